@@ -0,0 +1,105 @@
+"""Room mapping reads with and without the client-side cache.
+
+Needs a real Redis 6+ (fakeredis has no CLIENT TRACKING). Run against a
+scratch database (it flushes it)::
+
+    REDIS_URL=redis://localhost:6379/15 python -m benchmarks.client_cache --reads 20000
+
+Reads ``--rooms`` room mappings round-robin ``--reads`` times through
+``RedisClient.get_room_mapping``, first with tracking off and then on, and
+reports the time per read. Then changes a mapping ``--changes`` times from
+a second client and reports how long each change took to reach the
+cached read (the invalidation push).
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from src.services.redis_client import RedisClient
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Measure the room/user mapping cache")
+    parser.add_argument(
+        "--reads", type=int, default=20_000, help="Mapping reads per run"
+    )
+    parser.add_argument("--rooms", type=int, default=500, help="Distinct room mappings")
+    parser.add_argument(
+        "--changes", type=int, default=100, help="Mapping changes to time"
+    )
+    return parser.parse_args()
+
+
+async def read_all(redis: RedisClient, args: argparse.Namespace) -> float:
+    """Seconds per ``get_room_mapping`` over the whole run."""
+    started = time.perf_counter()
+    for i in range(args.reads):
+        await redis.get_room_mapping("chatwork", str(i % args.rooms))
+    return (time.perf_counter() - started) / args.reads
+
+
+async def wait_tracking(redis: RedisClient) -> None:
+    for _ in range(500):
+        if redis.cache.tracking:
+            return
+        await asyncio.sleep(0.01)
+    raise RuntimeError("client tracking did not come up")
+
+
+async def invalidation_delays(
+    redis: RedisClient, writer: RedisClient, args: argparse.Namespace
+) -> list[float]:
+    """Seconds from a write on another connection until the cached read sees it."""
+    delays = []
+    for n in range(args.changes):
+        await redis.get_room_mapping("chatwork", "0")  # cached
+        started = time.perf_counter()
+        await writer.client.hset("rooms:chatwork", "0", f"oc_changed_{n}")
+        while await redis.get_room_mapping("chatwork", "0") != f"oc_changed_{n}":
+            await asyncio.sleep(0)
+        delays.append(time.perf_counter() - started)
+    return delays
+
+
+async def main() -> None:
+    """Time cached and uncached reads and the invalidation delay."""
+    args = parse_args()
+    redis = RedisClient()
+    writer = RedisClient()
+    await redis.connect()
+    await writer.connect()
+    try:
+        await redis.client.flushdb()
+        await redis.client.hset(
+            "rooms:chatwork", mapping={str(i): f"oc_{i}" for i in range(args.rooms)}
+        )
+        uncached = await read_all(redis, args)
+
+        await redis.cache.start()
+        await wait_tracking(redis)
+        cached = await read_all(redis, args)
+        hits, misses = redis.cache.hits, redis.cache.misses
+
+        delays = await invalidation_delays(redis, writer, args)
+        await redis.client.flushdb()
+    finally:
+        await writer.disconnect()
+        await redis.disconnect()
+
+    print(f"reads:             {args.reads} over {args.rooms} rooms")
+    print(f"uncached:          {uncached * 1e6:.1f} us/read")
+    print(
+        f"cached:            {cached * 1e6:.1f} us/read ({hits} hits, {misses} misses)"
+    )
+    print(f"speedup:           {uncached / cached:.0f}x")
+    print(
+        f"invalidation:      median {statistics.median(delays) * 1e3:.2f} ms, "
+        f"max {max(delays) * 1e3:.2f} ms over {args.changes} changes"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
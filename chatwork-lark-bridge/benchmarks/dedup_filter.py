@@ -0,0 +1,161 @@
+"""Redis reads saved by the seen filter on dedup lookups.
+
+Run against a scratch Redis (it flushes the selected database), or
+in-process with ``--fake`` (fakeredis, no server needed)::
+
+    REDIS_URL=redis://localhost:6379/15 python -m benchmarks.dedup_filter --messages 10000
+    python -m benchmarks.dedup_filter --fake
+
+Writes ``--existing`` mappings, then runs ``--messages`` inbound messages
+(``--duplicates`` of them redeliveries of earlier ones) through
+``is_message_processed`` and ``save_message_mapping``, once without and once
+with the filter (rebuilt from Redis first), and reports the dedup lookups
+that reached Redis per 10k messages and the time they took.
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import uuid
+
+from src.core.config import settings
+from src.services.redis_client import RedisClient
+
+BATCH = 1000
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Measure Redis reads skipped by the seen filter"
+    )
+    parser.add_argument("--messages", type=int, default=10_000, help="Inbound messages")
+    parser.add_argument(
+        "--existing", type=int, default=50_000, help="Mappings already stored"
+    )
+    parser.add_argument(
+        "--duplicates", type=float, default=0.1, help="Fraction of messages redelivered"
+    )
+    parser.add_argument(
+        "--fake", action="store_true", help="Use fakeredis instead of REDIS_URL"
+    )
+    return parser.parse_args()
+
+
+class CountingPipelines:
+    """Wrap a client's ``pipeline`` to count executed pipelines (round trips)."""
+
+    def __init__(self, redis: RedisClient):
+        self.count = 0
+        self._pipeline = redis.client.pipeline
+        redis.client.pipeline = self.pipeline
+
+    def pipeline(self, *args, **kwargs):
+        pipe = self._pipeline(*args, **kwargs)
+        execute = pipe.execute
+
+        async def counted(*a, **kw):
+            self.count += 1
+            return await execute(*a, **kw)
+
+        pipe.execute = counted
+        return pipe
+
+
+def inbound(args: argparse.Namespace) -> list[str]:
+    """Lark message IDs as they arrive, redeliveries mixed in."""
+    rng = random.Random(0)
+    messages: list[str] = []
+    for _ in range(args.messages):
+        if messages and rng.random() < args.duplicates:
+            messages.append(rng.choice(messages))
+        else:
+            messages.append(f"om_{uuid.uuid4().hex}")
+    return messages
+
+
+async def run(redis: RedisClient, messages: list[str]) -> tuple[int, int, float]:
+    """Dedup lookups reaching Redis, duplicates found and seconds spent on lookups."""
+    counter = CountingPipelines(redis)
+    duplicates = 0
+    elapsed = 0.0
+    for i, message_id in enumerate(messages):
+        started = time.perf_counter()
+        processed = await redis.is_message_processed("lark", message_id)
+        elapsed += time.perf_counter() - started
+        if processed:
+            duplicates += 1
+        else:
+            await redis.save_message_mapping("lark", message_id, "chatwork", str(i))
+    lookups = counter.count - (len(messages) - duplicates)  # minus the mapping writes
+    del redis.client.pipeline
+    return lookups, duplicates, elapsed
+
+
+async def seed(redis: RedisClient, count: int) -> None:
+    """Mappings written before the run (what the filter is rebuilt from)."""
+    now = int(time.time())
+    for start in range(0, count, BATCH):
+        await redis.restore_message_mappings(
+            [
+                {
+                    "source_platform": "lark",
+                    "source_message_id": f"om_{uuid.uuid4().hex}",
+                    "target_platform": "chatwork",
+                    "target_message_id": str(1_000_000_000 + i),
+                    "saved_at": now,
+                }
+                for i in range(start, min(start + BATCH, count))
+            ]
+        )
+
+
+async def connect(args: argparse.Namespace) -> RedisClient:
+    """Client on REDIS_URL or on an in-process fake server."""
+    redis = RedisClient()
+    if args.fake:
+        import fakeredis.aioredis
+
+        redis.client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    else:
+        await redis.connect()
+    return redis
+
+
+async def main() -> None:
+    """Run the workload without and with the filter and print the reads saved."""
+    args = parse_args()
+    messages = inbound(args)
+    redis = await connect(args)
+    results = {}
+    try:
+        for name in ("without filter", "with filter"):
+            await redis.client.flushdb()
+            await seed(redis, args.existing)
+            redis.seen = None
+            if name == "with filter":
+                await redis.rebuild_seen_filter()
+            results[name] = await run(redis, messages)
+        await redis.client.flushdb()
+    finally:
+        await redis.disconnect()
+
+    scale = 10_000 / args.messages
+    print(f"messages:          {args.messages} ({args.duplicates:.0%} redelivered)")
+    print(f"existing mappings: {args.existing}")
+    print(
+        f"filter:            {settings.dedup_filter_capacity} IDs/window "
+        f"at {settings.dedup_filter_error_rate:.1%}"
+    )
+    for name, (lookups, duplicates, elapsed) in results.items():
+        print(
+            f"{name + ':':<19}{lookups * scale:.0f} Redis reads/10k, "
+            f"{duplicates} duplicates, {elapsed / args.messages * 1e6:.1f} us/lookup"
+        )
+    saved = results["without filter"][0] - results["with filter"][0]
+    print(f"saved:             {saved * scale:.0f} round trips/10k messages")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
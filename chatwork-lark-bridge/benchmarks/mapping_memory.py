@@ -0,0 +1,106 @@
+"""Redis memory used per message mapping, old layout vs hash buckets.
+
+Run against a scratch Redis (it flushes the selected database)::
+
+    REDIS_URL=redis://localhost:6379/15 python -m benchmarks.mapping_memory --count 200000
+
+Writes ``--count`` mappings in the per-key JSON layout, then the same
+mappings through ``RedisClient.save_message_mapping``, and reports the
+``used_memory`` growth per mapping of each.
+"""
+
+import argparse
+import asyncio
+import json
+import uuid
+from datetime import datetime, timezone
+
+from src.core.config import settings
+from src.services.redis_client import RedisClient
+
+BATCH = 1000
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Measure message mapping memory")
+    parser.add_argument("--count", type=int, default=100_000, help="Mappings to write")
+    return parser.parse_args()
+
+
+async def used_memory(redis: RedisClient) -> int:
+    """Bytes Redis reports in use."""
+    return (await redis.client.info("memory"))["used_memory"]
+
+
+async def write_legacy(redis: RedisClient, messages: list[tuple[str, str]]) -> None:
+    """One JSON string key per mapping, as stored before the bucket layout."""
+    for start in range(0, len(messages), BATCH):
+        async with redis.client.pipeline(transaction=False) as pipe:
+            for source_id, target_id in messages[start : start + BATCH]:
+                pipe.setex(
+                    f"msg:lark:{source_id}",
+                    settings.message_ttl_seconds,
+                    json.dumps(
+                        {
+                            "source_platform": "lark",
+                            "source_message_id": source_id,
+                            "target_platform": "chatwork",
+                            "target_message_id": target_id,
+                            "room_mapping_id": "lark_oc_0123456789abcdef_cw_12345678",
+                            "timestamp": datetime.now(timezone.utc).isoformat(),
+                        }
+                    ),
+                )
+            await pipe.execute()
+
+
+async def write_compact(redis: RedisClient, messages: list[tuple[str, str]]) -> None:
+    """The current layout, written through the client."""
+    for start in range(0, len(messages), BATCH):
+        await asyncio.gather(
+            *(
+                redis.save_message_mapping("lark", source_id, "chatwork", target_id)
+                for source_id, target_id in messages[start : start + BATCH]
+            )
+        )
+
+
+async def measure(redis: RedisClient, write, messages: list[tuple[str, str]]) -> float:
+    """Bytes per mapping added by one layout."""
+    await redis.client.flushdb()
+    before = await used_memory(redis)
+    await write(redis, messages)
+    return (await used_memory(redis) - before) / len(messages)
+
+
+async def main() -> None:
+    """Write both layouts and print bytes per mapping."""
+    args = parse_args()
+    # Realistic IDs: Lark "om_" + 32 hex chars, Chatwork 10-digit numbers
+    messages = [
+        (f"om_{uuid.uuid4().hex}", str(1_000_000_000 + i)) for i in range(args.count)
+    ]
+
+    redis = RedisClient()
+    await redis.connect()
+    try:
+        legacy = await measure(redis, write_legacy, messages)
+        compact = await measure(redis, write_compact, messages)
+        encodings = set()
+        async for key in redis.client.scan_iter("msgmap:*", count=1000):
+            encodings.add(await redis.client.object("encoding", key))
+        await redis.client.flushdb()
+    finally:
+        await redis.disconnect()
+
+    print(f"mappings:          {args.count}")
+    print(f"per-key JSON:      {legacy:.0f} bytes/mapping")
+    print(
+        f"hash buckets:      {compact:.0f} bytes/mapping ({', '.join(sorted(encodings))})"
+    )
+    print(f"saved:             {1 - compact / legacy:.0%}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,66 +1,26 @@
-"""Demo server with fakeredis for local testing."""
+"""Demo server with in-memory storage for local testing."""
 import os
 os.environ["ENV"] = "demo"
+# Keep everything in this process (no Redis required)
+os.environ["STORAGE_BACKEND"] = "memory"
+os.environ["INGEST_MODE"] = "inline"
+os.environ["RETRY_MODE"] = "inline"
 
-import asyncio
-import fakeredis.aioredis
 from src.main import app
-from src.services.redis_client import redis_client
 import uvicorn
 
-# Override Redis client with fakeredis
-async def override_redis():
-    """Replace real Redis with fakeredis."""
-    fake = fakeredis.aioredis.FakeRedis(decode_responses=True)
-    redis_client._client = fake
-    redis_client._connected = True
-    print("[OK] Using fakeredis for demo mode")
-    return fake
-
 if __name__ == "__main__":
     print("=" * 60)
     print("Starting Chatwork-Lark Bridge in DEMO mode...")
     print("=" * 60)
-    print("Using fakeredis (no real Redis required)")
+    print("Using in-memory storage (no real Redis required)")
     print("Server: http://localhost:8000")
     print("API Docs: http://localhost:8000/docs")
     print("Health Check: http://localhost:8000/health/")
     print("=" * 60)
     print("")
-    
-    # Run with fakeredis
-    async def startup():
-        await override_redis()
-    
-    # Patch the lifespan to use fakeredis
-    from src.main import lifespan
-    from contextlib import asynccontextmanager
-    
-    @asynccontextmanager
-    async def demo_lifespan(app):
-        # Startup
-        await override_redis()
-
-        # Load room and user mappings
-        from src.services.mapping_loader import mapping_loader
-        try:
-            room_count = await mapping_loader.load_room_mappings()
-            user_count = await mapping_loader.load_user_mappings()
-            print(f"[OK] Loaded {room_count} room mappings and {user_count} user mappings")
-        except Exception as e:
-            print(f"[WARNING] Failed to load mappings: {e}")
 
-        print("[OK] Demo server started successfully!")
-        print("[INFO] Press CTRL+C to stop the server")
-        print("")
-        yield
-        # Shutdown
-        print("Shutting down demo server...")
-    
-    # Replace lifespan
-    app.router.lifespan_context = demo_lifespan
-    
-    # Start server
+    # Start server (the normal lifespan connects the storage and loads mappings)
     uvicorn.run(
         app,
         host="0.0.0.0",
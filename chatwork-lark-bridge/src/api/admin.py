@@ -0,0 +1,128 @@
+"""Operational admin endpoints."""
+
+import asyncio
+import hmac
+import uuid
+from dataclasses import asdict
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from pydantic import BaseModel
+
+from ..core.config import settings
+from ..core.logging import get_logger
+from ..services.dlq_replay import ReplayFilter, dlq_replayer
+from ..services.mapping_loader import mapping_loader
+from ..services.storage import storage
+
+logger = get_logger(__name__)
+
+# Replays started from the API; kept so the tasks are not garbage collected
+_replays: set[asyncio.Task] = set()
+
+
+class ReplayRequest(BaseModel):
+    """DLQ replay options."""
+
+    platform: Optional[str] = None
+    room_id: Optional[str] = None
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+    dry_run: bool = False
+    concurrency: Optional[int] = None
+    run_id: Optional[str] = None
+
+
+def require_admin_token(
+    x_admin_token: Optional[str] = Header(None, alias="X-Admin-Token"),
+) -> None:
+    """Allow the request only with the configured admin token."""
+    if not settings.admin_token:
+        # Admin endpoints are disabled unless a token is configured
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    if not x_admin_token or not hmac.compare_digest(
+        x_admin_token, settings.admin_token
+    ):
+        logger.warning("admin_token_rejected")
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid admin token",
+        )
+
+
+router = APIRouter(dependencies=[Depends(require_admin_token)])
+
+
+@router.post("/mappings/reload")
+async def reload_mappings():
+    """
+    Apply changes in the mapping files without a restart.
+
+    Only mappings that were added, changed or removed are written.
+    """
+    result = await mapping_loader.reload()
+    return {"status": "ok", **result}
+
+
+@router.get("/dlq")
+async def list_failed_messages(
+    limit: int = Query(100, ge=1, le=1000),
+    after: Optional[str] = None,
+):
+    """
+    List DLQ entries, oldest first.
+
+    Pass ``next`` of a response as ``after`` to get the following page.
+    """
+    entries = await storage.get_failed_messages(limit=limit, after=after)
+    return {
+        "entries": [{"id": entry_id, **entry} for entry_id, entry in entries],
+        "next": entries[-1][0] if len(entries) == limit else None,
+    }
+
+
+@router.get("/dlq/counts")
+async def count_failed_messages():
+    """DLQ size by source platform and error class."""
+    return await storage.count_failed_messages()
+
+
+@router.post("/dlq/replay")
+async def replay_failed_messages(request: ReplayRequest):
+    """
+    Re-send DLQ entries through the normal pipeline.
+
+    A dry run counts the matching entries and returns the result. A real
+    run continues in the background; poll its progress with the returned
+    run ID, and pass the run ID again to resume an interrupted run.
+    """
+    filters = ReplayFilter(
+        platform=request.platform,
+        room_id=request.room_id,
+        since=request.since,
+        until=request.until,
+    )
+
+    if request.dry_run:
+        progress = await dlq_replayer.replay(
+            filters, dry_run=True, run_id=request.run_id
+        )
+        return asdict(progress)
+
+    run_id = request.run_id or uuid.uuid4().hex
+    task = asyncio.create_task(
+        dlq_replayer.replay(filters, concurrency=request.concurrency, run_id=run_id)
+    )
+    _replays.add(task)
+    task.add_done_callback(_replays.discard)
+    return {"run_id": run_id, "status": "running"}
+
+
+@router.get("/dlq/replay/{run_id}")
+async def get_replay_progress(run_id: str):
+    """Progress of a DLQ replay."""
+    progress = await dlq_replayer.get_progress(run_id)
+    if progress is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    return progress
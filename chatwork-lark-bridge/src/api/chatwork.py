@@ -1,16 +1,21 @@
 """Chatwork webhook endpoints."""
 
-from fastapi import APIRouter, Request, Header, HTTPException, status
+from fastapi import APIRouter, Header, HTTPException, Request, status
 from pydantic import BaseModel
 
-from ..core.logging import get_logger
-from ..utils.webhook_verification import verify_chatwork_signature
+from ..core.config import settings
 from ..core.exceptions import (
-    SignatureVerificationError,
     LoopDetectedError,
     MappingNotFoundError,
+    RetryScheduledError,
+    SignatureVerificationError,
 )
+from ..core.logging import get_logger
+from ..services.event_dispatcher import CHATWORK_MESSAGE_EVENT, parse_chatwork_event
+from ..services.event_queue import event_queue
 from ..services.message_processor import message_processor
+from ..services.redis_client import REDIS_OUTAGE_ERRORS
+from ..utils.webhook_verification import verify_chatwork_signature
 
 logger = get_logger(__name__)
 router = APIRouter()
@@ -34,6 +39,8 @@ async def chatwork_webhook(
     Chatwork webhook endpoint.
 
     Receives webhook events from Chatwork and syncs messages to Lark.
+    In queue ingest mode, message events are appended to the event stream
+    and delivered by the delivery worker instead.
     """
     # Get raw body for signature verification
     body = await request.body()
@@ -61,25 +68,52 @@ async def chatwork_webhook(
         room_id=event.get("room_id"),
     )
 
+    # Queue message events for asynchronous delivery
+    if event_type == CHATWORK_MESSAGE_EVENT and settings.queue_ingest_enabled:
+        try:
+            partition_key = await message_processor.partition_key(
+                "chatwork", str(event.get("room_id"))
+            )
+            entry_id = await event_queue.publish("chatwork", body, partition_key)
+        except Exception as e:
+            if not (
+                settings.degraded_mode_enabled and isinstance(e, REDIS_OUTAGE_ERRORS)
+            ):
+                logger.error(
+                    "chatwork_webhook_queue_error",
+                    message_id=event.get("message_id"),
+                    error=str(e),
+                    error_type=type(e).__name__,
+                )
+                # Chatwork doesn't retry failed webhooks
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail="Failed to queue event",
+                )
+            # Redis is down: deliver from this process instead
+            logger.warning(
+                "chatwork_webhook_queue_bypassed",
+                message_id=event.get("message_id"),
+                error=str(e),
+            )
+        else:
+            logger.info(
+                "chatwork_webhook_queued",
+                message_id=event.get("message_id"),
+                entry_id=entry_id,
+            )
+            return {"status": "ok"}
+
     # Process message_created events
-    if event_type == "message_created":
+    if event_type == CHATWORK_MESSAGE_EVENT:
         try:
             # Extract message data
-            room_id = str(event.get("room_id"))
-            message_id = str(event.get("message_id"))
-            sender_account_id = event.get("from_account_id")
-            message_body = event.get("body", "")
-
-            # Get sender name (from account info)
-            # For now, use account_id as name; can enhance with API call
-            sender_name = f"User {sender_account_id}"
+            message_kwargs = parse_chatwork_event(event_data)
+            message_id = message_kwargs["message_id"]
 
             # Process and sync to Lark
             lark_message_id = await message_processor.process_chatwork_message(
-                room_id=room_id,
-                message_id=message_id,
-                sender_name=sender_name,
-                message_body=message_body,
+                **message_kwargs
             )
 
             if lark_message_id:
@@ -102,6 +136,14 @@ async def chatwork_webhook(
                 message_id=event.get("message_id"),
             )
 
+        except RetryScheduledError as e:
+            # The send will be retried from the delay queue
+            logger.warning(
+                "chatwork_message_retry_scheduled",
+                message_id=event.get("message_id"),
+                error=str(e),
+            )
+
         except MappingNotFoundError as e:
             logger.warning(
                 "chatwork_room_mapping_not_found",
@@ -3,8 +3,12 @@
 from fastapi import APIRouter, status
 from pydantic import BaseModel
 
-from ..services.redis_client import redis_client
+from ..core.config import settings
 from ..core.logging import get_logger
+from ..services.degraded_storage import DegradedStorage
+from ..services.health_prober import health_prober
+from ..services.redis_client import redis_client
+from ..services.storage import storage
 
 logger = get_logger(__name__)
 router = APIRouter()
@@ -23,18 +27,47 @@ async def health_check():
     """
     Health check endpoint.
 
-    Returns the health status of the application and its dependencies.
+    Returns the health status of the application and its dependencies,
+    as of the latest background probe once the prober is running.
     """
-    redis_healthy = await redis_client.health_check()
-
-    is_healthy = redis_healthy
+    if health_prober.active:
+        results = health_prober.results
+        storage_healthy = results["storage"].healthy
+        redis_healthy = results["redis" if "redis" in results else "storage"].healthy
+        # A separate Redis check is only informational, as without the prober
+        is_healthy = all(r.healthy for name, r in results.items() if name != "redis")
+    else:
+        storage_healthy = await storage.health_check()
+        if storage is redis_client:
+            redis_healthy = storage_healthy
+        else:
+            # Shared breakers, rate limits and tokens use Redis when it is up
+            redis_healthy = (
+                redis_client.is_connected() and await redis_client.health_check()
+            )
+        is_healthy = storage_healthy
+
+    details = {
+        "redis": "connected" if redis_healthy else "disconnected",
+        "storage": settings.storage_backend,
+    }
+    if health_prober.active:
+        details["checks"] = {
+            name: r.to_dict() for name, r in health_prober.results.items()
+        }
+    pool = redis_client.instrumented_pool()
+    if pool is not None:
+        details["redis_pool"] = pool.stats()
+    # Serving from local state while Redis is down
+    if isinstance(storage, DegradedStorage) and storage.degraded:
+        is_healthy = False
+        details["storage"] = "redis (degraded)"
+        details["buffered_writes"] = storage.buffered
 
     return HealthResponse(
         status="healthy" if is_healthy else "degraded",
         redis=redis_healthy,
-        details={
-            "redis": "connected" if redis_healthy else "disconnected",
-        },
+        details=details,
     )
 
 
@@ -43,15 +76,39 @@ async def readiness_check():
     """
     Readiness check endpoint.
 
-    Returns 200 if the application is ready to receive traffic.
+    Returns 200 if the application is ready to receive traffic, with the
+    event queue depth and circuit breaker states of the latest probe.
     """
-    redis_healthy = await redis_client.health_check()
-
-    if not redis_healthy:
-        logger.warning("readiness_check_failed", reason="redis_unhealthy")
-        return {"ready": False, "reason": "Redis not connected"}
-
-    return {"ready": True}
+    state = {
+        "queue_depth": health_prober.queue_depth,
+        "breakers": health_prober.breakers,
+    }
+
+    if health_prober.active:
+        if health_prober.stale:
+            logger.warning("readiness_check_failed", reason="health_probes_stalled")
+            return {"ready": False, "reason": "Health probes stalled", **state}
+        storage_healthy = health_prober.results["storage"].healthy
+    else:
+        storage_healthy = await storage.health_check()
+
+    if not storage_healthy:
+        logger.warning(
+            "readiness_check_failed",
+            reason="storage_unhealthy",
+            backend=settings.storage_backend,
+        )
+        return {
+            "ready": False,
+            "reason": f"Storage ({settings.storage_backend}) not connected",
+            **state,
+        }
+
+    max_depth = settings.health_ready_max_queue_depth
+    if max_depth and (health_prober.queue_depth or 0) > max_depth:
+        return {"ready": False, "reason": "Event queue backlog", **state}
+
+    return {"ready": True, **state}
 
 
 @router.get("/live", status_code=status.HTTP_200_OK)
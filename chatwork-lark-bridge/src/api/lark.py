@@ -10,9 +10,16 @@ from ..core.exceptions import (
     SignatureVerificationError,
     LoopDetectedError,
     MappingNotFoundError,
+    RetryScheduledError,
+)
+from ..utils.webhook_verification import (
+    verify_lark_signature,
+    verify_lark_verification_token,
 )
-from ..utils.webhook_verification import verify_lark_verification_token
 from ..services.message_processor import message_processor
+from ..services.event_dispatcher import parse_lark_event, LARK_MESSAGE_EVENT
+from ..services.event_queue import event_queue
+from ..services.redis_client import REDIS_OUTAGE_ERRORS
 
 logger = get_logger(__name__)
 router = APIRouter()
@@ -37,13 +44,40 @@ class LarkMessageEvent(BaseModel):
     chat_id: Optional[str] = None
 
 
+def verify_lark_event(request: Request, body: bytes, event_data: dict) -> None:
+    """
+    Verify an event callback before it is accepted.
+
+    Uses the request signature when an encrypt key is configured,
+    otherwise the verification token carried in the event header.
+
+    Raises:
+        SignatureVerificationError: If verification fails
+    """
+    signature = request.headers.get("X-Lark-Signature")
+    if settings.lark_encrypt_key and signature:
+        verify_lark_signature(
+            timestamp=request.headers.get("X-Lark-Request-Timestamp", ""),
+            nonce=request.headers.get("X-Lark-Request-Nonce", ""),
+            encrypt_key=settings.lark_encrypt_key,
+            body=body.decode("utf-8"),
+            signature=signature,
+        )
+        return
+
+    verify_lark_verification_token(event_data.get("header", {}).get("token"))
+
+
 @router.post("/")
 async def lark_webhook(request: Request):
     """
     Lark event subscription endpoint.
 
     Receives event notifications from Lark and syncs messages to Chatwork.
+    In queue ingest mode, message events are appended to the event stream
+    and delivered by the delivery worker instead.
     """
+    body = await request.body()
     event_data = await request.json()
 
     # Handle URL verification challenge
@@ -75,65 +109,59 @@ async def lark_webhook(request: Request):
         event_id=event_id,
     )
 
-    # Process message received events
-    if event_type == "im.message.receive_v1":
-        try:
-            # Extract event data
-            event = event_data.get("event", {})
-
-            # Get message info
-            message = event.get("message", {})
-            message_id = message.get("message_id")
-            message_type = message.get("message_type")
-            chat_id = message.get("chat_id")
-            content_str = message.get("content", "{}")
-
-            # Get sender info
-            sender = event.get("sender", {})
-            sender_id = sender.get("sender_id", {})
-            open_id = sender_id.get("open_id")
-            user_id = sender_id.get("user_id")
-
-            # For now, use user_id or open_id as sender name
-            sender_name = f"User {user_id or open_id}"
+    try:
+        verify_lark_event(request, body, event_data)
+    except SignatureVerificationError as e:
+        logger.warning("lark_event_verification_failed", error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid event signature",
+        )
 
+    # Queue message events for asynchronous delivery
+    if event_type == LARK_MESSAGE_EVENT and settings.queue_ingest_enabled:
+        chat_id = event_data.get("event", {}).get("message", {}).get("chat_id")
+        try:
+            partition_key = await message_processor.partition_key("lark", str(chat_id))
+            entry_id = await event_queue.publish("lark", body, partition_key)
+        except Exception as e:
+            if not (
+                settings.degraded_mode_enabled and isinstance(e, REDIS_OUTAGE_ERRORS)
+            ):
+                logger.error(
+                    "lark_event_queue_error",
+                    event_id=event_id,
+                    error=str(e),
+                    error_type=type(e).__name__,
+                )
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail="Failed to queue event",
+                )
+            # Redis is down: deliver from this process instead
+            logger.warning("lark_event_queue_bypassed", event_id=event_id, error=str(e))
+        else:
             logger.info(
-                "lark_message_received",
-                message_id=message_id,
-                message_type=message_type,
-                chat_id=chat_id,
-                sender=sender_name,
+                "lark_event_queued",
+                event_id=event_id,
+                entry_id=entry_id,
             )
+            return {"status": "ok"}
 
-            # Only process text messages for now
-            if message_type != "text":
-                logger.info(
-                    "lark_message_type_unsupported",
-                    message_id=message_id,
-                    message_type=message_type,
-                    reason="only_text_supported",
-                )
+    # Process message received events
+    if event_type == LARK_MESSAGE_EVENT:
+        event = event_data.get("event", {})
+        try:
+            # Extract event data
+            message_kwargs = parse_lark_event(event_data)
+            if message_kwargs is None:
                 return {"status": "ok"}
 
-            # Parse message content
-            import json
-            try:
-                content = json.loads(content_str)
-                message_text = content.get("text", "")
-            except json.JSONDecodeError as e:
-                logger.warning(
-                    "lark_message_content_parse_error",
-                    message_id=message_id,
-                    error=str(e),
-                )
-                message_text = content_str
+            message_id = message_kwargs["message_id"]
 
             # Process and sync to Chatwork
             chatwork_message_id = await message_processor.process_lark_message(
-                chat_id=chat_id,
-                message_id=message_id,
-                sender_name=sender_name,
-                message_text=message_text,
+                **message_kwargs
             )
 
             if chatwork_message_id:
@@ -156,6 +184,14 @@ async def lark_webhook(request: Request):
                 message_id=event.get("message", {}).get("message_id"),
             )
 
+        except RetryScheduledError as e:
+            # The send will be retried from the delay queue
+            logger.warning(
+                "lark_message_retry_scheduled",
+                message_id=event.get("message", {}).get("message_id"),
+                error=str(e),
+            )
+
         except MappingNotFoundError as e:
             logger.warning(
                 "lark_room_mapping_not_found",
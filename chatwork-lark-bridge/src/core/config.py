@@ -33,27 +33,121 @@ class Settings(BaseSettings):
     lark_verification_token: str = "test_token"  # Default for testing
     lark_encrypt_key: Optional[str] = None
     lark_api_base_url: str = "https://open.larksuite.com/open-apis"
+    lark_transport: str = "httpx"  # httpx or sdk
+    lark_http_max_connections: int = 20
+    lark_sdk_max_workers: int = 4
+    # Keep under 1800: Lark only issues a new token in its last 30 minutes
+    lark_token_refresh_margin_seconds: int = 600
+    lark_token_lock_timeout_seconds: int = 10
+    lark_token_retry_seconds: int = 30
+    # Kept under Lark's send quotas (50 QPS per app, 5 QPS per chat)
+    lark_rate_limit_app_qps: int = 45
+    lark_rate_limit_chat_qps: int = 4
+    lark_rate_limit_retry_seconds: int = 1
 
     # Redis
     redis_url: str = "redis://localhost:6379/0"
     redis_password: Optional[str] = None
+    # Pool size (the starting size with redis_pool_autotune)
     redis_max_connections: int = 10
+    # Seconds a command waits for a free pooled connection before failing
+    redis_pool_timeout_seconds: float = 5.0
+    # Resize the pool between the limits below from observed contention
+    redis_pool_autotune: bool = False
+    redis_pool_autotune_min_connections: int = 4
+    redis_pool_autotune_max_connections: int = 64
+    redis_pool_autotune_interval_seconds: float = 10.0
+    # standalone (redis_url), sentinel or cluster (redis_url of any node)
+    redis_mode: str = "standalone"
+    redis_sentinels: str = ""  # Comma-separated host:port
+    redis_sentinel_master: str = "mymaster"
+    redis_sentinel_password: Optional[str] = None
+
+    # Storage for dedup, mappings and the DLQ: redis, memory or sqlite
+    # (memory and sqlite need INGEST_MODE=inline and RETRY_MODE=inline)
+    storage_backend: str = "redis"
+    sqlite_path: str = "data/bridge.db"
+    # Keep delivering through a Redis outage on local state, buffering
+    # mapping and DLQ writes in segment files until Redis is back
+    degraded_mode_enabled: bool = False
+    degraded_buffer_dir: str = "data/buffer"
+    degraded_segment_max_bytes: int = 4 * 1024 * 1024
+    degraded_buffer_fsync: bool = False
+    degraded_probe_interval_seconds: float = 1.0
+    degraded_reconcile_batch_size: int = 500
 
     # Message Processing
     max_message_length: int = 4000
     message_ttl_seconds: int = 86400  # 24 hours
+    # How long an in-progress claim blocks other copies of a message
+    message_claim_lease_seconds: int = 300
+    # Hashes per platform and TTL window that message mappings are spread
+    # over; keep the mappings per hash under hash-max-listpack-entries (128)
+    message_mapping_buckets: int = 1024
+    # In-process filter answering "never seen" without a Redis read
+    # (message IDs per TTL window it is sized for, false positive rate)
+    dedup_filter_enabled: bool = False
+    dedup_filter_capacity: int = 500_000
+    dedup_filter_error_rate: float = 0.01
+    # Serve room/user mapping reads from memory, invalidated by Redis
+    # (RESP3 CLIENT TRACKING; not in cluster mode)
+    client_cache_enabled: bool = False
+    client_cache_max_entries: int = 10_000
+    # Wait before re-enabling tracking after its connection dropped
+    client_cache_retry_seconds: float = 5.0
+    # Seconds between checks of the mapping files for changes (0 = off)
+    mapping_reload_interval_seconds: float = 10.0
+    # Fallback check of the in-process route table against Redis
+    route_table_check_interval_seconds: float = 30.0
     enable_loop_detection: bool = True
     message_prefix_chatwork: str = "[From Chatwork]"
     message_prefix_lark: str = "[From Lark]"
 
+    # Webhook Ingestion
+    ingest_mode: str = "inline"  # inline or queue
+    event_stream_key: str = "events:webhooks"
+    event_stream_partitions: int = 16
+    event_stream_maxlen: int = 100000
+    event_consumer_group: str = "delivery"
+    embedded_delivery_worker: bool = True
+    delivery_batch_size: int = 10
+    delivery_block_ms: int = 5000
+    delivery_concurrency: int = 16
+    partition_lease_ms: int = 15000
+    partition_rebalance_interval_seconds: int = 5
+    delivery_max_attempts: int = 5
+    delivery_shutdown_timeout_seconds: int = 50
+    delivery_heartbeat_file: Optional[str] = None
+
     # Retry Configuration
     max_retry_attempts: int = 5
     retry_min_wait_seconds: int = 2
     retry_max_wait_seconds: int = 60
+    retry_mode: str = (
+        "deferred"  # deferred (Redis delay queue) or inline (sleep and retry)
+    )
+    retry_queue_key: str = "retry:scheduled"
+    retry_poll_interval_seconds: float = 1.0
+    retry_claim_timeout_seconds: int = 60
+    # DLQ replay
+    dlq_replay_concurrency: int = 5
+    dlq_replay_page_size: int = 100
+
+    # Circuit Breaker
+    circuit_failure_threshold: int = 5
+    circuit_open_seconds: int = 30
+    circuit_probe_timeout_seconds: int = 60
+    circuit_drain_batch_size: int = 50
 
     # Rate Limiting
+    # Message posts per room
     chatwork_rate_limit_requests: int = 10
     chatwork_rate_limit_window_seconds: int = 10
+    # All API calls per token
+    chatwork_api_rate_limit_requests: int = 300
+    chatwork_api_rate_limit_window_seconds: int = 300
+    # Senders released per second after a platform-wide rate limit pause
+    rate_limit_resume_per_second: int = 5
 
     # Logging
     log_level: str = "INFO"
@@ -62,8 +156,15 @@ class Settings(BaseSettings):
     # Monitoring
     enable_metrics: bool = True
     metrics_port: int = 9090
+    # Background probes of Redis, Chatwork and Lark behind /health
+    health_probe_interval_seconds: float = 10.0
+    health_probe_timeout_seconds: float = 2.0
+    # /health/ready reports not ready above this event queue depth (0 = off)
+    health_ready_max_queue_depth: int = 0
 
     # Security
+    # Required in the X-Admin-Token header of /admin endpoints (unset = disabled)
+    admin_token: Optional[str] = None
     allowed_ips_chatwork: Optional[str] = None
     allowed_ips_lark: Optional[str] = None
 
@@ -72,6 +173,11 @@ class Settings(BaseSettings):
         """Check if running in production environment."""
         return self.env == "production"
 
+    @property
+    def queue_ingest_enabled(self) -> bool:
+        """Check if webhooks are acknowledged and delivered asynchronously."""
+        return self.ingest_mode == "queue"
+
     @property
     def allowed_chatwork_ips(self) -> list[str]:
         """Parse allowed Chatwork IPs from comma-separated string."""
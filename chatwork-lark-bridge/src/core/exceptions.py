@@ -78,6 +78,17 @@ class NetworkError(RetryableError):
     pass
 
 
+class CircuitOpenError(BridgeException):
+    """Calls to a platform are suspended because its circuit breaker is open."""
+
+    def __init__(self, circuit: str, retry_in: float):
+        message = f"Circuit {circuit} is open, retry in {retry_in:.0f}s"
+        details = {"circuit": circuit, "retry_in": retry_in}
+        super().__init__(message, details)
+        self.circuit = circuit
+        self.retry_in = retry_in
+
+
 # Webhook Errors
 class WebhookError(BridgeException):
     """Base class for webhook-related errors."""
@@ -129,6 +140,61 @@ class UnsupportedMessageTypeError(NonRetryableError):
     pass
 
 
+class DeadLetteredError(MessageProcessingError):
+    """Message could not be sent and was saved to the dead letter queue."""
+
+    def __init__(self, platform: str, message_id: str, error: Exception):
+        message = f"{platform} message {message_id} moved to DLQ: {error}"
+        details = {
+            "platform": platform,
+            "message_id": message_id,
+            "error_type": type(error).__name__,
+        }
+        super().__init__(message, details)
+
+
+class RetryScheduledError(MessageProcessingError):
+    """Message could not be sent and was scheduled for a later attempt."""
+
+    def __init__(
+        self, platform: str, message_id: str, error: Exception, retry_in: float
+    ):
+        message = f"{platform} message {message_id} retrying in {retry_in}s: {error}"
+        details = {
+            "platform": platform,
+            "message_id": message_id,
+            "error_type": type(error).__name__,
+            "retry_in": retry_in,
+        }
+        super().__init__(message, details)
+
+
+class RetryInPlaceError(MessageProcessingError):
+    """Message could not be sent yet; the caller retries it before anything later."""
+
+    def __init__(
+        self,
+        platform: str,
+        message_id: str,
+        error: Exception,
+        retry_in: float,
+        attempt: int,
+    ):
+        message = (
+            f"{platform} message {message_id} retrying in place in {retry_in}s: {error}"
+        )
+        details = {
+            "platform": platform,
+            "message_id": message_id,
+            "error_type": type(error).__name__,
+            "retry_in": retry_in,
+            "attempt": attempt,
+        }
+        super().__init__(message, details)
+        self.retry_in = retry_in
+        self.attempt = attempt
+
+
 # Data Store Errors
 class DataStoreError(BridgeException):
     """Base class for data store errors."""
@@ -123,3 +123,21 @@ async def retry_with_rate_limit_handling(
                 wait_time=wait_time,
             )
             await asyncio.sleep(wait_time)
+
+
+async def send_with_retry_policy(
+    func: Callable[P, T],
+    *args: P.args,
+    **kwargs: P.kwargs,
+) -> T:
+    """
+    Call an outbound API function under the configured retry mode.
+
+    With ``retry_mode=deferred`` the call is made once and errors propagate,
+    so the message processor can schedule the next attempt in the Redis
+    delay queue instead of sleeping here. Otherwise it is retried inline
+    with ``retry_with_rate_limit_handling``.
+    """
+    if settings.retry_mode == "deferred":
+        return await func(*args, **kwargs)
+    return await retry_with_rate_limit_handling(func, *args, **kwargs)
@@ -2,17 +2,24 @@
 
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, Request, status
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, Request, Response, status
 from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
+from .api import admin, chatwork, health, lark
 from .core.config import settings
-from .core.logging import setup_logging, get_logger
 from .core.exceptions import BridgeException
-from .services.redis_client import redis_client
-from .services.mapping_loader import mapping_loader
+from .core.logging import get_logger, setup_logging
 from .services.chatwork_client import chatwork_client
-from .api import chatwork, lark, health
+from .services.delivery_worker import delivery_worker
+from .services.event_queue import event_queue
+from .services.health_prober import health_prober
+from .services.lark_client import lark_client
+from .services.mapping_loader import mapping_loader
+from .services.retry_poller import retry_poller
+from .services.route_table import route_table
+from .services.storage import storage
 
 # Setup logging
 setup_logging()
@@ -25,8 +32,9 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("application_starting", env=settings.env)
 
-    # Connect to Redis
-    await redis_client.connect()
+    # Connect to the storage (Redis unless STORAGE_BACKEND says otherwise)
+    await storage.connect()
+    lark_client.start()
 
     # Load room and user mappings
     try:
@@ -41,12 +49,37 @@ async def lifespan(app: FastAPI):
         logger.error("failed_to_load_mappings", error=str(e))
         # Continue startup even if mappings fail to load
 
+    mapping_loader.start_watching()
+
+    # The route table, event stream and retry queue run on Redis
+    if settings.storage_backend == "redis":
+        await route_table.start()
+
+        # Prepare the event stream for queue ingest mode
+        if settings.queue_ingest_enabled:
+            await event_queue.ensure_group()
+            if settings.embedded_delivery_worker:
+                await delivery_worker.start()
+
+        # Run scheduled and deferred retries wherever messages are delivered
+        if not settings.queue_ingest_enabled or settings.embedded_delivery_worker:
+            retry_poller.start()
+
+    await health_prober.start()
+
     yield
 
     # Shutdown
     logger.info("application_shutting_down")
-    await redis_client.disconnect()
+    await health_prober.stop()
+    await retry_poller.stop()
+    if settings.queue_ingest_enabled and settings.embedded_delivery_worker:
+        await delivery_worker.stop()
+    await mapping_loader.stop_watching()
+    await route_table.stop()
+    await storage.disconnect()
     await chatwork_client.close()
+    await lark_client.close()
 
 
 # Create FastAPI app
@@ -119,6 +152,7 @@ async def generic_exception_handler(request: Request, exc: Exception):
 app.include_router(health.router, prefix="/health", tags=["health"])
 app.include_router(chatwork.router, prefix="/webhook/chatwork", tags=["chatwork"])
 app.include_router(lark.router, prefix="/webhook/lark", tags=["lark"])
+app.include_router(admin.router, prefix="/admin", tags=["admin"])
 
 
 @app.get("/")
@@ -132,6 +166,14 @@ async def root():
     }
 
 
+if settings.enable_metrics:
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Prometheus metrics (Redis pool saturation among them)."""
+        return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -0,0 +1,79 @@
+"""DLQ replay command.
+
+Run with ``python -m src.replay``. Re-sends dead-lettered messages through
+the normal processing pipeline, e.g. after a platform outage::
+
+    python -m src.replay --platform lark --since 2025-12-31T10:00 --dry-run
+    python -m src.replay --platform lark --since 2025-12-31T10:00
+    python -m src.replay --resume <run_id>
+"""
+
+import argparse
+import asyncio
+from dataclasses import asdict
+from datetime import datetime
+
+from .core.logging import get_logger, setup_logging
+from .services.chatwork_client import chatwork_client
+from .services.dlq_replay import ReplayFilter, dlq_replayer
+from .services.lark_client import lark_client
+from .services.storage import storage
+
+# Setup logging
+setup_logging()
+logger = get_logger(__name__)
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Replay messages from the DLQ")
+    parser.add_argument(
+        "--platform", choices=["chatwork", "lark"], help="Source platform"
+    )
+    parser.add_argument("--room", help="Source room/chat ID")
+    parser.add_argument(
+        "--since", type=datetime.fromisoformat, help="Failed at or after (ISO)"
+    )
+    parser.add_argument(
+        "--until", type=datetime.fromisoformat, help="Failed at or before (ISO)"
+    )
+    parser.add_argument("--concurrency", type=int, help="Messages re-sent at once")
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Only count matching entries"
+    )
+    parser.add_argument(
+        "--resume", metavar="RUN_ID", help="Continue an interrupted run"
+    )
+    return parser.parse_args()
+
+
+async def run_replay(args: argparse.Namespace) -> None:
+    """Run one replay and print its final progress."""
+    await storage.connect()
+    lark_client.start()
+    try:
+        progress = await dlq_replayer.replay(
+            ReplayFilter(
+                platform=args.platform,
+                room_id=args.room,
+                since=args.since,
+                until=args.until,
+            ),
+            dry_run=args.dry_run,
+            concurrency=args.concurrency,
+            run_id=args.resume,
+        )
+        print(asdict(progress))
+    finally:
+        await storage.disconnect()
+        await chatwork_client.close()
+        await lark_client.close()
+
+
+def main() -> None:
+    """Replay command entry point."""
+    asyncio.run(run_replay(parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,35 @@
 """Chatwork API client service."""
 
 from typing import Optional
+
 import httpx
 
 from ..core.config import settings
-from ..core.logging import get_logger
 from ..core.exceptions import (
-    RateLimitError,
     AuthenticationError,
-    ServerError,
     BadRequestError,
+    RateLimitError,
     ResourceNotFoundError,
+    ServerError,
 )
-from ..core.retry import retry_with_rate_limit_handling
+from ..core.logging import get_logger
+from ..core.retry import send_with_retry_policy
+from .circuit_breaker import circuit_breakers
+from .rate_limiter import Bucket, rate_limit_gate, rate_limiter
 
 logger = get_logger(__name__)
 
 
 class ChatworkAPIClient:
-    """Client for interacting with Chatwork API."""
+    """
+    Client for interacting with Chatwork API.
+
+    Every call first takes a token from the shared per-account bucket, and
+    message posts also from a per-room bucket, so all replicas together
+    stay under Chatwork's limits. A 429 pauses every sender through the
+    shared rate limit gate, and repeated 5xx/network errors open the
+    shared circuit breaker.
+    """
 
     def __init__(self):
         """Initialize Chatwork API client."""
@@ -28,6 +39,7 @@ class ChatworkAPIClient:
             "Content-Type": "application/x-www-form-urlencoded",
         }
         self.client = httpx.AsyncClient(headers=self.headers, timeout=30.0)
+        self.breaker = circuit_breakers["chatwork"]
 
         logger.info("chatwork_client_initialized")
 
@@ -66,7 +78,7 @@ class ChatworkAPIClient:
             }
 
             # Send with retry handling
-            response_data = await retry_with_rate_limit_handling(
+            response_data = await send_with_retry_policy(
                 self._post_message,
                 room_id,
                 data,
@@ -96,38 +108,65 @@ class ChatworkAPIClient:
         Internal method to POST message to Chatwork API.
 
         Handles HTTP errors and raises appropriate exceptions.
+
+        Raises:
+            CircuitOpenError: If Chatwork is considered down (not sent)
         """
         url = f"{self.base_url}/rooms/{room_id}/messages"
 
-        response = await self.client.post(url, data=data)
-
-        # Handle errors
-        if response.status_code == 429:
-            retry_after = int(response.headers.get("Retry-After", 10))
-            logger.warning(
-                "chatwork_rate_limit",
-                room_id=room_id,
-                retry_after=retry_after,
+        async with self.breaker.guard():
+            await rate_limit_gate.wait("chatwork")
+            await rate_limiter.acquire(
+                self._room_bucket(room_id), self._account_bucket()
             )
-            raise RateLimitError(platform="chatwork", retry_after=retry_after)
-
-        elif response.status_code == 401:
-            raise AuthenticationError("Chatwork API authentication failed")
-
-        elif response.status_code == 404:
-            raise ResourceNotFoundError(f"Room not found: {room_id}")
-
-        elif 400 <= response.status_code < 500:
-            error_msg = response.text
-            raise BadRequestError(f"Chatwork bad request: {error_msg}")
-
-        elif response.status_code >= 500:
-            raise ServerError(f"Chatwork server error: {response.status_code}")
-
-        # Check success
-        response.raise_for_status()
-
-        return response.json()
+            response = await self.client.post(url, data=data)
+
+            # Handle errors
+            if response.status_code == 429:
+                retry_after = int(response.headers.get("Retry-After", 10))
+                logger.warning(
+                    "chatwork_rate_limit",
+                    room_id=room_id,
+                    retry_after=retry_after,
+                )
+                await rate_limit_gate.pause("chatwork", retry_after)
+                raise RateLimitError(platform="chatwork", retry_after=retry_after)
+
+            elif response.status_code == 401:
+                raise AuthenticationError("Chatwork API authentication failed")
+
+            elif response.status_code == 404:
+                raise ResourceNotFoundError(f"Room not found: {room_id}")
+
+            elif 400 <= response.status_code < 500:
+                error_msg = response.text
+                raise BadRequestError(f"Chatwork bad request: {error_msg}")
+
+            elif response.status_code >= 500:
+                raise ServerError(f"Chatwork server error: {response.status_code}")
+
+            # Check success
+            response.raise_for_status()
+
+            return response.json()
+
+    @staticmethod
+    def _account_bucket() -> Bucket:
+        """Rate limit bucket shared by every call with this API token."""
+        return Bucket(
+            "chatwork:account",
+            settings.chatwork_api_rate_limit_requests,
+            settings.chatwork_api_rate_limit_window_seconds,
+        )
+
+    @staticmethod
+    def _room_bucket(room_id: str) -> Bucket:
+        """Rate limit bucket for message posts to one room."""
+        return Bucket(
+            f"chatwork:room:{room_id}",
+            settings.chatwork_rate_limit_requests,
+            settings.chatwork_rate_limit_window_seconds,
+        )
 
     async def get_room_members(self, room_id: str) -> list[dict]:
         """
@@ -141,6 +180,7 @@ class ChatworkAPIClient:
         """
         url = f"{self.base_url}/rooms/{room_id}/members"
 
+        await rate_limiter.acquire(self._account_bucket())
         response = await self.client.get(url)
         response.raise_for_status()
 
@@ -159,6 +199,7 @@ class ChatworkAPIClient:
         """
         url = f"{self.base_url}/rooms/{room_id}/messages/{message_id}"
 
+        await rate_limiter.acquire(self._account_bucket())
         response = await self.client.get(url)
 
         if response.status_code == 404:
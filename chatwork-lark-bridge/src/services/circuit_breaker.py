@@ -0,0 +1,315 @@
+"""Per-platform circuit breakers shared by every replica through Redis."""
+
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+import httpx
+
+from ..core.config import settings
+from ..core.exceptions import CircuitOpenError, NetworkError, ServerError
+from ..core.logging import get_logger
+from .redis_client import LEGACY_KEYS, RedisClient, hash_tag, redis_client
+from .retry_queue import RetryQueue, retry_queue
+
+logger = get_logger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Decide whether a call may go out. Once the open period is over, exactly
+# one caller gets the probe lock and is let through (half-open).
+BEFORE_CALL_SCRIPT = """
+local state = redis.call('HGET', KEYS[1], 'state') or 'closed'
+if state == 'closed' then
+    return {'closed', 0}
+end
+local open_until = tonumber(redis.call('HGET', KEYS[1], 'open_until') or '0')
+local now = tonumber(ARGV[1])
+if now < open_until then
+    return {'open', open_until - now}
+end
+if redis.call('SET', KEYS[2], '1', 'NX', 'PX', ARGV[2]) then
+    redis.call('HSET', KEYS[1], 'state', 'half_open')
+    return {'probe', 0}
+end
+return {'open', 0}
+"""
+
+# Close after a successful probe; forget earlier failures while closed.
+# Successes of calls started before the circuit opened are ignored.
+RECORD_SUCCESS_SCRIPT = """
+local state = redis.call('HGET', KEYS[1], 'state') or 'closed'
+if state == 'half_open' then
+    redis.call('HSET', KEYS[1], 'state', 'closed', 'failures', 0)
+    redis.call('DEL', KEYS[2])
+    return 'recovered'
+end
+if state == 'closed' and tonumber(redis.call('HGET', KEYS[1], 'failures') or '0') > 0 then
+    redis.call('HSET', KEYS[1], 'failures', 0)
+end
+return state
+"""
+
+# Open after ARGV[2] consecutive failures, or when the probe fails
+RECORD_FAILURE_SCRIPT = """
+local state = redis.call('HGET', KEYS[1], 'state') or 'closed'
+if state == 'open' then
+    return 'open'
+end
+if state == 'closed' then
+    local failures = redis.call('HINCRBY', KEYS[1], 'failures', 1)
+    if failures < tonumber(ARGV[2]) then
+        return 'closed'
+    end
+end
+redis.call('HSET', KEYS[1], 'state', 'open', 'open_until', tonumber(ARGV[1]) + tonumber(ARGV[3]),
+           'failures', 0)
+redis.call('DEL', KEYS[2])
+return 'open'
+"""
+
+# Move up to ARGV[2] deferred messages into the retry queue, due now
+RELEASE_DEFERRED_SCRIPT = """
+local items = redis.call('LRANGE', KEYS[1], 0, tonumber(ARGV[2]) - 1)
+for _, item in ipairs(items) do
+    redis.call('ZADD', KEYS[2], ARGV[1], item)
+end
+if #items > 0 then
+    redis.call('LTRIM', KEYS[1], #items, -1)
+end
+return #items
+"""
+
+
+def is_outage(error: BaseException) -> bool:
+    """Whether an error means the platform is unavailable (not our request)."""
+    return isinstance(error, (ServerError, NetworkError, httpx.TransportError))
+
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open circuit breaker for one platform endpoint.
+
+    The state lives in a Redis hash, so a platform outage seen by one
+    replica stops calls from all of them. After
+    ``circuit_failure_threshold`` consecutive outage errors the circuit
+    opens for ``circuit_open_seconds``; calls fail fast with
+    ``CircuitOpenError`` and the message processor parks those messages in
+    this breaker's deferred list. When the open period ends a single probe
+    call is let through; if it succeeds the circuit closes and
+    ``release_deferred`` feeds the parked messages back into the retry
+    queue. If Redis is unavailable, calls are always allowed.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        redis: Optional[RedisClient] = None,
+        retries: Optional[RetryQueue] = None,
+    ):
+        """
+        Initialize a circuit breaker.
+
+        Args:
+            name: Platform endpoint name (e.g. "lark:send_message")
+            redis: Redis client (defaults to the global instance)
+            retries: Retry queue deferred messages are released into
+        """
+        self.name = name
+        self.redis = redis or redis_client
+        self.retries = retries or retry_queue
+
+    @property
+    def key(self) -> str:
+        """Redis hash holding the breaker state."""
+        return f"circuit:{{{self.name}}}"
+
+    @property
+    def probe_key(self) -> str:
+        """Redis key held by the caller running the half-open probe."""
+        return f"circuit:{{{self.name}}}:probe"
+
+    @property
+    def deferred_key(self) -> str:
+        """
+        Redis list of messages parked while the circuit is open.
+
+        It shares the retry queue's hash tag, since ``release_deferred``
+        moves messages from one to the other in a single script.
+        """
+        return f"{{{hash_tag(self.retries.key)}}}:deferred:{self.name}"
+
+    async def before_call(self) -> None:
+        """
+        Check that a call may go out.
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+        """
+        if not self.redis.is_connected():
+            # Local storage backend: no shared breaker state
+            return
+        try:
+            decision, retry_in_ms = await self.redis.run_script(
+                BEFORE_CALL_SCRIPT,
+                [self.key, self.probe_key],
+                [
+                    int(time.time() * 1000),
+                    int(settings.circuit_probe_timeout_seconds * 1000),
+                ],
+            )
+        except Exception as e:
+            logger.warning("circuit_state_unavailable", circuit=self.name, error=str(e))
+            return
+
+        if decision == OPEN:
+            raise CircuitOpenError(self.name, int(retry_in_ms) / 1000)
+        if decision == "probe":
+            logger.info("circuit_half_open_probe", circuit=self.name)
+
+    async def record_success(self) -> None:
+        """Record a call that reached the platform."""
+        if await self._record(RECORD_SUCCESS_SCRIPT, []) == "recovered":
+            logger.info("circuit_closed", circuit=self.name)
+
+    async def record_failure(self) -> None:
+        """Record a call that failed because the platform is unavailable."""
+        state = await self._record(
+            RECORD_FAILURE_SCRIPT,
+            [
+                int(time.time() * 1000),
+                settings.circuit_failure_threshold,
+                int(settings.circuit_open_seconds * 1000),
+            ],
+        )
+        if state == OPEN:
+            logger.warning(
+                "circuit_open",
+                circuit=self.name,
+                open_seconds=settings.circuit_open_seconds,
+            )
+
+    async def _record(self, script: str, args: list) -> Optional[str]:
+        if not self.redis.is_connected():
+            return None
+        try:
+            return await self.redis.run_script(script, [self.key, self.probe_key], args)
+        except Exception as e:
+            logger.warning("circuit_state_unavailable", circuit=self.name, error=str(e))
+            return None
+
+    @asynccontextmanager
+    async def guard(self) -> AsyncIterator[None]:
+        """
+        Run a platform call under the breaker.
+
+        Raises:
+            CircuitOpenError: If the circuit is open (the call is not made)
+        """
+        await self.before_call()
+        try:
+            yield
+        except Exception as e:
+            if is_outage(e):
+                await self.record_failure()
+            else:
+                # The platform answered; the request itself was at fault
+                await self.record_success()
+            raise
+        await self.record_success()
+
+    async def state(self) -> dict:
+        """Current state, open_until (epoch ms) and failure count."""
+        data = await self.redis.client.hgetall(self.key)
+        return {
+            "state": data.get("state", CLOSED),
+            "open_until": int(data.get("open_until", 0)),
+            "failures": int(data.get("failures", 0)),
+        }
+
+    async def defer(
+        self,
+        source_platform: str,
+        message_data: dict,
+        attempt: int,
+        error: str,
+    ) -> None:
+        """
+        Park a message until the circuit closes.
+
+        Args:
+            source_platform: Platform the message came from
+            message_data: Keyword arguments of the message processor call
+            attempt: Attempt number to resume with (not counted against retries)
+            error: Why the message was deferred
+        """
+        item = self.retries.encode(source_platform, message_data, attempt, error)
+        await self.redis.client.rpush(self.deferred_key, item)
+        logger.info(
+            "message_deferred_circuit_open",
+            circuit=self.name,
+            source_platform=source_platform,
+            message_id=message_data.get("message_id"),
+        )
+
+    async def release_deferred(self) -> int:
+        """
+        Feed parked messages back into the retry queue as the circuit allows.
+
+        While closed, up to ``circuit_drain_batch_size`` messages are moved
+        per call. Once an open period has ended (or a probe was abandoned),
+        a single message is moved so it can serve as the half-open probe.
+
+        Returns:
+            Number of messages released
+        """
+        current = await self.state()
+        if current["state"] == CLOSED:
+            count = settings.circuit_drain_batch_size
+        elif current["state"] == OPEN and current["open_until"] <= time.time() * 1000:
+            count = 1
+        elif current["state"] == HALF_OPEN and not await self.redis.client.exists(
+            self.probe_key
+        ):
+            # The previous probe never reported back
+            count = 1
+        else:
+            return 0
+
+        released = await self.redis.run_script(
+            RELEASE_DEFERRED_SCRIPT,
+            [self.deferred_key, self.retries.key],
+            [int(time.time() * 1000), count],
+        )
+        if released:
+            logger.info(
+                "deferred_messages_released",
+                circuit=self.name,
+                count=released,
+                state=current["state"],
+            )
+        return released
+
+    async def deferred_count(self) -> int:
+        """Number of messages parked while the circuit is open."""
+        return await self.redis.client.llen(self.deferred_key)
+
+
+# One breaker per platform endpoint
+circuit_breakers = {
+    "chatwork": CircuitBreaker("chatwork:post_message"),
+    "lark": CircuitBreaker("lark:send_message"),
+}
+
+for _breaker in circuit_breakers.values():
+    LEGACY_KEYS[f"circuit:{_breaker.name}:deferred"] = _breaker.deferred_key
+
+
+def breaker_named(name: str) -> CircuitBreaker:
+    """Find the breaker of a platform endpoint by its name."""
+    for breaker in circuit_breakers.values():
+        if breaker.name == name:
+            return breaker
+    raise KeyError(name)
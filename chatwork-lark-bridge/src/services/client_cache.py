@@ -0,0 +1,167 @@
+"""Client-side cache of room and user mapping reads, invalidated by Redis."""
+
+import asyncio
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Optional
+
+from ..core.config import settings
+from ..core.logging import get_logger
+
+if TYPE_CHECKING:
+    from .redis_client import RedisClient
+
+logger = get_logger(__name__)
+
+# Keys read by get_room_mapping/get_user_mapping (hash tables and the
+# single-entry fallbacks); BCAST prefixes must not overlap
+TRACKED_PREFIXES = ("rooms:", "room:", "users:", "user:")
+
+
+class ClientCache:
+    """
+    Local copies of mapping reads, kept correct by RESP3 invalidation pushes.
+
+    A dedicated RESP3 connection turns on ``CLIENT TRACKING`` in broadcast
+    mode for ``TRACKED_PREFIXES``, so Redis pushes an ``invalidate``
+    message for every write to (or expiry of) a key under them, whoever
+    made it. Each cached value remembers the keys it was read from and is
+    dropped when one of them is invalidated.
+
+    Values are only served while that connection is up; when it drops the
+    cache is emptied and reads go to Redis until tracking is back. A value
+    whose read overlapped an invalidation is not stored, since it may
+    predate the write.
+    """
+
+    def __init__(self, redis: "RedisClient", max_entries: Optional[int] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            redis: Redis client whose reads are cached
+            max_entries: Values kept, least recently used dropped first
+                (defaults to ``client_cache_max_entries``)
+        """
+        self.redis = redis
+        self.max_entries = max_entries or settings.client_cache_max_entries
+        # Cache key -> (value, Redis keys it was read from)
+        self._entries: OrderedDict[str, tuple[Any, tuple[str, ...]]] = OrderedDict()
+        # Redis key -> cache keys of values read from it
+        self._sources: dict[str, set[str]] = {}
+        self._epoch = 0
+        self.tracking = False
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def fetch(
+        self, key: str, sources: tuple[str, ...], load: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Cached value of ``key``, or ``load()``'s result (then cached).
+
+        Args:
+            key: Cache key (one of the Redis keys read is fine)
+            sources: Redis keys ``load`` reads
+            load: Reads the value from Redis
+        """
+        if not self.tracking:
+            return await load()
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key][0]
+
+        self.misses += 1
+        epoch = self._epoch
+        value = await load()
+        if self.tracking and epoch == self._epoch:
+            self._store(key, sources, value)
+        return value
+
+    def _store(self, key: str, sources: tuple[str, ...], value: Any) -> None:
+        self._entries[key] = (value, sources)
+        for source in sources:
+            self._sources.setdefault(source, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: str) -> None:
+        _, sources = self._entries.pop(key)
+        for source in sources:
+            keys = self._sources.get(source)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._sources[source]
+
+    async def invalidate(self, message: list) -> None:
+        """Handle an ``invalidate`` push (a None key list means everything)."""
+        keys = message[1]
+        self._epoch += 1
+        self.invalidations += 1
+        if keys is None:
+            self.clear()
+            return
+        for source in keys:
+            for key in list(self._sources.get(source, ())):
+                self._drop(key)
+
+    def clear(self) -> None:
+        """Drop every cached value."""
+        self._epoch += 1
+        self._entries.clear()
+        self._sources.clear()
+
+    async def start(self) -> None:
+        """Turn on tracking in a background task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Turn off tracking and drop the cache."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._follow()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("client_cache_tracking_lost", error=str(e))
+                await asyncio.sleep(settings.client_cache_retry_seconds)
+
+    async def _follow(self) -> None:
+        pool = self.redis.tracking_pool()
+        connection = await pool.get_connection("CLIENT")
+        try:
+            connection._parser.set_invalidation_push_handler(self.invalidate)
+            prefixes = [
+                arg for prefix in TRACKED_PREFIXES for arg in ("PREFIX", prefix)
+            ]
+            await connection.send_command(
+                "CLIENT", "TRACKING", "ON", "BCAST", *prefixes
+            )
+            await connection.read_response()
+
+            self.clear()
+            self.tracking = True
+            logger.info("client_cache_tracking", prefixes=list(TRACKED_PREFIXES))
+            while True:
+                await connection.read_response(push_request=True)
+        finally:
+            self.tracking = False
+            self.clear()
+            await pool.disconnect()
@@ -0,0 +1,462 @@
+"""Redis storage that keeps working on local state while Redis is down."""
+
+import asyncio
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from ..core.config import settings
+from ..core.logging import get_logger
+from .memory_storage import MemoryStorage
+from .redis_client import (
+    REDIS_OUTAGE_ERRORS,
+    RedisClient,
+    SendClaim,
+    new_failed_entry,
+    redis_client,
+)
+from .route_table import RouteTable, route_table
+from .segment_log import SegmentLog
+
+logger = get_logger(__name__)
+
+# Segment records replayed through a bulk call rather than one by one
+MAPPING_RECORD = "mapping"
+FAILED_RECORD = "failed"
+
+
+class DegradedStorage:
+    """
+    ``RedisClient`` with a degraded mode for Redis outages.
+
+    Calls go to Redis. When one fails because Redis cannot be reached, the
+    storage turns degraded: calls are served by an in-process
+    ``MemoryStorage`` seeded with the last known routing snapshot (the
+    route table and the mapping tables this process loaded), so messages
+    keep flowing. Writes that must outlive the outage (message mappings,
+    DLQ entries and removals, records, table loads) are also appended to a
+    ``SegmentLog``; claims are not, since they only matter while a send is
+    in flight.
+
+    A background probe pings Redis every ``degraded_probe_interval_seconds``.
+    Once it answers, the buffered records are replayed into Redis in bulk
+    (``degraded_reconcile_batch_size`` per round trip) and calls go back to
+    Redis. Replaying is idempotent, so a replay cut short by another outage
+    just starts over.
+
+    Dedup during an outage only covers messages seen by this process since
+    it turned degraded (plus buffered records of earlier outages).
+    """
+
+    backend = "redis"
+
+    def __init__(
+        self,
+        primary: Optional[RedisClient] = None,
+        log: Optional[SegmentLog] = None,
+        routes: Optional[RouteTable] = None,
+    ):
+        """
+        Initialize the storage.
+
+        Args:
+            primary: Redis client (defaults to the global instance)
+            log: Write buffer (defaults to segments in ``degraded_buffer_dir``)
+            routes: Route table to take the routing snapshot from
+        """
+        self.primary = primary or redis_client
+        self.log = log or SegmentLog(
+            settings.degraded_buffer_dir,
+            settings.degraded_segment_max_bytes,
+            settings.degraded_buffer_fsync,
+        )
+        # An empty table is falsy (it has a length)
+        self.routes = routes if routes is not None else route_table
+        self.local = MemoryStorage()
+        self.tables: dict[str, dict[str, str]] = {}
+        self.degraded = False
+        self.degraded_since: Optional[float] = None
+        self._probe: Optional[asyncio.Task] = None
+
+    async def connect(self) -> None:
+        """Connect to Redis, or start degraded if it cannot be reached."""
+        await self.local.connect()
+        self.log.recover()
+        try:
+            await self.primary.connect()
+        except REDIS_OUTAGE_ERRORS as e:
+            await self._enter(e)
+            return
+        if self.log.sealed():
+            # Writes buffered before a restart
+            await self._reconcile()
+
+    async def disconnect(self) -> None:
+        """Stop probing, close the write buffer and disconnect from Redis."""
+        if self._probe is not None:
+            self._probe.cancel()
+            try:
+                await self._probe
+            except asyncio.CancelledError:
+                pass
+            self._probe = None
+        self.log.seal()
+        await self.primary.disconnect()
+        await self.local.disconnect()
+
+    def is_connected(self) -> bool:
+        """Check if calls can be served (by Redis or locally)."""
+        return self.degraded or self.primary.is_connected()
+
+    async def health_check(self) -> bool:
+        """Check storage health; a Redis outage only degrades it."""
+        if not self.degraded and not await self.primary.health_check():
+            await self._enter(ConnectionError("Redis ping failed"))
+        return True
+
+    @property
+    def buffered(self) -> int:
+        """Records written to the buffer since the last reconcile."""
+        return self.log.appended
+
+    # Dedup and message mappings
+    async def claim_message(self, platform: str, message_id: str) -> Optional[str]:
+        """Claim a message for processing."""
+        return await self._call("claim_message", platform, message_id)
+
+    async def prepare_send(
+        self, source_platform: str, source_room_id: str, message_id: str
+    ) -> SendClaim:
+        """Dedup, route and claim a message."""
+        return await self._call(
+            "prepare_send", source_platform, source_room_id, message_id
+        )
+
+    async def release_message_claim(
+        self, platform: str, message_id: str, claim: str
+    ) -> None:
+        """Give up a claim."""
+        await self._call("release_message_claim", platform, message_id, claim)
+
+    async def save_message_mapping(
+        self,
+        source_platform: str,
+        source_message_id: str,
+        target_platform: str,
+        target_message_id: str,
+        room_mapping_id: Optional[str] = None,
+    ) -> None:
+        """Save a message mapping, buffering it while Redis is down."""
+        args = (source_platform, source_message_id, target_platform, target_message_id)
+        served, _ = await self._primary("save_message_mapping", *args, room_mapping_id)
+        if served:
+            return
+        await self.local.save_message_mapping(*args, room_mapping_id)
+        self.log.append(
+            {
+                "op": MAPPING_RECORD,
+                "source_platform": source_platform,
+                "source_message_id": source_message_id,
+                "target_platform": target_platform,
+                "target_message_id": target_message_id,
+                "saved_at": int(time.time()),
+            }
+        )
+
+    async def get_message_mapping(
+        self, platform: str, message_id: str
+    ) -> Optional[dict]:
+        """Get message mapping by platform and message ID."""
+        return await self._call("get_message_mapping", platform, message_id)
+
+    async def get_counterpart(self, platform: str, message_id: str) -> Optional[dict]:
+        """Find the synced message on the other platform."""
+        return await self._call("get_counterpart", platform, message_id)
+
+    async def is_message_processed(self, platform: str, message_id: str) -> bool:
+        """Check if message has already been processed (or is in progress)."""
+        return await self._call("is_message_processed", platform, message_id)
+
+    # Room and user mappings
+    async def get_room_mapping(
+        self, source_platform: str, source_room_id: str
+    ) -> Optional[str]:
+        """Get target room ID."""
+        return await self._call("get_room_mapping", source_platform, source_room_id)
+
+    async def set_room_mapping(
+        self,
+        source_platform: str,
+        source_room_id: str,
+        target_room_id: str,
+        ttl: int = 3600,
+        sync_direction: Optional[str] = None,
+    ) -> None:
+        """Cache a room mapping (locally only while Redis is down)."""
+        await self._call(
+            "set_room_mapping",
+            source_platform,
+            source_room_id,
+            target_room_id,
+            ttl,
+            sync_direction,
+        )
+
+    async def get_user_mapping(
+        self, source_platform: str, source_user_id: str
+    ) -> Optional[dict]:
+        """Get user mapping."""
+        return await self._call("get_user_mapping", source_platform, source_user_id)
+
+    async def set_user_mapping(
+        self,
+        source_platform: str,
+        source_user_id: str,
+        user_data: dict,
+        ttl: int = 3600,
+    ) -> None:
+        """Cache a user mapping (locally only while Redis is down)."""
+        await self._call(
+            "set_user_mapping", source_platform, source_user_id, user_data, ttl
+        )
+
+    async def replace_tables(self, tables: dict[str, dict[str, str]]) -> None:
+        """Replace whole mapping tables, keeping a local copy."""
+        self.tables.update(tables)
+        await self.local.replace_tables(tables)
+        await self._write("replace_tables", tables=tables)
+
+    async def sync_tables(self, tables: dict[str, dict[str, str]]) -> tuple[int, int]:
+        """Write only the fields that differ, keeping a local copy."""
+        self.tables.update(tables)
+        counts = await self.local.sync_tables(tables)
+        served, result = await self._primary("sync_tables", tables)
+        if served:
+            return result
+        self.log.append({"op": "sync_tables", "tables": tables})
+        return counts
+
+    # DLQ
+    async def add_to_failed_queue(
+        self,
+        source_platform: str,
+        target_platform: str,
+        message_data: dict,
+        error: str,
+        retry_count: int = 0,
+        error_type: Optional[str] = None,
+    ) -> str:
+        """Add failed message to DLQ, buffering it while Redis is down."""
+        args = (
+            source_platform,
+            target_platform,
+            message_data,
+            error,
+            retry_count,
+            error_type,
+        )
+        served, result = await self._primary("add_to_failed_queue", *args)
+        if served:
+            return result
+
+        entry_id, value = new_failed_entry(*args)
+        await self.local.restore_failed_messages([(entry_id, value)])
+        self.log.append({"op": FAILED_RECORD, "entry_id": entry_id, "entry": value})
+        logger.warning(
+            "message_added_to_dlq",
+            source_platform=source_platform,
+            target_platform=target_platform,
+            error=error,
+            retry_count=retry_count,
+            entry_id=entry_id,
+            buffered=True,
+        )
+        return entry_id
+
+    async def get_failed_messages(
+        self, limit: int = 100, after: Optional[str] = None
+    ) -> list[tuple[str, dict]]:
+        """Get failed messages from DLQ (only buffered ones while Redis is down)."""
+        return await self._call("get_failed_messages", limit, after)
+
+    async def count_failed_messages(self) -> dict:
+        """DLQ size by source platform and error class."""
+        return await self._call("count_failed_messages")
+
+    async def remove_failed_messages(self, entries: list[tuple[str, dict]]) -> int:
+        """Remove entries from the DLQ."""
+        served, result = await self._primary("remove_failed_messages", entries)
+        if served:
+            return result
+        self.log.append({"op": "remove_failed_messages", "entries": entries})
+        return await self.local.remove_failed_messages(entries)
+
+    # Records
+    async def get_record(self, key: str) -> dict[str, str]:
+        """Fields of a record."""
+        return await self._call("get_record", key)
+
+    async def put_record(self, key: str, fields: dict[str, str], ttl: int) -> None:
+        """Store a record for ``ttl`` seconds."""
+        await self.local.put_record(key, fields, ttl)
+        await self._write("put_record", key=key, fields=fields, ttl=ttl)
+
+    # Degraded mode
+    async def _primary(
+        self, method: str, *args: Any, **kwargs: Any
+    ) -> tuple[bool, Any]:
+        """
+        Run a call on Redis unless degraded.
+
+        Returns:
+            Whether Redis served the call, and its result
+        """
+        if self.degraded:
+            return False, None
+        try:
+            return True, await getattr(self.primary, method)(*args, **kwargs)
+        except REDIS_OUTAGE_ERRORS as e:
+            await self._enter(e)
+            return False, None
+
+    async def _call(self, method: str, *args: Any) -> Any:
+        """Run a call on Redis, or locally while degraded."""
+        served, result = await self._primary(method, *args)
+        if served:
+            return result
+        return await getattr(self.local, method)(*args)
+
+    async def _write(self, method: str, **fields: Any) -> None:
+        """Run a write on Redis, or buffer it for replay while degraded."""
+        served, _ = await self._primary(method, **fields)
+        if not served:
+            self.log.append({"op": method, **fields})
+
+    async def _enter(self, error: BaseException) -> None:
+        if self.degraded:
+            return
+        self.degraded = True
+        self.degraded_since = time.time()
+
+        # Route with the last known snapshot, and keep dedup for buffered
+        # writes of earlier outages
+        if self.routes.ready:
+            await self.local.replace_tables(self.routes.tables())
+        for path in self.log.sealed():
+            for record in self.log.read(path):
+                await self._apply_locally(record)
+
+        logger.error(
+            "storage_degraded", error=str(error), error_type=type(error).__name__
+        )
+        if self._probe is None or self._probe.done():
+            self._probe = asyncio.create_task(self._run_probe())
+
+    async def _apply_locally(self, record: dict) -> None:
+        if record["op"] == MAPPING_RECORD:
+            await self.local.save_message_mapping(
+                record["source_platform"],
+                record["source_message_id"],
+                record["target_platform"],
+                record["target_message_id"],
+            )
+        elif record["op"] == FAILED_RECORD:
+            await self.local.restore_failed_messages(
+                [(record["entry_id"], record["entry"])]
+            )
+
+    async def _run_probe(self) -> None:
+        """Wait for Redis to answer again, then reconcile."""
+        while True:
+            await asyncio.sleep(settings.degraded_probe_interval_seconds)
+            if not self.primary.is_connected():
+                try:
+                    await self.primary.connect()
+                except REDIS_OUTAGE_ERRORS:
+                    continue
+            if not await self.primary.health_check():
+                continue
+            try:
+                await self._reconcile()
+                return
+            except REDIS_OUTAGE_ERRORS as e:
+                logger.warning("storage_reconcile_interrupted", error=str(e))
+            except Exception as e:
+                logger.error(
+                    "storage_reconcile_failed",
+                    error=str(e),
+                    error_type=type(e).__name__,
+                )
+
+    async def _reconcile(self) -> int:
+        """
+        Replay every buffered record into Redis, then leave degraded mode.
+
+        Calls keep being served locally (and buffered) while this runs;
+        degraded mode ends once a pass finds nothing new to replay.
+
+        Returns:
+            Number of records replayed
+        """
+        fresh = MemoryStorage()
+        await fresh.connect()
+        await fresh.replace_tables(self.tables)
+
+        replayed = 0
+        while True:
+            self.log.seal()
+            segments = self.log.sealed()
+            if not segments:
+                break
+            for path in segments:
+                replayed += await self._replay(path)
+                self.log.remove(path)
+
+        # Nothing awaited since the last check, so no write slipped past
+        was_degraded = self.degraded
+        self.degraded = False
+        self.local = fresh
+        self.log.appended = 0
+        logger.info(
+            "storage_reconciled",
+            records=replayed,
+            degraded_seconds=(
+                round(time.time() - self.degraded_since, 1)
+                if was_degraded and self.degraded_since
+                else None
+            ),
+        )
+        self.degraded_since = None
+        return replayed
+
+    async def _replay(self, path: Path) -> int:
+        """Replay one segment, batching mappings and DLQ entries."""
+        mappings: list[dict] = []
+        failed: list[tuple[str, dict]] = []
+        count = 0
+
+        async def flush() -> None:
+            if mappings:
+                await self.primary.restore_message_mappings(mappings)
+                mappings.clear()
+            if failed:
+                await self.primary.restore_failed_messages(failed)
+                failed.clear()
+
+        for record in self.log.read(path):
+            count += 1
+            op = record.pop("op")
+            if op == MAPPING_RECORD:
+                mappings.append(record)
+            elif op == FAILED_RECORD:
+                failed.append((record["entry_id"], record["entry"]))
+            else:
+                # Keep the order of e.g. a DLQ entry and its removal
+                await flush()
+                await getattr(self.primary, op)(**record)
+                if op in ("replace_tables", "sync_tables"):
+                    await self.routes.notify_changed()
+            if len(mappings) + len(failed) >= settings.degraded_reconcile_batch_size:
+                await flush()
+        await flush()
+        return count
@@ -0,0 +1,505 @@
+"""Background delivery of queued webhook events."""
+
+import asyncio
+import os
+import socket
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from ..core.config import settings
+from ..core.exceptions import (
+    DeadLetteredError,
+    LoopDetectedError,
+    MappingNotFoundError,
+    RetryInPlaceError,
+    RetryScheduledError,
+)
+from ..core.logging import get_logger
+from ..services.event_dispatcher import (
+    dead_letter_event,
+    dispatch_event,
+    partition_key_for,
+)
+from ..services.event_queue import QueuedEvent, event_queue, rendezvous_owner
+
+logger = get_logger(__name__)
+
+
+def default_consumer_name() -> str:
+    """Consumer name that is stable across restarts of the same pod."""
+    return os.environ.get("HOSTNAME") or socket.gethostname()
+
+
+@dataclass
+class OwnedPartition:
+    """Local delivery state of a partition this worker holds the lease for."""
+
+    backlog: asyncio.Queue = field(default_factory=asyncio.Queue)
+    task: Optional[asyncio.Task] = None
+    ready: bool = False
+    draining: bool = False
+    lost: bool = False
+
+
+class DeliveryWorker:
+    """
+    Consumes the partitioned webhook event streams and runs the sync pipeline.
+
+    Partitions are spread over the live workers with rendezvous hashing and
+    guarded by leases, so every partition has exactly one owner. Events of
+    a partition are delivered one at a time in stream order (strict FIFO
+    per room); different partitions are delivered in parallel, up to
+    ``delivery_concurrency`` at once.
+
+    When a partition changes hands, the new owner first waits until every
+    event the previous owner is still delivering has been acknowledged (or
+    has gone untouched for a full lease period because that owner died),
+    then delivers the leftovers before reading anything new.
+    """
+
+    def __init__(
+        self,
+        consumer_name: Optional[str] = None,
+        concurrency: Optional[int] = None,
+    ):
+        """Initialize delivery worker."""
+        self.queue = event_queue
+        self.consumer_name = consumer_name or default_consumer_name()
+        self.concurrency = concurrency or settings.delivery_concurrency
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._owned: dict[int, OwnedPartition] = {}
+        self._handling: dict[str, QueuedEvent] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+        self._last_rebalance = 0.0
+
+    @property
+    def owned_partitions(self) -> list[int]:
+        """Partitions this worker currently holds the lease for."""
+        return sorted(self._owned)
+
+    async def start(self) -> None:
+        """Start consuming in a background task."""
+        await self.queue.ensure_group()
+        try:
+            await self.queue.migrate_legacy_stream(partition_key_for)
+        except Exception as e:
+            logger.error("legacy_event_stream_migration_failed", error=str(e))
+
+        self._stopping.clear()
+        self._last_rebalance = 0.0
+        self._task = asyncio.create_task(self.run())
+        logger.info(
+            "delivery_worker_started",
+            consumer=self.consumer_name,
+            concurrency=self.concurrency,
+        )
+
+    async def stop(self) -> None:
+        """
+        Stop reading, finish the events already read and hand partitions back.
+
+        Leases keep being renewed until every partition is finished, so no
+        other worker takes over a partition while it is still delivering.
+        """
+        self._stopping.set()
+
+        # Let the other workers plan without us right away
+        try:
+            await self.queue.leave(self.consumer_name)
+        except Exception as e:
+            logger.error("delivery_worker_leave_failed", error=str(e))
+
+        if self._task:
+            try:
+                await asyncio.wait_for(
+                    self._task,
+                    timeout=settings.delivery_shutdown_timeout_seconds,
+                )
+            except asyncio.TimeoutError:
+                logger.warning(
+                    "delivery_worker_shutdown_timeout",
+                    consumer=self.consumer_name,
+                    partitions=self.owned_partitions,
+                )
+            self._task = None
+
+        # Whatever is left stays pending for the next owner
+        tasks = [state.task for state in self._owned.values() if state.task]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        logger.info("delivery_worker_stopped", consumer=self.consumer_name)
+
+    async def run(self) -> None:
+        """Rebalance partitions and read events until stopped and drained."""
+        interval = settings.partition_rebalance_interval_seconds
+
+        while not self._stopping.is_set() or self._owned:
+            self._touch_heartbeat()
+
+            try:
+                if time.monotonic() - self._last_rebalance >= interval:
+                    await self.rebalance()
+
+                if self._stopping.is_set():
+                    for partition in list(self._owned):
+                        self._drain(partition)
+                    await asyncio.sleep(0.1)
+                    continue
+
+                readable = [
+                    partition
+                    for partition, state in self._owned.items()
+                    if state.ready
+                    and not state.draining
+                    and state.backlog.qsize() < settings.delivery_batch_size
+                ]
+                if not readable:
+                    await asyncio.sleep(0.1)
+                    continue
+
+                # Never block past the next rebalance
+                events = await self.queue.read(
+                    self.consumer_name,
+                    readable,
+                    count=settings.delivery_batch_size,
+                    block_ms=min(settings.delivery_block_ms, max(interval, 1) * 1000),
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("delivery_worker_read_failed", error=str(e))
+                await asyncio.sleep(1)
+                continue
+
+            for event in events:
+                state = self._owned.get(event.partition)
+                if state is not None:
+                    state.backlog.put_nowait(event)
+
+    async def rebalance(self) -> None:
+        """
+        Renew held leases, hand off partitions we no longer own, take new ones.
+
+        Also resets the idle time of events being delivered right now, which
+        tells the next owner of their partition that they are not abandoned.
+        """
+        self._last_rebalance = time.monotonic()
+        await self._touch_in_flight()
+
+        for partition, state in list(self._owned.items()):
+            if state.lost:
+                continue
+            if not await self.queue.renew_partition(partition, self.consumer_name):
+                logger.warning(
+                    "partition_lease_lost",
+                    consumer=self.consumer_name,
+                    partition=partition,
+                )
+                state.lost = True
+                self._drain(partition, discard=True)
+
+        if self._stopping.is_set():
+            return
+
+        await self.queue.heartbeat(self.consumer_name)
+        workers = await self.queue.live_workers()
+        if self.consumer_name not in workers:
+            workers.append(self.consumer_name)
+
+        desired = {
+            partition
+            for partition in range(self.queue.partitions)
+            if rendezvous_owner(partition, workers) == self.consumer_name
+        }
+
+        for partition, state in list(self._owned.items()):
+            if partition not in desired and not state.draining:
+                logger.info(
+                    "partition_handoff",
+                    consumer=self.consumer_name,
+                    partition=partition,
+                )
+                self._drain(partition)
+
+        for partition in sorted(desired - set(self._owned)):
+            if await self.queue.acquire_partition(partition, self.consumer_name):
+                self._take(partition)
+
+    def _take(self, partition: int) -> None:
+        """Start delivering a partition whose lease we just acquired."""
+        state = OwnedPartition()
+        self._owned[partition] = state
+        state.task = asyncio.create_task(self._deliver_partition(partition, state))
+        logger.info(
+            "partition_acquired",
+            consumer=self.consumer_name,
+            partition=partition,
+        )
+
+    def _drain(self, partition: int, discard: bool = False) -> None:
+        """
+        Stop reading a partition and release it once its backlog is done.
+
+        With ``discard`` the local backlog is dropped instead of delivered
+        (the lease was lost; the new owner claims those events).
+        """
+        state = self._owned.get(partition)
+        if state is None or (state.draining and not discard):
+            return
+
+        state.draining = True
+        if discard:
+            while not state.backlog.empty():
+                state.backlog.get_nowait()
+        state.backlog.put_nowait(None)
+
+    async def _deliver_partition(self, partition: int, state: OwnedPartition) -> None:
+        """Catch up on leftovers, then deliver events strictly one after another."""
+        try:
+            await self._catch_up(partition, state)
+            state.ready = True
+
+            while True:
+                event = await state.backlog.get()
+                if event is None:
+                    break
+                await self._deliver(partition, state, event)
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Releasing the lease lets the next rebalance start over
+            logger.error(
+                "partition_delivery_failed",
+                partition=partition,
+                error=str(e),
+                error_type=type(e).__name__,
+            )
+        finally:
+            if self._owned.get(partition) is state:
+                del self._owned[partition]
+            if not state.lost:
+                try:
+                    await self.queue.release_partition(partition, self.consumer_name)
+                except Exception as e:
+                    logger.error(
+                        "partition_release_failed",
+                        partition=partition,
+                        error=str(e),
+                    )
+
+    async def _catch_up(self, partition: int, state: OwnedPartition) -> None:
+        """
+        Queue the events earlier owners of a partition left unacknowledged.
+
+        Waits while another owner (or an earlier lease of our own) is still
+        delivering one of them, so the room order is never broken.
+        """
+        while not state.draining:
+            await self.queue.claim_pending(
+                self.consumer_name,
+                partition,
+                min_idle_ms=settings.partition_lease_ms,
+            )
+            pending = await self.queue.pending_by_consumer(partition)
+            held_by_others = any(consumer != self.consumer_name for consumer in pending)
+            still_handling = any(
+                event.partition == partition for event in self._handling.values()
+            )
+            if not held_by_others and not still_handling:
+                break
+
+            logger.debug(
+                "partition_waiting_for_previous_owner",
+                partition=partition,
+                pending=pending,
+            )
+            await asyncio.sleep(min(settings.partition_rebalance_interval_seconds, 1))
+
+        if state.draining:
+            return
+
+        for event in await self.queue.read_own_pending(self.consumer_name, partition):
+            state.backlog.put_nowait(event)
+
+    async def _deliver(
+        self,
+        partition: int,
+        state: OwnedPartition,
+        event: QueuedEvent,
+    ) -> None:
+        """
+        Deliver one event, retrying in place so later events keep waiting.
+
+        Failed sends the message processor hands back are retried after its
+        backoff, until it gives up on them itself. After
+        ``delivery_max_attempts`` other failures the event is written to the
+        DLQ and acknowledged. If the partition is being given up meanwhile,
+        the rest of the backlog is left pending for the next owner instead.
+        """
+        attempt = 0
+        send_attempt = 0
+        self._handling[event.entry_id] = event
+        try:
+            while True:
+                try:
+                    # Free the slot while waiting to retry
+                    async with self._slots:
+                        acked = await self.handle(event, send_attempt)
+                    if acked:
+                        return
+                    attempt += 1
+                    delay = min(2**attempt, 30)
+                except RetryInPlaceError as e:
+                    send_attempt = e.attempt
+                    delay = e.retry_in
+
+                if state.lost or self._stopping.is_set():
+                    self._drain(partition, discard=True)
+                    return
+
+                if attempt >= settings.delivery_max_attempts:
+                    await dead_letter_event(
+                        event.platform,
+                        event.payload,
+                        f"Delivery failed after {attempt} attempts",
+                    )
+                    await self.queue.ack(event)
+                    return
+
+                await self._pause(state, delay)
+        finally:
+            self._handling.pop(event.entry_id, None)
+
+    async def _pause(self, state: OwnedPartition, delay: float) -> None:
+        """Wait before retrying an event, waking early if the partition is given up."""
+        while delay > 0 and not (state.lost or self._stopping.is_set()):
+            step = min(delay, 1)
+            await asyncio.sleep(step)
+            delay -= step
+
+    async def _touch_in_flight(self) -> None:
+        """Reset the idle time of events currently being delivered."""
+        by_partition: dict[int, list[str]] = {}
+        for event in self._handling.values():
+            by_partition.setdefault(event.partition, []).append(event.entry_id)
+
+        for partition, entry_ids in by_partition.items():
+            try:
+                await self.queue.touch(self.consumer_name, partition, entry_ids)
+            except Exception as e:
+                logger.error(
+                    "delivery_worker_touch_failed",
+                    partition=partition,
+                    error=str(e),
+                )
+
+    def _touch_heartbeat(self) -> None:
+        """Update the heartbeat file used by the worker liveness probe."""
+        if settings.delivery_heartbeat_file:
+            Path(settings.delivery_heartbeat_file).touch()
+
+    async def handle(self, event: QueuedEvent, attempt: int = 0) -> bool:
+        """
+        Deliver a single queued event and acknowledge it.
+
+        Events that were delivered, skipped, or whose send failure was
+        scheduled for retry or written to the DLQ by the message processor
+        are acknowledged.
+        Any other error (e.g. Redis unavailable before the send) leaves the
+        event pending so it is delivered again instead of being lost.
+
+        Args:
+            event: Event to deliver
+            attempt: Number of this send attempt (0 = first)
+
+        Returns:
+            True if the event was acknowledged
+
+        Raises:
+            RetryInPlaceError: If the send failed and should be retried
+                before later events of the partition (event left pending)
+        """
+        try:
+            result = await dispatch_event(
+                event.platform, event.payload, attempt=attempt, in_order=True
+            )
+            logger.info(
+                "queued_event_delivered",
+                entry_id=event.entry_id,
+                platform=event.platform,
+                partition=event.partition,
+                target_message_id=result,
+            )
+
+        except LoopDetectedError:
+            logger.debug(
+                "queued_event_loop_detected",
+                entry_id=event.entry_id,
+                platform=event.platform,
+            )
+
+        except MappingNotFoundError as e:
+            logger.warning(
+                "queued_event_room_mapping_not_found",
+                entry_id=event.entry_id,
+                platform=event.platform,
+                error=str(e),
+            )
+
+        except RetryScheduledError as e:
+            logger.warning(
+                "queued_event_retry_scheduled",
+                entry_id=event.entry_id,
+                platform=event.platform,
+                error=str(e),
+            )
+
+        except RetryInPlaceError as e:
+            logger.warning(
+                "queued_event_retry_in_place",
+                entry_id=event.entry_id,
+                platform=event.platform,
+                error=str(e),
+            )
+            raise
+
+        except DeadLetteredError as e:
+            logger.error(
+                "queued_event_dead_lettered",
+                entry_id=event.entry_id,
+                platform=event.platform,
+                error=str(e),
+            )
+
+        except Exception as e:
+            logger.error(
+                "queued_event_delivery_failed",
+                entry_id=event.entry_id,
+                platform=event.platform,
+                error=str(e),
+                error_type=type(e).__name__,
+            )
+            return False
+
+        try:
+            await self.queue.ack(event)
+        except Exception as e:
+            logger.error(
+                "queued_event_ack_failed",
+                entry_id=event.entry_id,
+                error=str(e),
+            )
+            return False
+
+        return True
+
+
+# Global delivery worker instance
+delivery_worker = DeliveryWorker()
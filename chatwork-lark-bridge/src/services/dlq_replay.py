@@ -0,0 +1,298 @@
+"""Re-send dead-lettered messages through the normal processing pipeline."""
+
+import asyncio
+import json
+import uuid
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Optional
+
+from ..core.config import settings
+from ..core.exceptions import DeadLetteredError, LoopDetectedError, RetryScheduledError
+from ..core.logging import get_logger
+from .event_dispatcher import parse_chatwork_event, parse_lark_event
+from .message_processor import MessageProcessor, message_processor
+from .storage import Storage
+from .storage import storage as default_storage
+
+logger = get_logger(__name__)
+
+REPLAYED = "replayed"
+SKIPPED = "skipped"
+DEAD_LETTERED = "dead_lettered"
+FAILED = "failed"
+
+# Keep replay progress around for a week, like the DLQ itself
+PROGRESS_TTL_SECONDS = 7 * 86400
+
+
+def _message_data(entry: dict) -> Optional[dict]:
+    """
+    Processor arguments of a DLQ entry.
+
+    Entries written by the delivery worker hold the raw webhook payload
+    (``{"event": ...}``), which is parsed like live traffic.
+
+    Returns:
+        Keyword arguments for process_*_message, or None if the entry does
+        not carry a message the bridge syncs
+    """
+    message = entry.get("message", {})
+    if "message_id" in message:
+        return message
+    if entry.get("source_platform") == "chatwork":
+        return parse_chatwork_event(message.get("event", {}))
+    return parse_lark_event(message.get("event", {}))
+
+
+@dataclass
+class ReplayFilter:
+    """Which DLQ entries to replay (all of them by default)."""
+
+    platform: Optional[str] = None
+    room_id: Optional[str] = None
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+
+    def matches(self, entry: dict) -> bool:
+        """Whether a DLQ entry passes the platform and room filters."""
+        if self.platform and entry.get("source_platform") != self.platform:
+            return False
+        if self.room_id:
+            message = _message_data(entry) or {}
+            room_id = message.get("room_id") or message.get("chat_id")
+            if str(room_id) != self.room_id:
+                return False
+        return True
+
+
+@dataclass
+class ReplayProgress:
+    """Counters of a replay run, saved after every page."""
+
+    run_id: str
+    status: str = "running"
+    dry_run: bool = False
+    cursor: Optional[str] = None
+    scanned: int = 0
+    matched: int = 0
+    replayed: int = 0
+    skipped: int = 0
+    dead_lettered: int = 0
+    failed: int = 0
+
+
+def _entry_ms(entry_id: str) -> int:
+    """Failure time (epoch ms) encoded in a DLQ entry ID."""
+    return int(entry_id.split("-", 1)[0])
+
+
+def _to_ms(value: datetime) -> int:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp() * 1000)
+
+
+class DLQReplayer:
+    """
+    Replays DLQ entries page by page.
+
+    Every entry is rebuilt into its original ``process_*_message`` call and
+    run through the message processor, so dedup claims, rate limits,
+    circuit breakers and the retry queue apply as for live traffic. Entries
+    that were sent, turned out to be duplicates, or were handed to the
+    retry queue or back to the DLQ (as a new entry) are removed, and so are
+    entries that can never be sent (the bridge's own messages, webhook
+    payloads without a message); entries that still cannot be routed stay
+    in place.
+
+    Progress (including the page cursor) is saved in the storage under
+    ``dlq:replay:{run_id}`` after every page, so an interrupted run can be
+    resumed with the same run ID. A dry run and a real run with the same
+    ID share the filters but not the cursor: after a dry run the real run
+    starts from the beginning, replaying the entries the dry run counted.
+    """
+
+    def __init__(
+        self,
+        storage: Optional[Storage] = None,
+        processor: Optional[MessageProcessor] = None,
+    ):
+        """
+        Initialize the replayer.
+
+        Args:
+            storage: Storage (defaults to the global instance)
+            processor: Message processor (defaults to the global instance)
+        """
+        self.storage = storage or default_storage
+        self.processor = processor or message_processor
+
+    @staticmethod
+    def progress_key(run_id: str) -> str:
+        """Record holding the progress of a run."""
+        return f"dlq:replay:{run_id}"
+
+    async def get_progress(self, run_id: str) -> Optional[dict]:
+        """Saved progress and filters of a run, or None if unknown."""
+        data = await self.storage.get_record(self.progress_key(run_id))
+        if not data:
+            return None
+        return json.loads(data["progress"]) | {"filters": json.loads(data["filters"])}
+
+    async def replay(
+        self,
+        filters: Optional[ReplayFilter] = None,
+        dry_run: bool = False,
+        concurrency: Optional[int] = None,
+        run_id: Optional[str] = None,
+    ) -> ReplayProgress:
+        """
+        Replay matching DLQ entries.
+
+        Args:
+            filters: Entries to replay (ignored when resuming a saved run)
+            dry_run: Only count the entries that would be replayed (a saved
+                run of the other kind is restarted with its filters)
+            concurrency: Messages re-sent at once (default dlq_replay_concurrency)
+            run_id: ID of a run to resume, or of a new run
+
+        Returns:
+            Final progress of the run
+        """
+        run_id = run_id or uuid.uuid4().hex
+        saved = await self.get_progress(run_id)
+        if saved:
+            filters = ReplayFilter(
+                **{
+                    name: (
+                        datetime.fromisoformat(value)
+                        if value and name in ("since", "until")
+                        else value
+                    )
+                    for name, value in saved.pop("filters").items()
+                }
+            )
+            if saved.get("dry_run", False) == dry_run:
+                progress = ReplayProgress(**saved)
+                progress.status = "running"
+                logger.info("dlq_replay_resumed", run_id=run_id, cursor=progress.cursor)
+            else:
+                progress = self._new_progress(run_id, dry_run, filters)
+                logger.info("dlq_replay_restarted", run_id=run_id, dry_run=dry_run)
+        else:
+            filters = filters or ReplayFilter()
+            if filters.until is None:
+                # Entries this run writes back to the DLQ come after it
+                filters.until = datetime.now(timezone.utc)
+            progress = self._new_progress(run_id, dry_run, filters)
+
+        until_ms = _to_ms(filters.until)
+        semaphore = asyncio.Semaphore(concurrency or settings.dlq_replay_concurrency)
+
+        try:
+            while True:
+                entries = await self.storage.get_failed_messages(
+                    limit=settings.dlq_replay_page_size,
+                    after=progress.cursor,
+                )
+                entries = [e for e in entries if _entry_ms(e[0]) <= until_ms]
+                if not entries:
+                    break
+
+                matched = [(i, e) for i, e in entries if filters.matches(e)]
+                progress.scanned += len(entries)
+                progress.matched += len(matched)
+
+                if not progress.dry_run:
+                    outcomes = await asyncio.gather(
+                        *(self._replay_entry(semaphore, entry) for _, entry in matched)
+                    )
+                    await self.storage.remove_failed_messages(
+                        [
+                            item
+                            for item, outcome in zip(matched, outcomes)
+                            if outcome != FAILED
+                        ]
+                    )
+                    progress.replayed += outcomes.count(REPLAYED)
+                    progress.skipped += outcomes.count(SKIPPED)
+                    progress.dead_lettered += outcomes.count(DEAD_LETTERED)
+                    progress.failed += outcomes.count(FAILED)
+
+                progress.cursor = entries[-1][0]
+                await self._save(progress, filters)
+                logger.info("dlq_replay_progress", **asdict(progress))
+
+            progress.status = "done"
+        except BaseException as e:
+            progress.status = "interrupted"
+            logger.error("dlq_replay_interrupted", run_id=run_id, error=repr(e))
+            raise
+        finally:
+            await self._save(progress, filters)
+
+        logger.info("dlq_replay_finished", **asdict(progress))
+        return progress
+
+    @staticmethod
+    def _new_progress(
+        run_id: str, dry_run: bool, filters: ReplayFilter
+    ) -> ReplayProgress:
+        progress = ReplayProgress(run_id=run_id, dry_run=dry_run)
+        if filters.since:
+            # IDs start with the failure time, so skip straight to it
+            progress.cursor = f"{_to_ms(filters.since):013d}"
+        return progress
+
+    async def _replay_entry(self, semaphore: asyncio.Semaphore, entry: dict) -> str:
+        """Re-send one entry and return its outcome."""
+        source_platform = entry.get("source_platform")
+        message_data = _message_data(entry)
+        if message_data is None:
+            # Not a message the bridge syncs; nothing to send
+            return SKIPPED
+
+        async with semaphore:
+            try:
+                result = await self.processor.retry_message(
+                    source_platform, message_data, attempt=0
+                )
+            except RetryScheduledError:
+                return REPLAYED
+            except DeadLetteredError:
+                # Failed again; the processor wrote a new DLQ entry
+                return DEAD_LETTERED
+            except LoopDetectedError:
+                # The bridge's own message; never to be sent back
+                return SKIPPED
+            except Exception as e:
+                logger.warning(
+                    "dlq_replay_entry_failed",
+                    source_platform=source_platform,
+                    message_id=message_data.get("message_id"),
+                    error=str(e),
+                    error_type=type(e).__name__,
+                )
+                return FAILED
+
+        # None: already delivered, or the room no longer syncs this way
+        return REPLAYED if result is not None else SKIPPED
+
+    async def _save(self, progress: ReplayProgress, filters: ReplayFilter) -> None:
+        filter_data = {
+            name: value.isoformat() if isinstance(value, datetime) else value
+            for name, value in asdict(filters).items()
+        }
+        await self.storage.put_record(
+            self.progress_key(progress.run_id),
+            {
+                "progress": json.dumps(asdict(progress)),
+                "filters": json.dumps(filter_data),
+            },
+            PROGRESS_TTL_SECONDS,
+        )
+
+
+# Global DLQ replayer instance
+dlq_replayer = DLQReplayer()
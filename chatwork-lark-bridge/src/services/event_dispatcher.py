@@ -0,0 +1,193 @@
+"""Translate webhook payloads into message processor calls."""
+
+import json
+from typing import Optional
+
+from ..core.logging import get_logger
+from ..services.message_processor import message_processor
+
+logger = get_logger(__name__)
+
+CHATWORK_MESSAGE_EVENT = "message_created"
+LARK_MESSAGE_EVENT = "im.message.receive_v1"
+
+
+def parse_chatwork_event(event_data: dict) -> Optional[dict]:
+    """
+    Extract process_chatwork_message arguments from a Chatwork webhook.
+
+    Args:
+        event_data: Parsed webhook body
+
+    Returns:
+        Keyword arguments for process_chatwork_message, or None if the
+        event does not carry a message to sync
+    """
+    if event_data.get("webhook_event_type") != CHATWORK_MESSAGE_EVENT:
+        return None
+
+    event = event_data.get("webhook_event", {})
+    sender_account_id = event.get("from_account_id")
+
+    return {
+        "room_id": str(event.get("room_id")),
+        "message_id": str(event.get("message_id")),
+        # For now, use account_id as name; can enhance with API call
+        "sender_name": f"User {sender_account_id}",
+        "message_body": event.get("body", ""),
+    }
+
+
+def parse_lark_event(event_data: dict) -> Optional[dict]:
+    """
+    Extract process_lark_message arguments from a Lark event callback.
+
+    Args:
+        event_data: Parsed event body
+
+    Returns:
+        Keyword arguments for process_lark_message, or None if the event
+        does not carry a supported message
+    """
+    if event_data.get("header", {}).get("event_type") != LARK_MESSAGE_EVENT:
+        return None
+
+    event = event_data.get("event", {})
+
+    # Get message info
+    message = event.get("message", {})
+    message_id = message.get("message_id")
+    message_type = message.get("message_type")
+    chat_id = message.get("chat_id")
+    content_str = message.get("content", "{}")
+
+    # Get sender info
+    sender_id = event.get("sender", {}).get("sender_id", {})
+    open_id = sender_id.get("open_id")
+    user_id = sender_id.get("user_id")
+
+    # For now, use user_id or open_id as sender name
+    sender_name = f"User {user_id or open_id}"
+
+    logger.info(
+        "lark_message_received",
+        message_id=message_id,
+        message_type=message_type,
+        chat_id=chat_id,
+        sender=sender_name,
+    )
+
+    # Only process text messages for now
+    if message_type != "text":
+        logger.info(
+            "lark_message_type_unsupported",
+            message_id=message_id,
+            message_type=message_type,
+            reason="only_text_supported",
+        )
+        return None
+
+    # Parse message content
+    try:
+        content = json.loads(content_str)
+        message_text = content.get("text", "")
+    except json.JSONDecodeError as e:
+        logger.warning(
+            "lark_message_content_parse_error",
+            message_id=message_id,
+            error=str(e),
+        )
+        message_text = content_str
+
+    return {
+        "chat_id": chat_id,
+        "message_id": message_id,
+        "sender_name": sender_name,
+        "message_text": message_text,
+    }
+
+
+async def dispatch_event(
+    platform: str,
+    event_data: dict,
+    attempt: int = 0,
+    in_order: bool = False,
+) -> Optional[str]:
+    """
+    Run the sync pipeline for a verified webhook payload.
+
+    Args:
+        platform: Source platform ("chatwork" or "lark")
+        event_data: Parsed webhook body
+        attempt: Number of this send attempt (0 = first)
+        in_order: Caller retries failed sends itself to keep room order
+
+    Returns:
+        Target message ID if sent, None if skipped
+
+    Raises:
+        ValueError: If the platform is unknown
+    """
+    if platform == "chatwork":
+        kwargs = parse_chatwork_event(event_data)
+        if kwargs is None:
+            return None
+        return await message_processor.process_chatwork_message(
+            **kwargs, attempt=attempt, in_order=in_order
+        )
+
+    if platform == "lark":
+        kwargs = parse_lark_event(event_data)
+        if kwargs is None:
+            return None
+        return await message_processor.process_lark_message(
+            **kwargs, attempt=attempt, in_order=in_order
+        )
+
+    raise ValueError(f"Unknown platform: {platform}")
+
+
+async def partition_key_for(platform: str, event_data: dict) -> str:
+    """
+    Routing key that orders a webhook payload relative to its room.
+
+    Args:
+        platform: Source platform ("chatwork" or "lark")
+        event_data: Parsed webhook body
+
+    Returns:
+        Room routing key (see MessageProcessor.partition_key)
+    """
+    if platform == "chatwork":
+        room_id = event_data.get("webhook_event", {}).get("room_id")
+    else:
+        room_id = event_data.get("event", {}).get("message", {}).get("chat_id")
+
+    return await message_processor.partition_key(platform, str(room_id))
+
+
+async def dead_letter_event(platform: str, event_data: dict, error: str) -> None:
+    """
+    Write a webhook payload that could not be delivered to the DLQ.
+
+    The message is stored in the same shape the message processor uses
+    for failed sends, so both can be inspected and replayed alike.
+
+    Args:
+        platform: Source platform ("chatwork" or "lark")
+        event_data: Parsed webhook body
+        error: Description of the last failure
+    """
+    if platform == "chatwork":
+        message_data = parse_chatwork_event(event_data)
+        target_platform = "lark"
+    else:
+        message_data = parse_lark_event(event_data)
+        target_platform = "chatwork"
+
+    await message_processor.storage.add_to_failed_queue(
+        source_platform=platform,
+        target_platform=target_platform,
+        message_data=message_data or {"event": event_data},
+        error=error,
+    )
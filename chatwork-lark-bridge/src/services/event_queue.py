@@ -0,0 +1,515 @@
+"""Durable webhook event queue backed by partitioned Redis Streams."""
+
+import asyncio
+import json
+import time
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Optional
+
+from redis.exceptions import ResponseError
+
+from ..core.config import settings
+from ..core.logging import get_logger
+from ..services.redis_client import redis_client
+
+logger = get_logger(__name__)
+
+# Extend a partition lease only while we still own it
+RENEW_LEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# Drop a partition lease only while we still own it
+RELEASE_LEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+@dataclass
+class QueuedEvent:
+    """A webhook event read back from the stream."""
+
+    entry_id: str
+    platform: str
+    payload: dict
+    partition: int = 0
+    received_at: Optional[str] = None
+
+
+def _id_key(entry_id: str) -> tuple[int, int]:
+    """Sortable form of a stream entry ID."""
+    ms, _, seq = entry_id.partition("-")
+    return int(ms), int(seq or 0)
+
+
+def _id_after(entry_id: str) -> str:
+    """Smallest stream entry ID greater than the given one."""
+    ms, seq = _id_key(entry_id)
+    return f"{ms}-{seq + 1}"
+
+
+def partition_for(partition_key: str, partitions: Optional[int] = None) -> int:
+    """Map a routing key to a stream partition."""
+    count = partitions or settings.event_stream_partitions
+    return zlib.crc32(partition_key.encode("utf-8")) % count
+
+
+def rendezvous_owner(partition: int, workers: list[str]) -> Optional[str]:
+    """
+    Pick the worker responsible for a partition (highest random weight).
+
+    Adding or removing a worker only moves the partitions that worker
+    wins or held, so rebalancing disturbs as few rooms as possible.
+    """
+    if not workers:
+        return None
+    return max(
+        workers,
+        key=lambda worker: zlib.crc32(f"{worker}:{partition}".encode("utf-8")),
+    )
+
+
+class EventQueue:
+    """
+    Buffers verified webhook payloads between ingestion and delivery.
+
+    Events are spread over ``event_stream_partitions`` streams by a hash of
+    their room routing key. Each partition is consumed by exactly one
+    worker at a time (guarded by a lease), which keeps delivery FIFO within
+    a room while different rooms are delivered in parallel.
+    """
+
+    def __init__(self):
+        """Initialize event queue."""
+        self.redis = redis_client
+
+    @property
+    def stream_key(self) -> str:
+        """Key prefix of the webhook event streams."""
+        return settings.event_stream_key
+
+    @property
+    def group(self) -> str:
+        """Consumer group shared by all delivery workers."""
+        return settings.event_consumer_group
+
+    @property
+    def partitions(self) -> int:
+        """Number of stream partitions."""
+        return settings.event_stream_partitions
+
+    @property
+    def workers_key(self) -> str:
+        """Sorted set of live workers scored by last heartbeat (ms)."""
+        return f"{self.stream_key}:workers"
+
+    def partition_stream(self, partition: int) -> str:
+        """Stream key of a partition."""
+        return f"{self.stream_key}:{partition}"
+
+    def partition_lease(self, partition: int) -> str:
+        """Lease key naming the worker that currently owns a partition."""
+        return f"{self.stream_key}:{partition}:owner"
+
+    def stream_keys(self) -> list[str]:
+        """Stream keys of all partitions."""
+        return [self.partition_stream(p) for p in range(self.partitions)]
+
+    async def publish(
+        self,
+        platform: str,
+        body: bytes | str,
+        partition_key: str,
+        received_at: Optional[str] = None,
+    ) -> str:
+        """
+        Append a verified webhook payload to its partition stream.
+
+        Args:
+            platform: Source platform ("chatwork" or "lark")
+            body: Raw request body as received
+            partition_key: Routing key that must be delivered in order
+            received_at: Original receive time (defaults to now)
+
+        Returns:
+            Stream entry ID
+        """
+        if isinstance(body, bytes):
+            body = body.decode("utf-8")
+
+        partition = partition_for(partition_key, self.partitions)
+        entry_id = await self.redis.client.xadd(
+            self.partition_stream(partition),
+            {
+                "platform": platform,
+                "payload": body,
+                "received_at": received_at or datetime.now(timezone.utc).isoformat(),
+            },
+            maxlen=settings.event_stream_maxlen,
+            approximate=True,
+        )
+
+        logger.debug(
+            "webhook_event_queued",
+            platform=platform,
+            partition=partition,
+            entry_id=entry_id,
+        )
+
+        return entry_id
+
+    async def ensure_group(self) -> None:
+        """Create the consumer group (and streams) if they do not exist yet."""
+        for stream in self.stream_keys():
+            try:
+                await self.redis.client.xgroup_create(
+                    stream,
+                    self.group,
+                    id="0",
+                    mkstream=True,
+                )
+            except ResponseError as e:
+                if "BUSYGROUP" not in str(e):
+                    raise
+
+    async def read(
+        self,
+        consumer: str,
+        partitions: list[int],
+        count: int = 10,
+        block_ms: Optional[int] = None,
+    ) -> list[QueuedEvent]:
+        """
+        Read new events from the given partitions for a consumer.
+
+        Args:
+            consumer: Consumer name within the group
+            partitions: Partitions owned by the consumer
+            count: Maximum number of events per partition
+            block_ms: Milliseconds to block waiting for events (None = no block)
+
+        Returns:
+            List of queued events, in stream order within each partition
+        """
+        if not partitions:
+            return []
+
+        streams = {self.partition_stream(p): ">" for p in partitions}
+        if self.redis.cluster:
+            # One XREADGROUP can only read streams on a single slot
+            responses = await asyncio.gather(
+                *(
+                    self.redis.client.xreadgroup(
+                        self.group, consumer, {stream: ">"}, count=count, block=block_ms
+                    )
+                    for stream in streams
+                )
+            )
+            response = [item for result in responses for item in result or []]
+        else:
+            response = await self.redis.client.xreadgroup(
+                self.group,
+                consumer,
+                streams,
+                count=count,
+                block=block_ms,
+            )
+
+        events = []
+        for stream, entries in response or []:
+            partition = self._partition_of(stream)
+            events.extend(
+                self._decode_entry(entry_id, fields, partition)
+                for entry_id, fields in entries
+                if fields
+            )
+        return events
+
+    async def claim_pending(
+        self,
+        consumer: str,
+        partition: int,
+        min_idle_ms: int,
+        count: int = 100,
+    ) -> list[QueuedEvent]:
+        """
+        Take over unacknowledged events of a partition left by other owners.
+
+        Only events idle for at least ``min_idle_ms`` are claimed, so events
+        a previous owner is still delivering (and keeps touching) stay with
+        it until they are acknowledged.
+
+        Args:
+            consumer: Consumer name that takes ownership
+            partition: Partition to scan
+            min_idle_ms: Only claim events idle for at least this long
+            count: Events per XAUTOCLAIM call
+
+        Returns:
+            Claimed events in stream order
+        """
+        stream = self.partition_stream(partition)
+        start_id = "0-0"
+        seen: set[str] = set()
+        events: list[QueuedEvent] = []
+
+        while True:
+            response = await self.redis.client.xautoclaim(
+                stream,
+                self.group,
+                consumer,
+                min_idle_time=min_idle_ms,
+                start_id=start_id,
+                count=count,
+            )
+            if not response:
+                break
+
+            next_id, entries = response[0], response[1]
+            new_entries = [
+                (entry_id, fields)
+                for entry_id, fields in entries
+                if entry_id not in seen
+            ]
+            for entry_id, fields in new_entries:
+                seen.add(entry_id)
+                if fields:
+                    events.append(self._decode_entry(entry_id, fields, partition))
+
+            if next_id == "0-0" or not new_entries:
+                break
+            # Some servers return the last claimed ID rather than the next one
+            start_id = _id_after(next_id) if next_id in seen else next_id
+
+        return events
+
+    async def read_own_pending(
+        self,
+        consumer: str,
+        partition: int,
+        count: int = 100,
+    ) -> list[QueuedEvent]:
+        """
+        Re-read events of a partition delivered to this consumer but not acknowledged.
+
+        Returns:
+            Pending events in stream order
+        """
+        stream = self.partition_stream(partition)
+        min_id = "-"
+        events: list[QueuedEvent] = []
+
+        while True:
+            pending = await self.redis.client.xpending_range(
+                stream,
+                self.group,
+                min=min_id,
+                max="+",
+                count=count,
+                consumername=consumer,
+            )
+            if not pending:
+                break
+
+            entries = await self.redis.client.xclaim(
+                stream,
+                self.group,
+                consumer,
+                min_idle_time=0,
+                message_ids=[item["message_id"] for item in pending],
+            )
+            events.extend(
+                self._decode_entry(entry_id, fields, partition)
+                for entry_id, fields in entries
+                if fields
+            )
+            if len(pending) < count:
+                break
+            min_id = "(" + pending[-1]["message_id"]
+
+        return sorted(events, key=lambda event: _id_key(event.entry_id))
+
+    async def pending_by_consumer(self, partition: int) -> dict[str, int]:
+        """Number of unacknowledged events of a partition per consumer."""
+        summary = await self.redis.client.xpending(
+            self.partition_stream(partition),
+            self.group,
+        )
+        return {
+            item["name"]: int(item["pending"])
+            for item in summary.get("consumers") or []
+        }
+
+    async def touch(
+        self,
+        consumer: str,
+        partition: int,
+        entry_ids: list[str],
+    ) -> None:
+        """
+        Reset the idle time of events a consumer is still delivering.
+
+        Keeps slow deliveries (e.g. waiting out a rate limit) from looking
+        abandoned to ``claim_pending`` on the next owner of the partition.
+        """
+        if not entry_ids:
+            return
+        await self.redis.client.xclaim(
+            self.partition_stream(partition),
+            self.group,
+            consumer,
+            min_idle_time=0,
+            message_ids=entry_ids,
+            justid=True,
+        )
+
+    async def ack(self, event: QueuedEvent) -> None:
+        """Acknowledge an event and remove it from its stream."""
+        stream = self.partition_stream(event.partition)
+        async with self.redis.pipeline() as pipe:
+            pipe.xack(stream, self.group, event.entry_id)
+            pipe.xdel(stream, event.entry_id)
+            await pipe.execute()
+
+    async def depth(self) -> int:
+        """Number of events currently held across all partitions."""
+        async with self.redis.client.pipeline(transaction=False) as pipe:
+            for stream in self.stream_keys():
+                pipe.xlen(stream)
+            lengths = await pipe.execute()
+        return sum(lengths)
+
+    async def migrate_legacy_stream(
+        self,
+        partition_key_for: Callable[[str, dict], Awaitable[str]],
+        batch_size: int = 100,
+    ) -> int:
+        """
+        Move events left in the pre-partitioning single stream to partitions.
+
+        Earlier releases queued every event on ``event_stream_key`` itself.
+        Whatever is still there (acknowledged or not) is republished to its
+        partition in order and the old stream is deleted. A short lock keeps
+        concurrently starting workers from moving the same events twice.
+
+        Args:
+            partition_key_for: Returns the routing key of a parsed payload
+            batch_size: Entries moved per round trip
+
+        Returns:
+            Number of events moved
+        """
+        legacy = self.stream_key
+        if await self.redis.client.type(legacy) != "stream":
+            return 0
+
+        lock = f"{legacy}:migrating"
+        if not await self.redis.client.set(lock, "1", nx=True, px=60000):
+            return 0
+
+        moved = 0
+        try:
+            while True:
+                entries = await self.redis.client.xrange(legacy, count=batch_size)
+                if not entries:
+                    break
+
+                for entry_id, fields in entries:
+                    event = self._decode_entry(entry_id, fields)
+                    partition_key = await partition_key_for(
+                        event.platform, event.payload
+                    )
+                    await self.publish(
+                        event.platform,
+                        fields.get("payload") or "{}",
+                        partition_key,
+                        received_at=event.received_at,
+                    )
+                    await self.redis.client.xdel(legacy, entry_id)
+                    moved += 1
+
+            await self.redis.client.delete(legacy)
+        finally:
+            await self.redis.client.delete(lock)
+
+        logger.info("legacy_event_stream_migrated", stream=legacy, moved=moved)
+        return moved
+
+    # Partition ownership
+    async def heartbeat(self, consumer: str) -> None:
+        """Record that a worker is alive and prune workers that went silent."""
+        now_ms = int(time.time() * 1000)
+        async with self.redis.pipeline() as pipe:
+            pipe.zadd(self.workers_key, {consumer: now_ms})
+            pipe.zremrangebyscore(
+                self.workers_key,
+                "-inf",
+                now_ms - settings.partition_lease_ms,
+            )
+            await pipe.execute()
+
+    async def live_workers(self) -> list[str]:
+        """Workers that sent a heartbeat within the lease period."""
+        return await self.redis.client.zrange(self.workers_key, 0, -1)
+
+    async def leave(self, consumer: str) -> None:
+        """Remove a worker from the registry on shutdown."""
+        await self.redis.client.zrem(self.workers_key, consumer)
+
+    async def acquire_partition(self, partition: int, consumer: str) -> bool:
+        """Try to take the lease of a partition."""
+        acquired = await self.redis.client.set(
+            self.partition_lease(partition),
+            consumer,
+            nx=True,
+            px=settings.partition_lease_ms,
+        )
+        return bool(acquired)
+
+    async def renew_partition(self, partition: int, consumer: str) -> bool:
+        """Extend a lease we hold. Returns False if it was lost."""
+        renewed = await self.redis.run_script(
+            RENEW_LEASE_SCRIPT,
+            keys=[self.partition_lease(partition)],
+            args=[consumer, settings.partition_lease_ms],
+        )
+        return bool(renewed)
+
+    async def release_partition(self, partition: int, consumer: str) -> None:
+        """Give up a lease we hold."""
+        await self.redis.run_script(
+            RELEASE_LEASE_SCRIPT,
+            keys=[self.partition_lease(partition)],
+            args=[consumer],
+        )
+
+    def _partition_of(self, stream: str) -> int:
+        """Partition number encoded in a stream key."""
+        return int(stream.rsplit(":", 1)[1])
+
+    def _decode_entry(
+        self,
+        entry_id: str,
+        fields: dict,
+        partition: int = 0,
+    ) -> QueuedEvent:
+        """Build a QueuedEvent from raw stream fields."""
+        return QueuedEvent(
+            entry_id=entry_id,
+            platform=fields.get("platform", ""),
+            payload=json.loads(fields.get("payload") or "{}"),
+            partition=partition,
+            received_at=fields.get("received_at"),
+        )
+
+
+# Global event queue instance
+event_queue = EventQueue()
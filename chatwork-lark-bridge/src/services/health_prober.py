@@ -0,0 +1,196 @@
+"""Background probes of the bridge's dependencies, cached for health checks."""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Optional
+
+import httpx
+
+from ..core.config import settings
+from ..core.logging import get_logger
+from .circuit_breaker import circuit_breakers
+from .event_queue import event_queue
+from .redis_client import redis_client
+from .storage import storage as default_storage
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class ProbeResult:
+    """Outcome of the latest probe of one dependency."""
+
+    healthy: bool
+    latency_ms: float
+    checked_at: float
+    last_success: Optional[float] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        """JSON-ready form (timestamps as ISO 8601)."""
+        return {
+            "healthy": self.healthy,
+            "latency_ms": round(self.latency_ms, 2),
+            "checked_at": _iso(self.checked_at),
+            "last_success": _iso(self.last_success),
+            "error": self.error,
+        }
+
+
+def _iso(timestamp: Optional[float]) -> Optional[str]:
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+class HealthProber:
+    """
+    Probes storage, Redis, Chatwork and Lark every ``health_probe_interval_seconds``.
+
+    The health endpoints read the cached ``results``, queue depth and
+    breaker states instead of calling out on every request. The platforms
+    are probed with an unauthenticated GET of their API base URL, so
+    probes cost no API quota; any answer below 500 counts as reachable.
+
+    Until the first probe after ``start`` has finished (and after
+    ``stop``) ``active`` is False and callers should check storage
+    themselves.
+    """
+
+    def __init__(self, storage: Any = None):
+        """
+        Initialize the prober.
+
+        Args:
+            storage: Storage backend (defaults to the global instance)
+        """
+        self.storage = storage if storage is not None else default_storage
+        self.results: dict[str, ProbeResult] = {}
+        self.queue_depth: Optional[int] = None
+        self.breakers: dict[str, str] = {}
+        self.checked_at: Optional[float] = None
+        self._http: Optional[httpx.AsyncClient] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def active(self) -> bool:
+        """Whether probes run in the background and have results."""
+        return self._task is not None and self.checked_at is not None
+
+    @property
+    def stale(self) -> bool:
+        """Whether the cached results are older than three probe intervals."""
+        if self.checked_at is None:
+            return True
+        return (
+            time.time() - self.checked_at > 3 * settings.health_probe_interval_seconds
+        )
+
+    async def probe(self) -> None:
+        """Probe every dependency once, concurrently, and cache the results."""
+        checks: dict[str, Callable[[], Awaitable[bool]]] = {
+            "storage": self.storage.health_check,
+            "chatwork": lambda: self._reachable(settings.chatwork_api_base_url),
+            "lark": lambda: self._reachable(settings.lark_api_base_url),
+        }
+        if self.storage is not redis_client:
+            # Shared breakers, rate limits and tokens use Redis when it is up
+            checks["redis"] = self._redis_healthy
+
+        await asyncio.gather(
+            *(self._check(name, check) for name, check in checks.items()),
+            self._read_queue_state(),
+        )
+        self.checked_at = time.time()
+
+    async def _check(self, name: str, check: Callable[[], Awaitable[bool]]) -> None:
+        previous = self.results.get(name)
+        started = time.perf_counter()
+        error = None
+        try:
+            healthy = await asyncio.wait_for(
+                check(), settings.health_probe_timeout_seconds
+            )
+        except Exception as e:
+            healthy = False
+            error = str(e) or type(e).__name__
+        now = time.time()
+
+        result = ProbeResult(
+            healthy=healthy,
+            latency_ms=(time.perf_counter() - started) * 1000,
+            checked_at=now,
+            last_success=now if healthy else previous and previous.last_success,
+            error=error,
+        )
+        if previous is not None and previous.healthy != healthy:
+            log = logger.info if healthy else logger.warning
+            log(
+                "dependency_health_changed",
+                dependency=name,
+                healthy=healthy,
+                error=error,
+            )
+        self.results[name] = result
+
+    async def _redis_healthy(self) -> bool:
+        return redis_client.is_connected() and await redis_client.health_check()
+
+    async def _reachable(self, url: str) -> bool:
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                timeout=settings.health_probe_timeout_seconds
+            )
+        response = await self._http.get(url)
+        return response.status_code < 500
+
+    async def _read_queue_state(self) -> None:
+        """Event queue depth and breaker states (both live in Redis)."""
+        if not redis_client.is_connected():
+            self.queue_depth = None
+            self.breakers = {}
+            return
+        try:
+            if settings.queue_ingest_enabled:
+                self.queue_depth = await event_queue.depth()
+            self.breakers = {
+                platform: (await breaker.state())["state"]
+                for platform, breaker in circuit_breakers.items()
+            }
+        except Exception as e:
+            self.queue_depth = None
+            self.breakers = {}
+            logger.warning("queue_state_probe_failed", error=str(e))
+
+    async def start(self) -> None:
+        """Start probing in a background task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop probing."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+        self.checked_at = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.probe()
+            except Exception as e:
+                logger.error("health_probe_failed", error=str(e))
+            await asyncio.sleep(settings.health_probe_interval_seconds)
+
+
+# Global health prober instance
+health_prober = HealthProber()
@@ -1,14 +1,16 @@
 """Lark API client service."""
 
-from typing import Optional
+import asyncio
 import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
 
+import httpx
 from lark_oapi import Client
 from lark_oapi.api.im.v1 import (
     CreateMessageRequest,
     CreateMessageRequestBody,
 )
-from lark_oapi.core.model import RawResponse
 
 from ..core.config import settings
 from ..core.logging import get_logger
@@ -19,13 +21,73 @@ from ..core.exceptions import (
     ServerError,
     BadRequestError,
 )
-from ..core.retry import retry_with_rate_limit_handling
+from ..core.retry import send_with_retry_policy
+from .circuit_breaker import circuit_breakers
+from .lark_token_manager import LarkTokenManager
+from .rate_limiter import Bucket, rate_limit_gate, rate_limiter
 
 logger = get_logger(__name__)
 
 
+def raise_for_lark_code(code: int, msg: str, retry_after: Optional[int] = None) -> None:
+    """
+    Map a Lark API error code to a bridge exception.
+
+    Args:
+        code: Lark error code
+        msg: Lark error message
+        retry_after: Seconds until the quota resets, if Lark reported it
+
+    Raises:
+        RateLimitError: If rate limit is exceeded
+        AuthenticationError: If authentication fails
+        BadRequestError: If request is invalid
+        ServerError: If server error occurs
+        APIError: For any other error code
+    """
+    if code == 0:
+        return
+
+    logger.warning(
+        "lark_api_error",
+        code=code,
+        message=msg,
+    )
+
+    if code == 99991663:  # Rate limit
+        raise RateLimitError(
+            platform="lark",
+            retry_after=retry_after or settings.lark_rate_limit_retry_seconds,
+        )
+    elif code in [99991661, 99991662]:  # Auth errors
+        raise AuthenticationError(f"Lark authentication failed: {msg}")
+    elif 99991000 <= code < 99992000:  # Client errors
+        raise BadRequestError(f"Lark bad request: {msg}")
+    elif code >= 99992000:  # Server errors
+        raise ServerError(f"Lark server error: {msg}")
+    else:
+        raise APIError(f"Lark API error: {msg}", status_code=code)
+
+
 class LarkAPIClient:
-    """Client for interacting with Lark API."""
+    """
+    Client for interacting with Lark API.
+
+    Messages are sent over a pooled ``httpx.AsyncClient`` so a slow Lark
+    response never blocks the event loop. With ``lark_transport=sdk`` the
+    blocking ``lark_oapi`` client is used instead, run on a bounded thread
+    pool.
+
+    Sends are spaced to stay under Lark's per-chat and per-app QPS quotas
+    using buckets shared by all replicas. The chat bucket is taken first, so
+    a busy chat waits on its own quota without holding app-wide tokens. A
+    rate limit error pauses every sender through the shared gate, and
+    repeated 5xx/network errors open the shared circuit breaker.
+
+    The tenant access token is shared across replicas by
+    ``LarkTokenManager`` and refreshed ahead of expiry once ``start`` has
+    been called.
+    """
 
     def __init__(self):
         """Initialize Lark API client."""
@@ -34,7 +96,35 @@ class LarkAPIClient:
             .app_secret(settings.lark_app_secret) \
             .build()
 
-        logger.info("lark_client_initialized", app_id=settings.lark_app_id)
+        self.http = httpx.AsyncClient(
+            base_url=settings.lark_api_base_url,
+            timeout=30.0,
+            limits=httpx.Limits(
+                max_connections=settings.lark_http_max_connections,
+                max_keepalive_connections=settings.lark_http_max_connections,
+            ),
+        )
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.tokens = LarkTokenManager(self._fetch_tenant_access_token)
+        self.breaker = circuit_breakers["lark"]
+
+        logger.info(
+            "lark_client_initialized",
+            app_id=settings.lark_app_id,
+            transport=settings.lark_transport,
+        )
+
+    def start(self):
+        """Start refreshing the tenant access token in the background."""
+        self.tokens.start()
+
+    async def close(self):
+        """Stop token refresh and close the HTTP client and SDK thread pool."""
+        await self.tokens.stop()
+        await self.http.aclose()
+        if self._executor:
+            self._executor.shutdown(wait=False)
+            self._executor = None
 
     async def send_text_message(
         self,
@@ -63,32 +153,22 @@ class LarkAPIClient:
             # Prepare message content
             content = json.dumps({"text": text})
 
-            # Create request
-            request = CreateMessageRequest.builder() \
-                .receive_id_type("chat_id") \
-                .request_body(
-                    CreateMessageRequestBody.builder()
-                    .receive_id(chat_id)
-                    .msg_type(msg_type)
-                    .content(content)
-                    .build()
-                ) \
-                .build()
-
             # Send message with retry handling
-            response = await retry_with_rate_limit_handling(
+            message_id = await send_with_retry_policy(
                 self._send_message_request,
-                request,
+                chat_id,
+                msg_type,
+                content,
             )
 
             logger.info(
                 "lark_message_sent",
                 chat_id=chat_id,
-                message_id=response.data.message_id,
+                message_id=message_id,
                 text_preview=text[:50] + "..." if len(text) > 50 else text,
             )
 
-            return response.data.message_id
+            return message_id
 
         except Exception as e:
             logger.error(
@@ -99,39 +179,162 @@ class LarkAPIClient:
             raise
 
     async def _send_message_request(
-        self, request: CreateMessageRequest
-    ) -> RawResponse:
+        self,
+        chat_id: str,
+        msg_type: str,
+        content: str,
+    ) -> str:
         """
-        Internal method to send message request.
+        Internal method to send a message with the configured transport.
 
         Handles error codes and raises appropriate exceptions.
+
+        Returns:
+            Message ID of the sent message
+
+        Raises:
+            CircuitOpenError: If Lark is considered down (not sent)
         """
-        response = self.client.im.v1.message.create(request)
+        async with self.breaker.guard():
+            await rate_limit_gate.wait("lark")
+            await self._acquire_send_slot(chat_id)
+
+            try:
+                if settings.lark_transport == "sdk":
+                    return await self._send_via_sdk(chat_id, msg_type, content)
+                return await self._send_via_http(chat_id, msg_type, content)
+            except RateLimitError as e:
+                await rate_limit_gate.pause("lark", e.retry_after)
+                raise
+
+    async def _acquire_send_slot(self, chat_id: str) -> None:
+        """Wait until a send to ``chat_id`` fits both Lark quotas."""
+        await rate_limiter.acquire(
+            Bucket(f"lark:chat:{chat_id}", settings.lark_rate_limit_chat_qps, 1)
+        )
+        await rate_limiter.acquire(
+            Bucket(
+                f"lark:app:{settings.lark_app_id}", settings.lark_rate_limit_app_qps, 1
+            )
+        )
 
-        # Check for errors
-        if not response.success():
-            error_code = response.code
-            error_msg = response.msg
+    async def _send_via_http(self, chat_id: str, msg_type: str, content: str) -> str:
+        """Send a message with the async HTTP client."""
+        token = await self.tokens.get_token()
+
+        response = await self.http.post(
+            "/im/v1/messages",
+            params={"receive_id_type": "chat_id"},
+            headers={"Authorization": f"Bearer {token}"},
+            json={
+                "receive_id": chat_id,
+                "msg_type": msg_type,
+                "content": content,
+            },
+        )
+        body = self._parse_response(response)
+
+        code = body.get("code", 0)
+        if code in [99991661, 99991663, 99991668]:
+            # Token may have been revoked or expired early
+            await self.tokens.invalidate(token)
+        raise_for_lark_code(code, body.get("msg", ""), self._retry_after(response))
+
+        return body["data"]["message_id"]
+
+    async def _send_via_sdk(self, chat_id: str, msg_type: str, content: str) -> str:
+        """Send a message with the blocking SDK on the bounded thread pool."""
+        request = (
+            CreateMessageRequest.builder()
+            .receive_id_type("chat_id")
+            .request_body(
+                CreateMessageRequestBody.builder()
+                .receive_id(chat_id)
+                .msg_type(msg_type)
+                .content(content)
+                .build()
+            )
+            .build()
+        )
 
-            logger.warning(
-                "lark_api_error",
-                code=error_code,
-                message=error_msg,
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=settings.lark_sdk_max_workers,
+                thread_name_prefix="lark-sdk",
             )
 
-            # Map error codes to exceptions
-            if error_code == 99991663:  # Rate limit
-                raise RateLimitError(platform="lark", retry_after=60)
-            elif error_code in [99991661, 99991662]:  # Auth errors
-                raise AuthenticationError(f"Lark authentication failed: {error_msg}")
-            elif 99991000 <= error_code < 99992000:  # Client errors
-                raise BadRequestError(f"Lark bad request: {error_msg}")
-            elif error_code >= 99992000:  # Server errors
-                raise ServerError(f"Lark server error: {error_msg}")
-            else:
-                raise APIError(f"Lark API error: {error_msg}", status_code=error_code)
+        loop = asyncio.get_running_loop()
+        response = await loop.run_in_executor(
+            self._executor,
+            self.client.im.v1.message.create,
+            request,
+        )
+
+        if not response.success():
+            raise_for_lark_code(response.code, response.msg)
+
+        return response.data.message_id
+
+    async def _fetch_tenant_access_token(self) -> tuple[str, int]:
+        """
+        Request a new tenant access token from Lark.
 
-        return response
+        Returns:
+            The token and its remaining lifetime in seconds
+        """
+        response = await self.http.post(
+            "/auth/v3/tenant_access_token/internal",
+            json={
+                "app_id": settings.lark_app_id,
+                "app_secret": settings.lark_app_secret,
+            },
+        )
+        body = self._parse_response(response)
+        raise_for_lark_code(body.get("code", 0), body.get("msg", ""))
+
+        return body["tenant_access_token"], body.get("expire", 7200)
+
+    @staticmethod
+    def _retry_after(response: httpx.Response) -> Optional[int]:
+        """Seconds until the Lark quota resets, from the gateway headers."""
+        reset = response.headers.get("x-ogw-ratelimit-reset")
+        try:
+            return max(int(reset), 1) if reset else None
+        except ValueError:
+            return None
+
+    def _parse_response(self, response: httpx.Response) -> dict:
+        """
+        Decode a Lark API response, mapping HTTP-level failures.
+
+        Lark reports most errors in the JSON body, but gateways may answer
+        with a bare status code.
+        """
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+
+        if isinstance(body, dict) and "code" in body:
+            return body
+
+        if response.status_code == 429:
+            raise RateLimitError(
+                platform="lark",
+                retry_after=self._retry_after(response)
+                or settings.lark_rate_limit_retry_seconds,
+            )
+        elif response.status_code in [401, 403]:
+            raise AuthenticationError(
+                f"Lark authentication failed: {response.status_code}"
+            )
+        elif response.status_code >= 500:
+            raise ServerError(f"Lark server error: {response.status_code}")
+
+        raise APIError(
+            f"Lark API error: unexpected response {response.status_code}",
+            status_code=response.status_code,
+        )
 
     async def send_rich_text_message(
         self,
@@ -155,30 +358,21 @@ class LarkAPIClient:
             "content": content,
         })
 
-        request = CreateMessageRequest.builder() \
-            .receive_id_type("chat_id") \
-            .request_body(
-                CreateMessageRequestBody.builder()
-                .receive_id(chat_id)
-                .msg_type("post")
-                .content(rich_content)
-                .build()
-            ) \
-            .build()
-
-        response = await retry_with_rate_limit_handling(
+        message_id = await send_with_retry_policy(
             self._send_message_request,
-            request,
+            chat_id,
+            "post",
+            rich_content,
         )
 
         logger.info(
             "lark_rich_message_sent",
             chat_id=chat_id,
-            message_id=response.data.message_id,
+            message_id=message_id,
             title=title,
         )
 
-        return response.data.message_id
+        return message_id
 
     def format_message_from_chatwork(
         self,
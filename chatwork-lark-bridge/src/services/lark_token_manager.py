@@ -0,0 +1,268 @@
+"""Shared Lark tenant access token cache."""
+
+import asyncio
+import time
+import uuid
+from typing import Awaitable, Callable, Optional
+
+from ..core.config import settings
+from ..core.logging import get_logger
+from .redis_client import RedisClient, redis_client
+
+logger = get_logger(__name__)
+
+# Never hand out a token this close to its expiry, even if a refresh failed
+TOKEN_HARD_MARGIN_SECONDS = 30
+
+# Release the refresh lock only if we still own it
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# Drop the shared token only if it is the one Lark rejected
+INVALIDATE_TOKEN_SCRIPT = """
+if redis.call('HGET', KEYS[1], 'token') == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class LarkTokenManager:
+    """
+    Tenant access token cache shared by every replica through Redis.
+
+    Tokens are refreshed ``lark_token_refresh_margin_seconds`` before they
+    expire, by a background task when one is running, so sends normally
+    find a valid token in memory. Refreshes are single-flight: callers in
+    one process share a refresh task, and replicas coordinate through a
+    short Redis lock so only one of them calls Lark. If Redis is
+    unavailable the token is fetched and cached in-process only.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[], Awaitable[tuple[str, int]]],
+        redis: Optional[RedisClient] = None,
+    ):
+        """
+        Initialize the token manager.
+
+        Args:
+            fetch: Coroutine function requesting a new token from Lark,
+                returning the token and its lifetime in seconds
+            redis: Redis client (defaults to the global instance)
+        """
+        self.fetch = fetch
+        self.redis = redis or redis_client
+        self._token: Optional[str] = None
+        self._expires_at = 0.0
+        self._refreshing: Optional[asyncio.Task] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def cache_key(self) -> str:
+        """Redis key holding the shared token."""
+        return f"lark:tenant_token:{settings.lark_app_id}"
+
+    @property
+    def lock_key(self) -> str:
+        """Redis key serializing refreshes across replicas."""
+        return f"{self.cache_key}:refresh_lock"
+
+    def _usable(self, expires_at: float) -> bool:
+        return time.time() < expires_at - TOKEN_HARD_MARGIN_SECONDS
+
+    def _due(self, expires_at: float) -> bool:
+        return time.time() >= expires_at - settings.lark_token_refresh_margin_seconds
+
+    async def get_token(self) -> str:
+        """
+        Return a valid tenant access token.
+
+        A token inside the refresh margin is still returned immediately and
+        a refresh is started in the background.
+
+        Raises:
+            AuthenticationError: If Lark rejects the app credentials
+            APIError: If the token request fails
+        """
+        if not (self._token and self._usable(self._expires_at)):
+            shared = await self._read_shared()
+            if not (shared and self._usable(shared[1])):
+                return await self.refresh()
+            self._adopt(*shared)
+
+        if self._due(self._expires_at) and self._task is None:
+            self._start_refresh()
+        return self._token
+
+    async def refresh(self) -> str:
+        """Refresh the token, joining a refresh already in progress."""
+        return await asyncio.shield(self._start_refresh())
+
+    def _start_refresh(self) -> asyncio.Task:
+        if self._refreshing is None or self._refreshing.done():
+            self._refreshing = asyncio.create_task(self._refresh())
+            self._refreshing.add_done_callback(self._refresh_done)
+        return self._refreshing
+
+    @staticmethod
+    def _refresh_done(task: asyncio.Task) -> None:
+        # Background refreshes have no awaiter; keep their errors out of
+        # "exception was never retrieved" warnings
+        if not task.cancelled():
+            task.exception()
+
+    async def invalidate(self, token: str) -> None:
+        """
+        Forget a token Lark rejected so the next send fetches a new one.
+
+        Args:
+            token: The rejected token
+        """
+        if self._token == token:
+            self._token = None
+            self._expires_at = 0.0
+        if not self.redis.is_connected():
+            return
+        try:
+            await self.redis.run_script(
+                INVALIDATE_TOKEN_SCRIPT, [self.cache_key], [token]
+            )
+        except Exception as e:
+            logger.warning("lark_token_invalidate_failed", error=str(e))
+
+    async def _refresh(self) -> str:
+        shared = await self._read_shared()
+        if shared and not self._due(shared[1]):
+            return self._adopt(*shared)
+
+        lock_token = uuid.uuid4().hex
+        if await self._acquire_lock(lock_token):
+            try:
+                # Another replica may have finished a refresh just before us
+                shared = await self._read_shared()
+                if shared and not self._due(shared[1]):
+                    return self._adopt(*shared)
+
+                token, expires_at = await self._fetch()
+                await self._write_shared(token, expires_at)
+                return self._adopt(token, expires_at)
+            finally:
+                await self._release_lock(lock_token)
+
+        # Another replica is refreshing; wait for its result
+        deadline = time.monotonic() + settings.lark_token_lock_timeout_seconds
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+            shared = await self._read_shared()
+            if shared and not self._due(shared[1]):
+                return self._adopt(*shared)
+
+        # The holder died or is stuck; a still-valid token is good enough
+        if shared and self._usable(shared[1]):
+            return self._adopt(*shared)
+
+        token, expires_at = await self._fetch()
+        await self._write_shared(token, expires_at)
+        return self._adopt(token, expires_at)
+
+    def _adopt(self, token: str, expires_at: float) -> str:
+        self._token = token
+        self._expires_at = expires_at
+        return token
+
+    async def _fetch(self) -> tuple[str, float]:
+        token, expire = await self.fetch()
+        logger.info("lark_tenant_token_refreshed", expire=expire)
+        return token, time.time() + expire
+
+    async def _read_shared(self) -> Optional[tuple[str, float]]:
+        if not self.redis.is_connected():
+            # Local storage backend: the token is cached in-process only
+            return None
+        try:
+            data = await self.redis.client.hgetall(self.cache_key)
+        except Exception as e:
+            logger.warning("lark_token_cache_read_failed", error=str(e))
+            return None
+        if not data:
+            return None
+        return data["token"], float(data["expires_at"])
+
+    async def _write_shared(self, token: str, expires_at: float) -> None:
+        ttl = int(expires_at - time.time())
+        if ttl <= 0 or not self.redis.is_connected():
+            return
+        try:
+            async with self.redis.pipeline() as pipe:
+                pipe.hset(
+                    self.cache_key, mapping={"token": token, "expires_at": expires_at}
+                )
+                pipe.expire(self.cache_key, ttl)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning("lark_token_cache_write_failed", error=str(e))
+
+    async def _acquire_lock(self, lock_token: str) -> bool:
+        if not self.redis.is_connected():
+            return True
+        try:
+            return bool(
+                await self.redis.client.set(
+                    self.lock_key,
+                    lock_token,
+                    nx=True,
+                    px=settings.lark_token_lock_timeout_seconds * 1000,
+                )
+            )
+        except Exception as e:
+            # Without Redis there is nobody to coordinate with
+            logger.warning("lark_token_lock_failed", error=str(e))
+            return True
+
+    async def _release_lock(self, lock_token: str) -> None:
+        if not self.redis.is_connected():
+            return
+        try:
+            await self.redis.run_script(
+                RELEASE_LOCK_SCRIPT, [self.lock_key], [lock_token]
+            )
+        except Exception as e:
+            logger.warning("lark_token_lock_release_failed", error=str(e))
+
+    def start(self) -> None:
+        """Start refreshing the token in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background refresh task."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+                delay = (
+                    self._expires_at
+                    - settings.lark_token_refresh_margin_seconds
+                    - time.time()
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("lark_token_background_refresh_failed", error=str(e))
+                delay = settings.lark_token_retry_seconds
+            await asyncio.sleep(max(delay, 1))
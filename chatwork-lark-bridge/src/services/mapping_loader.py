@@ -1,85 +1,56 @@
 """Load and cache room/user mappings from configuration files."""
 
+import asyncio
 import json
 from pathlib import Path
 from typing import Optional
 
+from ..core.config import settings
 from ..core.logging import get_logger
-from ..services.redis_client import redis_client
+from ..services.redis_client import REDIS_OUTAGE_ERRORS, SYNC_DIRECTIONS
+from ..services.route_table import route_table
+from ..services.storage import storage
 
 logger = get_logger(__name__)
 
+PLATFORMS = ("chatwork", "lark")
+
 
 class MappingLoader:
-    """Loads and caches room and user mappings."""
+    """
+    Loads room and user mappings into the storage.
+
+    Each table is one non-expiring hash per platform (``rooms:{platform}``,
+    ``room_directions:{platform}``, ``users:{platform}``). A full load
+    replaces the tables at once (in Redis, staged copies swapped in with
+    RENAME), so readers see either the old or the new tables. ``reload``
+    compares the files with what the storage holds and writes only the
+    differences; it runs from ``start_watching`` when a file changes and
+    from the admin API.
+    """
 
     def __init__(self, config_dir: str = "config"):
         """Initialize mapping loader."""
         self.config_dir = Path(config_dir)
-        self.redis = redis_client
+        self.storage = storage
+        self.routes = route_table
+        self._mtimes: dict[str, Optional[float]] = {}
+        self._task: Optional[asyncio.Task] = None
 
     async def load_room_mappings(self) -> int:
         """
-        Load room mappings from JSON file and cache in Redis.
+        Load room mappings from JSON file and replace them in the storage.
 
         Returns:
             Number of mappings loaded
         """
-        mapping_file = self.config_dir / "room_mappings.json"
-
-        if not mapping_file.exists():
-            logger.warning(
-                "room_mappings_file_not_found",
-                path=str(mapping_file),
-            )
-            return 0
-
         try:
-            with open(mapping_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
-
-            mappings = data.get("mappings", [])
-            loaded_count = 0
-
-            for mapping in mappings:
-                if not mapping.get("is_active", True):
-                    continue
-
-                chatwork_room_id = mapping["chatwork_room_id"]
-                lark_chat_id = mapping["lark_chat_id"]
-                name = mapping.get("name", "")
-
-                # Cache bidirectional mapping
-                await self.redis.set_room_mapping(
-                    source_platform="chatwork",
-                    source_room_id=chatwork_room_id,
-                    target_room_id=lark_chat_id,
-                    ttl=86400,  # 24 hours
-                )
-
-                await self.redis.set_room_mapping(
-                    source_platform="lark",
-                    source_room_id=lark_chat_id,
-                    target_room_id=chatwork_room_id,
-                    ttl=86400,
-                )
-
-                loaded_count += 1
-
-                logger.info(
-                    "room_mapping_loaded",
-                    name=name,
-                    chatwork_room_id=chatwork_room_id,
-                    lark_chat_id=lark_chat_id,
-                )
-
-            logger.info(
-                "room_mappings_loaded",
-                total_count=loaded_count,
-            )
-
-            return loaded_count
+            mappings = self._read_mappings("room_mappings.json", required=True)
+            if mappings is None:
+                return 0
 
+            await self.storage.replace_tables(self._room_tables(mappings))
+            await self._notify_routes()
         except Exception as e:
             logger.error(
                 "failed_to_load_room_mappings",
@@ -87,82 +58,190 @@ class MappingLoader:
             )
             raise
 
+        logger.info(
+            "room_mappings_loaded",
+            total_count=len(mappings),
+        )
+        return len(mappings)
+
     async def load_user_mappings(self) -> int:
         """
-        Load user mappings from JSON file and cache in Redis.
+        Load user mappings from JSON file and replace them in the storage.
 
         Returns:
             Number of mappings loaded
         """
-        mapping_file = self.config_dir / "user_mappings.json"
+        try:
+            mappings = self._read_mappings("user_mappings.json", required=False)
+            if mappings is None:
+                return 0
 
-        if not mapping_file.exists():
-            logger.info(
-                "user_mappings_file_not_found_skipping",
-                path=str(mapping_file),
+            await self.storage.replace_tables(self._user_tables(mappings))
+        except Exception as e:
+            logger.error(
+                "failed_to_load_user_mappings",
+                error=str(e),
             )
+            # User mappings are optional, don't raise
             return 0
 
+        logger.info(
+            "user_mappings_loaded",
+            total_count=len(mappings),
+        )
+        return len(mappings)
+
+    async def reload(self) -> dict:
+        """
+        Apply changes in the mapping files to the storage.
+
+        Only entries that were added, changed or removed are written. A
+        missing file leaves its mappings untouched.
+
+        Returns:
+            Number of hash fields updated and removed
+        """
+        tables = {}
+        rooms = self._read_mappings("room_mappings.json", required=True)
+        if rooms is not None:
+            tables.update(self._room_tables(rooms))
+        users = self._read_mappings("user_mappings.json", required=False)
+        if users is not None:
+            tables.update(self._user_tables(users))
+
+        updated, removed = await self.storage.sync_tables(tables)
+        if rooms is not None and (updated or removed):
+            await self._notify_routes()
+
+        logger.info("mappings_reloaded", updated=updated, removed=removed)
+        return {"updated": updated, "removed": removed}
+
+    async def _notify_routes(self) -> None:
+        # Let every process reload its route table (which runs on Redis only)
+        if settings.storage_backend != "redis":
+            return
+        try:
+            await self.routes.notify_changed()
+        except REDIS_OUTAGE_ERRORS as e:
+            # Degraded mode: the tables are buffered and route tables are
+            # notified when they are replayed
+            logger.warning("route_change_notify_failed", error=str(e))
+
+    def start_watching(self) -> None:
+        """Reload mappings whenever a mapping file changes."""
+        if self._task is None and settings.mapping_reload_interval_seconds > 0:
+            self._mtimes = self._file_mtimes()
+            self._task = asyncio.create_task(self._watch())
+
+    async def stop_watching(self) -> None:
+        """Stop watching the mapping files."""
+        if self._task is None:
+            return
+        self._task.cancel()
         try:
-            with open(mapping_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
-
-            mappings = data.get("mappings", [])
-            loaded_count = 0
-
-            for mapping in mappings:
-                if not mapping.get("is_active", True):
-                    continue
-
-                chatwork_user_id = mapping.get("chatwork_user_id")
-                lark_user_id = mapping.get("lark_user_id")
-                display_name = mapping.get("display_name", "")
-
-                if chatwork_user_id:
-                    await self.redis.set_user_mapping(
-                        source_platform="chatwork",
-                        source_user_id=chatwork_user_id,
-                        user_data={
-                            "name": display_name,
-                            "lark_user_id": lark_user_id,
-                        },
-                        ttl=86400,
-                    )
-
-                if lark_user_id:
-                    await self.redis.set_user_mapping(
-                        source_platform="lark",
-                        source_user_id=lark_user_id,
-                        user_data={
-                            "name": display_name,
-                            "chatwork_user_id": chatwork_user_id,
-                        },
-                        ttl=86400,
-                    )
-
-                loaded_count += 1
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _watch(self) -> None:
+        while True:
+            await asyncio.sleep(settings.mapping_reload_interval_seconds)
+            mtimes = self._file_mtimes()
+            if mtimes == self._mtimes:
+                continue
+            try:
+                await self.reload()
+                self._mtimes = mtimes
+            except Exception as e:
+                # Try again on the next tick
+                logger.error("mapping_reload_failed", error=str(e))
+
+    def _file_mtimes(self) -> dict[str, Optional[float]]:
+        mtimes = {}
+        for name in ("room_mappings.json", "user_mappings.json"):
+            path = self.config_dir / name
+            mtimes[name] = path.stat().st_mtime if path.exists() else None
+        return mtimes
+
+    def _read_mappings(self, filename: str, required: bool) -> Optional[list[dict]]:
+        """Active mappings of a file, or None if the file does not exist."""
+        mapping_file = self.config_dir / filename
 
+        if not mapping_file.exists():
+            if required:
+                logger.warning(
+                    "room_mappings_file_not_found",
+                    path=str(mapping_file),
+                )
+            else:
                 logger.info(
-                    "user_mapping_loaded",
-                    name=display_name,
-                    chatwork_user_id=chatwork_user_id,
-                    lark_user_id=lark_user_id,
+                    "user_mappings_file_not_found_skipping",
+                    path=str(mapping_file),
+                )
+            return None
+
+        with open(mapping_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        return [m for m in data.get("mappings", []) if m.get("is_active", True)]
+
+    @staticmethod
+    def _room_tables(mappings: list[dict]) -> dict[str, dict[str, str]]:
+        """Build the room hashes of both platforms from room mappings."""
+        tables = {}
+        for platform in PLATFORMS:
+            tables[f"rooms:{platform}"] = {}
+            tables[f"room_directions:{platform}"] = {}
+
+        for mapping in mappings:
+            chatwork_room_id = str(mapping["chatwork_room_id"])
+            lark_chat_id = mapping["lark_chat_id"]
+            sync_direction = SYNC_DIRECTIONS.get(mapping.get("sync_direction", "both"))
+
+            if sync_direction is None:
+                logger.warning(
+                    "unknown_sync_direction_using_both",
+                    name=mapping.get("name", ""),
+                    sync_direction=mapping.get("sync_direction"),
+                )
+                sync_direction = "both"
+
+            # Bidirectional mapping
+            tables["rooms:chatwork"][chatwork_room_id] = lark_chat_id
+            tables["rooms:lark"][lark_chat_id] = chatwork_room_id
+            tables["room_directions:chatwork"][chatwork_room_id] = sync_direction
+            tables["room_directions:lark"][lark_chat_id] = sync_direction
+
+        return tables
+
+    @staticmethod
+    def _user_tables(mappings: list[dict]) -> dict[str, dict[str, str]]:
+        """Build the user hashes of both platforms from user mappings."""
+        tables = {f"users:{platform}": {} for platform in PLATFORMS}
+
+        for mapping in mappings:
+            chatwork_user_id = mapping.get("chatwork_user_id")
+            lark_user_id = mapping.get("lark_user_id")
+            display_name = mapping.get("display_name", "")
+
+            if chatwork_user_id:
+                tables["users:chatwork"][str(chatwork_user_id)] = json.dumps(
+                    {
+                        "name": display_name,
+                        "lark_user_id": lark_user_id,
+                    }
                 )
 
-            logger.info(
-                "user_mappings_loaded",
-                total_count=loaded_count,
-            )
-
-            return loaded_count
+            if lark_user_id:
+                tables["users:lark"][lark_user_id] = json.dumps(
+                    {
+                        "name": display_name,
+                        "chatwork_user_id": chatwork_user_id,
+                    }
+                )
 
-        except Exception as e:
-            logger.error(
-                "failed_to_load_user_mappings",
-                error=str(e),
-            )
-            # User mappings are optional, don't raise
-            return 0
+        return tables
 
 
 # Global mapping loader instance
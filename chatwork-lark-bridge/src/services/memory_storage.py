@@ -0,0 +1,448 @@
+"""In-process storage backend for single-node sites."""
+
+import bisect
+import json
+import time
+import uuid
+from collections import Counter
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from typing import ContextManager, Iterable, Optional
+
+from ..core.config import settings
+from ..core.logging import get_logger
+from .redis_client import (
+    SEND_CLAIMED,
+    SEND_DIRECTION_DISABLED,
+    SEND_DUPLICATE,
+    SEND_NO_MAPPING,
+    SendClaim,
+    new_failed_entry,
+)
+
+logger = get_logger(__name__)
+
+# Expired values are dropped when read, and all of them every this many writes
+PURGE_EVERY_WRITES = 1000
+
+
+def _other(platform: str) -> str:
+    return "lark" if platform == "chatwork" else "chatwork"
+
+
+class MemoryStorage:
+    """
+    Storage kept in this process (see ``storage.Storage``).
+
+    Values expire like Redis keys: a message mapping lives for
+    ``message_ttl_seconds`` and a claim for ``message_claim_lease_seconds``.
+    Nothing survives a restart and nothing is shared with other processes,
+    so this suits a single web process, tests and benchmarks that should
+    leave out the network.
+
+    The public methods are written against a handful of primitives
+    (``_get``/``_set``/``_delete`` for expiring values, ``_table_*`` for
+    mapping tables, ``_dlq_*`` for the DLQ) run inside ``_transaction``;
+    ``SQLiteStorage`` swaps in persistent versions of them.
+    """
+
+    backend = "memory"
+
+    def __init__(self):
+        self._values: dict[str, tuple[str, Optional[float]]] = {}
+        self._tables: dict[str, dict[str, str]] = {}
+        self._dlq: dict[str, str] = {}
+        self._dlq_ids: list[str] = []
+        self._dlq_counters: Counter = Counter()
+        self._writes = 0
+        self._connected = False
+
+    async def connect(self) -> None:
+        """Make the storage usable."""
+        self._connected = True
+        logger.info("storage_ready", backend=self.backend)
+
+    async def disconnect(self) -> None:
+        """Stop using the storage."""
+        self._connected = False
+
+    def is_connected(self) -> bool:
+        """Check if the storage is usable."""
+        return self._connected
+
+    async def health_check(self) -> bool:
+        """Check storage health."""
+        return self.is_connected()
+
+    # Message ID Mapping
+    # claim:{platform}:{id} holds an in-progress claim, map:{platform}:{id}
+    # "target_id|epoch_seconds" and rev:{platform}:{id} the reverse entry of
+    # a message the bridge posted.
+    async def claim_message(self, platform: str, message_id: str) -> Optional[str]:
+        """Claim a message for processing (see ``RedisClient.claim_message``)."""
+        with self._transaction():
+            if self._is_taken(platform, message_id):
+                return None
+            return self._claim(platform, message_id)
+
+    async def prepare_send(
+        self, source_platform: str, source_room_id: str, message_id: str
+    ) -> SendClaim:
+        """Dedup, route and claim a message (see ``RedisClient.prepare_send``)."""
+        target_platform = _other(source_platform)
+        with self._transaction():
+            if self._is_taken(source_platform, message_id):
+                return SendClaim(SEND_DUPLICATE)
+
+            target_room_id, direction = self._route(source_platform, source_room_id)
+            if not target_room_id:
+                return SendClaim(SEND_NO_MAPPING)
+            if direction not in ("both", f"{source_platform}_to_{target_platform}"):
+                return SendClaim(SEND_DIRECTION_DISABLED, target_room_id)
+
+            claim = self._claim(source_platform, message_id)
+            return SendClaim(SEND_CLAIMED, target_room_id, claim)
+
+    async def release_message_claim(
+        self, platform: str, message_id: str, claim: str
+    ) -> None:
+        """Give up a claim so a later delivery or retry can process the message."""
+        key = f"claim:{platform}:{message_id}"
+        with self._transaction():
+            if self._get(key) == claim:
+                self._delete(key)
+
+    async def save_message_mapping(
+        self,
+        source_platform: str,
+        source_message_id: str,
+        target_platform: str,
+        target_message_id: str,
+        room_mapping_id: Optional[str] = None,
+    ) -> None:
+        """Save a message mapping and its reverse entry (completes a claim)."""
+        now = int(time.time())
+        with self._transaction():
+            self._set(
+                f"map:{source_platform}:{source_message_id}",
+                f"{target_message_id}|{now}",
+                settings.message_ttl_seconds,
+            )
+            self._set(
+                f"rev:{target_platform}:{target_message_id}",
+                f"{source_message_id}|{now}",
+                settings.message_ttl_seconds,
+            )
+            self._delete(f"claim:{source_platform}:{source_message_id}")
+
+        logger.debug(
+            "message_mapping_saved",
+            source_platform=source_platform,
+            source_message_id=source_message_id,
+            target_platform=target_platform,
+            target_message_id=target_message_id,
+            room_mapping_id=room_mapping_id,
+        )
+
+    async def get_message_mapping(
+        self, platform: str, message_id: str
+    ) -> Optional[dict]:
+        """Get message mapping by platform and message ID."""
+        value = self._get(f"map:{platform}:{message_id}")
+        if not value:
+            return None
+        target_message_id, _, saved_at = value.rpartition("|")
+        return {
+            "source_platform": platform,
+            "source_message_id": message_id,
+            "target_platform": _other(platform),
+            "target_message_id": target_message_id,
+            "timestamp": datetime.fromtimestamp(
+                int(saved_at), timezone.utc
+            ).isoformat(),
+        }
+
+    async def get_counterpart(self, platform: str, message_id: str) -> Optional[dict]:
+        """Find the synced message on the other platform, from either side."""
+        for prefix, role in (("map", "target"), ("rev", "source")):
+            value = self._get(f"{prefix}:{platform}:{message_id}")
+            if value:
+                return {
+                    "platform": _other(platform),
+                    "message_id": value.rpartition("|")[0],
+                    "role": role,
+                }
+        return None
+
+    async def is_message_processed(self, platform: str, message_id: str) -> bool:
+        """Check if message has already been processed (or is in progress)."""
+        return self._is_taken(platform, message_id)
+
+    def _is_taken(self, platform: str, message_id: str) -> bool:
+        return bool(
+            self._get(f"claim:{platform}:{message_id}")
+            or self._get(f"map:{platform}:{message_id}")
+        )
+
+    def _claim(self, platform: str, message_id: str) -> str:
+        claim = uuid.uuid4().hex
+        self._set(
+            f"claim:{platform}:{message_id}",
+            claim,
+            settings.message_claim_lease_seconds,
+        )
+        return claim
+
+    # Room and User Mapping (tables loaded by MappingLoader, with single
+    # cached entries as a fallback)
+    def _route(self, platform: str, room_id: str) -> tuple[Optional[str], str]:
+        target = self._table_get(f"rooms:{platform}", room_id) or self._get(
+            f"room:{platform}:{room_id}"
+        )
+        direction = (
+            self._table_get(f"room_directions:{platform}", room_id)
+            or self._get(f"room_direction:{platform}:{room_id}")
+            or "both"
+        )
+        return target, direction
+
+    async def get_room_mapping(
+        self, source_platform: str, source_room_id: str
+    ) -> Optional[str]:
+        """Get target room ID."""
+        return self._route(source_platform, source_room_id)[0]
+
+    async def set_room_mapping(
+        self,
+        source_platform: str,
+        source_room_id: str,
+        target_room_id: str,
+        ttl: int = 3600,
+        sync_direction: Optional[str] = None,
+    ) -> None:
+        """Cache a room mapping (see ``RedisClient.set_room_mapping``)."""
+        direction_key = f"room_direction:{source_platform}:{source_room_id}"
+        with self._transaction():
+            self._set(f"room:{source_platform}:{source_room_id}", target_room_id, ttl)
+            if sync_direction:
+                self._set(direction_key, sync_direction, ttl)
+            else:
+                self._delete(direction_key)
+
+    async def get_user_mapping(
+        self, source_platform: str, source_user_id: str
+    ) -> Optional[dict]:
+        """Get user mapping."""
+        value = self._table_get(
+            f"users:{source_platform}", source_user_id
+        ) or self._get(f"user:{source_platform}:{source_user_id}")
+        return json.loads(value) if value else None
+
+    async def set_user_mapping(
+        self,
+        source_platform: str,
+        source_user_id: str,
+        user_data: dict,
+        ttl: int = 3600,
+    ) -> None:
+        """Cache a user mapping."""
+        with self._transaction():
+            self._set(
+                f"user:{source_platform}:{source_user_id}", json.dumps(user_data), ttl
+            )
+
+    async def replace_tables(self, tables: dict[str, dict[str, str]]) -> None:
+        """Replace whole mapping tables at once."""
+        with self._transaction():
+            for name, fields in tables.items():
+                self._table_write(name, fields, (), replace=True)
+
+    async def sync_tables(self, tables: dict[str, dict[str, str]]) -> tuple[int, int]:
+        """Write only the fields that differ; return (updated, removed)."""
+        updated = removed = 0
+        with self._transaction():
+            for name, new in tables.items():
+                old = self._table_all(name)
+                changes = {
+                    field: value
+                    for field, value in new.items()
+                    if old.get(field) != value
+                }
+                stale = [field for field in old if field not in new]
+                if changes or stale:
+                    self._table_write(name, changes, stale)
+                updated += len(changes)
+                removed += len(stale)
+        return updated, removed
+
+    # Failed Messages Queue (Dead Letter Queue), ordered by time-ordered
+    # entry IDs like RedisClient's
+    async def add_to_failed_queue(
+        self,
+        source_platform: str,
+        target_platform: str,
+        message_data: dict,
+        error: str,
+        retry_count: int = 0,
+        error_type: Optional[str] = None,
+    ) -> str:
+        """
+        Add failed message to DLQ.
+
+        Returns:
+            DLQ entry ID
+        """
+        entry_id, value = new_failed_entry(
+            source_platform,
+            target_platform,
+            message_data,
+            error,
+            retry_count,
+            error_type,
+        )
+        await self.restore_failed_messages([(entry_id, value)])
+
+        logger.warning(
+            "message_added_to_dlq",
+            source_platform=source_platform,
+            target_platform=target_platform,
+            error=error,
+            retry_count=retry_count,
+            entry_id=entry_id,
+        )
+        return entry_id
+
+    async def restore_failed_messages(self, entries: list[tuple[str, dict]]) -> int:
+        """Add entries built elsewhere to the DLQ, skipping ones already there."""
+        cutoff_ms = int((time.time() - settings.message_ttl_seconds * 7) * 1000)
+        added = 0
+        with self._transaction():
+            for entry_id, value in entries:
+                if not self._dlq_has(entry_id):
+                    self._dlq_insert(entry_id, value)
+                    added += 1
+            # Drop entries past the retention (7 days)
+            expired = [
+                i for i, _ in self._dlq_page(None, 100) if i < f"{cutoff_ms:013d}"
+            ]
+            self._dlq_delete(expired)
+        return added
+
+    async def get_failed_messages(
+        self, limit: int = 100, after: Optional[str] = None
+    ) -> list[tuple[str, dict]]:
+        """Get failed messages from DLQ, oldest first, after an entry ID."""
+        return [
+            (entry_id, json.loads(value))
+            for entry_id, value in self._dlq_page(after, limit)
+        ]
+
+    async def count_failed_messages(self) -> dict:
+        """Total DLQ size and counts by source platform and error class."""
+        total, counts = self._dlq_counts()
+        by_platform: dict[str, int] = {}
+        by_error: dict[str, int] = {}
+        for field, count in counts.items():
+            group, _, name = field.partition(":")
+            if count > 0:
+                (by_platform if group == "platform" else by_error)[name] = count
+        return {"total": total, "by_platform": by_platform, "by_error": by_error}
+
+    async def remove_failed_messages(self, entries: list[tuple[str, dict]]) -> int:
+        """Remove entries from the DLQ; returns how many were still there."""
+        with self._transaction():
+            return self._dlq_delete([entry_id for entry_id, _ in entries])
+
+    @staticmethod
+    def _dlq_count_fields(value: dict) -> tuple[str, str]:
+        return (
+            f"platform:{value.get('source_platform', 'unknown')}",
+            f"error:{value.get('error_type', 'unknown')}",
+        )
+
+    # Records
+    async def get_record(self, key: str) -> dict[str, str]:
+        """Fields of a record, or an empty dict if it is unknown or expired."""
+        value = self._get(f"record:{key}")
+        return json.loads(value) if value else {}
+
+    async def put_record(self, key: str, fields: dict[str, str], ttl: int) -> None:
+        """Store a record for ``ttl`` seconds."""
+        with self._transaction():
+            self._set(f"record:{key}", json.dumps(fields), ttl)
+
+    # Primitives
+    def _transaction(self) -> ContextManager:
+        # Nothing awaits between reads and writes, so every method already
+        # runs without interleaving
+        return nullcontext()
+
+    def _get(self, key: str) -> Optional[str]:
+        item = self._values.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at is not None and expires_at <= time.time():
+            del self._values[key]
+            return None
+        return value
+
+    def _set(self, key: str, value: str, ttl: Optional[float]) -> None:
+        self._values[key] = (value, time.time() + ttl if ttl else None)
+        self._writes += 1
+        if self._writes % PURGE_EVERY_WRITES == 0:
+            now = time.time()
+            for stale in [
+                k for k, (_, exp) in self._values.items() if exp and exp <= now
+            ]:
+                del self._values[stale]
+
+    def _delete(self, key: str) -> None:
+        self._values.pop(key, None)
+
+    def _table_get(self, name: str, field: str) -> Optional[str]:
+        return self._tables.get(name, {}).get(field)
+
+    def _table_all(self, name: str) -> dict[str, str]:
+        return dict(self._tables.get(name, {}))
+
+    def _table_write(
+        self,
+        name: str,
+        changes: dict[str, str],
+        stale: Iterable[str],
+        replace: bool = False,
+    ) -> None:
+        if replace:
+            self._tables[name] = dict(changes)
+            return
+        table = self._tables.setdefault(name, {})
+        table.update(changes)
+        for field in stale:
+            table.pop(field, None)
+
+    def _dlq_has(self, entry_id: str) -> bool:
+        return entry_id in self._dlq
+
+    def _dlq_insert(self, entry_id: str, value: dict) -> None:
+        self._dlq[entry_id] = json.dumps(value)
+        bisect.insort(self._dlq_ids, entry_id)
+        self._dlq_counters.update(self._dlq_count_fields(value))
+
+    def _dlq_page(self, after: Optional[str], limit: int) -> list[tuple[str, str]]:
+        start = bisect.bisect_right(self._dlq_ids, after) if after else 0
+        return [(i, self._dlq[i]) for i in self._dlq_ids[start : start + limit]]
+
+    def _dlq_delete(self, entry_ids: list[str]) -> int:
+        removed = 0
+        for entry_id in entry_ids:
+            value = self._dlq.pop(entry_id, None)
+            if value is None:
+                continue
+            del self._dlq_ids[bisect.bisect_left(self._dlq_ids, entry_id)]
+            self._dlq_counters.subtract(self._dlq_count_fields(json.loads(value)))
+            removed += 1
+        return removed
+
+    def _dlq_counts(self) -> tuple[int, dict[str, int]]:
+        return len(self._dlq_ids), dict(self._dlq_counters)
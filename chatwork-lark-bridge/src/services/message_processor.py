@@ -9,8 +9,24 @@ from ..core.exceptions import (
     LoopDetectedError,
     MessageTooLongError,
     MappingNotFoundError,
+    DeadLetteredError,
+    CircuitOpenError,
+    RetryableError,
+    RetryScheduledError,
+    RetryInPlaceError,
 )
-from ..services.redis_client import redis_client
+from ..services.circuit_breaker import breaker_named
+from ..services.redis_client import (
+    REDIS_OUTAGE_ERRORS,
+    SEND_CLAIMED,
+    SEND_DIRECTION_DISABLED,
+    SEND_DUPLICATE,
+    SEND_NO_MAPPING,
+    SendClaim,
+)
+from ..services.route_table import route_table
+from ..services.storage import storage
+from ..services.retry_queue import retry_queue
 from ..services.lark_client import lark_client
 from ..services.chatwork_client import chatwork_client
 
@@ -22,7 +38,9 @@ class MessageProcessor:
 
     def __init__(self):
         """Initialize message processor."""
-        self.redis = redis_client
+        self.storage = storage
+        self.routes = route_table
+        self.retries = retry_queue
         self.lark = lark_client
         self.chatwork = chatwork_client
 
@@ -32,6 +50,8 @@ class MessageProcessor:
         message_id: str,
         sender_name: str,
         message_body: str,
+        attempt: int = 0,
+        in_order: bool = False,
     ) -> Optional[str]:
         """
         Process a message from Chatwork and sync to Lark.
@@ -41,6 +61,9 @@ class MessageProcessor:
             message_id: Chatwork message ID
             sender_name: Sender's name
             message_body: Message text
+            attempt: Number of this attempt (0 = first, set by retries)
+            in_order: Caller delivers the room in order and retries failed
+                sends itself (see _handle_send_failure)
 
         Returns:
             Lark message ID if sent, None if skipped
@@ -48,6 +71,9 @@ class MessageProcessor:
         Raises:
             LoopDetectedError: If message originated from bridge
             MappingNotFoundError: If room mapping not found
+            RetryScheduledError: If sending failed and will be retried later
+            RetryInPlaceError: If sending failed and ``in_order`` is set
+            DeadLetteredError: If sending failed (message saved to DLQ)
         """
         logger.info(
             "processing_chatwork_message",
@@ -56,16 +82,7 @@ class MessageProcessor:
             sender=sender_name,
         )
 
-        # 1. Check if already processed
-        if await self.redis.is_message_processed("chatwork", message_id):
-            logger.debug(
-                "message_already_processed",
-                platform="chatwork",
-                message_id=message_id,
-            )
-            return None
-
-        # 2. Loop detection - check message prefix
+        # 1. Loop detection - check message prefix
         if self._is_from_bridge(message_body, "lark"):
             logger.info(
                 "loop_detected_skipping",
@@ -75,10 +92,20 @@ class MessageProcessor:
             )
             raise LoopDetectedError("Message originated from Lark bridge")
 
-        # 3. Get room mapping
-        lark_chat_id = await self.redis.get_room_mapping("chatwork", room_id)
+        # 2. Look up the room and claim the message in one round trip;
+        #    duplicates stop here, before any sending
+        prepared = await self._prepare_send("chatwork", room_id, message_id)
 
-        if not lark_chat_id:
+        if prepared.status == SEND_DUPLICATE:
+            logger.debug(
+                "message_already_processed",
+                platform="chatwork",
+                message_id=message_id,
+            )
+            return None
+
+        # 3. Check room mapping and sync direction
+        if prepared.status == SEND_NO_MAPPING:
             logger.warning(
                 "room_mapping_not_found",
                 platform="chatwork",
@@ -86,6 +113,18 @@ class MessageProcessor:
             )
             raise MappingNotFoundError("room", room_id)
 
+        if prepared.status == SEND_DIRECTION_DISABLED:
+            logger.info(
+                "sync_direction_disabled_skipping",
+                platform="chatwork",
+                room_id=room_id,
+                message_id=message_id,
+            )
+            return None
+
+        lark_chat_id = prepared.target_room_id
+        claim = prepared.claim
+
         # 4. Format message for Lark
         formatted_message = self.lark.format_message_from_chatwork(
             sender_name,
@@ -109,29 +148,10 @@ class MessageProcessor:
                 lark_chat_id,
                 formatted_message,
             )
-
-            # 7. Save mapping for loop detection
-            await self.redis.save_message_mapping(
-                source_platform="chatwork",
-                source_message_id=message_id,
-                target_platform="lark",
-                target_message_id=lark_message_id,
-                room_mapping_id=f"cw_{room_id}_lark_{lark_chat_id}",
-            )
-
-            logger.info(
-                "message_synced_successfully",
-                source="chatwork",
-                target="lark",
-                chatwork_message_id=message_id,
-                lark_message_id=lark_message_id,
-            )
-
-            return lark_message_id
-
         except Exception as e:
-            # Save to DLQ
-            await self.redis.add_to_failed_queue(
+            # Release first, so the retry or DLQ replay can claim it again
+            await self.storage.release_message_claim("chatwork", message_id, claim)
+            await self._handle_send_failure(
                 source_platform="chatwork",
                 target_platform="lark",
                 message_data={
@@ -140,9 +160,29 @@ class MessageProcessor:
                     "sender_name": sender_name,
                     "message_body": message_body,
                 },
-                error=str(e),
+                error=e,
+                attempt=attempt,
+                in_order=in_order,
             )
-            raise
+
+        # 7. Save mapping for loop detection (completes the claim)
+        await self.storage.save_message_mapping(
+            source_platform="chatwork",
+            source_message_id=message_id,
+            target_platform="lark",
+            target_message_id=lark_message_id,
+            room_mapping_id=self.room_mapping_id("chatwork", room_id, lark_chat_id),
+        )
+
+        logger.info(
+            "message_synced_successfully",
+            source="chatwork",
+            target="lark",
+            chatwork_message_id=message_id,
+            lark_message_id=lark_message_id,
+        )
+
+        return lark_message_id
 
     async def process_lark_message(
         self,
@@ -150,6 +190,8 @@ class MessageProcessor:
         message_id: str,
         sender_name: str,
         message_text: str,
+        attempt: int = 0,
+        in_order: bool = False,
     ) -> Optional[str]:
         """
         Process a message from Lark and sync to Chatwork.
@@ -159,6 +201,9 @@ class MessageProcessor:
             message_id: Lark message ID
             sender_name: Sender's name
             message_text: Message text
+            attempt: Number of this attempt (0 = first, set by retries)
+            in_order: Caller delivers the room in order and retries failed
+                sends itself (see _handle_send_failure)
 
         Returns:
             Chatwork message ID if sent, None if skipped
@@ -170,16 +215,7 @@ class MessageProcessor:
             sender=sender_name,
         )
 
-        # 1. Check if already processed
-        if await self.redis.is_message_processed("lark", message_id):
-            logger.debug(
-                "message_already_processed",
-                platform="lark",
-                message_id=message_id,
-            )
-            return None
-
-        # 2. Loop detection
+        # 1. Loop detection
         if self._is_from_bridge(message_text, "chatwork"):
             logger.info(
                 "loop_detected_skipping",
@@ -189,10 +225,19 @@ class MessageProcessor:
             )
             raise LoopDetectedError("Message originated from Chatwork bridge")
 
-        # 3. Get room mapping
-        chatwork_room_id = await self.redis.get_room_mapping("lark", chat_id)
+        # 2. Look up the room and claim the message in one round trip
+        prepared = await self._prepare_send("lark", chat_id, message_id)
+
+        if prepared.status == SEND_DUPLICATE:
+            logger.debug(
+                "message_already_processed",
+                platform="lark",
+                message_id=message_id,
+            )
+            return None
 
-        if not chatwork_room_id:
+        # 3. Check room mapping and sync direction
+        if prepared.status == SEND_NO_MAPPING:
             logger.warning(
                 "room_mapping_not_found",
                 platform="lark",
@@ -200,6 +245,18 @@ class MessageProcessor:
             )
             raise MappingNotFoundError("room", chat_id)
 
+        if prepared.status == SEND_DIRECTION_DISABLED:
+            logger.info(
+                "sync_direction_disabled_skipping",
+                platform="lark",
+                chat_id=chat_id,
+                message_id=message_id,
+            )
+            return None
+
+        chatwork_room_id = prepared.target_room_id
+        claim = prepared.claim
+
         # 4. Format message for Chatwork
         formatted_message = self.chatwork.format_message_from_lark(
             sender_name,
@@ -222,29 +279,9 @@ class MessageProcessor:
                 chatwork_room_id,
                 formatted_message,
             )
-
-            # 7. Save mapping
-            await self.redis.save_message_mapping(
-                source_platform="lark",
-                source_message_id=message_id,
-                target_platform="chatwork",
-                target_message_id=chatwork_message_id,
-                room_mapping_id=f"lark_{chat_id}_cw_{chatwork_room_id}",
-            )
-
-            logger.info(
-                "message_synced_successfully",
-                source="lark",
-                target="chatwork",
-                lark_message_id=message_id,
-                chatwork_message_id=chatwork_message_id,
-            )
-
-            return chatwork_message_id
-
         except Exception as e:
-            # Save to DLQ
-            await self.redis.add_to_failed_queue(
+            await self.storage.release_message_claim("lark", message_id, claim)
+            await self._handle_send_failure(
                 source_platform="lark",
                 target_platform="chatwork",
                 message_data={
@@ -253,9 +290,227 @@ class MessageProcessor:
                     "sender_name": sender_name,
                     "message_text": message_text,
                 },
+                error=e,
+                attempt=attempt,
+                in_order=in_order,
+            )
+
+        # 7. Save mapping (completes the claim)
+        await self.storage.save_message_mapping(
+            source_platform="lark",
+            source_message_id=message_id,
+            target_platform="chatwork",
+            target_message_id=chatwork_message_id,
+            room_mapping_id=self.room_mapping_id("lark", chat_id, chatwork_room_id),
+        )
+
+        logger.info(
+            "message_synced_successfully",
+            source="lark",
+            target="chatwork",
+            lark_message_id=message_id,
+            chatwork_message_id=chatwork_message_id,
+        )
+
+        return chatwork_message_id
+
+    async def retry_message(
+        self,
+        source_platform: str,
+        message_data: dict,
+        attempt: int,
+    ) -> Optional[str]:
+        """
+        Run a scheduled retry of a message through the pipeline again.
+
+        Args:
+            source_platform: Platform the message came from
+            message_data: Keyword arguments saved when the retry was scheduled
+            attempt: Number of this attempt
+
+        Returns:
+            Target message ID if sent, None if skipped
+        """
+        if source_platform == "chatwork":
+            return await self.process_chatwork_message(**message_data, attempt=attempt)
+        return await self.process_lark_message(**message_data, attempt=attempt)
+
+    async def _prepare_send(
+        self,
+        source_platform: str,
+        source_room_id: str,
+        message_id: str,
+    ) -> SendClaim:
+        """
+        Route and claim a message.
+
+        Rooms found in the in-process route table are routed locally, so
+        the claim is the only storage call. Anything else (table not loaded
+        yet, a mapping added moments ago, a local storage backend) is
+        routed through the storage.
+        """
+        route = self.routes.lookup(source_platform, source_room_id)
+        if route is None:
+            return await self.storage.prepare_send(
+                source_platform, source_room_id, message_id
+            )
+
+        target_platform = "lark" if source_platform == "chatwork" else "chatwork"
+        if route.sync_direction not in (
+            "both",
+            f"{source_platform}_to_{target_platform}",
+        ):
+            return SendClaim(SEND_DIRECTION_DISABLED, route.target_room_id)
+
+        claim = await self.storage.claim_message(source_platform, message_id)
+        if claim is None:
+            return SendClaim(SEND_DUPLICATE)
+        return SendClaim(SEND_CLAIMED, route.target_room_id, claim)
+
+    async def _handle_send_failure(
+        self,
+        source_platform: str,
+        target_platform: str,
+        message_data: dict,
+        error: Exception,
+        attempt: int,
+        in_order: bool = False,
+    ) -> None:
+        """
+        Schedule a failed send for another attempt, or save it to the DLQ.
+
+        Messages for a platform whose circuit breaker is open are parked
+        until it closes, without using up an attempt. Retryable errors are
+        scheduled in the delay queue while attempts remain
+        (``retry_mode=deferred``); everything else, and anything that could
+        not be scheduled because Redis is down, goes to the DLQ.
+
+        With ``in_order`` (events of the ordered delivery queue) retryable
+        errors and open circuits are handed back to the caller instead of
+        being scheduled or parked, so it can retry the event before any
+        later one of the same room; an open circuit pauses the room until
+        it may close, again without using up an attempt.
+
+        Raises:
+            RetryScheduledError: If the send will be retried later
+            RetryInPlaceError: If the caller should retry the send itself
+            DeadLetteredError: If the message was saved to the DLQ
+        """
+        message_id = message_data["message_id"]
+
+        try:
+            if isinstance(error, CircuitOpenError):
+                if in_order:
+                    # Wait at least a second while another caller probes
+                    raise RetryInPlaceError(
+                        source_platform,
+                        message_id,
+                        error,
+                        max(error.retry_in, 1),
+                        attempt,
+                    ) from error
+                await breaker_named(error.circuit).defer(
+                    source_platform,
+                    message_data,
+                    attempt,
+                    str(error),
+                )
+                raise RetryScheduledError(
+                    source_platform, message_id, error, error.retry_in
+                ) from error
+
+            if (
+                settings.retry_mode == "deferred"
+                and isinstance(error, RetryableError)
+                and attempt + 1 < settings.max_retry_attempts
+            ):
+                delay = self.retries.backoff(error, attempt)
+                if in_order:
+                    raise RetryInPlaceError(
+                        source_platform, message_id, error, delay, attempt + 1
+                    ) from error
+                await self.retries.schedule(
+                    source_platform,
+                    message_data,
+                    attempt + 1,
+                    delay,
+                    str(error),
+                )
+                raise RetryScheduledError(
+                    source_platform, message_id, error, delay
+                ) from error
+        except REDIS_OUTAGE_ERRORS as e:
+            # The retry queue is on Redis; the DLQ survives the outage
+            # (buffered by the storage in degraded mode)
+            logger.warning(
+                "retry_schedule_failed",
+                source_platform=source_platform,
+                message_id=message_id,
                 error=str(e),
             )
-            raise
+
+        # Save to DLQ
+        await self.storage.add_to_failed_queue(
+            source_platform=source_platform,
+            target_platform=target_platform,
+            message_data=message_data,
+            error=str(error),
+            error_type=type(error).__name__,
+        )
+        raise DeadLetteredError(source_platform, message_id, error) from error
+
+    @staticmethod
+    def room_mapping_id(
+        source_platform: str,
+        source_room_id: str,
+        target_room_id: Optional[str],
+    ) -> str:
+        """
+        Build the routing key of a room pair as seen from the source side.
+
+        Args:
+            source_platform: Platform the message came from
+            source_room_id: Room/chat ID on the source platform
+            target_room_id: Mapped room/chat ID on the other platform
+
+        Returns:
+            Routing key such as "cw_{room_id}_lark_{chat_id}"
+        """
+        if source_platform == "chatwork":
+            return f"cw_{source_room_id}_lark_{target_room_id}"
+        return f"lark_{source_room_id}_cw_{target_room_id}"
+
+    async def partition_key(self, source_platform: str, source_room_id: str) -> str:
+        """
+        Direction-independent routing key used to order delivery.
+
+        Both directions of a room pair share the Chatwork-to-Lark routing
+        key, so messages of one conversation stay in one delivery partition.
+        Unmapped rooms fall back to a key of their own.
+
+        Args:
+            source_platform: Platform the message came from
+            source_room_id: Room/chat ID on the source platform
+
+        Returns:
+            Partition routing key
+        """
+        route = self.routes.lookup(source_platform, source_room_id)
+        if route is not None:
+            target_room_id = route.target_room_id
+        else:
+            target_room_id = await self.storage.get_room_mapping(
+                source_platform, source_room_id
+            )
+
+        if source_platform == "chatwork":
+            if not target_room_id:
+                return f"cw_{source_room_id}"
+            return self.room_mapping_id("chatwork", source_room_id, target_room_id)
+
+        if not target_room_id:
+            return f"lark_{source_room_id}"
+        return self.room_mapping_id("chatwork", target_room_id, source_room_id)
 
     def _is_from_bridge(self, message_text: str, source_platform: str) -> bool:
         """
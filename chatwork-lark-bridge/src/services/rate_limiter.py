@@ -0,0 +1,264 @@
+"""Distributed token-bucket rate limiting for outbound API calls."""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from ..core.config import settings
+from ..core.logging import get_logger
+from .redis_client import RedisClient, redis_client
+
+logger = get_logger(__name__)
+
+# Reserve one token from every bucket in KEYS and return how many
+# milliseconds the caller must wait before using it.
+#
+# Buckets may go negative: a caller that finds the bucket empty still takes
+# its token and is told exactly when that token refills, so concurrent
+# callers queue up one refill interval apart instead of polling.
+# ARGV holds (capacity, window_ms) for each key; Redis TIME is the clock so
+# all replicas agree on refill.
+TOKEN_BUCKET_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) * 1000 + math.floor(tonumber(now_parts[2]) / 1000)
+local wait = 0
+
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 2 - 1])
+    local window = tonumber(ARGV[i * 2])
+    local rate = capacity / window
+
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate) - 1
+
+    if tokens < 0 then
+        wait = math.max(wait, math.ceil(-tokens / rate))
+    end
+
+    redis.call('HSET', key, 'tokens', tostring(tokens), 'ts', now)
+    redis.call('PEXPIRE', key, math.ceil(window - tokens / rate) + 1000)
+end
+
+return wait
+"""
+
+# Extend a platform pause only if the new deadline is later. The hash keeps
+# the deadline and the pause length, which is also how long senders are
+# paced after the pause ends.
+PAUSE_SCRIPT = """
+local current = tonumber(redis.call('HGET', KEYS[1], 'until') or '0')
+if tonumber(ARGV[1]) > current then
+    redis.call('HSET', KEYS[1], 'until', ARGV[1], 'seconds', ARGV[2])
+    redis.call('PEXPIRE', KEYS[1], math.ceil(tonumber(ARGV[2]) * 2000))
+    return 1
+end
+return 0
+"""
+
+# How often a sender re-reads the shared pause from Redis
+PAUSE_POLL_SECONDS = 1.0
+
+
+@dataclass(frozen=True)
+class Bucket:
+    """A token bucket allowing ``capacity`` calls per ``window_seconds``."""
+
+    name: str
+    capacity: int
+    window_seconds: float
+
+    @property
+    def key(self) -> str:
+        """
+        Redis key holding the bucket state.
+
+        The name up to its first colon (the platform) is the hash tag, so
+        buckets acquired together stay on one cluster slot.
+        """
+        scope, _, rest = self.name.partition(":")
+        return f"ratelimit:{{{scope}}}:{rest}"
+
+
+class RateLimiter:
+    """
+    Token-bucket rate limiter shared by every replica through Redis.
+
+    ``acquire`` takes one token from each bucket in a single Lua call and
+    sleeps until the token is actually available, so callers stay under the
+    limit instead of finding out from a 429. If Redis is unavailable the
+    buckets are kept in-process, which limits each replica on its own.
+    """
+
+    def __init__(self, redis: Optional[RedisClient] = None):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            redis: Redis client (defaults to the global instance)
+        """
+        self.redis = redis or redis_client
+        self._local: dict[str, tuple[float, float]] = {}
+
+    async def acquire(self, *buckets: Bucket) -> float:
+        """
+        Take one token from every bucket, waiting until they refill.
+
+        Args:
+            buckets: Buckets the call counts against
+
+        Returns:
+            Seconds spent waiting
+        """
+        wait = await self.reserve(*buckets)
+        if wait > 0:
+            logger.debug(
+                "rate_limit_wait",
+                buckets=[bucket.name for bucket in buckets],
+                wait_seconds=wait,
+            )
+            await asyncio.sleep(wait)
+        return wait
+
+    async def reserve(self, *buckets: Bucket) -> float:
+        """
+        Reserve one token from every bucket without waiting.
+
+        Returns:
+            Seconds until the reserved tokens may be used
+        """
+        args: list = []
+        for bucket in buckets:
+            args.extend([bucket.capacity, int(bucket.window_seconds * 1000)])
+        if not self.redis.is_connected():
+            # Local storage backend: limits apply to this process only
+            return self._reserve_local(buckets)
+
+        try:
+            wait_ms = await self.redis.run_script(
+                TOKEN_BUCKET_SCRIPT,
+                [bucket.key for bucket in buckets],
+                args,
+            )
+            return int(wait_ms) / 1000
+        except Exception as e:
+            logger.warning("rate_limit_redis_unavailable", error=str(e))
+            return self._reserve_local(buckets)
+
+    def _reserve_local(self, buckets: tuple[Bucket, ...]) -> float:
+        """Same reservation as TOKEN_BUCKET_SCRIPT, in-process."""
+        now = time.monotonic()
+        wait = 0.0
+        for bucket in buckets:
+            rate = bucket.capacity / bucket.window_seconds
+            tokens, ts = self._local.get(bucket.key, (bucket.capacity, now))
+            tokens = min(bucket.capacity, tokens + (now - ts) * rate) - 1
+            if tokens < 0:
+                wait = max(wait, -tokens / rate)
+            self._local[bucket.key] = (tokens, now)
+        return wait
+
+
+class RateLimitGate:
+    """
+    Per-platform "paused until" gate shared by every replica through Redis.
+
+    When any call to a platform is rate limited, ``pause`` closes the gate
+    for the platform's ``retry_after``. Senders call ``wait`` before each
+    request, so they all hold off together instead of retrying on their own
+    schedule. For as long again after the pause ends, senders are let
+    through at ``rate_limit_resume_per_second`` rather than all at once.
+    """
+
+    def __init__(self, limiter: RateLimiter, redis: Optional[RedisClient] = None):
+        """
+        Initialize the gate.
+
+        Args:
+            limiter: Rate limiter pacing senders after a pause
+            redis: Redis client (defaults to the global instance)
+        """
+        self.limiter = limiter
+        self.redis = redis or redis_client
+        # platform -> (paused until, pause length), wall clock seconds
+        self._pauses: dict[str, tuple[float, float]] = {}
+        self._checked_at: dict[str, float] = {}
+
+    @staticmethod
+    def key(platform: str) -> str:
+        """Redis key holding the platform's pause."""
+        return f"ratelimit:paused:{platform}"
+
+    async def pause(self, platform: str, seconds: float) -> None:
+        """
+        Close the gate for ``seconds``, unless it is already closed longer.
+
+        Args:
+            platform: Platform that returned a rate limit error
+            seconds: How long the platform asked us to back off
+        """
+        until = time.time() + seconds
+        if until > self._pauses.get(platform, (0, 0))[0]:
+            self._pauses[platform] = (until, seconds)
+            logger.warning(
+                "platform_rate_limit_paused", platform=platform, seconds=seconds
+            )
+
+        try:
+            await self.redis.run_script(
+                PAUSE_SCRIPT, [self.key(platform)], [until, seconds]
+            )
+        except Exception as e:
+            logger.warning(
+                "rate_limit_pause_share_failed", platform=platform, error=str(e)
+            )
+
+    async def wait(self, platform: str) -> float:
+        """
+        Wait while the platform is paused, then for a paced resume slot.
+
+        Returns:
+            Seconds spent waiting
+        """
+        started = time.monotonic()
+        while True:
+            until, seconds = await self._pause_for(platform)
+            remaining = until - time.time()
+            if remaining <= 0:
+                break
+            await asyncio.sleep(min(remaining, PAUSE_POLL_SECONDS))
+
+        if time.time() < until + seconds:
+            # One token per slot, so resumed senders are evenly spaced
+            await self.limiter.acquire(
+                Bucket(
+                    f"{platform}:resume", 1, 1 / settings.rate_limit_resume_per_second
+                )
+            )
+        return time.monotonic() - started
+
+    async def _pause_for(self, platform: str) -> tuple[float, float]:
+        """Latest pause, refreshed from Redis at most every poll interval."""
+        now = time.monotonic()
+        if now - self._checked_at.get(platform, float("-inf")) >= PAUSE_POLL_SECONDS:
+            self._checked_at[platform] = now
+            try:
+                shared = await self.redis.client.hgetall(self.key(platform))
+            except Exception:
+                shared = None
+            if (
+                shared
+                and float(shared["until"]) > self._pauses.get(platform, (0, 0))[0]
+            ):
+                self._pauses[platform] = (
+                    float(shared["until"]),
+                    float(shared["seconds"]),
+                )
+        return self._pauses.get(platform, (0, 0))
+
+
+# Global rate limiter instances
+rate_limiter = RateLimiter()
+rate_limit_gate = RateLimitGate(rate_limiter)
@@ -1,54 +1,397 @@
 """Redis client for data storage and caching."""
 
 import json
+import time
+import uuid
+import zlib
+from dataclasses import dataclass
 from typing import Any, Optional
 from datetime import datetime, timezone
 
 import redis.asyncio as aioredis
+from redis import exceptions as redis_exceptions
+from redis._parsers import _AsyncRESP3Parser
 from redis.asyncio import ConnectionPool
+from redis.asyncio.client import PubSub
+from redis.asyncio.cluster import RedisCluster
+from redis.asyncio.sentinel import Sentinel, SentinelConnectionPool
 
 from ..core.config import settings
 from ..core.exceptions import RedisConnectionError
 from ..core.logging import get_logger
+from .client_cache import ClientCache
+from .redis_pool import (
+    InstrumentedConnectionPool,
+    InstrumentedPoolMixin,
+    InstrumentedSentinelPool,
+    PoolTuner,
+)
+from .seen_filter import SeenFilter
 
 logger = get_logger(__name__)
 
+# Delete a message claim only if it is still ours and still in progress
+RELEASE_CLAIM_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# Claim a message unless it is in progress (KEYS[1]) or already mapped in
+# the current or previous mapping bucket (KEYS[2], KEYS[3]) or, outside
+# cluster mode, under its pre-bucket key (KEYS[4])
+CLAIM_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1
+    or redis.call('HEXISTS', KEYS[2], ARGV[3]) == 1
+    or redis.call('HEXISTS', KEYS[3], ARGV[3]) == 1
+    or (KEYS[4] and redis.call('EXISTS', KEYS[4]) == 1) then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+return 1
+"""
+
+# Everything the processor needs before sending, in one round trip:
+# dedup, room lookup, sync direction and the claim itself. The room tables
+# and the message are on different cluster slots, so this is not used in
+# cluster mode.
+PREPARE_SEND_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1
+    or redis.call('HEXISTS', KEYS[6], ARGV[5]) == 1
+    or redis.call('HEXISTS', KEYS[7], ARGV[5]) == 1
+    or redis.call('EXISTS', KEYS[8]) == 1 then
+    return {'duplicate', false}
+end
+local target = redis.call('HGET', KEYS[2], ARGV[4]) or redis.call('GET', KEYS[3])
+if not target then
+    return {'no_mapping', false}
+end
+local direction = redis.call('HGET', KEYS[4], ARGV[4]) or redis.call('GET', KEYS[5]) or 'both'
+if direction ~= 'both' and direction ~= ARGV[3] then
+    return {'direction_disabled', target}
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+return {'claimed', target}
+"""
+
+# Write a mapping into its bucket (KEYS[1]) and complete the message's
+# claim (KEYS[2], if given)
+SAVE_MAPPING_SCRIPT = """
+redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+if KEYS[2] then
+    redis.call('DEL', KEYS[2])
+end
+"""
+
+# Add a DLQ entry (ARGV[1], ARGV[2]) and count it under ARGV[3] and ARGV[4]
+ADD_FAILED_SCRIPT = """
+redis.call('HSET', KEYS[2], ARGV[1], ARGV[2])
+redis.call('ZADD', KEYS[1], 0, ARGV[1])
+redis.call('HINCRBY', KEYS[3], ARGV[3], 1)
+redis.call('HINCRBY', KEYS[3], ARGV[4], 1)
+"""
+
+# Add DLQ entries given as (id, json, platform field, error field) that are
+# not there yet, so restoring the same entries twice counts them once
+RESTORE_FAILED_SCRIPT = """
+local added = 0
+for i = 1, #ARGV, 4 do
+    if redis.call('ZADD', KEYS[1], 'NX', 0, ARGV[i]) == 1 then
+        redis.call('HSET', KEYS[2], ARGV[i], ARGV[i + 1])
+        redis.call('HINCRBY', KEYS[3], ARGV[i + 2], 1)
+        redis.call('HINCRBY', KEYS[3], ARGV[i + 3], 1)
+        added = added + 1
+    end
+end
+return added
+"""
+
+# Remove DLQ entries given as (id, platform field, error field) triples,
+# decrementing counts only for entries this call actually removed
+REMOVE_FAILED_SCRIPT = """
+local removed = 0
+for i = 1, #ARGV, 3 do
+    if redis.call('ZREM', KEYS[1], ARGV[i]) == 1 then
+        redis.call('HDEL', KEYS[2], ARGV[i])
+        redis.call('HINCRBY', KEYS[3], ARGV[i + 1], -1)
+        redis.call('HINCRBY', KEYS[3], ARGV[i + 2], -1)
+        removed = removed + 1
+    end
+end
+return removed
+"""
+
+# Keys used together by one script or transaction share a hash tag (the
+# part in braces), so they stay on one Redis Cluster slot
+DLQ_INDEX_KEY = "{dlq}:index"
+DLQ_ENTRIES_KEY = "{dlq}:entries"
+DLQ_COUNTS_KEY = "{dlq}:counts"
+
+# Keys renamed to their hash-tagged names on connect (outside cluster mode)
+LEGACY_KEYS = {
+    "dlq:index": DLQ_INDEX_KEY,
+    "dlq:entries": DLQ_ENTRIES_KEY,
+    "dlq:counts": DLQ_COUNTS_KEY,
+}
+
+REDIS_MODES = ("standalone", "sentinel", "cluster")
+
+# Errors meaning Redis cannot be reached (as opposed to a bad command)
+REDIS_OUTAGE_ERRORS = (
+    RedisConnectionError,
+    redis_exceptions.ConnectionError,
+    redis_exceptions.TimeoutError,
+    redis_exceptions.ClusterDownError,
+)
+
+# Accepted sync_direction spellings in room mapping files
+SYNC_DIRECTIONS = {
+    "both": "both",
+    "chatwork_to_lark": "chatwork_to_lark",
+    "cw_to_lark": "chatwork_to_lark",
+    "lark_to_chatwork": "lark_to_chatwork",
+    "lark_to_cw": "lark_to_chatwork",
+}
+
+SEND_CLAIMED = "claimed"
+SEND_DUPLICATE = "duplicate"
+SEND_NO_MAPPING = "no_mapping"
+SEND_DIRECTION_DISABLED = "direction_disabled"
+
+
+@dataclass(frozen=True)
+class SendClaim:
+    """Outcome of ``RedisClient.prepare_send``."""
+
+    status: str
+    target_room_id: Optional[str] = None
+    claim: Optional[str] = None
+
+
+def hash_tag(key: str) -> str:
+    """The part of a key Redis Cluster hashes to pick its slot."""
+    start = key.find("{")
+    if start != -1:
+        end = key.find("}", start + 1)
+        if end > start + 1:
+            return key[start + 1 : end]
+    return key
+
+
+def new_failed_entry(
+    source_platform: str,
+    target_platform: str,
+    message_data: dict,
+    error: str,
+    retry_count: int = 0,
+    error_type: Optional[str] = None,
+) -> tuple[str, dict]:
+    """
+    Build a DLQ entry.
+
+    Returns:
+        Entry ID (failure time in epoch ms, then a random suffix) and entry
+    """
+    now = datetime.now(timezone.utc)
+    entry_id = f"{int(now.timestamp() * 1000):013d}-{uuid.uuid4().hex[:12]}"
+    return entry_id, {
+        "source_platform": source_platform,
+        "target_platform": target_platform,
+        "message": message_data,
+        "error": error,
+        "error_type": error_type or "unknown",
+        "retry_count": retry_count,
+        "failed_at": now.isoformat(),
+    }
+
 
 class RedisClient:
-    """Async Redis client wrapper."""
+    """
+    Async Redis client wrapper.
+
+    ``redis_mode`` selects a single server (``redis_url``), a Sentinel
+    managed master (``redis_sentinels``/``redis_sentinel_master``) or a
+    Redis Cluster (``redis_url`` of any node). Scripts only ever get keys
+    sharing a hash tag, so they run unchanged on a cluster.
+    """
 
     def __init__(self):
         self._pool: Optional[ConnectionPool] = None
         self._client: Optional[aioredis.Redis] = None
+        self._pubsub_client: Optional[aioredis.Redis] = None
+        self._sentinel: Optional[Sentinel] = None
+        self._tuner: Optional[PoolTuner] = None
+        self._scripts: dict[str, Any] = {}
+        self.cluster = False
+        # Set once rebuilt on connect (dedup_filter_enabled)
+        self.seen: Optional[SeenFilter] = None
+        # Serves room/user mapping reads while tracking (client_cache_enabled)
+        self.cache = ClientCache(self)
 
     async def connect(self) -> None:
         """Establish Redis connection pool."""
+        mode = settings.redis_mode
         try:
-            self._pool = ConnectionPool.from_url(
-                settings.redis_url,
-                password=settings.redis_password,
-                max_connections=settings.redis_max_connections,
-                decode_responses=True,
-            )
-            self._client = aioredis.Redis(connection_pool=self._pool)
+            if mode not in REDIS_MODES:
+                raise ValueError(f"Unknown redis_mode: {mode}")
+
+            if mode == "cluster":
+                self._client = RedisCluster.from_url(
+                    settings.redis_url,
+                    password=settings.redis_password,
+                    max_connections=settings.redis_max_connections,
+                    decode_responses=True,
+                )
+            elif mode == "sentinel":
+                sentinel = Sentinel(
+                    [
+                        (host, int(port))
+                        for host, _, port in (
+                            address.strip().rpartition(":")
+                            for address in settings.redis_sentinels.split(",")
+                            if address.strip()
+                        )
+                    ],
+                    sentinel_kwargs={"password": settings.redis_sentinel_password},
+                    password=settings.redis_password,
+                    max_connections=settings.redis_max_connections,
+                    decode_responses=True,
+                )
+                self._client = sentinel.master_for(
+                    settings.redis_sentinel_master,
+                    connection_pool_class=InstrumentedSentinelPool,
+                    wait_timeout=settings.redis_pool_timeout_seconds,
+                )
+                self._sentinel = sentinel
+            else:
+                self._pool = InstrumentedConnectionPool.from_url(
+                    settings.redis_url,
+                    password=settings.redis_password,
+                    max_connections=settings.redis_max_connections,
+                    wait_timeout=settings.redis_pool_timeout_seconds,
+                    decode_responses=True,
+                )
+                self._client = aioredis.Redis(connection_pool=self._pool)
+            self.cluster = mode == "cluster"
 
             # Test connection
             await self._client.ping()
-            logger.info("redis_connected", url=settings.redis_url)
+            if not self.cluster:
+                await self.migrate_legacy_keys()
+            if settings.dedup_filter_enabled:
+                await self.rebuild_seen_filter()
+            pool = self.instrumented_pool()
+            if settings.redis_pool_autotune and pool is not None:
+                self._tuner = PoolTuner(pool)
+                self._tuner.start()
+            if settings.client_cache_enabled:
+                if self.cluster:
+                    logger.warning("client_cache_unsupported", mode=mode)
+                else:
+                    await self.cache.start()
+            logger.info("redis_connected", url=settings.redis_url, mode=mode)
         except Exception as e:
             logger.error("redis_connection_failed", error=str(e))
             raise RedisConnectionError(f"Failed to connect to Redis: {e}")
 
     async def disconnect(self) -> None:
         """Close Redis connection pool."""
+        await self.cache.stop()
+        if self._tuner is not None:
+            await self._tuner.stop()
+            self._tuner = None
+        if self._pubsub_client:
+            await self._pubsub_client.aclose()
+            self._pubsub_client = None
         if self._client:
             await self._client.aclose()
             self._client = None
         if self._pool:
             await self._pool.disconnect()
             self._pool = None
+        self.seen = None
+        self._sentinel = None
         logger.info("redis_disconnected")
 
+    async def migrate_legacy_keys(self) -> int:
+        """
+        Rename keys written before the hash-tagged key layout.
+
+        Returns:
+            Number of keys renamed
+        """
+        renamed = 0
+        for old, new in LEGACY_KEYS.items():
+            if not await self.client.exists(old):
+                continue
+            if await self.client.renamenx(old, new):
+                renamed += 1
+                logger.info("redis_key_migrated", old=old, new=new)
+            else:
+                logger.warning("redis_key_migration_conflict", old=old, new=new)
+        return renamed
+
+    async def rebuild_seen_filter(self) -> int:
+        """
+        Fill the seen filter from the mappings Redis holds.
+
+        Reads the message IDs of every mapping bucket of the current and
+        previous window (and, outside a cluster, of claims and legacy
+        mapping keys). The filter is only used once this has finished.
+
+        From then on the filter learns what this process claims and saves,
+        so a "never seen" answer skips the read in ``is_message_processed``.
+        Messages claimed or saved by other replicas (or the worker) after
+        the rebuild are not in it, so that answer is only a hint: callers
+        still claim before sending, and the claim scripts never consult the
+        filter. Lookups whose answer is used as is (``get_message_mapping``,
+        ``get_counterpart``) always read Redis.
+
+        Returns:
+            Number of message IDs added
+        """
+        seen = SeenFilter(
+            settings.dedup_filter_capacity,
+            settings.dedup_filter_error_rate,
+            settings.message_ttl_seconds,
+        )
+        window = int(time.time()) // settings.message_ttl_seconds
+        added = 0
+        for platform in ("chatwork", "lark"):
+            for w in (window, window - 1):
+                async with self.client.pipeline(transaction=False) as pipe:
+                    for bucket in range(settings.message_mapping_buckets):
+                        pipe.hkeys(f"msgmap:{{{platform}:{bucket}}}:{w}")
+                    for message_ids in await pipe.execute():
+                        for message_id in message_ids:
+                            seen.add(f"{platform}:{message_id}", w)
+                            added += 1
+
+        if not self.cluster:
+            # msg:{platform:bucket}:{id} claims and msg:{platform}:{id} mappings
+            async for key in self.client.scan_iter(match="msg:*", count=1000):
+                _, _, rest = key.partition(":")
+                tag, _, message_id = rest.rpartition(":")
+                seen.add(f"{tag.strip('{}').partition(':')[0]}:{message_id}")
+                added += 1
+
+        self.seen = seen
+        logger.info("seen_filter_rebuilt", message_ids=added)
+        return added
+
+    def _mark_seen(self, platform: str, message_id: str) -> None:
+        """Add a message to the seen filter (before writing it to Redis)."""
+        if self.seen is not None:
+            self.seen.add(f"{platform}:{message_id}")
+
+    def _never_seen(self, platform: str, message_id: str) -> bool:
+        """True if the seen filter rules out a claim or mapping by this process."""
+        return self.seen is not None and not self.seen.might_contain(
+            f"{platform}:{message_id}"
+        )
+
     def is_connected(self) -> bool:
         """Check if Redis client is connected."""
         return self._client is not None
@@ -65,7 +408,263 @@ class RedisClient:
         """Set Redis client instance (mainly for testing)."""
         self._client = value
 
+    async def run_script(self, source: str, keys: list, args: list) -> Any:
+        """Run a Lua script with EVALSHA, loading it on first use."""
+        script = self._scripts.get(source)
+        if script is None:
+            script = self.client.register_script(source)
+            self._scripts[source] = script
+        return await script(keys=keys, args=args, client=self.client)
+
+    def pipeline(self, transaction: bool = True) -> Any:
+        """
+        Pipeline that runs as a MULTI/EXEC transaction where possible.
+
+        Redis Cluster has no transactions across slots, so in cluster mode
+        this is a plain pipeline: one round trip per node, not atomic.
+        Invariants spanning several keys belong in a script instead.
+        """
+        return self.client.pipeline(transaction=transaction and not self.cluster)
+
+    def pubsub(self) -> PubSub:
+        """
+        Pub/sub connection.
+
+        Cluster messages reach every node, so in cluster mode this
+        subscribes on one of them.
+        """
+        if not self.cluster:
+            return self.client.pubsub()
+        if self._pubsub_client is None:
+            node = self.client.get_default_node()
+            self._pubsub_client = aioredis.Redis(
+                host=node.host,
+                port=node.port,
+                password=settings.redis_password,
+                decode_responses=True,
+            )
+        return self._pubsub_client.pubsub()
+
+    def instrumented_pool(self) -> Optional[InstrumentedPoolMixin]:
+        """
+        The client's blocking pool with saturation counters.
+
+        None in cluster mode (one pool per node) or for clients set up
+        without ``connect``.
+        """
+        pool = getattr(self._client, "connection_pool", None)
+        return pool if isinstance(pool, InstrumentedPoolMixin) else None
+
+    def tracking_pool(self) -> ConnectionPool:
+        """One-connection RESP3 pool to the master, for invalidation pushes."""
+        kwargs = {
+            "protocol": 3,
+            "parser_class": _AsyncRESP3Parser,
+            "max_connections": 1,
+        }
+        if self._sentinel is not None:
+            return SentinelConnectionPool(
+                settings.redis_sentinel_master,
+                self._sentinel,
+                **{**self._sentinel.connection_kwargs, **kwargs, "is_master": True},
+            )
+        return ConnectionPool.from_url(
+            settings.redis_url,
+            password=settings.redis_password,
+            decode_responses=True,
+            **kwargs,
+        )
+
     # Message ID Mapping
+    # Completed mappings are stored compactly ("target_id|epoch_seconds") as
+    # fields of small hashes, msgmap:{platform:bucket}:{window}, so Redis
+    # keeps them listpack-encoded. A window is message_ttl_seconds long and
+    # its buckets expire one window after it ends, so a mapping lives
+    # between one and two TTLs; lookups check the current and previous
+    # window. The same layout under msgrev: maps each message the bridge
+    # posted back to its source. In-progress claims are short-lived
+    # msg:{platform:bucket}:{id} keys. A message's claim and buckets share
+    # the {platform:bucket} hash tag, so scripts over them stay on one
+    # cluster slot. Mappings written before this layout are plain
+    # msg:{platform}:{id} JSON keys, still read until they expire.
+    @staticmethod
+    def _message_tag(platform: str, message_id: str) -> str:
+        """Hash tag shared by a message's claim key and mapping buckets."""
+        bucket = zlib.crc32(message_id.encode()) % settings.message_mapping_buckets
+        return f"{{{platform}:{bucket}}}"
+
+    def _claim_key(self, platform: str, message_id: str) -> str:
+        """Key holding a message's in-progress claim."""
+        return f"msg:{self._message_tag(platform, message_id)}:{message_id}"
+
+    @staticmethod
+    def _legacy_mapping_key(platform: str, message_id: str) -> str:
+        """Key of a mapping written before the bucket layout."""
+        return f"msg:{platform}:{message_id}"
+
+    def _mapping_buckets(
+        self, platform: str, message_id: str, prefix: str = "msgmap"
+    ) -> tuple[str, str]:
+        """Keys of the current and previous mapping bucket of a message."""
+        window = int(time.time()) // settings.message_ttl_seconds
+        tag = self._message_tag(platform, message_id)
+        return f"{prefix}:{tag}:{window}", f"{prefix}:{tag}:{window - 1}"
+
+    @staticmethod
+    def _decode_mapping(platform: str, message_id: str, value: str) -> Optional[dict]:
+        """Expand a stored mapping (compact or legacy JSON) into a dict."""
+        if value.startswith("{"):
+            mapping = json.loads(value)
+            # An in-progress claim is not a mapping yet
+            return None if mapping.get("status") == "in_progress" else mapping
+
+        target_message_id, _, saved_at = value.rpartition("|")
+        return {
+            "source_platform": platform,
+            "source_message_id": message_id,
+            "target_platform": "lark" if platform == "chatwork" else "chatwork",
+            "target_message_id": target_message_id,
+            "timestamp": datetime.fromtimestamp(
+                int(saved_at), timezone.utc
+            ).isoformat(),
+        }
+
+    @staticmethod
+    def _new_claim() -> str:
+        """In-progress entry stored under a message's claim key."""
+        return json.dumps(
+            {
+                "status": "in_progress",
+                "claim_id": uuid.uuid4().hex,
+                "claimed_at": datetime.now(timezone.utc).isoformat(),
+            }
+        )
+
+    async def claim_message(self, platform: str, message_id: str) -> Optional[str]:
+        """
+        Claim a message for processing before anything is sent.
+
+        The claim is an in-progress key written only if the message is
+        neither claimed nor mapped, so only one replica (or one of several
+        redeliveries) gets to send a message. ``save_message_mapping``
+        completes it; ``release_message_claim`` gives it up after a
+        failure. A claim whose holder dies expires after
+        ``message_claim_lease_seconds``.
+
+        Args:
+            platform: Platform the message came from
+            message_id: Message ID on that platform
+
+        Returns:
+            Claim token, or None if the message is processed or in progress
+        """
+        keys = [
+            self._claim_key(platform, message_id),
+            *self._mapping_buckets(platform, message_id),
+        ]
+        if not self.cluster:
+            # Cluster deployments never had the old layout
+            keys.append(self._legacy_mapping_key(platform, message_id))
+
+        self._mark_seen(platform, message_id)
+        claim = self._new_claim()
+        claimed = await self.run_script(
+            CLAIM_SCRIPT,
+            keys,
+            [claim, settings.message_claim_lease_seconds, message_id],
+        )
+        return claim if claimed else None
+
+    async def prepare_send(
+        self, source_platform: str, source_room_id: str, message_id: str
+    ) -> SendClaim:
+        """
+        Dedup, route and claim a message in a single Redis call.
+
+        In cluster mode the route is read first and the message claimed in
+        a second call, since the two live on different slots.
+
+        Args:
+            source_platform: Platform the message came from
+            source_room_id: Room/chat ID on the source platform
+            message_id: Message ID on the source platform
+
+        Returns:
+            ``SendClaim`` whose status is ``claimed`` (with the target room
+            and claim token), ``duplicate``, ``no_mapping`` or
+            ``direction_disabled`` (the room pair does not sync this way)
+        """
+        target_platform = "lark" if source_platform == "chatwork" else "chatwork"
+        if self.cluster:
+            return await self._route_and_claim(
+                source_platform, source_room_id, message_id, target_platform
+            )
+
+        claim = self._new_claim()
+        # Marked up front: a routing miss only costs a false "maybe seen"
+        self._mark_seen(source_platform, message_id)
+        status, target_room_id = await self.run_script(
+            PREPARE_SEND_SCRIPT,
+            [
+                self._claim_key(source_platform, message_id),
+                f"rooms:{source_platform}",
+                f"room:{source_platform}:{source_room_id}",
+                f"room_directions:{source_platform}",
+                f"room_direction:{source_platform}:{source_room_id}",
+                *self._mapping_buckets(source_platform, message_id),
+                self._legacy_mapping_key(source_platform, message_id),
+            ],
+            [
+                claim,
+                settings.message_claim_lease_seconds,
+                f"{source_platform}_to_{target_platform}",
+                source_room_id,
+                message_id,
+            ],
+        )
+        return SendClaim(
+            status=status,
+            target_room_id=target_room_id or None,
+            claim=claim if status == SEND_CLAIMED else None,
+        )
+
+    async def _route_and_claim(
+        self,
+        source_platform: str,
+        source_room_id: str,
+        message_id: str,
+        target_platform: str,
+    ) -> SendClaim:
+        """``prepare_send`` as two slot-safe calls."""
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.hget(f"rooms:{source_platform}", source_room_id)
+            pipe.get(f"room:{source_platform}:{source_room_id}")
+            pipe.hget(f"room_directions:{source_platform}", source_room_id)
+            pipe.get(f"room_direction:{source_platform}:{source_room_id}")
+            loaded, cached, direction, cached_direction = await pipe.execute()
+
+        target_room_id = loaded or cached
+        if not target_room_id:
+            return SendClaim(SEND_NO_MAPPING)
+        direction = direction or cached_direction or "both"
+        if direction not in ("both", f"{source_platform}_to_{target_platform}"):
+            return SendClaim(SEND_DIRECTION_DISABLED, target_room_id)
+
+        claim = await self.claim_message(source_platform, message_id)
+        if claim is None:
+            return SendClaim(SEND_DUPLICATE)
+        return SendClaim(SEND_CLAIMED, target_room_id, claim)
+
+    async def release_message_claim(
+        self, platform: str, message_id: str, claim: str
+    ) -> None:
+        """Give up a claim so a later delivery or retry can process the message."""
+        await self.run_script(
+            RELEASE_CLAIM_SCRIPT,
+            [self._claim_key(platform, message_id)],
+            [claim],
+        )
+
     async def save_message_mapping(
         self,
         source_platform: str,
@@ -74,51 +673,182 @@ class RedisClient:
         target_message_id: str,
         room_mapping_id: Optional[str] = None,
     ) -> None:
-        """Save message ID mapping for loop detection."""
-        key = f"msg:{source_platform}:{source_message_id}"
-        value = {
-            "source_platform": source_platform,
-            "source_message_id": source_message_id,
-            "target_platform": target_platform,
-            "target_message_id": target_message_id,
-            "room_mapping_id": room_mapping_id,
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-        }
+        """
+        Save message ID mapping for loop detection (completes a claim).
 
-        await self.client.setex(
-            key,
-            settings.message_ttl_seconds,
-            json.dumps(value),
+        The reverse entry (target to source) is written in the same
+        transaction. In cluster mode the two entries are on different
+        slots; the reverse entry is written first, so a forward mapping
+        always has one. The target platform is implied by the source and
+        ``room_mapping_id`` is only logged; neither is stored.
+        """
+        bucket, _ = self._mapping_buckets(source_platform, source_message_id)
+        reverse_bucket, _ = self._mapping_buckets(
+            target_platform, target_message_id, prefix="msgrev"
         )
+        claim_key = self._claim_key(source_platform, source_message_id)
+        now = int(time.time())
+        ttl = settings.message_ttl_seconds * 2
+        self._mark_seen(source_platform, source_message_id)
+
+        if self.cluster:
+            await self.run_script(
+                SAVE_MAPPING_SCRIPT,
+                [reverse_bucket],
+                [target_message_id, f"{source_message_id}|{now}", ttl],
+            )
+            await self.run_script(
+                SAVE_MAPPING_SCRIPT,
+                [bucket, claim_key],
+                [source_message_id, f"{target_message_id}|{now}", ttl],
+            )
+        else:
+            async with self.client.pipeline(transaction=True) as pipe:
+                pipe.hset(bucket, source_message_id, f"{target_message_id}|{now}")
+                pipe.expire(bucket, ttl)
+                pipe.hset(
+                    reverse_bucket, target_message_id, f"{source_message_id}|{now}"
+                )
+                pipe.expire(reverse_bucket, ttl)
+                pipe.delete(claim_key)
+                await pipe.execute()
+
         logger.debug(
             "message_mapping_saved",
             source_platform=source_platform,
             source_message_id=source_message_id,
+            target_platform=target_platform,
             target_message_id=target_message_id,
+            room_mapping_id=room_mapping_id,
         )
 
+    async def restore_message_mappings(self, mappings: list[dict]) -> None:
+        """
+        Write mappings saved elsewhere (e.g. while Redis was down) in bulk.
+
+        Each mapping has the ``save_message_mapping`` arguments plus
+        ``saved_at`` (epoch seconds). One pipeline, not a transaction:
+        rewriting a mapping is harmless, so a partial write can be retried.
+        """
+        ttl = settings.message_ttl_seconds * 2
+        async with self.client.pipeline(transaction=False) as pipe:
+            for m in mappings:
+                self._mark_seen(m["source_platform"], m["source_message_id"])
+                bucket, _ = self._mapping_buckets(
+                    m["source_platform"], m["source_message_id"]
+                )
+                reverse_bucket, _ = self._mapping_buckets(
+                    m["target_platform"], m["target_message_id"], prefix="msgrev"
+                )
+                pipe.hset(
+                    bucket,
+                    m["source_message_id"],
+                    f"{m['target_message_id']}|{m['saved_at']}",
+                )
+                pipe.expire(bucket, ttl)
+                pipe.hset(
+                    reverse_bucket,
+                    m["target_message_id"],
+                    f"{m['source_message_id']}|{m['saved_at']}",
+                )
+                pipe.expire(reverse_bucket, ttl)
+                pipe.delete(
+                    self._claim_key(m["source_platform"], m["source_message_id"])
+                )
+            await pipe.execute()
+
     async def get_message_mapping(
         self, platform: str, message_id: str
     ) -> Optional[dict]:
         """Get message mapping by platform and message ID."""
-        key = f"msg:{platform}:{message_id}"
-        value = await self.client.get(key)
+        current, previous = self._mapping_buckets(platform, message_id)
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.hget(current, message_id)
+            pipe.hget(previous, message_id)
+            pipe.get(self._legacy_mapping_key(platform, message_id))
+            values = await pipe.execute()
 
-        if value:
-            return json.loads(value)
+        for value in values:
+            if value:
+                return self._decode_mapping(platform, message_id, value)
+        return None
+
+    async def get_counterpart(self, platform: str, message_id: str) -> Optional[dict]:
+        """
+        Find the message on the other platform that a message was synced with.
+
+        Works both for messages the bridge picked up (source) and for
+        messages it posted (target), in one round trip.
+
+        Args:
+            platform: Platform of the message
+            message_id: Message ID on that platform
+
+        Returns:
+            ``{"platform", "message_id", "role"}`` of the counterpart, where
+            role is "target" if the counterpart is the copy the bridge
+            posted and "source" if it is the original; None if unknown
+        """
+        other = "lark" if platform == "chatwork" else "chatwork"
+        async with self.client.pipeline(transaction=False) as pipe:
+            for key in self._mapping_buckets(platform, message_id):
+                pipe.hget(key, message_id)
+            for key in self._mapping_buckets(platform, message_id, prefix="msgrev"):
+                pipe.hget(key, message_id)
+            pipe.get(self._legacy_mapping_key(platform, message_id))
+            *buckets, legacy = await pipe.execute()
+
+        for i, value in enumerate(buckets):
+            if value:
+                return {
+                    "platform": other,
+                    "message_id": value.rpartition("|")[0],
+                    "role": "target" if i < 2 else "source",
+                }
+
+        mapping = legacy and self._decode_mapping(platform, message_id, legacy)
+        if mapping:
+            return {
+                "platform": other,
+                "message_id": mapping["target_message_id"],
+                "role": "target",
+            }
         return None
 
     async def is_message_processed(self, platform: str, message_id: str) -> bool:
-        """Check if message has already been processed."""
-        return await self.client.exists(f"msg:{platform}:{message_id}") > 0
+        """
+        Check if message has already been processed (or is in progress).
+
+        A False answer may come from the seen filter and miss messages other
+        processes handled since it was rebuilt; claim before sending.
+        """
+        if self._never_seen(platform, message_id):
+            return False
+        current, previous = self._mapping_buckets(platform, message_id)
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.exists(self._claim_key(platform, message_id))
+            pipe.hexists(current, message_id)
+            pipe.hexists(previous, message_id)
+            pipe.exists(self._legacy_mapping_key(platform, message_id))
+            return any(await pipe.execute())
 
-    # Room Mapping (cached from database)
+    # Room Mapping (loaded into rooms:{platform} by MappingLoader; single
+    # room:{platform}:{id} entries are a fallback with their own TTL)
     async def get_room_mapping(
         self, source_platform: str, source_room_id: str
     ) -> Optional[str]:
         """Get target room ID from mapping cache."""
+        table = f"rooms:{source_platform}"
         key = f"room:{source_platform}:{source_room_id}"
-        return await self.client.get(key)
+
+        async def load() -> Optional[str]:
+            async with self.client.pipeline(transaction=False) as pipe:
+                pipe.hget(table, source_room_id)
+                pipe.get(key)
+                loaded, cached = await pipe.execute()
+            return loaded or cached
+
+        return await self.cache.fetch(key, (table, key), load)
 
     async def set_room_mapping(
         self,
@@ -126,18 +856,42 @@ class RedisClient:
         source_room_id: str,
         target_room_id: str,
         ttl: int = 3600,  # 1 hour cache
+        sync_direction: Optional[str] = None,
     ) -> None:
-        """Cache room mapping."""
+        """
+        Cache room mapping.
+
+        ``sync_direction`` ("both", "chatwork_to_lark" or
+        "lark_to_chatwork") limits which way the pair syncs; without it
+        both directions are allowed.
+        """
         key = f"room:{source_platform}:{source_room_id}"
-        await self.client.setex(key, ttl, target_room_id)
+        direction_key = f"room_direction:{source_platform}:{source_room_id}"
+        async with self.pipeline() as pipe:
+            pipe.setex(key, ttl, target_room_id)
+            if sync_direction:
+                pipe.setex(direction_key, ttl, sync_direction)
+            else:
+                pipe.delete(direction_key)
+            await pipe.execute()
 
-    # User Mapping (cached from database)
+    # User Mapping (loaded into users:{platform}, same fallback as rooms)
     async def get_user_mapping(
         self, source_platform: str, source_user_id: str
     ) -> Optional[dict]:
         """Get user mapping from cache."""
+        table = f"users:{source_platform}"
         key = f"user:{source_platform}:{source_user_id}"
-        value = await self.client.get(key)
+
+        async def load() -> Optional[str]:
+            async with self.client.pipeline(transaction=False) as pipe:
+                pipe.hget(table, source_user_id)
+                pipe.get(key)
+                loaded, cached = await pipe.execute()
+            return loaded or cached
+
+        # The JSON is cached, so every caller gets its own dict
+        value = await self.cache.fetch(key, (table, key), load)
 
         if value:
             return json.loads(value)
@@ -154,7 +908,67 @@ class RedisClient:
         key = f"user:{source_platform}:{source_user_id}"
         await self.client.setex(key, ttl, json.dumps(user_data))
 
+    async def replace_tables(self, tables: dict[str, dict[str, str]]) -> None:
+        """
+        Write staged copies of mapping tables, then swap them in at once.
+
+        A staged copy is tagged with its table's name, so RENAME stays on
+        the table's cluster slot. In cluster mode the tables are swapped one
+        at a time rather than in one transaction.
+        """
+        async with self.client.pipeline(transaction=False) as pipe:
+            for key, fields in tables.items():
+                pipe.delete(self._staging_key(key))
+                if fields:
+                    pipe.hset(self._staging_key(key), mapping=fields)
+            await pipe.execute()
+
+        async with self.pipeline() as pipe:
+            for key, fields in tables.items():
+                if fields:
+                    pipe.rename(self._staging_key(key), key)
+                else:
+                    pipe.delete(key)
+            await pipe.execute()
+
+    @staticmethod
+    def _staging_key(key: str) -> str:
+        return f"{{{key}}}:staging"
+
+    async def sync_tables(self, tables: dict[str, dict[str, str]]) -> tuple[int, int]:
+        """Write only the fields that differ; return (updated, removed)."""
+        keys = list(tables)
+        async with self.client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.hgetall(key)
+            current = await pipe.execute()
+
+        updated = removed = 0
+        async with self.pipeline() as pipe:
+            for key, old in zip(keys, current):
+                new = tables[key]
+                changes = {
+                    field: value
+                    for field, value in new.items()
+                    if old.get(field) != value
+                }
+                stale = [field for field in old if field not in new]
+                if changes:
+                    pipe.hset(key, mapping=changes)
+                if stale:
+                    pipe.hdel(key, *stale)
+                updated += len(changes)
+                removed += len(stale)
+            if updated or removed:
+                await pipe.execute()
+
+        return updated, removed
+
     # Failed Messages Queue (Dead Letter Queue)
+    # Entries live in one hash ({dlq}:entries), indexed by a sorted set
+    # ({dlq}:index) whose members are time-ordered entry IDs, all with score
+    # 0 so ZRANGEBYLEX pages through them in O(log N). {dlq}:counts keeps
+    # totals per platform and error class.
     async def add_to_failed_queue(
         self,
         source_platform: str,
@@ -162,24 +976,27 @@ class RedisClient:
         message_data: dict,
         error: str,
         retry_count: int = 0,
-    ) -> None:
-        """Add failed message to DLQ."""
-        timestamp = datetime.now(timezone.utc).isoformat()
-        key = f"failed:{timestamp}:{source_platform}:{message_data.get('message_id', 'unknown')}"
-
-        value = {
-            "source_platform": source_platform,
-            "target_platform": target_platform,
-            "message": message_data,
-            "error": error,
-            "retry_count": retry_count,
-            "failed_at": timestamp,
-        }
+        error_type: Optional[str] = None,
+    ) -> str:
+        """
+        Add failed message to DLQ.
+
+        Returns:
+            DLQ entry ID
+        """
+        entry_id, value = new_failed_entry(
+            source_platform,
+            target_platform,
+            message_data,
+            error,
+            retry_count,
+            error_type,
+        )
 
-        await self.client.setex(
-            key,
-            settings.message_ttl_seconds * 7,  # Keep failed messages for 7 days
-            json.dumps(value),
+        await self.run_script(
+            ADD_FAILED_SCRIPT,
+            [DLQ_INDEX_KEY, DLQ_ENTRIES_KEY, DLQ_COUNTS_KEY],
+            [entry_id, json.dumps(value), *self._dlq_count_fields(value)],
         )
 
         logger.warning(
@@ -188,24 +1005,138 @@ class RedisClient:
             target_platform=target_platform,
             error=error,
             retry_count=retry_count,
+            entry_id=entry_id,
         )
 
+        await self._prune_failed_messages(time.time())
+        return entry_id
+
+    async def restore_failed_messages(self, entries: list[tuple[str, dict]]) -> int:
+        """
+        Add entries built elsewhere (e.g. while Redis was down) to the DLQ.
+
+        Entries already in the DLQ are skipped.
+
+        Returns:
+            Number of entries added
+        """
+        if not entries:
+            return 0
+        args: list = []
+        for entry_id, value in entries:
+            args.extend([entry_id, json.dumps(value), *self._dlq_count_fields(value)])
+        added = await self.run_script(
+            RESTORE_FAILED_SCRIPT,
+            [DLQ_INDEX_KEY, DLQ_ENTRIES_KEY, DLQ_COUNTS_KEY],
+            args,
+        )
+        await self._prune_failed_messages(time.time())
+        return added
+
     async def get_failed_messages(
-        self, limit: int = 100
+        self, limit: int = 100, after: Optional[str] = None
     ) -> list[tuple[str, dict]]:
-        """Get failed messages from DLQ."""
-        keys = await self.client.keys("failed:*")
-        keys = keys[:limit]
+        """
+        Get failed messages from DLQ, oldest first.
 
-        messages = []
-        for key in keys:
-            value = await self.client.get(key)
-            if value:
-                messages.append((key, json.loads(value)))
+        Args:
+            limit: Maximum number of entries
+            after: Entry ID to continue after (the last ID of the previous page)
+
+        Returns:
+            (entry ID, entry) pairs
+        """
+        entry_ids = await self.client.zrangebylex(
+            DLQ_INDEX_KEY,
+            f"({after}" if after else "-",
+            "+",
+            start=0,
+            num=limit,
+        )
+        if not entry_ids:
+            return []
+
+        values = await self.client.hmget(DLQ_ENTRIES_KEY, entry_ids)
+        return [
+            (entry_id, json.loads(value))
+            for entry_id, value in zip(entry_ids, values)
+            if value
+        ]
+
+    async def count_failed_messages(self) -> dict:
+        """Total DLQ size and counts by source platform and error class."""
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.zcard(DLQ_INDEX_KEY)
+            pipe.hgetall(DLQ_COUNTS_KEY)
+            total, counts = await pipe.execute()
+
+        by_platform: dict[str, int] = {}
+        by_error: dict[str, int] = {}
+        for field, count in counts.items():
+            group, _, name = field.partition(":")
+            if int(count) > 0:
+                (by_platform if group == "platform" else by_error)[name] = int(count)
+
+        return {"total": total, "by_platform": by_platform, "by_error": by_error}
+
+    async def remove_failed_messages(self, entries: list[tuple[str, dict]]) -> int:
+        """
+        Remove entries from the DLQ.
+
+        Args:
+            entries: (entry ID, entry) pairs as returned by get_failed_messages
 
-        return messages
+        Returns:
+            Number of entries removed (entries already gone are skipped)
+        """
+        if not entries:
+            return 0
+        args = []
+        for entry_id, value in entries:
+            args.extend([entry_id, *self._dlq_count_fields(value)])
+        return await self.run_script(
+            REMOVE_FAILED_SCRIPT,
+            [DLQ_INDEX_KEY, DLQ_ENTRIES_KEY, DLQ_COUNTS_KEY],
+            args,
+        )
+
+    async def _prune_failed_messages(self, now: float) -> None:
+        """Drop entries older than the DLQ retention, a batch at a time."""
+        cutoff_ms = int((now - settings.message_ttl_seconds * 7) * 1000)  # 7 days
+        expired_ids = await self.client.zrangebylex(
+            DLQ_INDEX_KEY, "-", f"({cutoff_ms:013d}", start=0, num=100
+        )
+        if not expired_ids:
+            return
+        values = await self.client.hmget(DLQ_ENTRIES_KEY, expired_ids)
+        await self.remove_failed_messages(
+            [
+                (entry_id, json.loads(value) if value else {})
+                for entry_id, value in zip(expired_ids, values)
+            ]
+        )
+
+    @staticmethod
+    def _dlq_count_fields(value: dict) -> tuple[str, str]:
+        """{dlq}:counts fields an entry is counted under."""
+        return (
+            f"platform:{value.get('source_platform', 'unknown')}",
+            f"error:{value.get('error_type', 'unknown')}",
+        )
 
     # Rate Limiting
+    # Records (small expiring hashes, e.g. DLQ replay progress)
+    async def get_record(self, key: str) -> dict[str, str]:
+        """Fields of a record, or an empty dict if it is unknown or expired."""
+        return await self.client.hgetall(key)
+
+    async def put_record(self, key: str, fields: dict[str, str], ttl: int) -> None:
+        """Store a record for ``ttl`` seconds."""
+        async with self.pipeline() as pipe:
+            pipe.hset(key, mapping=fields)
+            pipe.expire(key, ttl)
+            await pipe.execute()
+
     async def check_rate_limit(
         self, key: str, limit: int, window_seconds: int
     ) -> bool:
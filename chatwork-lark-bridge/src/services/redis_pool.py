@@ -0,0 +1,269 @@
+"""Blocking Redis connection pools with saturation metrics and optional auto-sizing."""
+
+import asyncio
+import math
+import time
+from typing import Optional
+
+from prometheus_client import Counter, Gauge, Histogram
+from redis.asyncio.connection import AbstractConnection, ConnectionPool
+from redis.asyncio.sentinel import SentinelConnectionPool
+from redis.exceptions import ConnectionError
+
+from ..core.config import settings
+from ..core.logging import get_logger
+
+logger = get_logger(__name__)
+
+WAIT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+)
+
+POOL_SIZE = Gauge("redis_pool_max_connections", "Connections the Redis pool may open")
+POOL_IN_USE = Gauge("redis_pool_in_use_connections", "Redis connections checked out")
+POOL_IDLE = Gauge(
+    "redis_pool_idle_connections", "Open Redis connections not checked out"
+)
+POOL_WAITERS = Gauge("redis_pool_waiters", "Callers waiting for a Redis connection")
+POOL_WAIT = Histogram(
+    "redis_pool_wait_seconds",
+    "Time spent waiting for a free Redis connection",
+    buckets=WAIT_BUCKETS,
+)
+POOL_CHECKOUT = Histogram(
+    "redis_pool_checkout_seconds",
+    "Time to check out a Redis connection (waiting plus connecting)",
+    buckets=WAIT_BUCKETS,
+)
+POOL_TIMEOUTS = Counter(
+    "redis_pool_timeouts_total", "Checkouts that found no free Redis connection in time"
+)
+
+
+class InstrumentedPoolMixin:
+    """
+    Blocking checkout, saturation counters and resizing for a connection pool.
+
+    A caller finding every connection in use waits up to ``wait_timeout``
+    seconds for one to be released (None waits forever), then gets
+    ``ConnectionError("No connection available.")`` like redis-py's
+    ``BlockingConnectionPool``. Counters cover checkouts, waits, time spent
+    waiting and timeouts, and ``peak_in_use`` since ``take_window``; the
+    same figures are exported as Prometheus metrics.
+    """
+
+    def __init__(self, *args, wait_timeout: Optional[float] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_timeout = wait_timeout
+        self._condition = asyncio.Condition()
+        self.waiters = 0
+        self.checkouts = 0
+        self.waited = 0
+        self.wait_seconds = 0.0
+        self.timeouts = 0
+        self.peak_in_use = 0
+        POOL_SIZE.set(self.max_connections)
+
+    @property
+    def in_use(self) -> int:
+        """Connections currently checked out."""
+        return len(self._in_use_connections)
+
+    @property
+    def idle(self) -> int:
+        """Open connections waiting in the pool."""
+        return len(self._available_connections)
+
+    async def get_connection(
+        self, command_name, *keys, **options
+    ) -> AbstractConnection:
+        """Check out a connection, waiting up to ``wait_timeout`` for one."""
+        started = time.perf_counter()
+        try:
+            async with self._condition:
+                if not self.can_get_connection():
+                    await self._wait()
+                connection = self.get_available_connection()
+        except asyncio.TimeoutError as e:
+            self.timeouts += 1
+            POOL_TIMEOUTS.inc()
+            raise ConnectionError("No connection available.") from e
+        finally:
+            waited = time.perf_counter() - started
+            self.wait_seconds += waited
+            POOL_WAIT.observe(waited)
+
+        self.checkouts += 1
+        self.peak_in_use = max(self.peak_in_use, self.in_use)
+        self._update_gauges()
+        try:
+            await self.ensure_connection(connection)
+        except BaseException:
+            await self.release(connection)
+            raise
+        POOL_CHECKOUT.observe(time.perf_counter() - started)
+        return connection
+
+    async def _wait(self) -> None:
+        """Wait (holding the condition) until a connection can be checked out."""
+        self.waited += 1
+        self.waiters += 1
+        POOL_WAITERS.inc()
+        try:
+            await asyncio.wait_for(
+                self._condition.wait_for(self.can_get_connection), self.wait_timeout
+            )
+        finally:
+            self.waiters -= 1
+            POOL_WAITERS.dec()
+
+    async def release(self, connection: AbstractConnection) -> None:
+        """Return a connection, closing it if the pool has shrunk since."""
+        async with self._condition:
+            await super().release(connection)
+            if self.in_use + self.idle > self.max_connections:
+                self._available_connections.remove(connection)
+                await connection.disconnect()
+            self._condition.notify()
+        self._update_gauges()
+
+    async def resize(self, max_connections: int) -> None:
+        """Change the pool size; extra connections close as they come back."""
+        async with self._condition:
+            self.max_connections = max_connections
+            while (
+                self._available_connections
+                and self.in_use + self.idle > max_connections
+            ):
+                await self._available_connections.pop(0).disconnect()
+            self._condition.notify_all()
+        POOL_SIZE.set(max_connections)
+        self._update_gauges()
+
+    def take_window(self) -> dict:
+        """Counters since the previous call (then reset), plus the current state."""
+        window = self.stats()
+        self.checkouts = self.waited = self.timeouts = 0
+        self.wait_seconds = 0.0
+        self.peak_in_use = self.in_use
+        return window
+
+    def stats(self) -> dict:
+        """Pool size, usage and the counters of the current window."""
+        return {
+            "max_connections": self.max_connections,
+            "in_use": self.in_use,
+            "idle": self.idle,
+            "waiters": self.waiters,
+            "peak_in_use": self.peak_in_use,
+            "checkouts": self.checkouts,
+            "waited": self.waited,
+            "wait_seconds": round(self.wait_seconds, 6),
+            "timeouts": self.timeouts,
+        }
+
+    def _update_gauges(self) -> None:
+        POOL_IN_USE.set(self.in_use)
+        POOL_IDLE.set(self.idle)
+
+
+class InstrumentedConnectionPool(InstrumentedPoolMixin, ConnectionPool):
+    """Instrumented blocking pool to a single Redis server."""
+
+
+class InstrumentedSentinelPool(InstrumentedPoolMixin, SentinelConnectionPool):
+    """Instrumented blocking pool to the master a Sentinel points at."""
+
+
+class PoolTuner:
+    """
+    Resizes an instrumented pool every ``redis_pool_autotune_interval_seconds``.
+
+    The pool grows by half when a checkout timed out or more than
+    ``GROW_WAIT_RATIO`` of checkouts had to wait, and shrinks halfway
+    towards its peak usage (plus one spare) after a window without any
+    waiting. It stays within ``redis_pool_autotune_min_connections`` and
+    ``redis_pool_autotune_max_connections``.
+    """
+
+    GROW_WAIT_RATIO = 0.05
+
+    def __init__(self, pool: InstrumentedPoolMixin):
+        """
+        Initialize the tuner.
+
+        Args:
+            pool: Pool to resize
+        """
+        self.pool = pool
+        self._task: Optional[asyncio.Task] = None
+
+    def target_size(self, window: dict) -> int:
+        """Pool size for the next window, given the counters of the last one."""
+        size = window["max_connections"]
+        low = settings.redis_pool_autotune_min_connections
+        high = settings.redis_pool_autotune_max_connections
+
+        if (
+            window["timeouts"]
+            or window["waited"] > self.GROW_WAIT_RATIO * window["checkouts"]
+        ):
+            target = max(size + 1, math.ceil(size * 1.5))
+        elif window["waited"] == 0:
+            target = size - max(0, size - window["peak_in_use"] - 1) // 2
+        else:
+            target = size
+        return max(low, min(high, target))
+
+    async def adjust(self) -> int:
+        """Resize the pool from the counters of the window just ended."""
+        window = self.pool.take_window()
+        size = self.target_size(window)
+        if size != window["max_connections"]:
+            await self.pool.resize(size)
+            logger.info(
+                "redis_pool_resized",
+                old=window["max_connections"],
+                new=size,
+                peak_in_use=window["peak_in_use"],
+                waited=window["waited"],
+                checkouts=window["checkouts"],
+                timeouts=window["timeouts"],
+            )
+        return size
+
+    def start(self) -> None:
+        """Start resizing in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop resizing."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(settings.redis_pool_autotune_interval_seconds)
+            try:
+                await self.adjust()
+            except Exception as e:
+                logger.error("redis_pool_tuning_failed", error=str(e))
@@ -0,0 +1,135 @@
+"""Background runner for scheduled retries."""
+
+import asyncio
+from typing import Optional
+
+from ..core.config import settings
+from ..core.exceptions import (
+    DeadLetteredError,
+    LoopDetectedError,
+    MappingNotFoundError,
+    RetryScheduledError,
+)
+from ..core.logging import get_logger
+from .circuit_breaker import circuit_breakers
+from .message_processor import message_processor
+from .retry_queue import retry_queue
+
+logger = get_logger(__name__)
+
+
+class RetryPoller:
+    """
+    Runs retries from the delay queue once they are due.
+
+    Each due message goes through the message processor again, which either
+    sends it, schedules the next attempt or writes it to the DLQ. Several
+    pollers (app and worker replicas) can run at once: claiming a retry
+    hides it from the others until it is finished or its claim times out.
+
+    The poller also releases messages parked by open circuit breakers once
+    the breaker lets calls through again.
+    """
+
+    def __init__(self, concurrency: Optional[int] = None):
+        """Initialize retry poller."""
+        self.queue = retry_queue
+        self.processor = message_processor
+        self.concurrency = concurrency or settings.delivery_concurrency
+        self._running: set[asyncio.Task] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start polling in a background task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+            logger.info("retry_poller_started", concurrency=self.concurrency)
+
+    async def stop(self) -> None:
+        """Stop polling and wait for the retries already started."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        # Unfinished retries become due again after their claim times out
+        if self._running:
+            await asyncio.wait(
+                self._running,
+                timeout=settings.delivery_shutdown_timeout_seconds,
+            )
+        logger.info("retry_poller_stopped")
+
+    async def run(self) -> None:
+        """Claim due retries and run them until cancelled."""
+        while True:
+            await self.release_deferred()
+
+            try:
+                free = self.concurrency - len(self._running)
+                items = await self.queue.claim_due(free) if free > 0 else []
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("retry_poller_claim_failed", error=str(e))
+                items = []
+
+            for raw_item, item in items:
+                task = asyncio.create_task(self.run_retry(raw_item, item))
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+
+            if not items:
+                await asyncio.sleep(settings.retry_poll_interval_seconds)
+
+    async def release_deferred(self) -> None:
+        """Move messages parked by circuit breakers back into the retry queue."""
+        for breaker in circuit_breakers.values():
+            try:
+                await breaker.release_deferred()
+            except Exception as e:
+                logger.error(
+                    "deferred_release_failed",
+                    circuit=breaker.name,
+                    error=str(e),
+                )
+
+    async def run_retry(self, raw_item: str, item: dict) -> None:
+        """Process one scheduled retry and remove it from the queue."""
+        try:
+            await self.processor.retry_message(
+                item["source_platform"],
+                item["message_data"],
+                item["attempt"],
+            )
+        except (
+            RetryScheduledError,
+            DeadLetteredError,
+            LoopDetectedError,
+            MappingNotFoundError,
+        ):
+            # The processor has logged and recorded the outcome
+            pass
+        except Exception as e:
+            # Leave it claimed; it becomes due again after the timeout
+            logger.error(
+                "message_retry_failed",
+                source_platform=item["source_platform"],
+                attempt=item["attempt"],
+                error=str(e),
+                error_type=type(e).__name__,
+            )
+            return
+
+        try:
+            await self.queue.complete(raw_item)
+        except Exception as e:
+            logger.error("message_retry_complete_failed", error=str(e))
+
+
+# Global retry poller instance
+retry_poller = RetryPoller()
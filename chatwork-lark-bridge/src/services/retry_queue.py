@@ -0,0 +1,145 @@
+"""Delayed retry queue for failed sends, backed by a Redis sorted set."""
+
+import json
+import time
+import uuid
+from typing import Optional
+
+from ..core.config import settings
+from ..core.exceptions import RateLimitError
+from ..core.logging import get_logger
+from .redis_client import RedisClient, redis_client
+
+logger = get_logger(__name__)
+
+# Return items due by ARGV[1] (ms) and push their score to ARGV[3], so a
+# poller that dies before finishing them lets them become due again.
+CLAIM_DUE_SCRIPT = """
+local items = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+for _, item in ipairs(items) do
+    redis.call('ZADD', KEYS[1], ARGV[3], item)
+end
+return items
+"""
+
+
+class RetryQueue:
+    """
+    Sends waiting for their next attempt, scored by next-attempt time.
+
+    Nothing holds a coroutine, request slot or connection while a retry
+    waits, and scheduled retries survive pod restarts. ``RetryPoller``
+    runs them again once they are due.
+    """
+
+    def __init__(self, redis: Optional[RedisClient] = None):
+        """
+        Initialize the retry queue.
+
+        Args:
+            redis: Redis client (defaults to the global instance)
+        """
+        self.redis = redis or redis_client
+
+    @property
+    def key(self) -> str:
+        """Sorted set of scheduled retries."""
+        return settings.retry_queue_key
+
+    @staticmethod
+    def backoff(error: Exception, attempt: int) -> float:
+        """
+        Seconds to wait before the next attempt.
+
+        Args:
+            error: Error of the failed attempt
+            attempt: Number of the failed attempt (0 = first)
+
+        Returns:
+            The platform's retry_after for rate limits, otherwise an
+            exponential backoff capped at retry_max_wait_seconds
+        """
+        if isinstance(error, RateLimitError) and error.retry_after:
+            return error.retry_after
+        return min(
+            settings.retry_max_wait_seconds,
+            settings.retry_min_wait_seconds * (2**attempt),
+        )
+
+    @staticmethod
+    def encode(
+        source_platform: str,
+        message_data: dict,
+        attempt: int,
+        error: str,
+    ) -> str:
+        """Serialize a retry item (unique, so equal messages never collide)."""
+        return json.dumps(
+            {
+                "id": uuid.uuid4().hex,
+                "source_platform": source_platform,
+                "message_data": message_data,
+                "attempt": attempt,
+                "error": error,
+            }
+        )
+
+    async def schedule(
+        self,
+        source_platform: str,
+        message_data: dict,
+        attempt: int,
+        delay_seconds: float,
+        error: str,
+    ) -> None:
+        """
+        Schedule a message to be processed again.
+
+        Args:
+            source_platform: Platform the message came from
+            message_data: Keyword arguments of the message processor call
+            attempt: Number of the attempt being scheduled
+            delay_seconds: Seconds until the attempt is due
+            error: Error of the previous attempt
+        """
+        item = self.encode(source_platform, message_data, attempt, error)
+        due_ms = int((time.time() + delay_seconds) * 1000)
+        await self.redis.client.zadd(self.key, {item: due_ms})
+
+        logger.info(
+            "message_retry_scheduled",
+            source_platform=source_platform,
+            message_id=message_data.get("message_id"),
+            attempt=attempt,
+            delay_seconds=delay_seconds,
+        )
+
+    async def claim_due(self, limit: int = 100) -> list[tuple[str, dict]]:
+        """
+        Take retries that are due, hiding them for retry_claim_timeout_seconds.
+
+        Args:
+            limit: Maximum number of retries to take
+
+        Returns:
+            (raw item, decoded item) pairs; pass the raw item to ``complete``
+        """
+        now_ms = int(time.time() * 1000)
+        items = await self.redis.run_script(
+            CLAIM_DUE_SCRIPT,
+            [self.key],
+            [now_ms, limit, now_ms + settings.retry_claim_timeout_seconds * 1000],
+        )
+        return [(item, json.loads(item)) for item in items]
+
+    async def complete(self, raw_item: str) -> None:
+        """Remove a retry that has been run."""
+        await self.redis.client.zrem(self.key, raw_item)
+
+    async def depth(self) -> int:
+        """Number of scheduled retries."""
+        return await self.redis.client.zcard(self.key)
+
+
+# Global retry queue instance
+retry_queue = RetryQueue()
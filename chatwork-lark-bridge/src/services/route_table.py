@@ -0,0 +1,175 @@
+"""In-process copy of the room routing table, kept fresh through Redis pub/sub."""
+
+import asyncio
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping, Optional
+
+from ..core.config import settings
+from ..core.logging import get_logger
+from .redis_client import RedisClient, redis_client
+
+logger = get_logger(__name__)
+
+VERSION_KEY = "routes:version"
+CHANGES_CHANNEL = "routes:changed"
+PLATFORMS = ("chatwork", "lark")
+
+
+@dataclass(frozen=True)
+class Route:
+    """Where messages from one room go."""
+
+    target_room_id: str
+    sync_direction: str = "both"
+
+
+class RouteTable:
+    """
+    Immutable snapshot of the room mappings loaded by ``MappingLoader``.
+
+    Route lookups are plain dict reads. Whoever changes mappings in Redis
+    calls ``notify_changed``, which bumps ``routes:version`` and publishes
+    the new version; every running table reloads and swaps in a new
+    snapshot. The version is also checked every
+    ``route_table_check_interval_seconds`` in case a notification was
+    missed while the subscription was down.
+
+    Until the first load succeeds the table is not ``ready`` and callers
+    should read routes from Redis.
+    """
+
+    def __init__(self, redis: Optional[RedisClient] = None):
+        """
+        Initialize the route table.
+
+        Args:
+            redis: Redis client (defaults to the global instance)
+        """
+        self.redis = redis or redis_client
+        self._routes: Mapping[str, Route] = MappingProxyType({})
+        self.version: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        """Whether a snapshot has been loaded."""
+        return self.version is not None
+
+    def lookup(self, platform: str, room_id: str) -> Optional[Route]:
+        """Route of a room, or None if the snapshot has no mapping for it."""
+        return self._routes.get(f"{platform}:{room_id}")
+
+    def __len__(self) -> int:
+        return len(self._routes)
+
+    def tables(self) -> dict[str, dict[str, str]]:
+        """The snapshot as ``rooms:{platform}``/``room_directions:{platform}`` tables."""
+        tables: dict[str, dict[str, str]] = {}
+        for platform in PLATFORMS:
+            tables[f"rooms:{platform}"] = {}
+            tables[f"room_directions:{platform}"] = {}
+        for key, route in self._routes.items():
+            platform, _, room_id = key.partition(":")
+            tables[f"rooms:{platform}"][room_id] = route.target_room_id
+            tables[f"room_directions:{platform}"][room_id] = route.sync_direction
+        return tables
+
+    async def refresh(self) -> int:
+        """
+        Load the ``rooms:{platform}`` hashes and swap in the new snapshot.
+
+        Returns:
+            Version of the loaded snapshot
+        """
+        client = self.redis.client
+        # Read the version first: a change made while reading bumps it
+        # again, so the next check reloads.
+        version = int(await client.get(VERSION_KEY) or 0)
+
+        async with client.pipeline(transaction=False) as pipe:
+            for platform in PLATFORMS:
+                pipe.hgetall(f"rooms:{platform}")
+                pipe.hgetall(f"room_directions:{platform}")
+            tables = await pipe.execute()
+
+        routes = {}
+        for i, platform in enumerate(PLATFORMS):
+            targets, directions = tables[2 * i], tables[2 * i + 1]
+            for room_id, target in targets.items():
+                routes[f"{platform}:{room_id}"] = Route(
+                    target, directions.get(room_id, "both")
+                )
+
+        self._routes = MappingProxyType(routes)
+        self.version = version
+        logger.info("route_table_loaded", routes=len(routes), version=version)
+        return version
+
+    async def notify_changed(self) -> int:
+        """
+        Tell every route table that the mappings in Redis changed.
+
+        Returns:
+            The new routing table version
+        """
+        version = await self.redis.client.incr(VERSION_KEY)
+        await self.redis.client.publish(CHANGES_CHANNEL, version)
+        return version
+
+    async def check_version(self) -> None:
+        """Reload if Redis holds a newer version than the snapshot."""
+        version = int(await self.redis.client.get(VERSION_KEY) or 0)
+        if version != self.version:
+            await self.refresh()
+
+    async def start(self) -> None:
+        """Load the table and follow changes in a background task."""
+        if self._task is not None:
+            return
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.error("route_table_load_failed", error=str(e))
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop following changes."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._follow()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("route_table_subscription_lost", error=str(e))
+                await asyncio.sleep(settings.route_table_check_interval_seconds)
+
+    async def _follow(self) -> None:
+        async with self.redis.pubsub() as pubsub:
+            await pubsub.subscribe(CHANGES_CHANNEL)
+            # Catch up on changes made while not subscribed
+            await self.check_version()
+
+            while True:
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True,
+                    timeout=settings.route_table_check_interval_seconds,
+                )
+                if message is None:
+                    await self.check_version()
+                elif int(message["data"]) != self.version:
+                    await self.refresh()
+
+
+# Global route table instance
+route_table = RouteTable()
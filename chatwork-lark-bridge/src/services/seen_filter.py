@@ -0,0 +1,105 @@
+"""Per-process "never seen" filter for message IDs."""
+
+import hashlib
+import math
+import time
+from typing import Optional
+
+
+class BloomFilter:
+    """
+    Plain Bloom filter over a bytearray.
+
+    Sized for ``capacity`` items at ``error_rate`` false positives; the
+    ``k`` bit positions come from one BLAKE2b digest (double hashing).
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        """
+        Initialize the filter.
+
+        Args:
+            capacity: Items the filter is sized for
+            error_rate: False positive rate at that many items
+        """
+        self.bits = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self._array = bytearray((self.bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str) -> list[int]:
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def add(self, item: str) -> None:
+        """Add an item."""
+        for position in self._positions(item):
+            self._array[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self._array[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+
+class SeenFilter:
+    """
+    Rotating Bloom filter answering "definitely never seen".
+
+    One slice per mapping window (``message_ttl_seconds``, the same windows
+    as the ``msgmap`` buckets), keeping the current and previous slice like
+    the buckets do, so a slice is dropped once the mappings it stands for
+    are out of reach. ``might_contain`` returning False means the item was
+    not added to either slice; True means "maybe" and the caller has to
+    ask Redis.
+    """
+
+    def __init__(self, capacity: int, error_rate: float, window_seconds: int):
+        """
+        Initialize the filter.
+
+        Args:
+            capacity: Items per window each slice is sized for
+            error_rate: False positive rate of a slice at capacity
+            window_seconds: Length of a window
+        """
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.window_seconds = window_seconds
+        self._slices: dict[int, BloomFilter] = {}
+
+    def _window(self, now: Optional[float] = None) -> int:
+        return int(now if now is not None else time.time()) // self.window_seconds
+
+    def _slice(self, window: int) -> BloomFilter:
+        current = self._window()
+        for stale in [w for w in self._slices if w < current - 1]:
+            del self._slices[stale]
+        if window not in self._slices:
+            self._slices[window] = BloomFilter(self.capacity, self.error_rate)
+        return self._slices[window]
+
+    def add(self, item: str, window: Optional[int] = None) -> None:
+        """Add an item to the slice of ``window`` (default: the current one)."""
+        self._slice(self._window() if window is None else window).add(item)
+
+    def might_contain(self, item: str) -> bool:
+        """False if the item is definitely not in the current or previous slice."""
+        current = self._window()
+        return any(
+            item in bloom
+            for window, bloom in self._slices.items()
+            if window >= current - 1
+        )
+
+    def clear(self) -> None:
+        """Forget everything (before a rebuild)."""
+        self._slices.clear()
+
+    def __len__(self) -> int:
+        current = self._window()
+        return sum(b.count for w, b in self._slices.items() if w >= current - 1)
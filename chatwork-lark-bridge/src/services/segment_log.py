@@ -0,0 +1,126 @@
+"""Append-only segment files buffering writes while Redis is unreachable."""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import IO, Iterator, Optional
+
+from ..core.logging import get_logger
+
+logger = get_logger(__name__)
+
+OPEN_SUFFIX = ".open"
+SEALED_SUFFIX = ".log"
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class SegmentLog:
+    """
+    JSON-lines records in a directory of segment files.
+
+    Records are appended to this process's open segment
+    (``{time_ns}-{pid}.open``), flushed after every record so they survive
+    a crash of the process (and fsynced too with ``fsync``). A segment is
+    sealed (renamed to ``.log``) when it grows past ``max_bytes`` or when
+    its records are about to be replayed; sealed segments sort in the
+    order they were started and are removed once replayed.
+
+    Replaying a segment twice must be harmless, so any process sharing the
+    directory may replay any sealed segment.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, fsync: bool = False):
+        """
+        Initialize the log.
+
+        Args:
+            directory: Where segments are kept (created on first use)
+            max_bytes: Size at which the open segment is sealed
+            fsync: fsync after every record, not only flush
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.fsync = fsync
+        self._file: Optional[IO[str]] = None
+        self._path: Optional[Path] = None
+        self.appended = 0
+
+    def recover(self) -> int:
+        """
+        Seal segments left open by processes that are gone.
+
+        Returns:
+            Number of segments sealed
+        """
+        if not self.directory.exists():
+            return 0
+        sealed = 0
+        for path in self.directory.glob(f"*{OPEN_SUFFIX}"):
+            if path == self._path:
+                continue
+            pid = int(path.stem.rpartition("-")[2])
+            # PID 1 is this process again after a container restart
+            if pid == os.getpid() or not _pid_alive(pid):
+                path.rename(path.with_suffix(SEALED_SUFFIX))
+                sealed += 1
+        return sealed
+
+    def append(self, record: dict) -> None:
+        """Write one record to the open segment."""
+        if self._file is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._path = (
+                self.directory / f"{time.time_ns():020d}-{os.getpid()}{OPEN_SUFFIX}"
+            )
+            self._file = self._path.open("a", encoding="utf-8")
+
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self.appended += 1
+
+        if self._file.tell() >= self.max_bytes:
+            self.seal()
+
+    def seal(self) -> None:
+        """Close the open segment so it can be replayed."""
+        if self._file is None:
+            return
+        self._file.close()
+        self._path.rename(self._path.with_suffix(SEALED_SUFFIX))
+        self._file = None
+        self._path = None
+
+    def sealed(self) -> list[Path]:
+        """Sealed segments, oldest first."""
+        if not self.directory.exists():
+            return []
+        return sorted(self.directory.glob(f"*{SEALED_SUFFIX}"))
+
+    def read(self, path: Path) -> Iterator[dict]:
+        """Records of a segment (a torn last line is skipped)."""
+        try:
+            with path.open(encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        logger.warning("segment_record_unreadable", segment=path.name)
+        except FileNotFoundError:
+            # Replayed and removed by another process meanwhile
+            return
+
+    def remove(self, path: Path) -> None:
+        """Delete a replayed segment."""
+        path.unlink(missing_ok=True)
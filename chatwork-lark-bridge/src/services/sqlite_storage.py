@@ -0,0 +1,293 @@
+"""SQLite storage backend for single-node sites."""
+
+import asyncio
+import functools
+import json
+import random
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Iterable, Iterator, Optional
+
+from ..core.exceptions import BridgeException
+from ..core.logging import get_logger
+from .memory_storage import PURGE_EVERY_WRITES, MemoryStorage
+
+logger = get_logger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS kv (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    expires_at REAL
+);
+CREATE INDEX IF NOT EXISTS kv_expires_at ON kv (expires_at);
+CREATE TABLE IF NOT EXISTS tables (
+    name TEXT NOT NULL,
+    field TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (name, field)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS dlq (
+    entry_id TEXT PRIMARY KEY,
+    source_platform TEXT NOT NULL,
+    error_type TEXT NOT NULL,
+    value TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+# Wait this long for another process holding the write lock. SQLite's own
+# busy handler would sleep on the event loop thread, so it is turned off and
+# locked calls are retried with an async backoff instead.
+LOCK_WAIT_SECONDS = 5.0
+LOCK_RETRY_MIN_SECONDS = 0.001
+LOCK_RETRY_MAX_SECONDS = 0.05
+
+
+def _is_locked(error: sqlite3.OperationalError) -> bool:
+    return "locked" in str(error) or "busy" in str(error)
+
+
+def _retry_when_locked(
+    method: Callable[..., Awaitable[Any]]
+) -> Callable[..., Awaitable[Any]]:
+    """Wrap a storage method so it is retried while the database is locked."""
+
+    @functools.wraps(method)
+    async def wrapper(self: "SQLiteStorage", *args, **kwargs):
+        return await self._when_unlocked(method, self, *args, **kwargs)
+
+    return wrapper
+
+
+class SQLiteStorage(MemoryStorage):
+    """
+    Storage in a local SQLite database (see ``storage.Storage``).
+
+    The database runs in WAL mode with ``synchronous=NORMAL``: readers never
+    block the writer, and a commit costs an append to the log rather than
+    an fsync of the database, while a crash loses at most the last commits
+    (never consistency). Claims and ``prepare_send`` run in ``BEGIN
+    IMMEDIATE`` transactions, so several processes on the same host share
+    dedup like they would through Redis.
+
+    Statements are short and run on the event loop thread; the values,
+    tables and DLQ rows mirror ``MemoryStorage``. Nothing waits inside
+    SQLite for a lock another process holds: the busy timeout is zero, and
+    a call that finds the database locked is rolled back and retried after
+    an ``asyncio.sleep`` (for up to ``LOCK_WAIT_SECONDS``), so the other
+    coroutines keep running meanwhile.
+    """
+
+    backend = "sqlite"
+
+    def __init__(self, path: str):
+        """
+        Initialize the storage.
+
+        Args:
+            path: Database file (created with its directory on connect)
+        """
+        super().__init__()
+        self.path = path
+        self._db: Optional[sqlite3.Connection] = None
+        self._depth = 0
+
+    async def connect(self) -> None:
+        """Open the database and create the schema."""
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(
+            self.path, isolation_level=None, check_same_thread=False
+        )
+        self._db.execute("PRAGMA busy_timeout=0")
+        await self._when_unlocked(self._setup)
+        self._connected = True
+        logger.info("storage_ready", backend=self.backend, path=self.path)
+
+    async def _setup(self) -> None:
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+        with self._transaction():
+            self.db.execute("DELETE FROM kv WHERE expires_at <= ?", (time.time(),))
+
+    async def disconnect(self) -> None:
+        """Close the database."""
+        if self._db:
+            self._db.close()
+            self._db = None
+        self._connected = False
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        """Get the database connection."""
+        if not self._db:
+            raise BridgeException("SQLite storage not connected")
+        return self._db
+
+    async def health_check(self) -> bool:
+        """Check the database answers."""
+        try:
+            self.db.execute("SELECT 1").fetchone()
+            return True
+        except (BridgeException, sqlite3.Error) as e:
+            logger.error(
+                "storage_health_check_failed", backend=self.backend, error=str(e)
+            )
+            return False
+
+    async def _when_unlocked(
+        self, func: Callable[..., Awaitable[Any]], *args, **kwargs
+    ) -> Any:
+        """Run a storage call, backing off asynchronously while the database is locked."""
+        delay = LOCK_RETRY_MIN_SECONDS
+        deadline = time.monotonic() + LOCK_WAIT_SECONDS
+        while True:
+            try:
+                return await func(*args, **kwargs)
+            except sqlite3.OperationalError as e:
+                if not _is_locked(e) or time.monotonic() >= deadline:
+                    raise
+            await asyncio.sleep(delay * random.uniform(0.5, 1.5))
+            delay = min(delay * 2, LOCK_RETRY_MAX_SECONDS)
+
+    claim_message = _retry_when_locked(MemoryStorage.claim_message)
+    prepare_send = _retry_when_locked(MemoryStorage.prepare_send)
+    release_message_claim = _retry_when_locked(MemoryStorage.release_message_claim)
+    save_message_mapping = _retry_when_locked(MemoryStorage.save_message_mapping)
+    get_message_mapping = _retry_when_locked(MemoryStorage.get_message_mapping)
+    get_counterpart = _retry_when_locked(MemoryStorage.get_counterpart)
+    is_message_processed = _retry_when_locked(MemoryStorage.is_message_processed)
+    get_room_mapping = _retry_when_locked(MemoryStorage.get_room_mapping)
+    set_room_mapping = _retry_when_locked(MemoryStorage.set_room_mapping)
+    get_user_mapping = _retry_when_locked(MemoryStorage.get_user_mapping)
+    set_user_mapping = _retry_when_locked(MemoryStorage.set_user_mapping)
+    replace_tables = _retry_when_locked(MemoryStorage.replace_tables)
+    sync_tables = _retry_when_locked(MemoryStorage.sync_tables)
+    add_to_failed_queue = _retry_when_locked(MemoryStorage.add_to_failed_queue)
+    restore_failed_messages = _retry_when_locked(MemoryStorage.restore_failed_messages)
+    get_failed_messages = _retry_when_locked(MemoryStorage.get_failed_messages)
+    count_failed_messages = _retry_when_locked(MemoryStorage.count_failed_messages)
+    remove_failed_messages = _retry_when_locked(MemoryStorage.remove_failed_messages)
+    get_record = _retry_when_locked(MemoryStorage.get_record)
+    put_record = _retry_when_locked(MemoryStorage.put_record)
+
+    # Primitives
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        # Reentrant: only the outermost call begins and commits
+        if self._depth == 0:
+            self.db.execute("BEGIN IMMEDIATE")
+        self._depth += 1
+        try:
+            yield
+        except BaseException:
+            self._depth -= 1
+            if self._depth == 0:
+                self.db.execute("ROLLBACK")
+            raise
+        self._depth -= 1
+        if self._depth == 0:
+            try:
+                self.db.execute("COMMIT")
+            except sqlite3.Error:
+                # Leave no transaction open for the retry
+                self.db.execute("ROLLBACK")
+                raise
+
+    def _get(self, key: str) -> Optional[str]:
+        row = self.db.execute(
+            "SELECT value FROM kv WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (key, time.time()),
+        ).fetchone()
+        return row[0] if row else None
+
+    def _set(self, key: str, value: str, ttl: Optional[float]) -> None:
+        now = time.time()
+        self.db.execute(
+            "INSERT OR REPLACE INTO kv (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, value, now + ttl if ttl else None),
+        )
+        self._writes += 1
+        if self._writes % PURGE_EVERY_WRITES == 0:
+            self.db.execute("DELETE FROM kv WHERE expires_at <= ?", (now,))
+
+    def _delete(self, key: str) -> None:
+        self.db.execute("DELETE FROM kv WHERE key = ?", (key,))
+
+    def _table_get(self, name: str, field: str) -> Optional[str]:
+        row = self.db.execute(
+            "SELECT value FROM tables WHERE name = ? AND field = ?", (name, field)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _table_all(self, name: str) -> dict[str, str]:
+        return dict(
+            self.db.execute("SELECT field, value FROM tables WHERE name = ?", (name,))
+        )
+
+    def _table_write(
+        self,
+        name: str,
+        changes: dict[str, str],
+        stale: Iterable[str],
+        replace: bool = False,
+    ) -> None:
+        if replace:
+            self.db.execute("DELETE FROM tables WHERE name = ?", (name,))
+        self.db.executemany(
+            "INSERT OR REPLACE INTO tables (name, field, value) VALUES (?, ?, ?)",
+            [(name, field, value) for field, value in changes.items()],
+        )
+        self.db.executemany(
+            "DELETE FROM tables WHERE name = ? AND field = ?",
+            [(name, field) for field in stale],
+        )
+
+    def _dlq_has(self, entry_id: str) -> bool:
+        return (
+            self.db.execute(
+                "SELECT 1 FROM dlq WHERE entry_id = ?", (entry_id,)
+            ).fetchone()
+            is not None
+        )
+
+    def _dlq_insert(self, entry_id: str, value: dict) -> None:
+        self.db.execute(
+            "INSERT INTO dlq (entry_id, source_platform, error_type, value) VALUES (?, ?, ?, ?)",
+            (
+                entry_id,
+                value.get("source_platform", "unknown"),
+                value.get("error_type", "unknown"),
+                json.dumps(value),
+            ),
+        )
+
+    def _dlq_page(self, after: Optional[str], limit: int) -> list[tuple[str, str]]:
+        return self.db.execute(
+            "SELECT entry_id, value FROM dlq WHERE entry_id > ? ORDER BY entry_id LIMIT ?",
+            (after or "", limit),
+        ).fetchall()
+
+    def _dlq_delete(self, entry_ids: list[str]) -> int:
+        before = self.db.total_changes
+        self.db.executemany(
+            "DELETE FROM dlq WHERE entry_id = ?",
+            [(entry_id,) for entry_id in entry_ids],
+        )
+        return self.db.total_changes - before
+
+    def _dlq_counts(self) -> tuple[int, dict[str, int]]:
+        counts: dict[str, int] = {}
+        total = 0
+        for column, group in (("source_platform", "platform"), ("error_type", "error")):
+            rows = self.db.execute(
+                f"SELECT {column}, COUNT(*) FROM dlq GROUP BY {column}"
+            ).fetchall()
+            for name, count in rows:
+                counts[f"{group}:{name}"] = count
+                if group == "platform":
+                    total += count
+        return total, counts
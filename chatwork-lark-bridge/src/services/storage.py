@@ -0,0 +1,147 @@
+"""Storage backend used for dedup, mappings and the DLQ."""
+
+from typing import Optional, Protocol
+
+from ..core.config import settings
+from .degraded_storage import DegradedStorage
+from .memory_storage import MemoryStorage
+from .redis_client import SendClaim, redis_client
+from .sqlite_storage import SQLiteStorage
+
+STORAGE_BACKENDS = ("redis", "memory", "sqlite")
+
+
+class Storage(Protocol):
+    """
+    What the message pipeline needs from its store.
+
+    ``RedisClient`` is the shared, multi-replica implementation
+    (wrapped in ``DegradedStorage`` to ride out Redis outages).
+    ``MemoryStorage`` (in-process) and ``SQLiteStorage`` (a local WAL
+    database) have the same semantics for claims, mapping TTLs, room and
+    user tables and the DLQ, for single-node sites that do not want a
+    network hop per operation. Features built on Redis itself (the event
+    stream, deferred retries, shared circuit breakers and rate limits, the
+    route table) stay Redis-only.
+    """
+
+    async def connect(self) -> None: ...
+
+    async def disconnect(self) -> None: ...
+
+    def is_connected(self) -> bool: ...
+
+    async def health_check(self) -> bool: ...
+
+    # Dedup and message mappings
+    async def claim_message(self, platform: str, message_id: str) -> Optional[str]: ...
+
+    async def prepare_send(
+        self, source_platform: str, source_room_id: str, message_id: str
+    ) -> SendClaim: ...
+
+    async def release_message_claim(
+        self, platform: str, message_id: str, claim: str
+    ) -> None: ...
+
+    async def save_message_mapping(
+        self,
+        source_platform: str,
+        source_message_id: str,
+        target_platform: str,
+        target_message_id: str,
+        room_mapping_id: Optional[str] = None,
+    ) -> None: ...
+
+    async def get_message_mapping(
+        self, platform: str, message_id: str
+    ) -> Optional[dict]: ...
+
+    async def get_counterpart(
+        self, platform: str, message_id: str
+    ) -> Optional[dict]: ...
+
+    async def is_message_processed(self, platform: str, message_id: str) -> bool: ...
+
+    # Room and user mappings
+    async def get_room_mapping(
+        self, source_platform: str, source_room_id: str
+    ) -> Optional[str]: ...
+
+    async def set_room_mapping(
+        self,
+        source_platform: str,
+        source_room_id: str,
+        target_room_id: str,
+        ttl: int = 3600,
+        sync_direction: Optional[str] = None,
+    ) -> None: ...
+
+    async def get_user_mapping(
+        self, source_platform: str, source_user_id: str
+    ) -> Optional[dict]: ...
+
+    async def set_user_mapping(
+        self,
+        source_platform: str,
+        source_user_id: str,
+        user_data: dict,
+        ttl: int = 3600,
+    ) -> None: ...
+
+    async def replace_tables(self, tables: dict[str, dict[str, str]]) -> None: ...
+
+    async def sync_tables(
+        self, tables: dict[str, dict[str, str]]
+    ) -> tuple[int, int]: ...
+
+    # DLQ
+    async def add_to_failed_queue(
+        self,
+        source_platform: str,
+        target_platform: str,
+        message_data: dict,
+        error: str,
+        retry_count: int = 0,
+        error_type: Optional[str] = None,
+    ) -> str: ...
+
+    async def get_failed_messages(
+        self, limit: int = 100, after: Optional[str] = None
+    ) -> list[tuple[str, dict]]: ...
+
+    async def count_failed_messages(self) -> dict: ...
+
+    async def remove_failed_messages(self, entries: list[tuple[str, dict]]) -> int: ...
+
+    # Small expiring records (e.g. DLQ replay progress)
+    async def get_record(self, key: str) -> dict[str, str]: ...
+
+    async def put_record(self, key: str, fields: dict[str, str], ttl: int) -> None: ...
+
+
+def create_storage(backend: Optional[str] = None) -> Storage:
+    """
+    Storage selected by ``storage_backend``.
+
+    Raises:
+        ValueError: For an unknown backend, or a local backend combined
+            with a feature that needs Redis
+    """
+    backend = backend or settings.storage_backend
+    if backend == "redis":
+        return DegradedStorage() if settings.degraded_mode_enabled else redis_client
+    if backend not in STORAGE_BACKENDS:
+        raise ValueError(f"Unknown storage_backend: {backend}")
+    if settings.queue_ingest_enabled or settings.retry_mode == "deferred":
+        raise ValueError(
+            f"storage_backend={backend} needs INGEST_MODE=inline and RETRY_MODE=inline "
+            "(the event queue and deferred retries run on Redis)"
+        )
+    if backend == "memory":
+        return MemoryStorage()
+    return SQLiteStorage(settings.sqlite_path)
+
+
+# Global storage instance
+storage = create_storage()
@@ -0,0 +1,73 @@
+"""Standalone delivery worker.
+
+Run with ``python -m src.worker``. Web pods started with
+``INGEST_MODE=queue`` and ``EMBEDDED_DELIVERY_WORKER=false`` only
+acknowledge webhooks; worker pods read the event stream and perform the
+outbound delivery, so the two can be scaled independently.
+"""
+
+import asyncio
+import signal
+
+from .core.config import settings
+from .core.logging import get_logger, setup_logging
+from .services.chatwork_client import chatwork_client
+from .services.delivery_worker import DeliveryWorker
+from .services.health_prober import health_prober
+from .services.lark_client import lark_client
+from .services.retry_poller import retry_poller
+from .services.route_table import route_table
+from .services.storage import storage
+
+# Setup logging
+setup_logging()
+logger = get_logger(__name__)
+
+
+async def run_worker() -> None:
+    """Run the delivery worker until SIGINT/SIGTERM."""
+    logger.info(
+        "worker_starting",
+        env=settings.env,
+        concurrency=settings.delivery_concurrency,
+    )
+
+    if settings.storage_backend != "redis":
+        raise ValueError(
+            f"storage_backend={settings.storage_backend} has no event queue to deliver from"
+        )
+
+    # Connect like the web app does (degraded mode wraps Redis when enabled)
+    await storage.connect()
+    lark_client.start()
+    await route_table.start()
+    await health_prober.start()
+    worker = DeliveryWorker()
+
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop_event.set)
+
+    try:
+        await worker.start()
+        retry_poller.start()
+        await stop_event.wait()
+    finally:
+        logger.info("worker_shutting_down", consumer=worker.consumer_name)
+        await retry_poller.stop()
+        await worker.stop()
+        await health_prober.stop()
+        await route_table.stop()
+        await storage.disconnect()
+        await chatwork_client.close()
+        await lark_client.close()
+
+
+def main() -> None:
+    """Worker entry point."""
+    asyncio.run(run_worker())
+
+
+if __name__ == "__main__":
+    main()
@@ -17,7 +17,7 @@ class TestBidirectionalMessageFlow:
 
     @pytest.mark.asyncio
     async def test_chatwork_to_lark_complete_flow(
-        self, async_client, fake_redis
+        self, async_client, fake_redis, redis_client
     ):
         """Test complete message flow from Chatwork to Lark."""
         # 1. Setup room mapping
@@ -61,18 +61,16 @@ class TestBidirectionalMessageFlow:
         assert response.status_code == 200
 
         # 6. Verify message mapping was saved in Redis
-        mapping_key = "msg:chatwork:999"
-        mapping_data = await fake_redis.get(mapping_key)
+        mapping = await redis_client.get_message_mapping("chatwork", "999")
 
-        if mapping_data:
-            mapping = json.loads(mapping_data)
+        if mapping:
             assert mapping["source_platform"] == "chatwork"
             assert mapping["target_platform"] == "lark"
             assert mapping["target_message_id"] == "om_test123"  # From conftest mock
 
     @pytest.mark.asyncio
     async def test_lark_to_chatwork_complete_flow(
-        self, async_client, fake_redis
+        self, async_client, fake_redis, redis_client
     ):
         """Test complete message flow from Lark to Chatwork."""
         # 1. Setup room mapping
@@ -89,7 +87,7 @@ class TestBidirectionalMessageFlow:
                 "event_id": "evt_123",
                 "event_type": "im.message.receive_v1",
                 "create_time": "1234567890",
-                "token": settings.lark_verification_token,
+                "token": "test_verification_token",
                 "app_id": "cli_test",
                 "tenant_key": "tenant_test",
             },
@@ -119,11 +117,9 @@ class TestBidirectionalMessageFlow:
         assert response.status_code == 200
 
         # 5. Verify message mapping was saved in Redis
-        mapping_key = "msg:lark:om_lark_456"
-        mapping_data = await fake_redis.get(mapping_key)
+        mapping = await redis_client.get_message_mapping("lark", "om_lark_456")
 
-        if mapping_data:
-            mapping = json.loads(mapping_data)
+        if mapping:
             assert mapping["source_platform"] == "lark"
             assert mapping["target_platform"] == "chatwork"
             assert mapping["target_message_id"] == "999"  # From conftest mock
@@ -173,7 +169,7 @@ class TestBidirectionalMessageFlow:
                 "event_id": "evt_loop",
                 "event_type": "im.message.receive_v1",
                 "create_time": "1234567890",
-                "token": settings.lark_verification_token,
+                "token": "test_verification_token",
                 "app_id": "cli_test",
                 "tenant_key": "tenant_test",
             },
@@ -183,9 +179,9 @@ class TestBidirectionalMessageFlow:
                     "message_id": "om_123",  # Same message
                     "message_type": "text",
                     "chat_id": "oc_test",
-                    "content": json.dumps({
-                        "text": "[From Chatwork] User: Original Chatwork message"
-                    }),
+                    "content": json.dumps(
+                        {"text": "[From Chatwork] User: Original Chatwork message"}
+                    ),
                 },
             },
         }
@@ -222,7 +218,7 @@ class TestBidirectionalMessageFlow:
                 "event_id": "evt_original",
                 "event_type": "im.message.receive_v1",
                 "create_time": "1234567890",
-                "token": settings.lark_verification_token,
+                "token": "test_verification_token",
                 "app_id": "cli_test",
                 "tenant_key": "tenant_test",
             },
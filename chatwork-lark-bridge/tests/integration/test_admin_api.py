@@ -0,0 +1,101 @@
+"""Integration tests for admin endpoints."""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+import src.api.admin as admin_module
+
+
+@pytest.mark.integration
+class TestAdminAPI:
+    """Test admin endpoint access and mapping reload."""
+
+    @pytest.mark.asyncio
+    async def test_disabled_without_token(self, async_client, monkeypatch):
+        """Test admin endpoints do not exist unless a token is configured."""
+        monkeypatch.setattr(admin_module.settings, "admin_token", None)
+
+        response = await async_client.post("/admin/mappings/reload")
+
+        assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_wrong_token_rejected(self, async_client, monkeypatch):
+        """Test a wrong admin token is refused."""
+        monkeypatch.setattr(admin_module.settings, "admin_token", "secret")
+
+        response = await async_client.post(
+            "/admin/mappings/reload",
+            headers={"X-Admin-Token": "wrong"},
+        )
+
+        assert response.status_code == 403
+
+    @pytest.mark.asyncio
+    async def test_reload_mappings(self, async_client, monkeypatch):
+        """Test the reload endpoint reports what changed."""
+        monkeypatch.setattr(admin_module.settings, "admin_token", "secret")
+
+        with patch.object(
+            admin_module.mapping_loader,
+            "reload",
+            AsyncMock(return_value={"updated": 2, "removed": 1}),
+        ):
+            response = await async_client.post(
+                "/admin/mappings/reload",
+                headers={"X-Admin-Token": "secret"},
+            )
+
+        assert response.status_code == 200
+        assert response.json() == {"status": "ok", "updated": 2, "removed": 1}
+
+    @pytest.mark.asyncio
+    async def test_dlq_pages_and_counts(self, async_client, redis_client, monkeypatch):
+        """Test DLQ entries are listed page by page and counted."""
+        monkeypatch.setattr(admin_module.settings, "admin_token", "secret")
+        headers = {"X-Admin-Token": "secret"}
+        for i in range(3):
+            await redis_client.add_to_failed_queue(
+                "chatwork",
+                "lark",
+                {"message_id": str(i)},
+                "down",
+                error_type="ServerError",
+            )
+
+        first = (await async_client.get("/admin/dlq?limit=2", headers=headers)).json()
+        second = (
+            await async_client.get(
+                f"/admin/dlq?limit=2&after={first['next']}", headers=headers
+            )
+        ).json()
+        counts = (await async_client.get("/admin/dlq/counts", headers=headers)).json()
+
+        assert len(first["entries"]) == 2
+        assert len(second["entries"]) == 1
+        assert second["next"] is None
+        assert counts["by_error"] == {"ServerError": 3}
+
+    @pytest.mark.asyncio
+    async def test_replay_dry_run(self, async_client, redis_client, monkeypatch):
+        """Test a dry-run replay reports the matching entries and their progress."""
+        monkeypatch.setattr(admin_module.settings, "admin_token", "secret")
+        headers = {"X-Admin-Token": "secret"}
+        await redis_client.add_to_failed_queue(
+            "chatwork", "lark", {"message_id": "1", "room_id": "111"}, "down"
+        )
+
+        response = await async_client.post(
+            "/admin/dlq/replay",
+            json={"platform": "chatwork", "dry_run": True, "run_id": "dry"},
+            headers=headers,
+        )
+        progress = await async_client.get("/admin/dlq/replay/dry", headers=headers)
+
+        assert response.status_code == 200
+        assert response.json()["matched"] == 1
+        assert progress.json()["status"] == "done"
+        assert (
+            await async_client.get("/admin/dlq/replay/unknown", headers=headers)
+        ).status_code == 404
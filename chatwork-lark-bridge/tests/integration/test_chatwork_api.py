@@ -176,3 +176,47 @@ class TestChatworkWebhook:
 
         assert response.status_code == 200
         assert response.json() == {"status": "ok"}
+
+    @pytest.mark.asyncio
+    async def test_chatwork_webhook_queue_mode(
+        self, async_client, chatwork_webhook_data, fake_redis, monkeypatch
+    ):
+        """Test queue ingest mode enqueues the event without processing it."""
+        import src.api.chatwork
+
+        monkeypatch.setattr(src.api.chatwork.settings, "ingest_mode", "queue")
+
+        # Generate valid signature
+        body = json.dumps(chatwork_webhook_data).encode()
+        secret = settings.chatwork_webhook_secret
+        decoded_secret = base64.b64decode(secret)
+        digest = hmac.new(decoded_secret, body, hashlib.sha256).digest()
+        signature = base64.b64encode(digest).decode()
+
+        with patch("src.api.chatwork.message_processor") as mock_processor:
+            mock_processor.process_chatwork_message = AsyncMock()
+            mock_processor.partition_key = AsyncMock(
+                return_value="cw_12345678_lark_oc_test_chat"
+            )
+
+            response = await async_client.post(
+                "/webhook/chatwork/",
+                json=chatwork_webhook_data,
+                headers={"X-ChatWorkWebhookSignature": signature},
+            )
+
+            assert response.status_code == 200
+            assert response.json() == {"status": "ok"}
+            mock_processor.process_chatwork_message.assert_not_called()
+            mock_processor.partition_key.assert_called_once_with("chatwork", "12345678")
+
+        from src.services.event_queue import event_queue, partition_for
+
+        stream = event_queue.partition_stream(
+            partition_for("cw_12345678_lark_oc_test_chat")
+        )
+        entries = await fake_redis.xrange(stream)
+        assert len(entries) == 1
+        _, fields = entries[0]
+        assert fields["platform"] == "chatwork"
+        assert json.loads(fields["payload"]) == chatwork_webhook_data
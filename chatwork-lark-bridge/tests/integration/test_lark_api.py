@@ -4,8 +4,6 @@ import json
 import pytest
 from unittest.mock import patch, AsyncMock
 
-from src.core.config import settings
-
 
 @pytest.mark.integration
 class TestLarkWebhook:
@@ -144,7 +142,7 @@ class TestLarkWebhook:
                 "event_id": "evt_123",
                 "event_type": "im.message.receive_v1",
                 "create_time": "1234567890",
-                "token": settings.lark_verification_token,
+                "token": "test_verification_token",
                 "app_id": "cli_test",
                 "tenant_key": "tenant_test",
             },
@@ -182,7 +180,7 @@ class TestLarkWebhook:
                 "event_id": "evt_read_123",
                 "event_type": "im.message.message_read_v1",
                 "create_time": "1234567890",
-                "token": settings.lark_verification_token,
+                "token": "test_verification_token",
                 "app_id": "cli_test",
                 "tenant_key": "tenant_test",
             },
@@ -207,7 +205,7 @@ class TestLarkWebhook:
                 "event_id": "evt_unknown_123",
                 "event_type": "unknown.event.type",
                 "create_time": "1234567890",
-                "token": settings.lark_verification_token,
+                "token": "test_verification_token",
                 "app_id": "cli_test",
                 "tenant_key": "tenant_test",
             },
@@ -248,6 +246,124 @@ class TestLarkWebhook:
             # Should return 500 for unexpected errors
             assert response.status_code == 500
 
+    @pytest.mark.asyncio
+    async def test_lark_message_event_invalid_token(
+        self, async_client, lark_webhook_data
+    ):
+        """Test inline mode rejects events with a wrong token."""
+        lark_webhook_data["header"]["token"] = "wrong_token"
+
+        with patch("src.api.lark.message_processor") as mock_processor:
+            mock_processor.process_lark_message = AsyncMock()
+
+            response = await async_client.post(
+                "/webhook/lark/",
+                json=lark_webhook_data,
+            )
+
+            assert response.status_code == 403
+            mock_processor.process_lark_message.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_lark_message_event_queue_mode(
+        self, async_client, lark_webhook_data, fake_redis, monkeypatch
+    ):
+        """Test queue ingest mode enqueues the event without processing it."""
+        import src.api.lark
+
+        monkeypatch.setattr(src.api.lark.settings, "ingest_mode", "queue")
+
+        # Room pair mapped in both directions shares one partition key
+        await fake_redis.setex("room:lark:oc_a1b2c3d4e5f6", 86400, "12345678")
+
+        with patch(
+            "src.api.lark.message_processor.process_lark_message"
+        ) as mock_process:
+            response = await async_client.post(
+                "/webhook/lark/",
+                json=lark_webhook_data,
+            )
+
+            assert response.status_code == 200
+            assert response.json() == {"status": "ok"}
+            mock_process.assert_not_called()
+
+        from src.services.event_queue import event_queue, partition_for
+
+        stream = event_queue.partition_stream(
+            partition_for("cw_12345678_lark_oc_a1b2c3d4e5f6")
+        )
+        entries = await fake_redis.xrange(stream)
+        assert len(entries) == 1
+        assert entries[0][1]["platform"] == "lark"
+
+    @pytest.mark.asyncio
+    async def test_lark_message_event_queue_mode_invalid_token(
+        self, async_client, lark_webhook_data, fake_redis, monkeypatch
+    ):
+        """Test queue ingest mode rejects events with a wrong token."""
+        import src.api.lark
+
+        monkeypatch.setattr(src.api.lark.settings, "ingest_mode", "queue")
+        lark_webhook_data["header"]["token"] = "wrong_token"
+
+        response = await async_client.post(
+            "/webhook/lark/",
+            json=lark_webhook_data,
+        )
+
+        assert response.status_code == 403
+        assert await fake_redis.keys("events:*") == []
+
+    @pytest.mark.asyncio
+    async def test_lark_message_event_queue_mode_publish_error(
+        self, async_client, lark_webhook_data, monkeypatch
+    ):
+        """Test queue ingest mode reports a failed enqueue as an error."""
+        import src.api.lark
+
+        monkeypatch.setattr(src.api.lark.settings, "ingest_mode", "queue")
+
+        with patch("src.api.lark.event_queue") as mock_queue:
+            mock_queue.publish = AsyncMock(side_effect=ConnectionError("redis down"))
+
+            response = await async_client.post(
+                "/webhook/lark/",
+                json=lark_webhook_data,
+            )
+
+        assert response.status_code == 500
+
+    @pytest.mark.asyncio
+    async def test_lark_message_event_queue_mode_redis_down_degraded(
+        self, async_client, lark_webhook_data, monkeypatch
+    ):
+        """Test degraded mode delivers in-process when the queue is unreachable."""
+        import src.api.lark
+        from redis.exceptions import ConnectionError as RedisConnectionError
+
+        monkeypatch.setattr(src.api.lark.settings, "ingest_mode", "queue")
+        monkeypatch.setattr(src.api.lark.settings, "degraded_mode_enabled", True)
+
+        with patch("src.api.lark.event_queue") as mock_queue, patch(
+            "src.api.lark.message_processor"
+        ) as mock_processor:
+            mock_queue.publish = AsyncMock(
+                side_effect=RedisConnectionError("redis down")
+            )
+            mock_processor.partition_key = AsyncMock(
+                return_value="lark_oc_a1b2c3d4e5f6"
+            )
+            mock_processor.process_lark_message = AsyncMock(return_value="999")
+
+            response = await async_client.post(
+                "/webhook/lark/",
+                json=lark_webhook_data,
+            )
+
+        assert response.status_code == 200
+        mock_processor.process_lark_message.assert_called_once()
+
 
 @pytest.mark.integration
 class TestHealthEndpoints:
@@ -0,0 +1,190 @@
+"""Unit tests for the shared circuit breakers."""
+
+import asyncio
+
+import pytest
+import respx
+from httpx import Response
+
+import src.services.chatwork_client as chatwork_client_module
+import src.services.circuit_breaker as circuit_breaker_module
+from src.core.exceptions import (
+    BadRequestError,
+    CircuitOpenError,
+    RetryInPlaceError,
+    RetryScheduledError,
+    ServerError,
+)
+from src.services.chatwork_client import ChatworkAPIClient
+from src.services.circuit_breaker import CircuitBreaker
+from src.services.message_processor import MessageProcessor
+from src.services.rate_limiter import RateLimiter, RateLimitGate
+from src.services.retry_queue import RetryQueue
+
+
+@pytest.fixture
+def retries(redis_client):
+    """Create a retry queue backed by fake Redis."""
+    return RetryQueue(redis=redis_client)
+
+
+@pytest.fixture
+def breaker(redis_client, retries, monkeypatch):
+    """Create a breaker that opens after 3 failures for 0.2 seconds."""
+    monkeypatch.setattr(circuit_breaker_module.settings, "circuit_failure_threshold", 3)
+    monkeypatch.setattr(circuit_breaker_module.settings, "circuit_open_seconds", 0.2)
+    breaker = CircuitBreaker("test:send", redis=redis_client, retries=retries)
+    monkeypatch.setitem(circuit_breaker_module.circuit_breakers, "test", breaker)
+    return breaker
+
+
+async def fail(breaker: CircuitBreaker, error: Exception) -> None:
+    """Run a failing call under the breaker."""
+    with pytest.raises(type(error)):
+        async with breaker.guard():
+            raise error
+
+
+async def succeed(breaker: CircuitBreaker) -> None:
+    """Run a successful call under the breaker."""
+    async with breaker.guard():
+        pass
+
+
+@pytest.mark.unit
+class TestCircuitBreaker:
+    """Test breaker state transitions."""
+
+    @pytest.mark.asyncio
+    async def test_opens_after_consecutive_outage_errors(self, breaker, redis_client):
+        """Test the circuit opens for every replica after the threshold."""
+        for _ in range(3):
+            await fail(breaker, ServerError("down"))
+
+        other_replica = CircuitBreaker("test:send", redis=redis_client)
+        with pytest.raises(CircuitOpenError) as exc_info:
+            await other_replica.before_call()
+
+        assert 0 < exc_info.value.retry_in <= 0.2
+        assert (await breaker.state())["state"] == "open"
+
+    @pytest.mark.asyncio
+    async def test_client_errors_and_successes_do_not_open(self, breaker):
+        """Test only outage errors count, and a success resets the count."""
+        await fail(breaker, ServerError("down"))
+        await fail(breaker, ServerError("down"))
+        await succeed(breaker)
+        await fail(breaker, ServerError("down"))
+        await fail(breaker, BadRequestError("bad"))
+        await fail(breaker, ServerError("down"))
+
+        assert (await breaker.state())["state"] == "closed"
+
+    @pytest.mark.asyncio
+    async def test_single_probe_after_open_period(self, breaker):
+        """Test one caller probes after the open period while others still fail fast."""
+        for _ in range(3):
+            await fail(breaker, ServerError("down"))
+        await asyncio.sleep(0.25)
+
+        await breaker.before_call()
+        with pytest.raises(CircuitOpenError):
+            await breaker.before_call()
+
+        await breaker.record_success()
+        assert (await breaker.state())["state"] == "closed"
+        await breaker.before_call()
+
+    @pytest.mark.asyncio
+    async def test_failed_probe_reopens(self, breaker):
+        """Test a failing probe opens the circuit for another period."""
+        for _ in range(3):
+            await fail(breaker, ServerError("down"))
+        await asyncio.sleep(0.25)
+
+        await fail(breaker, ServerError("still down"))
+
+        assert (await breaker.state())["state"] == "open"
+        with pytest.raises(CircuitOpenError):
+            await breaker.before_call()
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_defers_message_until_closed(
+        self, breaker, retries, redis_client, mock_chatwork_client, mock_lark_client
+    ):
+        """Test messages skip the retry ladder while open and drain once closed."""
+        processor = MessageProcessor()
+        processor.storage = redis_client
+        processor.retries = retries
+        processor.chatwork = mock_chatwork_client
+        processor.lark = mock_lark_client
+        processor.lark.send_text_message.side_effect = CircuitOpenError(
+            "test:send", 0.2
+        )
+        await redis_client.set_room_mapping("chatwork", "12345678", "oc_test")
+
+        with pytest.raises(RetryScheduledError):
+            await processor.process_chatwork_message("12345678", "999", "User", "Hello")
+
+        assert await breaker.deferred_count() == 1
+        assert await retries.depth() == 0
+        assert await redis_client.get_failed_messages() == []
+
+        # Open: nothing is released until the open period is over
+        for _ in range(3):
+            await fail(breaker, ServerError("down"))
+        assert await breaker.release_deferred() == 0
+
+        # Open period over: one message goes out as the probe
+        await asyncio.sleep(0.25)
+        assert await breaker.release_deferred() == 1
+        [(_, item)] = await retries.claim_due()
+        assert item["message_data"]["message_id"] == "999"
+        assert item["attempt"] == 0
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_pauses_ordered_delivery(
+        self, breaker, retries, redis_client, mock_chatwork_client, mock_lark_client
+    ):
+        """Test queue-delivered messages are handed back rather than parked."""
+        processor = MessageProcessor()
+        processor.storage = redis_client
+        processor.retries = retries
+        processor.chatwork = mock_chatwork_client
+        processor.lark = mock_lark_client
+        processor.lark.send_text_message.side_effect = CircuitOpenError("test:send", 5)
+        await redis_client.set_room_mapping("chatwork", "12345678", "oc_test")
+
+        with pytest.raises(RetryInPlaceError) as exc_info:
+            await processor.process_chatwork_message(
+                "12345678", "999", "User", "Hello", attempt=2, in_order=True
+            )
+
+        assert (exc_info.value.retry_in, exc_info.value.attempt) == (5, 2)
+        assert await breaker.deferred_count() == 0
+        assert await retries.depth() == 0
+
+    @pytest.mark.asyncio
+    async def test_chatwork_client_fails_fast_when_open(self, breaker, monkeypatch):
+        """Test Chatwork is not called while its circuit is open."""
+        client = ChatworkAPIClient()
+        client.breaker = breaker
+        limiter = RateLimiter(redis=breaker.redis)
+        monkeypatch.setattr(chatwork_client_module, "rate_limiter", limiter)
+        monkeypatch.setattr(
+            chatwork_client_module, "rate_limit_gate", RateLimitGate(limiter)
+        )
+
+        with respx.mock() as router:
+            route = router.post(
+                f"{chatwork_client_module.settings.chatwork_api_base_url}/rooms/1/messages"
+            ).mock(return_value=Response(503))
+
+            for _ in range(3):
+                with pytest.raises(ServerError):
+                    await client._post_message("1", {"body": "a"})
+            with pytest.raises(CircuitOpenError):
+                await client._post_message("1", {"body": "a"})
+
+        await client.close()
+        assert route.call_count == 3
@@ -0,0 +1,148 @@
+"""Unit tests for the client-side cache of room and user mapping reads."""
+
+import asyncio
+
+import pytest
+
+from src.services.client_cache import ClientCache
+
+
+class FakeTrackingConnection:
+    """Connection replaying invalidation pushes, then dropping."""
+
+    def __init__(self, pushes: list):
+        self.pushes = pushes
+        self.commands = []
+        self.handler = None
+        self._parser = self
+        self.released = asyncio.Event()
+
+    def set_invalidation_push_handler(self, handler):
+        self.handler = handler
+
+    async def send_command(self, *args):
+        self.commands.append(args)
+
+    async def read_response(self, push_request=False):
+        if not push_request:
+            return "OK"
+        if not self.pushes:
+            await self.released.wait()
+            raise ConnectionError("Connection closed by server.")
+        return await self.handler(self.pushes.pop(0))
+
+
+class FakeTrackingPool:
+    """Pool handing out one ``FakeTrackingConnection``."""
+
+    def __init__(self, connection: FakeTrackingConnection):
+        self.connection = connection
+
+    async def get_connection(self, command):
+        return self.connection
+
+    async def disconnect(self):
+        pass
+
+
+@pytest.fixture
+def cache(redis_client):
+    """Cache of the test client, as if tracking were on."""
+    cache = ClientCache(redis_client, max_entries=100)
+    cache.tracking = True
+    redis_client.cache = cache
+    return cache
+
+
+@pytest.mark.unit
+@pytest.mark.redis
+class TestClientCache:
+    """Test serving mapping reads locally until Redis invalidates them."""
+
+    @pytest.mark.asyncio
+    async def test_reads_served_until_invalidated(
+        self, redis_client, fake_redis, cache
+    ):
+        """Test repeat reads skip Redis and an invalidation forces a fresh read."""
+        await fake_redis.hset("rooms:chatwork", "123", "oc_1")
+        assert await redis_client.get_room_mapping("chatwork", "123") == "oc_1"
+
+        # Not seen without an invalidation push
+        await fake_redis.hset("rooms:chatwork", "123", "oc_2")
+        assert await redis_client.get_room_mapping("chatwork", "123") == "oc_1"
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        await cache.invalidate(["invalidate", ["rooms:chatwork"]])
+        assert await redis_client.get_room_mapping("chatwork", "123") == "oc_2"
+
+    @pytest.mark.asyncio
+    async def test_user_mapping_copies(self, redis_client, cache):
+        """Test cached user mappings are handed out as separate dicts."""
+        await redis_client.set_user_mapping("chatwork", "1", {"lark_user_id": "ou_1"})
+        first = await redis_client.get_user_mapping("chatwork", "1")
+        first["lark_user_id"] = "changed"
+
+        assert await redis_client.get_user_mapping("chatwork", "1") == {
+            "lark_user_id": "ou_1"
+        }
+        await cache.invalidate(["invalidate", ["user:chatwork:1"]])
+        assert len(cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_read_overlapping_invalidation_not_stored(self, cache):
+        """Test a value read while its key was invalidated is not cached."""
+
+        async def load():
+            await cache.invalidate(["invalidate", ["room:chatwork:1"]])
+            return "oc_old"
+
+        assert (
+            await cache.fetch("room:chatwork:1", ("room:chatwork:1",), load) == "oc_old"
+        )
+        assert len(cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_flush_and_eviction(self, cache):
+        """Test a flush push empties the cache and old entries are evicted."""
+        cache.max_entries = 2
+        for i in range(3):
+            await cache.fetch(f"room:lark:{i}", (f"room:lark:{i}",), lambda: _value(i))
+        assert len(cache) == 2
+        assert "room:lark:0" not in cache._sources
+
+        await cache.invalidate(["invalidate", None])
+        assert len(cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_tracking_connection(self, redis_client, monkeypatch):
+        """Test tracking is turned on and the cache emptied when it drops."""
+        connection = FakeTrackingConnection([["invalidate", ["rooms:lark"]]])
+        monkeypatch.setattr(
+            redis_client, "tracking_pool", lambda: FakeTrackingPool(connection)
+        )
+        cache = ClientCache(redis_client)
+        task = asyncio.create_task(cache._follow())
+        for _ in range(100):
+            if cache.invalidations:
+                break
+            await asyncio.sleep(0)
+
+        assert cache.tracking
+        assert connection.commands[0][:4] == ("CLIENT", "TRACKING", "ON", "BCAST")
+        assert "rooms:" in connection.commands[0]
+
+        connection.released.set()
+        with pytest.raises(ConnectionError):
+            await task
+        assert not cache.tracking
+
+    @pytest.mark.asyncio
+    async def test_disabled_reads_redis(self, redis_client, fake_redis):
+        """Test nothing is cached while tracking is off."""
+        await fake_redis.set("room:chatwork:9", "oc_9")
+        assert await redis_client.get_room_mapping("chatwork", "9") == "oc_9"
+        assert len(redis_client.cache) == 0
+
+
+async def _value(i: int) -> str:
+    return f"oc_{i}"
@@ -0,0 +1,212 @@
+"""Unit tests for degraded mode (local state and write buffer during Redis outages)."""
+
+import asyncio
+import os
+
+import fakeredis.aioredis
+import pytest
+
+from src.core.config import settings
+from src.core.exceptions import DeadLetteredError, ServerError
+from src.services.degraded_storage import DegradedStorage
+from src.services.message_processor import MessageProcessor
+from src.services.redis_client import SEND_CLAIMED, RedisClient
+from src.services.retry_queue import RetryQueue
+from src.services.route_table import RouteTable
+from src.services.segment_log import SegmentLog
+
+
+@pytest.fixture
+def server():
+    """Fake Redis server that can be taken down."""
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+async def primary(server):
+    """Redis client on the fake server."""
+    client = RedisClient()
+    client.client = fakeredis.aioredis.FakeRedis(server=server, decode_responses=True)
+    yield client
+    client._client = None
+
+
+@pytest.fixture
+def log(tmp_path):
+    """Segment log in a temporary directory."""
+    return SegmentLog(str(tmp_path / "buffer"), max_bytes=1024 * 1024)
+
+
+@pytest.fixture
+async def storage(primary, log, monkeypatch):
+    """Degraded-mode storage probing every few milliseconds."""
+    monkeypatch.setattr(settings, "degraded_probe_interval_seconds", 0.01)
+    storage = DegradedStorage(
+        primary=primary, log=log, routes=RouteTable(redis=primary)
+    )
+    yield storage
+    if storage._probe is not None:
+        storage._probe.cancel()
+
+
+async def wait_recovered(storage: DegradedStorage) -> None:
+    for _ in range(200):
+        if not storage.degraded:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("storage did not recover")
+
+
+@pytest.mark.unit
+class TestDegradedStorage:
+    """Test serving through an outage and reconciling afterwards."""
+
+    @pytest.mark.asyncio
+    async def test_outage_is_buffered_and_reconciled(
+        self, storage, server, primary, log
+    ):
+        """Test writes made during an outage reach Redis once it is back."""
+        await storage.save_message_mapping("chatwork", "1", "lark", "om_1")
+        assert not storage.degraded
+
+        server.connected = False
+        claim = await storage.claim_message("chatwork", "2")
+        assert storage.degraded
+        assert claim is not None
+        assert await storage.claim_message("chatwork", "2") is None
+        await storage.save_message_mapping("chatwork", "2", "lark", "om_2")
+        await storage.add_to_failed_queue(
+            "lark", "chatwork", {"message_id": "om_3"}, "boom"
+        )
+        assert await storage.get_counterpart("lark", "om_2") == {
+            "platform": "chatwork",
+            "message_id": "2",
+            "role": "source",
+        }
+        assert storage.buffered == 2
+
+        server.connected = True
+        await wait_recovered(storage)
+
+        assert await primary.get_message_mapping("chatwork", "2") is not None
+        assert await primary.get_counterpart("lark", "om_2") is not None
+        assert (await primary.count_failed_messages())["total"] == 1
+        assert log.sealed() == []
+        assert storage.buffered == 0
+
+    @pytest.mark.asyncio
+    async def test_routes_from_last_snapshot(self, storage, server, primary):
+        """Test rooms are routed from the route table while Redis is down."""
+        await primary.replace_tables({"rooms:chatwork": {"123": "oc_1"}})
+        await storage.routes.refresh()
+
+        server.connected = False
+        result = await storage.prepare_send("chatwork", "123", "1")
+
+        assert storage.degraded
+        assert result.status == SEND_CLAIMED
+        assert result.target_room_id == "oc_1"
+
+    @pytest.mark.asyncio
+    async def test_dlq_removal_replayed_in_order(self, storage, server, primary):
+        """Test a DLQ entry added and removed during an outage stays removed."""
+        server.connected = False
+        await storage.add_to_failed_queue(
+            "lark", "chatwork", {"message_id": "om_1"}, "boom"
+        )
+        entries = await storage.get_failed_messages()
+        assert await storage.remove_failed_messages(entries) == 1
+
+        server.connected = True
+        await wait_recovered(storage)
+
+        assert await primary.count_failed_messages() == {
+            "total": 0,
+            "by_platform": {},
+            "by_error": {},
+        }
+
+    @pytest.mark.asyncio
+    async def test_leftover_buffer_reconciled_on_connect(
+        self, primary, log, monkeypatch
+    ):
+        """Test records buffered before a restart are replayed at startup."""
+        log.append(
+            {
+                "op": "mapping",
+                "source_platform": "lark",
+                "source_message_id": "om_1",
+                "target_platform": "chatwork",
+                "target_message_id": "5",
+                "saved_at": 1700000000,
+            }
+        )
+        log.seal()
+
+        async def connect():
+            pass
+
+        monkeypatch.setattr(primary, "connect", connect)
+        storage = DegradedStorage(
+            primary=primary, log=log, routes=RouteTable(redis=primary)
+        )
+        await storage.connect()
+
+        assert not storage.degraded
+        assert await primary.is_message_processed("lark", "om_1")
+        assert log.sealed() == []
+
+    @pytest.mark.asyncio
+    async def test_failed_send_dead_lettered_when_retry_queue_down(
+        self,
+        storage,
+        server,
+        primary,
+        mock_chatwork_client,
+        mock_lark_client,
+        monkeypatch,
+    ):
+        """Test a send failure during an outage is buffered in the DLQ."""
+        monkeypatch.setattr(settings, "retry_mode", "deferred")
+        processor = MessageProcessor()
+        processor.storage = storage
+        processor.routes = storage.routes
+        processor.retries = RetryQueue(redis=primary)
+        processor.chatwork = mock_chatwork_client
+        processor.lark = mock_lark_client
+        mock_lark_client.send_text_message.side_effect = ServerError("Lark unavailable")
+        await primary.replace_tables({"rooms:chatwork": {"123": "oc_1"}})
+        await storage.routes.refresh()
+
+        server.connected = False
+        with pytest.raises(DeadLetteredError):
+            await processor.process_chatwork_message("123", "999", "User", "Hello")
+
+        assert (await storage.count_failed_messages())["total"] == 1
+
+
+@pytest.mark.unit
+class TestSegmentLog:
+    """Test the append-only write buffer."""
+
+    def test_rotates_and_skips_torn_records(self, tmp_path):
+        """Test segments are sealed by size and a torn line is skipped."""
+        log = SegmentLog(str(tmp_path), max_bytes=64)
+        for i in range(3):
+            log.append({"op": "put_record", "key": f"k{i}", "padding": "x" * 40})
+        log.seal()
+
+        segments = log.sealed()
+        assert len(segments) == 3
+        with segments[-1].open("a") as f:
+            f.write('{"op": "put_re')
+        assert [r["key"] for s in segments for r in log.read(s)] == ["k0", "k1", "k2"]
+
+    def test_recover_seals_orphaned_segments(self, tmp_path):
+        """Test open segments of dead processes (or of this PID) are sealed."""
+        (tmp_path / f"00000000000000000001-{os.getpid()}.open").write_text("{}\n")
+        (tmp_path / "00000000000000000002-999999999.open").write_text("{}\n")
+        log = SegmentLog(str(tmp_path), max_bytes=1024)
+
+        assert log.recover() == 2
+        assert len(log.sealed()) == 2
@@ -0,0 +1,231 @@
+"""Unit tests for DLQ replay."""
+
+import json
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock
+
+import pytest
+
+import src.services.dlq_replay as dlq_replay_module
+from src.core.exceptions import BadRequestError
+from src.services.dlq_replay import DLQReplayer, ReplayFilter
+from src.services.message_processor import MessageProcessor
+
+
+@pytest.fixture
+async def processor(redis_client, mock_chatwork_client, mock_lark_client):
+    """Create a message processor with mapped rooms and mocked clients."""
+    processor = MessageProcessor()
+    processor.storage = redis_client
+    processor.chatwork = mock_chatwork_client
+    processor.lark = mock_lark_client
+    await redis_client.set_room_mapping("chatwork", "111", "oc_a")
+    await redis_client.set_room_mapping("chatwork", "222", "oc_b")
+    await redis_client.set_room_mapping("lark", "oc_a", "111")
+    return processor
+
+
+@pytest.fixture
+def replayer(redis_client, processor):
+    """Create a DLQ replayer."""
+    return DLQReplayer(storage=redis_client, processor=processor)
+
+
+async def dead_letter(redis_client, platform, room_id, message_id):
+    """Write a failed send to the DLQ as the processor does."""
+    if platform == "chatwork":
+        message = {
+            "room_id": room_id,
+            "message_id": message_id,
+            "sender_name": "User",
+            "message_body": "Hello",
+        }
+    else:
+        message = {
+            "chat_id": room_id,
+            "message_id": message_id,
+            "sender_name": "User",
+            "message_text": "Hello",
+        }
+    target = "lark" if platform == "chatwork" else "chatwork"
+    return await redis_client.add_to_failed_queue(
+        platform, target, message, "down", error_type="ServerError"
+    )
+
+
+@pytest.mark.unit
+class TestDLQReplay:
+    """Test replaying dead-lettered messages."""
+
+    @pytest.mark.asyncio
+    async def test_replay_sends_and_removes_entries(
+        self, replayer, redis_client, processor
+    ):
+        """Test entries are re-sent through the processor and leave the DLQ."""
+        await dead_letter(redis_client, "chatwork", "111", "1")
+        await dead_letter(redis_client, "lark", "oc_a", "om_2")
+
+        progress = await replayer.replay()
+
+        assert progress.status == "done"
+        assert (progress.matched, progress.replayed, progress.failed) == (2, 2, 0)
+        processor.lark.send_text_message.assert_called_once()
+        processor.chatwork.send_message.assert_called_once()
+        assert await redis_client.get_failed_messages() == []
+        assert await redis_client.is_message_processed("chatwork", "1")
+
+    @pytest.mark.asyncio
+    async def test_dry_run_and_filters(self, replayer, redis_client, processor):
+        """Test a dry run counts only matching entries and sends nothing."""
+        await dead_letter(redis_client, "chatwork", "111", "1")
+        await dead_letter(redis_client, "chatwork", "222", "2")
+        await dead_letter(redis_client, "lark", "oc_a", "om_3")
+
+        progress = await replayer.replay(
+            ReplayFilter(platform="chatwork", room_id="222"), dry_run=True
+        )
+
+        assert (progress.scanned, progress.matched, progress.replayed) == (3, 1, 0)
+        processor.lark.send_text_message.assert_not_called()
+        assert (await redis_client.count_failed_messages())["total"] == 3
+
+    @pytest.mark.asyncio
+    async def test_time_window(self, replayer, redis_client):
+        """Test only entries that failed inside the window are replayed."""
+        await dead_letter(redis_client, "chatwork", "111", "1")
+        future = datetime.now(timezone.utc) + timedelta(hours=1)
+
+        progress = await replayer.replay(ReplayFilter(since=future), dry_run=True)
+
+        assert progress.matched == 0
+
+    @pytest.mark.asyncio
+    async def test_already_delivered_is_skipped(
+        self, replayer, redis_client, processor
+    ):
+        """Test an entry whose message was delivered meanwhile is not sent twice."""
+        await dead_letter(redis_client, "chatwork", "111", "1")
+        await redis_client.save_message_mapping("chatwork", "1", "lark", "om_sent")
+
+        progress = await replayer.replay()
+
+        assert (progress.replayed, progress.skipped) == (0, 1)
+        processor.lark.send_text_message.assert_not_called()
+        assert await redis_client.get_failed_messages() == []
+
+    @pytest.mark.asyncio
+    async def test_failing_again_is_dead_lettered_once(
+        self, replayer, redis_client, processor
+    ):
+        """Test a message failing again gets a new entry that this run leaves alone."""
+        processor.lark.send_text_message = AsyncMock(side_effect=BadRequestError("bad"))
+        await dead_letter(redis_client, "chatwork", "111", "1")
+
+        progress = await replayer.replay()
+
+        assert progress.dead_lettered == 1
+        processor.lark.send_text_message.assert_called_once()
+        assert (await redis_client.count_failed_messages())["total"] == 1
+
+    @pytest.mark.asyncio
+    async def test_dry_run_then_real_run_with_same_id(
+        self, replayer, redis_client, processor
+    ):
+        """Test a real run does not resume the dry run it was previewed with."""
+        await dead_letter(redis_client, "chatwork", "111", "1")
+        await dead_letter(redis_client, "chatwork", "222", "2")
+
+        preview = await replayer.replay(
+            ReplayFilter(room_id="111"), dry_run=True, run_id="r"
+        )
+        progress = await replayer.replay(run_id="r")
+
+        assert (preview.matched, preview.replayed) == (1, 0)
+        assert (progress.dry_run, progress.matched, progress.replayed) == (False, 1, 1)
+        processor.lark.send_text_message.assert_called_once()
+        assert (await redis_client.count_failed_messages())["total"] == 1
+
+    @pytest.mark.asyncio
+    async def test_raw_payloads_and_loops(
+        self,
+        replayer,
+        redis_client,
+        processor,
+        chatwork_webhook_data,
+        lark_webhook_data,
+    ):
+        """Test raw webhook payloads are parsed, and unsendable entries are dropped."""
+        chatwork_webhook_data["webhook_event"]["room_id"] = 111
+        await redis_client.add_to_failed_queue(
+            "chatwork", "lark", {"event": chatwork_webhook_data}, "gave up"
+        )
+        await redis_client.add_to_failed_queue(
+            "chatwork",
+            "lark",
+            {"event": {"webhook_event_type": "mention_to_me"}},
+            "gave up",
+        )
+        text = f"{dlq_replay_module.settings.message_prefix_chatwork} echo"
+        lark_webhook_data["event"]["message"]["content"] = json.dumps({"text": text})
+        await redis_client.add_to_failed_queue(
+            "lark", "chatwork", {"event": lark_webhook_data}, "gave up"
+        )
+
+        progress = await replayer.replay()
+
+        assert (progress.matched, progress.replayed, progress.skipped) == (3, 1, 2)
+        processor.lark.send_text_message.assert_called_once()
+        assert await redis_client.get_failed_messages() == []
+
+    @pytest.mark.asyncio
+    async def test_unroutable_entry_stays(self, replayer, redis_client):
+        """Test entries that still cannot be routed are kept for later."""
+        await dead_letter(redis_client, "chatwork", "999", "1")
+
+        progress = await replayer.replay()
+
+        assert progress.failed == 1
+        assert (await redis_client.count_failed_messages())["total"] == 1
+
+    @pytest.mark.asyncio
+    async def test_resume_continues_after_saved_cursor(
+        self, replayer, redis_client, processor, monkeypatch
+    ):
+        """Test a resumed run picks up its filters and cursor from Redis."""
+        monkeypatch.setattr(dlq_replay_module.settings, "dlq_replay_page_size", 1)
+        # Entries written in the same millisecond sort by their random suffix
+        first = min(
+            [
+                await dead_letter(redis_client, "chatwork", "111", "1"),
+                await dead_letter(redis_client, "chatwork", "111", "2"),
+            ]
+        )
+        await redis_client.client.hset(
+            replayer.progress_key("run1"),
+            mapping={
+                "progress": json.dumps(
+                    {
+                        "run_id": "run1",
+                        "status": "interrupted",
+                        "cursor": first,
+                        "scanned": 1,
+                        "matched": 1,
+                        "replayed": 1,
+                    }
+                ),
+                "filters": json.dumps(
+                    {
+                        "platform": "chatwork",
+                        "until": datetime.now(timezone.utc).isoformat(),
+                    }
+                ),
+            },
+        )
+
+        progress = await replayer.replay(run_id="run1")
+
+        assert (progress.status, progress.scanned, progress.replayed) == ("done", 2, 2)
+        processor.lark.send_text_message.assert_called_once()
+        saved = await replayer.get_progress("run1")
+        assert saved["status"] == "done"
+        assert saved["filters"]["platform"] == "chatwork"
@@ -0,0 +1,638 @@
+"""Unit tests for the webhook event queue and delivery worker."""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+import src.services.event_queue as event_queue_module
+from src.core.exceptions import (
+    DeadLetteredError,
+    MappingNotFoundError,
+    RetryInPlaceError,
+    ServerError,
+)
+from src.services.delivery_worker import DeliveryWorker
+from src.services.event_dispatcher import (
+    dead_letter_event,
+    dispatch_event,
+    parse_chatwork_event,
+    parse_lark_event,
+)
+from src.services.event_queue import EventQueue, partition_for, rendezvous_owner
+
+_real_sleep = asyncio.sleep
+
+
+async def _no_backoff(delay, *args, **kwargs):
+    """Skip retry backoff while still yielding to the event loop."""
+    await _real_sleep(min(delay, 0.01))
+
+
+@pytest.fixture
+async def event_queue(redis_client, monkeypatch):
+    """Create a 4-partition event queue backed by fake Redis."""
+    monkeypatch.setattr(event_queue_module.settings, "event_stream_partitions", 4)
+    queue = EventQueue()
+    queue.redis = redis_client
+    await queue.ensure_group()
+    return queue
+
+
+def key_for_partition(partition: int, partitions: int = 4) -> str:
+    """Find a routing key that hashes onto the given partition."""
+    n = 0
+    while partition_for(f"cw_{n}", partitions) != partition:
+        n += 1
+    return f"cw_{n}"
+
+
+@pytest.mark.unit
+class TestPartitioning:
+    """Test partition hashing and ownership."""
+
+    def test_partition_for_is_stable_and_bounded(self):
+        """Test the same key always maps to the same partition."""
+        partitions = {partition_for("cw_1_lark_oc_1", 16) for _ in range(10)}
+
+        assert len(partitions) == 1
+        assert 0 <= partitions.pop() < 16
+
+    def test_rendezvous_owner_without_workers(self):
+        """Test no owner is chosen when no worker is alive."""
+        assert rendezvous_owner(0, []) is None
+
+    def test_rendezvous_moves_only_departed_partitions(self):
+        """Test removing a worker only reassigns that worker's partitions."""
+        before = {p: rendezvous_owner(p, ["w1", "w2", "w3"]) for p in range(64)}
+        after = {p: rendezvous_owner(p, ["w1", "w2"]) for p in range(64)}
+
+        for partition, owner in before.items():
+            if owner != "w3":
+                assert after[partition] == owner
+        assert set(after.values()) == {"w1", "w2"}
+
+
+@pytest.mark.unit
+@pytest.mark.redis
+class TestEventQueue:
+    """Test partitioned Redis Stream event queue."""
+
+    @pytest.mark.asyncio
+    async def test_publish_and_read(self, event_queue, chatwork_webhook_data):
+        """Test published payloads are read back verbatim from their partition."""
+        body = json.dumps(chatwork_webhook_data).encode()
+        partition = partition_for("cw_12345678_lark_oc_x", 4)
+
+        entry_id = await event_queue.publish("chatwork", body, "cw_12345678_lark_oc_x")
+        events = await event_queue.read("worker-1", [partition])
+
+        assert len(events) == 1
+        assert events[0].entry_id == entry_id
+        assert events[0].platform == "chatwork"
+        assert events[0].partition == partition
+        assert events[0].payload == chatwork_webhook_data
+        assert events[0].received_at is not None
+
+    @pytest.mark.asyncio
+    async def test_read_only_requested_partitions(self, event_queue):
+        """Test a consumer only sees the partitions it asks for."""
+        await event_queue.publish("lark", "{}", key_for_partition(0))
+        await event_queue.publish("lark", "{}", key_for_partition(1))
+
+        events = await event_queue.read("worker-1", [1])
+
+        assert [e.partition for e in events] == [1]
+        assert await event_queue.read("worker-1", []) == []
+
+    @pytest.mark.asyncio
+    async def test_read_partitions_one_by_one_in_cluster_mode(self, event_queue):
+        """Test partitions are read separately when they live on other slots."""
+        event_queue.redis.cluster = True
+        await event_queue.publish("lark", "{}", key_for_partition(0))
+        await event_queue.publish("lark", "{}", key_for_partition(2))
+
+        events = await event_queue.read("worker-1", [0, 1, 2])
+
+        assert sorted(e.partition for e in events) == [0, 2]
+
+    @pytest.mark.asyncio
+    async def test_ack_removes_event(self, event_queue):
+        """Test acknowledged events leave the stream."""
+        await event_queue.publish("lark", "{}", key_for_partition(2))
+        events = await event_queue.read("worker-1", [2])
+
+        assert await event_queue.depth() == 1
+        await event_queue.ack(events[0])
+        assert await event_queue.depth() == 0
+
+    @pytest.mark.asyncio
+    async def test_claim_pending_takes_over_in_order(self, event_queue):
+        """Test a new owner receives the previous owner's idle events in order."""
+        key = key_for_partition(3)
+        for i in range(5):
+            await event_queue.publish("chatwork", json.dumps({"n": i}), key)
+        await event_queue.read("crashed-worker", [3])
+
+        claimed = await event_queue.claim_pending("worker-2", 3, min_idle_ms=0, count=2)
+
+        assert [e.payload["n"] for e in claimed] == [0, 1, 2, 3, 4]
+        assert all(e.partition == 3 for e in claimed)
+        assert await event_queue.pending_by_consumer(3) == {"worker-2": 5}
+
+    @pytest.mark.asyncio
+    async def test_touched_events_are_not_claimed(self, event_queue):
+        """Test events the owner keeps touching stay with the owner."""
+        await event_queue.publish("chatwork", "{}", key_for_partition(0))
+        delivered = await event_queue.read("worker-1", [0])
+        await asyncio.sleep(0.1)
+
+        await event_queue.touch("worker-1", 0, [delivered[0].entry_id])
+
+        assert await event_queue.claim_pending("worker-2", 0, min_idle_ms=80) == []
+        await asyncio.sleep(0.1)
+        assert len(await event_queue.claim_pending("worker-2", 0, min_idle_ms=80)) == 1
+
+    @pytest.mark.asyncio
+    async def test_read_own_pending(self, event_queue):
+        """Test a restarted consumer sees its own unacknowledged events."""
+        key = key_for_partition(1)
+        for i in range(3):
+            await event_queue.publish("lark", json.dumps({"n": i}), key)
+        await event_queue.read("worker-1", [1])
+
+        pending = await event_queue.read_own_pending("worker-1", 1, count=2)
+
+        assert [e.payload["n"] for e in pending] == [0, 1, 2]
+        assert await event_queue.read_own_pending("worker-2", 1) == []
+
+    @pytest.mark.asyncio
+    async def test_partition_lease(self, event_queue):
+        """Test a partition lease has a single holder."""
+        assert await event_queue.acquire_partition(0, "worker-1") is True
+        assert await event_queue.acquire_partition(0, "worker-2") is False
+
+        assert await event_queue.renew_partition(0, "worker-1") is True
+        assert await event_queue.renew_partition(0, "worker-2") is False
+
+        await event_queue.release_partition(0, "worker-2")
+        assert await event_queue.acquire_partition(0, "worker-2") is False
+
+        await event_queue.release_partition(0, "worker-1")
+        assert await event_queue.acquire_partition(0, "worker-2") is True
+
+    @pytest.mark.asyncio
+    async def test_heartbeat_registers_and_prunes_workers(
+        self, event_queue, redis_client
+    ):
+        """Test silent workers drop out of the registry."""
+        await redis_client.client.zadd(event_queue.workers_key, {"dead-worker": 1})
+
+        await event_queue.heartbeat("worker-1")
+
+        assert await event_queue.live_workers() == ["worker-1"]
+        await event_queue.leave("worker-1")
+        assert await event_queue.live_workers() == []
+
+    @pytest.mark.asyncio
+    async def test_migrate_legacy_stream(self, event_queue, redis_client):
+        """Test events left in the single pre-partitioning stream are moved."""
+        legacy = event_queue.stream_key
+        for i in range(3):
+            await redis_client.client.xadd(
+                legacy,
+                {
+                    "platform": "chatwork",
+                    "payload": json.dumps({"n": i}),
+                    "received_at": f"2025-01-0{i + 1}T00:00:00+00:00",
+                },
+            )
+
+        async def key_for(platform, payload):
+            return key_for_partition(2)
+
+        moved = await event_queue.migrate_legacy_stream(key_for)
+
+        assert moved == 3
+        assert await redis_client.client.exists(legacy) == 0
+        events = await event_queue.read("worker-1", [2])
+        assert [e.payload["n"] for e in events] == [0, 1, 2]
+        assert events[0].received_at == "2025-01-01T00:00:00+00:00"
+        assert await event_queue.migrate_legacy_stream(key_for) == 0
+
+    @pytest.mark.asyncio
+    async def test_ensure_group_is_idempotent(self, event_queue):
+        """Test creating the groups twice does not fail."""
+        await event_queue.ensure_group()
+
+
+@pytest.mark.unit
+class TestEventDispatcher:
+    """Test webhook payload parsing and dispatch."""
+
+    def test_parse_chatwork_event(self, chatwork_webhook_data):
+        """Test Chatwork payload is mapped to processor arguments."""
+        kwargs = parse_chatwork_event(chatwork_webhook_data)
+
+        assert kwargs == {
+            "room_id": "12345678",
+            "message_id": "999",
+            "sender_name": "User 111",
+            "message_body": "Hello from Chatwork!",
+        }
+
+    def test_parse_chatwork_non_message_event(self, chatwork_webhook_data):
+        """Test non-message Chatwork events are ignored."""
+        chatwork_webhook_data["webhook_event_type"] = "mention_to_me"
+
+        assert parse_chatwork_event(chatwork_webhook_data) is None
+
+    def test_parse_lark_event(self, lark_webhook_data):
+        """Test Lark payload is mapped to processor arguments."""
+        kwargs = parse_lark_event(lark_webhook_data)
+
+        assert kwargs == {
+            "chat_id": "oc_a1b2c3d4e5f6",
+            "message_id": "om_test123",
+            "sender_name": "User user_test",
+            "message_text": "Hello from Lark!",
+        }
+
+    def test_parse_lark_non_text_message(self, lark_webhook_data):
+        """Test non-text Lark messages are ignored."""
+        lark_webhook_data["event"]["message"]["message_type"] = "image"
+
+        assert parse_lark_event(lark_webhook_data) is None
+
+    @pytest.mark.asyncio
+    async def test_dispatch_unknown_platform(self):
+        """Test dispatching an unknown platform fails."""
+        with pytest.raises(ValueError):
+            await dispatch_event("slack", {})
+
+    @pytest.mark.asyncio
+    async def test_dead_letter_event(
+        self, redis_client, monkeypatch, chatwork_webhook_data
+    ):
+        """Test an undeliverable payload is saved to the processor's storage DLQ."""
+        from src.services.message_processor import message_processor
+
+        monkeypatch.setattr(message_processor, "storage", redis_client)
+        await dead_letter_event("chatwork", chatwork_webhook_data, "gave up")
+        await dead_letter_event("chatwork", {"webhook_event_type": "other"}, "gave up")
+
+        entries = await redis_client.get_failed_messages()
+        assert [value["target_platform"] for _, value in entries] == ["lark", "lark"]
+        assert entries[0][1]["message"]["message_id"] == "999"
+        assert entries[0][1]["error"] == "gave up"
+        assert entries[1][1]["message"] == {"event": {"webhook_event_type": "other"}}
+
+
+@pytest.fixture
+def fast_worker(event_queue, monkeypatch):
+    """
+    Rebalance on every loop, use short leases and poll instead of blocking.
+
+    fakeredis mishandles XREADGROUP BLOCK combined with COUNT.
+    """
+    monkeypatch.setattr(
+        event_queue_module.settings, "partition_rebalance_interval_seconds", 0
+    )
+    monkeypatch.setattr(event_queue_module.settings, "partition_lease_ms", 300)
+    read = event_queue.read
+
+    async def poll(consumer, partitions, count=10, block_ms=None):
+        await asyncio.sleep(0.005)
+        return await read(consumer, partitions, count=count)
+
+    monkeypatch.setattr(event_queue, "read", poll)
+
+
+async def wait_until_drained(event_queue, timeout: float = 3.0) -> None:
+    """Wait until every queued event has been acknowledged."""
+    for _ in range(int(timeout / 0.01)):
+        if await event_queue.depth() == 0:
+            return
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.unit
+@pytest.mark.redis
+class TestDeliveryWorker:
+    """Test partitioned queued event delivery."""
+
+    @pytest.fixture
+    def worker(self, event_queue):
+        """Create delivery worker reading from the fake queue."""
+        worker = DeliveryWorker(consumer_name="worker-test", concurrency=4)
+        worker.queue = event_queue
+        return worker
+
+    @pytest.mark.asyncio
+    async def test_handle_dispatches_and_acks(
+        self, worker, event_queue, lark_webhook_data
+    ):
+        """Test a queued event is delivered and acknowledged."""
+        await event_queue.publish("lark", json.dumps(lark_webhook_data), "lark_oc")
+        events = await event_queue.read(worker.consumer_name, [0, 1, 2, 3])
+
+        with patch(
+            "src.services.delivery_worker.dispatch_event",
+            AsyncMock(return_value="999"),
+        ) as mock_dispatch:
+            assert await worker.handle(events[0]) is True
+
+        mock_dispatch.assert_called_once_with(
+            "lark", lark_webhook_data, attempt=0, in_order=True
+        )
+        assert await event_queue.depth() == 0
+
+    @pytest.mark.asyncio
+    async def test_handle_acks_on_failure(self, worker, event_queue):
+        """Test unroutable events are acknowledged."""
+        await event_queue.publish("chatwork", "{}", "cw_1")
+        events = await event_queue.read(worker.consumer_name, [0, 1, 2, 3])
+
+        with patch(
+            "src.services.delivery_worker.dispatch_event",
+            AsyncMock(side_effect=MappingNotFoundError("chatwork", "1")),
+        ):
+            await worker.handle(events[0])
+
+        assert await event_queue.depth() == 0
+
+    @pytest.mark.asyncio
+    async def test_handle_acks_dead_lettered(self, worker, event_queue):
+        """Test send failures already saved to the DLQ are acknowledged."""
+        await event_queue.publish("chatwork", "{}", "cw_1")
+        events = await event_queue.read(worker.consumer_name, [0, 1, 2, 3])
+
+        with patch(
+            "src.services.delivery_worker.dispatch_event",
+            AsyncMock(
+                side_effect=DeadLetteredError("chatwork", "1", Exception("boom"))
+            ),
+        ):
+            assert await worker.handle(events[0]) is True
+
+        assert await event_queue.depth() == 0
+
+    @pytest.mark.asyncio
+    async def test_handle_leaves_unexpected_errors_pending(self, worker, event_queue):
+        """Test errors that never reached the DLQ keep the event pending."""
+        await event_queue.publish("chatwork", "{}", "cw_1")
+        events = await event_queue.read(worker.consumer_name, [0, 1, 2, 3])
+
+        with patch(
+            "src.services.delivery_worker.dispatch_event",
+            AsyncMock(side_effect=ConnectionError("redis down")),
+        ):
+            assert await worker.handle(events[0]) is False
+
+        assert await event_queue.depth() == 1
+
+    @pytest.mark.asyncio
+    async def test_fifo_per_room_parallel_across_rooms(
+        self, worker, event_queue, fast_worker
+    ):
+        """Test each room is delivered in order while rooms run in parallel."""
+        rooms = {"a": key_for_partition(0), "b": key_for_partition(1)}
+        for i in range(5):
+            for room, key in rooms.items():
+                payload = json.dumps({"room": room, "n": i})
+                await event_queue.publish("chatwork", payload, key)
+
+        delivered = {"a": [], "b": []}
+        active = {"a": 0, "b": 0}
+        peak_per_room = 0
+        peak_total = 0
+
+        async def slow_dispatch(platform, payload, **options):
+            nonlocal peak_per_room, peak_total
+            room = payload["room"]
+            active[room] += 1
+            peak_per_room = max(peak_per_room, active[room])
+            peak_total = max(peak_total, sum(active.values()))
+            await asyncio.sleep(0.01)
+            delivered[room].append(payload["n"])
+            active[room] -= 1
+            return "om_1"
+
+        with patch("src.services.delivery_worker.dispatch_event", slow_dispatch):
+            await worker.start()
+            await wait_until_drained(event_queue)
+            await worker.stop()
+
+        assert delivered == {"a": [0, 1, 2, 3, 4], "b": [0, 1, 2, 3, 4]}
+        assert peak_per_room == 1
+        assert peak_total == 2
+
+    @pytest.mark.asyncio
+    async def test_retries_failed_event_before_later_ones(
+        self, worker, event_queue, fast_worker, monkeypatch
+    ):
+        """Test a failing event is retried in place, keeping room order."""
+        monkeypatch.setattr("src.services.delivery_worker.asyncio.sleep", _no_backoff)
+        key = key_for_partition(2)
+        for i in range(2):
+            await event_queue.publish("chatwork", json.dumps({"n": i}), key)
+
+        calls = []
+
+        async def flaky(platform, payload, **options):
+            calls.append(payload["n"])
+            if calls == [0]:
+                raise ConnectionError("redis down")
+
+        with patch("src.services.delivery_worker.dispatch_event", flaky):
+            await worker.start()
+            await wait_until_drained(event_queue)
+            await worker.stop()
+
+        assert calls == [0, 0, 1]
+
+    @pytest.mark.asyncio
+    async def test_send_retried_in_place_before_later_events(
+        self, worker, event_queue, fast_worker, monkeypatch
+    ):
+        """Test a send the processor hands back is retried before the next event."""
+        monkeypatch.setattr("src.services.delivery_worker.asyncio.sleep", _no_backoff)
+        key = key_for_partition(1)
+        for i in range(2):
+            await event_queue.publish("chatwork", json.dumps({"n": i}), key)
+
+        calls = []
+
+        async def rate_limited(platform, payload, attempt, in_order):
+            calls.append((payload["n"], attempt))
+            if payload["n"] == 0 and attempt < 2:
+                raise RetryInPlaceError(
+                    "chatwork", "0", ServerError("down"), 3, attempt + 1
+                )
+
+        with patch("src.services.delivery_worker.dispatch_event", rate_limited):
+            await worker.start()
+            await wait_until_drained(event_queue)
+            await worker.stop()
+
+        assert calls == [(0, 0), (0, 1), (0, 2), (1, 0)]
+
+    @pytest.mark.asyncio
+    async def test_dead_letters_after_max_attempts(
+        self, worker, event_queue, fast_worker, monkeypatch, chatwork_webhook_data
+    ):
+        """Test an event that keeps failing goes to the DLQ and is acked."""
+        monkeypatch.setattr("src.services.delivery_worker.asyncio.sleep", _no_backoff)
+        monkeypatch.setattr(event_queue_module.settings, "delivery_max_attempts", 2)
+        await event_queue.publish(
+            "chatwork", json.dumps(chatwork_webhook_data), key_for_partition(0)
+        )
+
+        with patch(
+            "src.services.delivery_worker.dispatch_event",
+            AsyncMock(side_effect=ConnectionError("redis down")),
+        ), patch(
+            "src.services.delivery_worker.dead_letter_event", AsyncMock()
+        ) as mock_dlq:
+            await worker.start()
+            await wait_until_drained(event_queue)
+            await worker.stop()
+
+        assert await event_queue.depth() == 0
+        mock_dlq.assert_called_once()
+        assert mock_dlq.call_args.args[1] == chatwork_webhook_data
+
+    @pytest.mark.asyncio
+    async def test_takes_over_crashed_owner_events_first(
+        self, worker, event_queue, fast_worker
+    ):
+        """Test events left unacked by a crashed owner are delivered first."""
+        key = key_for_partition(2)
+        await event_queue.publish("chatwork", json.dumps({"n": 0}), key)
+        await event_queue.read("crashed-worker", [2])
+        await event_queue.publish("chatwork", json.dumps({"n": 1}), key)
+
+        order = []
+
+        async def record(platform, payload, **options):
+            order.append(payload["n"])
+
+        with patch("src.services.delivery_worker.dispatch_event", record):
+            await worker.start()
+            await wait_until_drained(event_queue)
+            await worker.stop()
+
+        assert order == [0, 1]
+
+    @pytest.mark.asyncio
+    async def test_new_owner_waits_for_in_flight_event(self, event_queue, fast_worker):
+        """Test a lost lease never lets two workers deliver a room at once."""
+        key = key_for_partition(1)
+        for i in range(3):
+            await event_queue.publish("chatwork", json.dumps({"n": i}), key)
+
+        old_owner = DeliveryWorker(consumer_name="worker-1")
+        new_owner = DeliveryWorker(consumer_name="worker-2")
+        old_owner.queue = new_owner.queue = event_queue
+
+        order = []
+        active = 0
+        peak = 0
+        release = asyncio.Event()
+
+        async def slow_dispatch(platform, payload, **options):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            order.append(payload["n"])
+            if payload["n"] == 0:
+                await release.wait()
+            active -= 1
+
+        with patch("src.services.delivery_worker.dispatch_event", slow_dispatch):
+            await old_owner.start()
+            while order != [0]:
+                await asyncio.sleep(0.01)
+
+            # The old owner's lease expires mid-delivery
+            await event_queue.redis.client.delete(event_queue.partition_lease(1))
+            await new_owner.start()
+            await asyncio.sleep(0.5)
+            assert order == [0]
+
+            release.set()
+            await wait_until_drained(event_queue)
+            await old_owner.stop()
+            await new_owner.stop()
+
+        assert order == [0, 1, 2]
+        assert peak == 1
+
+    @pytest.mark.asyncio
+    async def test_stop_keeps_lease_until_partitions_finish(
+        self, worker, event_queue, fast_worker
+    ):
+        """Test shutdown renews leases while the backlog is still delivered."""
+        key = key_for_partition(3)
+        for i in range(3):
+            await event_queue.publish("chatwork", json.dumps({"n": i}), key)
+
+        order = []
+
+        async def slow_dispatch(platform, payload, **options):
+            order.append(payload["n"])
+            await asyncio.sleep(0.25)
+
+        with patch("src.services.delivery_worker.dispatch_event", slow_dispatch):
+            await worker.start()
+            while not order:
+                await asyncio.sleep(0.01)
+            await worker.stop()
+
+        # Delivery took longer than the 300ms lease without losing it
+        assert order == [0, 1, 2]
+        assert await event_queue.depth() == 0
+        lease = event_queue.partition_lease(3)
+        assert await event_queue.redis.client.exists(lease) == 0
+
+    @pytest.mark.asyncio
+    async def test_partitions_rebalance_between_workers(self, event_queue):
+        """Test partitions are split between workers and move when one leaves."""
+        first = DeliveryWorker(consumer_name="worker-1")
+        second = DeliveryWorker(consumer_name="worker-2")
+        first.queue = second.queue = event_queue
+
+        # Both workers are registered before either picks partitions
+        await event_queue.heartbeat("worker-1")
+        await event_queue.heartbeat("worker-2")
+        await first.rebalance()
+        await second.rebalance()
+
+        assert set(first.owned_partitions).isdisjoint(second.owned_partitions)
+        assert set(first.owned_partitions) | set(second.owned_partitions) == {
+            0,
+            1,
+            2,
+            3,
+        }
+
+        await second.stop()
+        await first.rebalance()
+
+        assert first.owned_partitions == [0, 1, 2, 3]
+        await first.stop()
+
+    @pytest.mark.asyncio
+    async def test_failed_catch_up_releases_partition(self, worker, event_queue):
+        """Test a partition whose takeover fails is released, not stuck."""
+        with patch.object(
+            event_queue,
+            "claim_pending",
+            AsyncMock(side_effect=ConnectionError("redis down")),
+        ):
+            await worker.rebalance()
+            await asyncio.sleep(0.05)
+
+        assert worker.owned_partitions == []
+        assert await event_queue.acquire_partition(0, "worker-2") is True
@@ -0,0 +1,124 @@
+"""Unit tests for the background health prober."""
+
+import asyncio
+import time
+
+import pytest
+import respx
+from httpx import AsyncClient, ConnectError, Response
+
+import src.services.health_prober as health_prober_module
+from src.core.config import settings
+from src.main import app
+from src.services.health_prober import HealthProber, ProbeResult
+from src.services.redis_client import redis_client as global_redis
+
+
+@pytest.fixture
+def prober(redis_client, monkeypatch):
+    """Prober of the fake-Redis storage, sharing it with the global client."""
+    monkeypatch.setattr(global_redis, "_client", redis_client.client)
+    return HealthProber(storage=redis_client)
+
+
+@pytest.fixture
+def active_prober(monkeypatch):
+    """Global prober made to look like it is running in the background."""
+    prober = health_prober_module.health_prober
+    now = time.time()
+    monkeypatch.setattr(prober, "_task", object())
+    monkeypatch.setattr(prober, "checked_at", now)
+    monkeypatch.setattr(prober, "queue_depth", 7)
+    monkeypatch.setattr(prober, "breakers", {"chatwork": "closed", "lark": "open"})
+    monkeypatch.setattr(
+        prober,
+        "results",
+        {
+            "storage": ProbeResult(True, 0.4, now, now),
+            "chatwork": ProbeResult(True, 35.0, now, now),
+            "lark": ProbeResult(False, 2000.0, now, now - 60, "timed out"),
+        },
+    )
+    return prober
+
+
+@pytest.mark.unit
+class TestHealthProber:
+    """Test probing dependencies and caching the results."""
+
+    @pytest.mark.asyncio
+    async def test_probe_records_results(self, prober, monkeypatch):
+        """Test latency and last success are kept, also across a failure."""
+        monkeypatch.setattr(settings, "ingest_mode", "queue")
+        with respx.mock() as router:
+            router.get(settings.chatwork_api_base_url).mock(return_value=Response(401))
+            lark = router.get(settings.lark_api_base_url)
+            lark.mock(return_value=Response(404))
+            await prober.probe()
+            first_success = prober.results["lark"].last_success
+
+            lark.mock(side_effect=ConnectError("unreachable"))
+            await prober.probe()
+
+        assert prober.results["storage"].healthy
+        assert prober.results["chatwork"].healthy
+        lark_result = prober.results["lark"]
+        assert not lark_result.healthy
+        assert lark_result.last_success == first_success
+        assert lark_result.error == "unreachable"
+        assert lark_result.latency_ms >= 0
+        assert prober.queue_depth == 0
+        assert prober.breakers == {"chatwork": "closed", "lark": "closed"}
+        assert not prober.stale
+
+    @pytest.mark.asyncio
+    async def test_slow_dependency_times_out(self, prober, monkeypatch):
+        """Test a probe that hangs is reported unhealthy after the timeout."""
+        monkeypatch.setattr(settings, "health_probe_timeout_seconds", 0.01)
+
+        async def hang():
+            await asyncio.sleep(1)
+            return True
+
+        await prober._check("chatwork", hang)
+        assert not prober.results["chatwork"].healthy
+        assert prober.results["chatwork"].last_success is None
+
+
+@pytest.mark.unit
+class TestCachedHealthEndpoints:
+    """Test the health endpoints answering from the prober's cache."""
+
+    @pytest.mark.asyncio
+    async def test_health_from_cache(self, active_prober, monkeypatch):
+        """Test /health reports the cached checks without probing."""
+
+        async def fail():
+            raise AssertionError("storage probed inline")
+
+        monkeypatch.setattr(active_prober.storage, "health_check", fail)
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            body = (await client.get("/health/")).json()
+
+        assert body["status"] == "degraded"
+        assert body["details"]["checks"]["lark"]["error"] == "timed out"
+        assert body["details"]["checks"]["chatwork"]["latency_ms"] == 35.0
+
+    @pytest.mark.asyncio
+    async def test_ready_reports_queue_and_breakers(self, active_prober, monkeypatch):
+        """Test readiness carries queue depth and breakers, and honours the depth limit."""
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            body = (await client.get("/health/ready")).json()
+            assert body == {
+                "ready": True,
+                "queue_depth": 7,
+                "breakers": {"chatwork": "closed", "lark": "open"},
+            }
+
+            monkeypatch.setattr(settings, "health_ready_max_queue_depth", 5)
+            assert (await client.get("/health/ready")).json()["ready"] is False
+
+            monkeypatch.setattr(settings, "health_ready_max_queue_depth", 0)
+            monkeypatch.setattr(active_prober, "checked_at", time.time() - 3600)
+            body = (await client.get("/health/ready")).json()
+            assert body["reason"] == "Health probes stalled"
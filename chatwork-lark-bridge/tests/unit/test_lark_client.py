@@ -0,0 +1,252 @@
+"""Unit tests for the Lark API client."""
+
+import asyncio
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+import respx
+from httpx import Response
+
+import src.services.lark_client as lark_client_module
+from src.core.exceptions import (
+    APIError,
+    AuthenticationError,
+    BadRequestError,
+    RateLimitError,
+    ServerError,
+)
+from src.services.lark_client import LarkAPIClient
+from src.services.rate_limiter import RateLimiter, RateLimitGate
+from src.services.redis_client import RedisClient
+
+BASE_URL = lark_client_module.settings.lark_api_base_url
+
+
+@pytest.fixture
+async def lark(monkeypatch):
+    """Create a Lark client using the HTTP transport and a fresh rate limit gate."""
+    limiter = RateLimiter(redis=RedisClient())
+    monkeypatch.setattr(lark_client_module, "rate_limiter", limiter)
+    monkeypatch.setattr(lark_client_module, "rate_limit_gate", RateLimitGate(limiter))
+    client = LarkAPIClient()
+    yield client
+    await client.close()
+
+
+class RecordingLimiter(RateLimiter):
+    """Records reservation waits instead of sleeping."""
+
+    def __init__(self, redis):
+        super().__init__(redis=redis)
+        self.waits = []
+
+    async def acquire(self, *buckets):
+        wait = await self.reserve(*buckets)
+        self.waits.append((buckets[0].name, wait))
+        return wait
+
+
+def mock_token(router: respx.MockRouter) -> respx.Route:
+    """Mock the tenant access token endpoint."""
+    return router.post(f"{BASE_URL}/auth/v3/tenant_access_token/internal").mock(
+        return_value=Response(
+            200,
+            json={
+                "code": 0,
+                "msg": "ok",
+                "tenant_access_token": "t-123",
+                "expire": 7200,
+            },
+        )
+    )
+
+
+@pytest.mark.unit
+class TestLarkAPIClient:
+    """Test Lark message sending."""
+
+    @pytest.mark.asyncio
+    async def test_send_text_message_over_http(self, lark):
+        """Test messages are sent with a cached tenant token."""
+        with respx.mock(assert_all_called=True) as router:
+            token_route = mock_token(router)
+            send_route = router.post(f"{BASE_URL}/im/v1/messages").mock(
+                return_value=Response(
+                    200,
+                    json={"code": 0, "msg": "ok", "data": {"message_id": "om_1"}},
+                )
+            )
+
+            assert await lark.send_text_message("oc_test", "Hello") == "om_1"
+            assert await lark.send_text_message("oc_test", "Again") == "om_1"
+
+        assert token_route.call_count == 1
+        request = send_route.calls.last.request
+        assert request.headers["Authorization"] == "Bearer t-123"
+        assert request.url.params["receive_id_type"] == "chat_id"
+
+    @pytest.mark.asyncio
+    async def test_concurrent_sends_fetch_token_once(self, lark):
+        """Test concurrent first sends share a single token request."""
+        with respx.mock() as router:
+            token_route = mock_token(router)
+            router.post(f"{BASE_URL}/im/v1/messages").mock(
+                return_value=Response(
+                    200,
+                    json={"code": 0, "msg": "ok", "data": {"message_id": "om_1"}},
+                )
+            )
+
+            await asyncio.gather(
+                *(lark._send_message_request("oc_test", "text", "{}") for _ in range(5))
+            )
+
+        assert token_route.call_count == 1
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "code,exception",
+        [
+            (99991663, RateLimitError),
+            (99991661, AuthenticationError),
+            (99991400, BadRequestError),
+            (99992001, ServerError),
+            (12345, APIError),
+        ],
+    )
+    async def test_error_code_mapping(self, lark, code, exception):
+        """Test Lark error codes map to bridge exceptions."""
+        with respx.mock() as router:
+            mock_token(router)
+            router.post(f"{BASE_URL}/im/v1/messages").mock(
+                return_value=Response(400, json={"code": code, "msg": "failed"})
+            )
+
+            with pytest.raises(exception):
+                await lark._send_message_request("oc_test", "text", "{}")
+
+    @pytest.mark.asyncio
+    async def test_gateway_error_without_body(self, lark):
+        """Test bare HTTP errors map to bridge exceptions."""
+        with respx.mock() as router:
+            mock_token(router)
+            router.post(f"{BASE_URL}/im/v1/messages").mock(
+                return_value=Response(503, text="Service Unavailable")
+            )
+
+            with pytest.raises(ServerError):
+                await lark._send_message_request("oc_test", "text", "{}")
+
+    @pytest.mark.asyncio
+    async def test_sdk_transport_runs_off_the_event_loop(self, lark, monkeypatch):
+        """Test the SDK fallback does not block the event loop thread."""
+        monkeypatch.setattr(lark_client_module.settings, "lark_transport", "sdk")
+        threads = []
+
+        def create(request):
+            threads.append(threading.current_thread().name)
+            response = MagicMock()
+            response.success.return_value = True
+            response.data.message_id = "om_sdk"
+            return response
+
+        lark.client = MagicMock()
+        lark.client.im.v1.message.create = create
+
+        assert await lark._send_message_request("oc_test", "text", "{}") == "om_sdk"
+        assert threads[0].startswith("lark-sdk")
+
+    @pytest.mark.asyncio
+    async def test_sdk_transport_keeps_error_mapping(self, lark, monkeypatch):
+        """Test SDK responses use the same error code mapping."""
+        monkeypatch.setattr(lark_client_module.settings, "lark_transport", "sdk")
+        response = MagicMock()
+        response.success.return_value = False
+        response.code = 99991661
+        response.msg = "invalid token"
+
+        lark.client = MagicMock()
+        lark.client.im.v1.message.create.return_value = response
+
+        with pytest.raises(AuthenticationError):
+            await lark._send_message_request("oc_test", "text", "{}")
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_retry_after_from_reset_header(self, lark):
+        """Test the quota reset header replaces a fixed retry delay."""
+        with respx.mock() as router:
+            mock_token(router)
+            router.post(f"{BASE_URL}/im/v1/messages").mock(
+                side_effect=[
+                    Response(
+                        400,
+                        json={"code": 99991663, "msg": "too many requests"},
+                        headers={"x-ogw-ratelimit-reset": "3"},
+                    ),
+                    Response(400, json={"code": 99991663, "msg": "too many requests"}),
+                ]
+            )
+
+            with pytest.raises(RateLimitError) as with_header:
+                await lark._send_message_request("oc_test", "text", "{}")
+            with pytest.raises(RateLimitError) as without_header:
+                await lark._send_message_request("oc_test", "text", "{}")
+
+        assert with_header.value.retry_after == 3
+        assert without_header.value.retry_after == 1
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_pauses_platform(self, lark):
+        """Test a Lark rate limit error closes the shared gate."""
+        with respx.mock() as router:
+            mock_token(router)
+            router.post(f"{BASE_URL}/im/v1/messages").mock(
+                return_value=Response(
+                    400,
+                    json={"code": 99991663, "msg": "too many requests"},
+                    headers={"x-ogw-ratelimit-reset": "5"},
+                )
+            )
+
+            with pytest.raises(RateLimitError):
+                await lark._send_message_request("oc_test", "text", "{}")
+
+        _, seconds = await lark_client_module.rate_limit_gate._pause_for("lark")
+        assert seconds == 5
+
+    @pytest.mark.asyncio
+    async def test_sends_spaced_per_chat_and_per_app(
+        self, lark, redis_client, monkeypatch
+    ):
+        """Test a busy chat waits on its own quota without delaying other chats."""
+        limiter = RecordingLimiter(redis_client)
+        monkeypatch.setattr(lark_client_module, "rate_limiter", limiter)
+        monkeypatch.setattr(
+            lark_client_module, "rate_limit_gate", RateLimitGate(limiter)
+        )
+        monkeypatch.setattr(lark_client_module.settings, "lark_rate_limit_chat_qps", 1)
+
+        with respx.mock() as router:
+            mock_token(router)
+            router.post(f"{BASE_URL}/im/v1/messages").mock(
+                return_value=Response(
+                    200,
+                    json={"code": 0, "msg": "ok", "data": {"message_id": "om_1"}},
+                )
+            )
+
+            await lark._send_message_request("oc_busy", "text", "{}")
+            await lark._send_message_request("oc_busy", "text", "{}")
+            await lark._send_message_request("oc_quiet", "text", "{}")
+
+        chat_waits = [
+            wait for name, wait in limiter.waits if name.startswith("lark:chat:")
+        ]
+        app_waits = [
+            wait for name, wait in limiter.waits if name.startswith("lark:app:")
+        ]
+        assert chat_waits[0] == 0
+        assert chat_waits[1] > 0.9
+        assert chat_waits[2] == 0
+        assert app_waits == [0, 0, 0]
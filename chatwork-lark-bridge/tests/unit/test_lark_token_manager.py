@@ -0,0 +1,119 @@
+"""Unit tests for the shared Lark tenant token manager."""
+
+import asyncio
+import time
+
+import pytest
+
+from src.services.lark_token_manager import LarkTokenManager
+from src.services.redis_client import RedisClient
+
+
+class FakeTokenEndpoint:
+    """Counts token requests and issues a new token for each."""
+
+    def __init__(self, expire: int = 7200, delay: float = 0):
+        self.calls = 0
+        self.expire = expire
+        self.delay = delay
+
+    async def __call__(self) -> tuple[str, int]:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return f"t-{self.calls}", self.expire
+
+
+@pytest.mark.unit
+class TestLarkTokenManager:
+    """Test token caching, sharing and refresh."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_fetch(self, redis_client):
+        """Test concurrent first callers collapse into one token request."""
+        endpoint = FakeTokenEndpoint(delay=0.05)
+        manager = LarkTokenManager(endpoint, redis=redis_client)
+
+        tokens = await asyncio.gather(*(manager.get_token() for _ in range(10)))
+
+        assert set(tokens) == {"t-1"}
+        assert endpoint.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_token_shared_across_replicas(self, redis_client):
+        """Test a second replica reuses the token cached in Redis."""
+        endpoint = FakeTokenEndpoint()
+        first = LarkTokenManager(endpoint, redis=redis_client)
+        second = LarkTokenManager(endpoint, redis=redis_client)
+
+        assert await first.get_token() == "t-1"
+        assert await second.get_token() == "t-1"
+        assert endpoint.calls == 1
+
+        ttl = await redis_client.client.ttl(first.cache_key)
+        assert 0 < ttl <= 7200
+
+    @pytest.mark.asyncio
+    async def test_replicas_refresh_once_at_the_same_time(self, redis_client):
+        """Test simultaneous refreshes on two replicas call Lark once."""
+        endpoint = FakeTokenEndpoint(delay=0.2)
+        first = LarkTokenManager(endpoint, redis=redis_client)
+        second = LarkTokenManager(endpoint, redis=redis_client)
+
+        tokens = await asyncio.gather(first.get_token(), second.get_token())
+
+        assert tokens == ["t-1", "t-1"]
+        assert endpoint.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_token_near_expiry_refreshed_in_background(self, redis_client):
+        """Test a token inside the refresh margin is served while refreshing."""
+        endpoint = FakeTokenEndpoint(delay=0.05)
+        manager = LarkTokenManager(endpoint, redis=redis_client)
+        await redis_client.client.hset(
+            manager.cache_key,
+            mapping={"token": "t-old", "expires_at": time.time() + 120},
+        )
+
+        assert await manager.get_token() == "t-old"
+        assert await manager.get_token() == "t-old"
+        await asyncio.sleep(0.1)
+
+        assert await manager.get_token() == "t-1"
+        assert endpoint.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_background_task_fetches_before_first_send(self, redis_client):
+        """Test start() obtains a token without any caller waiting on it."""
+        endpoint = FakeTokenEndpoint()
+        manager = LarkTokenManager(endpoint, redis=redis_client)
+
+        manager.start()
+        await asyncio.sleep(0.05)
+        await manager.stop()
+
+        assert endpoint.calls == 1
+        assert manager._token == "t-1"
+
+    @pytest.mark.asyncio
+    async def test_invalidate_drops_only_the_rejected_token(self, redis_client):
+        """Test invalidation does not discard a newer shared token."""
+        endpoint = FakeTokenEndpoint()
+        manager = LarkTokenManager(endpoint, redis=redis_client)
+        await manager.get_token()
+
+        await manager.invalidate("t-stale")
+        assert await redis_client.client.exists(manager.cache_key)
+
+        await manager.invalidate("t-1")
+        assert not await redis_client.client.exists(manager.cache_key)
+        assert await manager.get_token() == "t-2"
+
+    @pytest.mark.asyncio
+    async def test_works_without_redis(self):
+        """Test tokens are cached in-process when Redis is unavailable."""
+        endpoint = FakeTokenEndpoint()
+        manager = LarkTokenManager(endpoint, redis=RedisClient())
+
+        assert await manager.get_token() == "t-1"
+        assert await manager.get_token() == "t-1"
+        assert endpoint.calls == 1
@@ -0,0 +1,100 @@
+"""Unit tests for the mapping loader."""
+
+import json
+
+import pytest
+
+from src.services.mapping_loader import MappingLoader
+from src.services.route_table import RouteTable
+
+ROOMS = [
+    {"chatwork_room_id": "111", "lark_chat_id": "oc_a", "sync_direction": "both"},
+    {"chatwork_room_id": "222", "lark_chat_id": "oc_b", "sync_direction": "lark_to_cw"},
+    {"chatwork_room_id": "333", "lark_chat_id": "oc_c", "is_active": False},
+]
+
+
+def write_rooms(config_dir, mappings):
+    """Write a room_mappings.json file."""
+    (config_dir / "room_mappings.json").write_text(json.dumps({"mappings": mappings}))
+
+
+@pytest.fixture
+def loader(tmp_path, redis_client):
+    """Create a mapping loader reading from a temporary config directory."""
+    loader = MappingLoader(config_dir=str(tmp_path))
+    loader.storage = redis_client
+    loader.routes = RouteTable(redis=redis_client)
+    return loader
+
+
+@pytest.mark.unit
+class TestMappingLoader:
+    """Test loading and reloading mappings."""
+
+    @pytest.mark.asyncio
+    async def test_load_into_non_expiring_hashes(self, loader, tmp_path, redis_client):
+        """Test active mappings are loaded in both directions without a TTL."""
+        write_rooms(tmp_path, ROOMS)
+
+        assert await loader.load_room_mappings() == 2
+
+        assert await redis_client.get_room_mapping("chatwork", "111") == "oc_a"
+        assert await redis_client.get_room_mapping("lark", "oc_b") == "222"
+        assert await redis_client.get_room_mapping("chatwork", "333") is None
+        assert await redis_client.client.ttl("rooms:chatwork") == -1
+        assert await redis_client.client.hget("room_directions:chatwork", "222") == (
+            "lark_to_chatwork"
+        )
+        assert not await redis_client.client.exists("{rooms:chatwork}:staging")
+
+    @pytest.mark.asyncio
+    async def test_full_load_replaces_old_mappings(
+        self, loader, tmp_path, redis_client
+    ):
+        """Test a full load drops mappings no longer in the file."""
+        write_rooms(tmp_path, ROOMS)
+        await loader.load_room_mappings()
+
+        write_rooms(tmp_path, ROOMS[:1])
+        await loader.load_room_mappings()
+
+        assert await redis_client.client.hgetall("rooms:chatwork") == {"111": "oc_a"}
+
+    @pytest.mark.asyncio
+    async def test_reload_writes_only_changes(self, loader, tmp_path, redis_client):
+        """Test a reload updates, adds and removes just the differing entries."""
+        write_rooms(tmp_path, ROOMS)
+        await loader.load_room_mappings()
+        await loader.routes.refresh()
+
+        assert await loader.reload() == {"updated": 0, "removed": 0}
+
+        write_rooms(
+            tmp_path,
+            [
+                {"chatwork_room_id": "111", "lark_chat_id": "oc_new"},
+                {"chatwork_room_id": "444", "lark_chat_id": "oc_d"},
+            ],
+        )
+        result = await loader.reload()
+
+        # 111 retargeted (3 fields, its direction is unchanged), 444 added
+        # (4 fields); 222, oc_a and oc_b removed with their directions
+        assert result == {"updated": 7, "removed": 6}
+        assert await redis_client.client.hgetall("rooms:chatwork") == {
+            "111": "oc_new",
+            "444": "oc_d",
+        }
+        await loader.routes.check_version()
+        assert loader.routes.lookup("chatwork", "444").target_room_id == "oc_d"
+
+    @pytest.mark.asyncio
+    async def test_missing_file_keeps_mappings(self, loader, tmp_path, redis_client):
+        """Test a deleted mapping file does not wipe the loaded mappings."""
+        write_rooms(tmp_path, ROOMS)
+        await loader.load_room_mappings()
+        (tmp_path / "room_mappings.json").unlink()
+
+        assert await loader.reload() == {"updated": 0, "removed": 0}
+        assert await redis_client.get_room_mapping("chatwork", "111") == "oc_a"
@@ -1,5 +1,6 @@
 """Unit tests for message processor."""
 
+import asyncio
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 
@@ -7,6 +8,7 @@ from src.services.message_processor import MessageProcessor
 from src.core.exceptions import (
     LoopDetectedError,
     MappingNotFoundError,
+    ServerError,
 )
 
 
@@ -18,7 +20,7 @@ class TestMessageProcessor:
     def message_processor(self, redis_client, mock_chatwork_client, mock_lark_client):
         """Create message processor instance with mocks."""
         processor = MessageProcessor()
-        processor.redis = redis_client
+        processor.storage = redis_client
         processor.chatwork = mock_chatwork_client
         processor.lark = mock_lark_client
         return processor
@@ -66,6 +68,70 @@ class TestMessageProcessor:
         assert result is None
         message_processor.lark.send_text_message.assert_not_called()
 
+    @pytest.mark.asyncio
+    async def test_concurrent_duplicates_send_once(
+        self, message_processor, redis_client
+    ):
+        """Test two copies of a message racing each other are sent once."""
+        await redis_client.set_room_mapping("chatwork", "12345678", "oc_test")
+
+        async def slow_send(chat_id, text):
+            await asyncio.sleep(0.05)
+            return "om_test123"
+
+        message_processor.lark.send_text_message.side_effect = slow_send
+        message = {
+            "room_id": "12345678",
+            "message_id": "999",
+            "sender_name": "Test User",
+            "message_body": "Hello",
+        }
+
+        results = await asyncio.gather(
+            message_processor.process_chatwork_message(**message),
+            message_processor.process_chatwork_message(**message),
+        )
+
+        assert sorted(results, key=str) == [None, "om_test123"]
+        message_processor.lark.send_text_message.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_failed_send_releases_claim(self, message_processor, redis_client):
+        """Test a failed send gives up its claim so the message can be retried."""
+        await redis_client.set_room_mapping("chatwork", "12345678", "oc_test")
+        message_processor.lark.send_text_message.side_effect = ServerError("down")
+        message_processor.retries = AsyncMock()
+        message_processor.retries.backoff = MagicMock(return_value=1)
+
+        with pytest.raises(Exception):
+            await message_processor.process_chatwork_message(
+                room_id="12345678",
+                message_id="999",
+                sender_name="Test User",
+                message_body="Hello",
+            )
+
+        assert not await redis_client.is_message_processed("chatwork", "999")
+
+    @pytest.mark.asyncio
+    async def test_one_way_room_skips_other_direction(
+        self, message_processor, redis_client
+    ):
+        """Test a Lark-to-Chatwork-only room does not forward Chatwork messages."""
+        await redis_client.set_room_mapping(
+            "chatwork", "12345678", "oc_test", sync_direction="lark_to_chatwork"
+        )
+
+        result = await message_processor.process_chatwork_message(
+            room_id="12345678",
+            message_id="999",
+            sender_name="Test User",
+            message_body="Hello",
+        )
+
+        assert result is None
+        message_processor.lark.send_text_message.assert_not_called()
+
     @pytest.mark.asyncio
     async def test_process_chatwork_message_loop_detection(
         self, message_processor, redis_client
@@ -101,6 +167,7 @@ class TestMessageProcessor:
             )
 
         message_processor.lark.send_text_message.assert_not_called()
+        assert not await redis_client.is_message_processed("chatwork", "999")
 
     @pytest.mark.asyncio
     async def test_process_lark_message_success(
@@ -233,3 +300,21 @@ class TestMessageProcessor:
         assert message_processor._is_from_bridge(
             "[From Lark] test", "lark"
         ) is True
+
+    @pytest.mark.asyncio
+    async def test_partition_key_same_for_both_directions(
+        self, message_processor, redis_client
+    ):
+        """Test both directions of a room pair share one partition key."""
+        await redis_client.set_room_mapping("chatwork", "12345678", "oc_test")
+        await redis_client.set_room_mapping("lark", "oc_test", "12345678")
+
+        assert await message_processor.partition_key("chatwork", "12345678") == (
+            "cw_12345678_lark_oc_test"
+        )
+        assert await message_processor.partition_key("lark", "oc_test") == (
+            "cw_12345678_lark_oc_test"
+        )
+        assert await message_processor.partition_key("lark", "oc_other") == (
+            "lark_oc_other"
+        )
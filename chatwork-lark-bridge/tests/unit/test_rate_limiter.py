@@ -0,0 +1,167 @@
+"""Unit tests for the distributed token-bucket rate limiter."""
+
+import asyncio
+import time
+
+import pytest
+import respx
+from httpx import Response
+
+import src.services.chatwork_client as chatwork_client_module
+import src.services.rate_limiter as rate_limiter_module
+from src.core.exceptions import RateLimitError
+from src.services.chatwork_client import ChatworkAPIClient
+from src.services.rate_limiter import Bucket, RateLimiter, RateLimitGate
+from src.services.redis_client import RedisClient
+
+
+@pytest.mark.unit
+class TestRateLimiter:
+    """Test token bucket reservation."""
+
+    @pytest.mark.asyncio
+    async def test_burst_up_to_capacity_then_wait_for_refill(self, redis_client):
+        """Test a full bucket allows a burst, then spaces calls by refill time."""
+        limiter = RateLimiter(redis=redis_client)
+        bucket = Bucket("test", capacity=5, window_seconds=1)
+
+        waits = [await limiter.reserve(bucket) for _ in range(7)]
+
+        assert waits[:5] == [0, 0, 0, 0, 0]
+        assert 0.15 <= waits[5] <= 0.2
+        assert 0.35 <= waits[6] <= 0.4
+
+    @pytest.mark.asyncio
+    async def test_bucket_shared_across_replicas(self, redis_client):
+        """Test two limiter instances draw from the same Redis bucket."""
+        first = RateLimiter(redis=redis_client)
+        second = RateLimiter(redis=redis_client)
+        bucket = Bucket("shared", capacity=2, window_seconds=10)
+
+        assert await first.reserve(bucket) == 0
+        assert await second.reserve(bucket) == 0
+        assert await first.reserve(bucket) > 4
+
+    @pytest.mark.asyncio
+    async def test_wait_is_longest_of_all_buckets(self, redis_client):
+        """Test a call counted against several buckets waits for the slowest."""
+        limiter = RateLimiter(redis=redis_client)
+        room = Bucket("room", capacity=1, window_seconds=1)
+        account = Bucket("account", capacity=1, window_seconds=10)
+
+        assert await limiter.reserve(room, account) == 0
+        assert await limiter.reserve(room, account) > 9
+
+    @pytest.mark.asyncio
+    async def test_local_fallback_without_redis(self):
+        """Test buckets are kept in-process when Redis is unavailable."""
+        limiter = RateLimiter(redis=RedisClient())
+        bucket = Bucket("local", capacity=1, window_seconds=10)
+
+        assert await limiter.reserve(bucket) == 0
+        assert await limiter.reserve(bucket) > 9
+
+    @pytest.mark.asyncio
+    async def test_chatwork_post_acquires_before_sending(
+        self, redis_client, monkeypatch
+    ):
+        """Test Chatwork waits for the room bucket instead of sending into a 429."""
+        limiter = RateLimiter(redis=redis_client)
+        monkeypatch.setattr(chatwork_client_module, "rate_limiter", limiter)
+        monkeypatch.setattr(
+            chatwork_client_module.settings, "chatwork_rate_limit_requests", 1
+        )
+
+        waits = []
+
+        async def acquire(*buckets):
+            waits.append(await limiter.reserve(*buckets))
+
+        monkeypatch.setattr(limiter, "acquire", acquire)
+        client = ChatworkAPIClient()
+
+        with respx.mock() as router:
+            route = router.post(
+                f"{chatwork_client_module.settings.chatwork_api_base_url}/rooms/1/messages"
+            ).mock(return_value=Response(200, json={"message_id": "1"}))
+
+            await client._post_message("1", {"body": "a"})
+            await client._post_message("1", {"body": "b"})
+
+        await client.close()
+        assert route.call_count == 2
+        assert waits[0] == 0
+        assert waits[1] > 9
+
+
+@pytest.fixture
+def gate(redis_client):
+    """Create a rate limit gate backed by fake Redis."""
+    return RateLimitGate(RateLimiter(redis=redis_client), redis=redis_client)
+
+
+@pytest.mark.unit
+class TestRateLimitGate:
+    """Test the shared per-platform pause."""
+
+    @pytest.mark.asyncio
+    async def test_open_gate_does_not_wait(self, gate):
+        """Test senders pass straight through when nothing is paused."""
+        assert await gate.wait("chatwork") < 0.05
+
+    @pytest.mark.asyncio
+    async def test_pause_shared_across_replicas(self, gate, redis_client):
+        """Test a pause set by one replica holds senders on another."""
+        other = RateLimitGate(RateLimiter(redis=redis_client), redis=redis_client)
+
+        await gate.pause("chatwork", 0.3)
+
+        assert await other.wait("chatwork") >= 0.25
+        assert await other.wait("lark") < 0.05
+
+    @pytest.mark.asyncio
+    async def test_shorter_pause_does_not_shorten_gate(self, gate, redis_client):
+        """Test a later, shorter retry_after keeps the longer pause."""
+        await gate.pause("lark", 60)
+        await gate.pause("lark", 1)
+
+        shared = await redis_client.client.hgetall(gate.key("lark"))
+        assert float(shared["until"]) > time.time() + 50
+
+    @pytest.mark.asyncio
+    async def test_senders_resume_at_controlled_rate(self, gate, monkeypatch):
+        """Test waiters are released one resume interval apart."""
+        monkeypatch.setattr(
+            rate_limiter_module.settings, "rate_limit_resume_per_second", 10
+        )
+        await gate.pause("lark", 0.2)
+        started = time.monotonic()
+
+        async def send():
+            await gate.wait("lark")
+            return time.monotonic() - started
+
+        released = sorted(await asyncio.gather(*(send() for _ in range(4))))
+
+        assert released[0] >= 0.15
+        gaps = [later - earlier for earlier, later in zip(released, released[1:])]
+        assert all(gap >= 0.08 for gap in gaps)
+
+    @pytest.mark.asyncio
+    async def test_chatwork_429_pauses_platform(self, gate, monkeypatch):
+        """Test a Chatwork 429 closes the gate for its Retry-After."""
+        monkeypatch.setattr(chatwork_client_module, "rate_limit_gate", gate)
+        client = ChatworkAPIClient()
+
+        with respx.mock() as router:
+            router.post(
+                f"{chatwork_client_module.settings.chatwork_api_base_url}/rooms/1/messages"
+            ).mock(return_value=Response(429, headers={"Retry-After": "30"}))
+
+            with pytest.raises(RateLimitError):
+                await client._post_message("1", {"body": "a"})
+
+        await client.close()
+        until, seconds = await gate._pause_for("chatwork")
+        assert seconds == 30
+        assert until > time.time() + 25
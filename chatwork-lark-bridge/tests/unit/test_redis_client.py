@@ -1,10 +1,27 @@
 """Unit tests for Redis client."""
 
 import json
+import time
 import pytest
 from datetime import datetime, timezone
 
-from src.services.redis_client import RedisClient
+from redis.crc import key_slot
+
+import src.services.redis_client as redis_client_module
+from src.services.circuit_breaker import CircuitBreaker, circuit_breakers
+from src.services.rate_limiter import Bucket, RateLimiter
+from src.services.redis_client import (
+    DLQ_COUNTS_KEY,
+    DLQ_ENTRIES_KEY,
+    DLQ_INDEX_KEY,
+    SEND_CLAIMED,
+    SEND_DIRECTION_DISABLED,
+    SEND_DUPLICATE,
+    SEND_NO_MAPPING,
+    RedisClient,
+    hash_tag,
+)
+from src.services.retry_queue import RetryQueue
 
 
 @pytest.mark.unit
@@ -53,6 +70,67 @@ class TestRedisClient:
         is_processed = await redis_client.is_message_processed("chatwork", "999")
         assert is_processed is True
 
+    @pytest.mark.asyncio
+    async def test_claim_message(self, redis_client):
+        """Test only the first claim wins until it is released."""
+        claim = await redis_client.claim_message("chatwork", "999")
+
+        assert claim is not None
+        assert await redis_client.claim_message("chatwork", "999") is None
+        assert (
+            await redis_client.client.ttl(redis_client._claim_key("chatwork", "999"))
+            > 0
+        )
+
+        await redis_client.release_message_claim("chatwork", "999", claim)
+        assert await redis_client.claim_message("chatwork", "999") is not None
+
+    @pytest.mark.asyncio
+    async def test_completed_claim_is_not_released(self, redis_client):
+        """Test releasing a claim after its mapping was saved keeps the mapping."""
+        claim = await redis_client.claim_message("chatwork", "999")
+        await redis_client.save_message_mapping("chatwork", "999", "lark", "om_test123")
+
+        await redis_client.release_message_claim("chatwork", "999", claim)
+
+        mapping = await redis_client.get_message_mapping("chatwork", "999")
+        assert mapping["target_message_id"] == "om_test123"
+
+    @pytest.mark.asyncio
+    async def test_prepare_send(self, redis_client):
+        """Test dedup, room lookup and claim come back from one call."""
+        await redis_client.set_room_mapping("chatwork", "12345678", "oc_test")
+
+        prepared = await redis_client.prepare_send("chatwork", "12345678", "999")
+        assert prepared.status == "claimed"
+        assert prepared.target_room_id == "oc_test"
+        assert prepared.claim is not None
+
+        duplicate = await redis_client.prepare_send("chatwork", "12345678", "999")
+        assert duplicate.status == "duplicate"
+
+        unmapped = await redis_client.prepare_send("chatwork", "99999999", "1000")
+        assert unmapped.status == "no_mapping"
+        assert not await redis_client.is_message_processed("chatwork", "1000")
+
+    @pytest.mark.asyncio
+    async def test_prepare_send_checks_sync_direction(self, redis_client):
+        """Test a one-way room pair only claims messages going its way."""
+        await redis_client.set_room_mapping(
+            "chatwork", "12345678", "oc_test", sync_direction="lark_to_chatwork"
+        )
+        await redis_client.set_room_mapping(
+            "lark", "oc_test", "12345678", sync_direction="lark_to_chatwork"
+        )
+
+        blocked = await redis_client.prepare_send("chatwork", "12345678", "999")
+        allowed = await redis_client.prepare_send("lark", "oc_test", "om_123")
+
+        assert blocked.status == "direction_disabled"
+        assert not await redis_client.is_message_processed("chatwork", "999")
+        assert allowed.status == "claimed"
+        assert allowed.target_room_id == "12345678"
+
     @pytest.mark.asyncio
     async def test_set_and_get_room_mapping(self, redis_client):
         """Test setting and getting room mapping."""
@@ -129,10 +207,10 @@ class TestRedisClient:
         )
 
         # Verify it was added (check using Redis directly)
-        failed_keys = await redis_client.client.keys("failed:*")
+        entry_ids = await redis_client.client.zrange(DLQ_INDEX_KEY, 0, -1)
 
-        assert len(failed_keys) == 1
-        stored_json = await redis_client.client.get(failed_keys[0])
+        assert len(entry_ids) == 1
+        stored_json = await redis_client.client.hget(DLQ_ENTRIES_KEY, entry_ids[0])
         stored_data = json.loads(stored_json)
         assert stored_data["message"]["message_id"] == "999"
         assert stored_data["error"] == "API error"
@@ -176,6 +254,80 @@ class TestRedisClient:
 
         assert len(failed_messages) == 3
 
+    @pytest.mark.asyncio
+    async def test_failed_messages_cursor_pagination(self, redis_client):
+        """Test DLQ pages continue after the last entry of the previous page."""
+        for i in range(5):
+            await redis_client.add_to_failed_queue(
+                "chatwork", "lark", {"message_id": f"msg_{i}"}, f"Error {i}"
+            )
+
+        first = await redis_client.get_failed_messages(limit=3)
+        second = await redis_client.get_failed_messages(limit=3, after=first[-1][0])
+
+        message_ids = [data["message"]["message_id"] for _, data in first + second]
+        assert sorted(message_ids) == [f"msg_{i}" for i in range(5)]
+        assert await redis_client.get_failed_messages(after=second[-1][0]) == []
+
+    @pytest.mark.asyncio
+    async def test_failed_message_counts(self, redis_client):
+        """Test DLQ counts by platform and error class follow adds and removals."""
+        await redis_client.add_to_failed_queue(
+            "chatwork", "lark", {"message_id": "1"}, "bad", error_type="BadRequestError"
+        )
+        await redis_client.add_to_failed_queue(
+            "lark", "chatwork", {"message_id": "2"}, "down", error_type="ServerError"
+        )
+        await redis_client.add_to_failed_queue(
+            "lark", "chatwork", {"message_id": "3"}, "down", error_type="ServerError"
+        )
+
+        counts = await redis_client.count_failed_messages()
+        assert counts == {
+            "total": 3,
+            "by_platform": {"chatwork": 1, "lark": 2},
+            "by_error": {"BadRequestError": 1, "ServerError": 2},
+        }
+
+        entries = await redis_client.get_failed_messages(limit=2)
+        assert await redis_client.remove_failed_messages(entries) == 2
+        # Removing again is a no-op and does not skew the counts
+        assert await redis_client.remove_failed_messages(entries) == 0
+
+        counts = await redis_client.count_failed_messages()
+        assert counts == {
+            "total": 1,
+            "by_platform": {"lark": 1},
+            "by_error": {"ServerError": 1},
+        }
+
+    @pytest.mark.asyncio
+    async def test_old_failed_messages_pruned(self, redis_client):
+        """Test entries past the DLQ retention are dropped on the next add."""
+        old_id = "0000000000001-000000000000"
+        await redis_client.client.hset(
+            DLQ_ENTRIES_KEY,
+            old_id,
+            json.dumps(
+                {
+                    "source_platform": "chatwork",
+                    "error_type": "ServerError",
+                    "message": {"message_id": "old"},
+                }
+            ),
+        )
+        await redis_client.client.zadd(DLQ_INDEX_KEY, {old_id: 0})
+        await redis_client.client.hset(DLQ_COUNTS_KEY, "platform:chatwork", 1)
+
+        await redis_client.add_to_failed_queue(
+            "chatwork", "lark", {"message_id": "new"}, "e"
+        )
+
+        remaining = await redis_client.get_failed_messages()
+        assert [data["message"]["message_id"] for _, data in remaining] == ["new"]
+        counts = await redis_client.count_failed_messages()
+        assert counts["by_platform"] == {"chatwork": 1}
+
     @pytest.mark.asyncio
     async def test_message_ttl(self, redis_client):
         """Test message mapping TTL."""
@@ -183,10 +335,105 @@ class TestRedisClient:
             "chatwork", "999", "lark", "om_123"
         )
 
-        # Check TTL is set (should be around 86400 seconds = 24 hours)
-        ttl = await redis_client.client.ttl("msg:chatwork:999")
-        assert ttl > 0
-        assert ttl <= 86400  # Within 24 hours
+        # The bucket outlives its window by one TTL (24 hours)
+        bucket, _ = redis_client._mapping_buckets("chatwork", "999")
+        ttl = await redis_client.client.ttl(bucket)
+        assert ttl > 86400
+        assert ttl <= 2 * 86400
+
+    @pytest.mark.asyncio
+    async def test_message_mapping_compact_encoding(self, redis_client):
+        """Test mappings are stored compactly and decoded on read."""
+        await redis_client.save_message_mapping(
+            "chatwork", "999", "lark", "om_123", room_mapping_id="cw_1_lark_oc"
+        )
+
+        bucket, _ = redis_client._mapping_buckets("chatwork", "999")
+        value = await redis_client.client.hget(bucket, "999")
+        assert value.startswith("om_123|")
+        assert not await redis_client.client.exists(
+            redis_client._claim_key("chatwork", "999")
+        )
+
+        mapping = await redis_client.get_message_mapping("chatwork", "999")
+        assert mapping["source_platform"] == "chatwork"
+        assert mapping["source_message_id"] == "999"
+        assert mapping["target_platform"] == "lark"
+        assert mapping["target_message_id"] == "om_123"
+        assert await redis_client.is_message_processed("chatwork", "999")
+
+    @pytest.mark.asyncio
+    async def test_legacy_message_mapping_still_read(self, redis_client):
+        """Test mappings written before the bucket layout are still found."""
+        await redis_client.client.setex(
+            "msg:lark:om_old",
+            3600,
+            json.dumps(
+                {
+                    "source_platform": "lark",
+                    "target_platform": "chatwork",
+                    "target_message_id": "555",
+                }
+            ),
+        )
+
+        mapping = await redis_client.get_message_mapping("lark", "om_old")
+        assert mapping["target_message_id"] == "555"
+        assert await redis_client.claim_message("lark", "om_old") is None
+
+    @pytest.mark.asyncio
+    async def test_get_counterpart_both_directions(self, redis_client):
+        """Test the counterpart is found from either side of a mapping."""
+        await redis_client.save_message_mapping("chatwork", "999", "lark", "om_123")
+
+        assert await redis_client.get_counterpart("chatwork", "999") == {
+            "platform": "lark",
+            "message_id": "om_123",
+            "role": "target",
+        }
+        assert await redis_client.get_counterpart("lark", "om_123") == {
+            "platform": "chatwork",
+            "message_id": "999",
+            "role": "source",
+        }
+        assert await redis_client.get_counterpart("lark", "om_unknown") is None
+        # Posted copies are not themselves processed messages
+        assert not await redis_client.is_message_processed("lark", "om_123")
+
+    @pytest.mark.asyncio
+    async def test_get_counterpart_legacy_mapping(self, redis_client):
+        """Test a legacy mapping resolves from its source side."""
+        await redis_client.client.setex(
+            "msg:lark:om_old",
+            3600,
+            json.dumps(
+                {
+                    "source_platform": "lark",
+                    "target_platform": "chatwork",
+                    "target_message_id": "555",
+                }
+            ),
+        )
+
+        counterpart = await redis_client.get_counterpart("lark", "om_old")
+        assert counterpart == {
+            "platform": "chatwork",
+            "message_id": "555",
+            "role": "target",
+        }
+
+    @pytest.mark.asyncio
+    async def test_mapping_from_previous_window_blocks_claim(
+        self, redis_client, monkeypatch
+    ):
+        """Test a mapping saved just before the window rolled over still dedups."""
+        await redis_client.save_message_mapping("chatwork", "999", "lark", "om_123")
+        later = time.time() + 86400
+        monkeypatch.setattr(redis_client_module.time, "time", lambda: later)
+
+        assert await redis_client.claim_message("chatwork", "999") is None
+        mapping = await redis_client.get_message_mapping("chatwork", "999")
+        assert mapping["target_message_id"] == "om_123"
 
     @pytest.mark.asyncio
     async def test_room_mapping_ttl(self, redis_client):
@@ -207,3 +454,101 @@ class TestRedisClient:
 
         await redis_client.disconnect()
         assert redis_client.is_connected() is False
+
+
+@pytest.fixture
+def cluster_client(redis_client, monkeypatch):
+    """Redis client in cluster mode that fails scripts spanning slots."""
+    redis_client.cluster = True
+    run_script = redis_client.run_script
+
+    async def slot_checked(source, keys, args):
+        slots = {key_slot(key.encode()) for key in keys}
+        assert len(slots) <= 1, f"cross-slot script keys: {keys}"
+        return await run_script(source, keys, args)
+
+    monkeypatch.setattr(redis_client, "run_script", slot_checked)
+    return redis_client
+
+
+@pytest.mark.unit
+@pytest.mark.redis
+class TestClusterKeyLayout:
+    """Test the key layout and code paths used with Redis Cluster."""
+
+    def test_hash_tag(self):
+        """Test the hashed part of a key is found like Redis Cluster does."""
+        assert hash_tag("{dlq}:index") == "dlq"
+        assert hash_tag("msg:{lark:7}:om_1") == "lark:7"
+        assert hash_tag("retry:scheduled") == "retry:scheduled"
+        assert hash_tag("a:{}:b") == "a:{}:b"
+
+    @pytest.mark.asyncio
+    async def test_message_flow_stays_on_one_slot(self, cluster_client):
+        """Test claims, mappings and the DLQ only run single-slot scripts."""
+        await cluster_client.client.hset("rooms:chatwork", "12345678", "oc_test")
+        await cluster_client.client.hset("rooms:lark", "oc_oneway", "87654321")
+        await cluster_client.client.hset(
+            "room_directions:lark", "oc_oneway", "chatwork_to_lark"
+        )
+
+        prepared = await cluster_client.prepare_send("chatwork", "12345678", "999")
+        assert (prepared.status, prepared.target_room_id) == (SEND_CLAIMED, "oc_test")
+        assert (
+            await cluster_client.prepare_send("chatwork", "12345678", "999")
+        ).status == (SEND_DUPLICATE)
+        assert (await cluster_client.prepare_send("chatwork", "404", "1")).status == (
+            SEND_NO_MAPPING
+        )
+        assert (
+            await cluster_client.prepare_send("lark", "oc_oneway", "om_1")
+        ).status == (SEND_DIRECTION_DISABLED)
+
+        await cluster_client.save_message_mapping("chatwork", "999", "lark", "om_123")
+        assert (await cluster_client.get_counterpart("lark", "om_123"))[
+            "message_id"
+        ] == "999"
+        assert not await cluster_client.client.exists(
+            cluster_client._claim_key("chatwork", "999")
+        )
+
+        await cluster_client.add_to_failed_queue(
+            "chatwork", "lark", {"message_id": "1"}, "e"
+        )
+        entries = await cluster_client.get_failed_messages()
+        assert await cluster_client.remove_failed_messages(entries) == 1
+
+    @pytest.mark.asyncio
+    async def test_circuit_breaker_and_rate_limiter_stay_on_one_slot(
+        self, cluster_client
+    ):
+        """Test the breaker and token bucket scripts only touch one slot."""
+        breaker = CircuitBreaker(
+            "lark:send_message",
+            redis=cluster_client,
+            retries=RetryQueue(cluster_client),
+        )
+        await breaker.before_call()
+        await breaker.record_failure()
+        await breaker.defer("lark", {"message_id": "om_1"}, 0, "down")
+        assert await breaker.release_deferred() == 1
+
+        limiter = RateLimiter(redis=cluster_client)
+        await limiter.reserve(
+            Bucket("lark:chat:oc_1", 5, 1), Bucket("lark:app:cli", 50, 1)
+        )
+        assert await cluster_client.client.exists("ratelimit:{lark}:chat:oc_1")
+
+    @pytest.mark.asyncio
+    async def test_legacy_keys_migrated(self, redis_client):
+        """Test keys from before the hash-tagged layout are renamed."""
+        await redis_client.client.zadd("dlq:index", {"0000000000001-a": 0})
+        await redis_client.client.rpush("circuit:lark:send_message:deferred", "item")
+
+        assert await redis_client.migrate_legacy_keys() == 2
+
+        assert await redis_client.client.zcard(DLQ_INDEX_KEY) == 1
+        assert await redis_client.client.lrange(
+            circuit_breakers["lark"].deferred_key, 0, -1
+        ) == ["item"]
+        assert not await redis_client.client.exists("dlq:index")
@@ -0,0 +1,138 @@
+"""Unit tests for the instrumented Redis connection pool and its tuner."""
+
+import asyncio
+
+import fakeredis
+import fakeredis.aioredis
+import pytest
+import redis.asyncio as aioredis
+from redis.exceptions import ConnectionError
+
+from src.core.config import settings
+from src.services.redis_pool import InstrumentedConnectionPool, PoolTuner
+
+
+@pytest.fixture
+def pool():
+    """Two-connection pool on a fake server, waiting at most 50 ms."""
+    return InstrumentedConnectionPool(
+        connection_class=fakeredis.aioredis.FakeConnection,
+        server=fakeredis.FakeServer(),
+        max_connections=2,
+        wait_timeout=0.05,
+        decode_responses=True,
+    )
+
+
+@pytest.fixture
+def tuner(pool, monkeypatch):
+    """Tuner keeping the pool between 2 and 8 connections."""
+    monkeypatch.setattr(settings, "redis_pool_autotune_min_connections", 2)
+    monkeypatch.setattr(settings, "redis_pool_autotune_max_connections", 8)
+    return PoolTuner(pool)
+
+
+@pytest.mark.unit
+class TestInstrumentedPool:
+    """Test blocking checkout and saturation counters."""
+
+    @pytest.mark.asyncio
+    async def test_waits_for_released_connection(self, pool):
+        """Test a checkout on a full pool waits and is counted as waiting."""
+        held = [await pool.get_connection("GET") for _ in range(2)]
+        waiting = asyncio.create_task(pool.get_connection("GET"))
+        await asyncio.sleep(0.01)
+        assert pool.waiters == 1
+
+        await pool.release(held[0])
+        connection = await waiting
+
+        assert pool.stats() | {"wait_seconds": 0} == {
+            "max_connections": 2,
+            "in_use": 2,
+            "idle": 0,
+            "waiters": 0,
+            "peak_in_use": 2,
+            "checkouts": 3,
+            "waited": 1,
+            "wait_seconds": 0,
+            "timeouts": 0,
+        }
+        assert pool.wait_seconds >= 0.01
+        for c in (held[1], connection):
+            await pool.release(c)
+
+    @pytest.mark.asyncio
+    async def test_times_out_when_exhausted(self, pool):
+        """Test a checkout fails after wait_timeout instead of blocking forever."""
+        held = [await pool.get_connection("GET") for _ in range(2)]
+
+        with pytest.raises(ConnectionError, match="No connection available"):
+            await pool.get_connection("GET")
+        assert pool.timeouts == 1
+        assert pool.waiters == 0
+        for c in held:
+            await pool.release(c)
+
+    @pytest.mark.asyncio
+    async def test_commands_through_pool(self, pool):
+        """Test the pool works as a client's connection pool."""
+        client = aioredis.Redis(connection_pool=pool)
+        await asyncio.gather(*(client.incr("n") for _ in range(20)))
+
+        assert await client.get("n") == "20"
+        assert pool.in_use == 0
+        assert pool.peak_in_use == 2
+
+
+@pytest.mark.unit
+class TestPoolTuner:
+    """Test resizing the pool from the last window's counters."""
+
+    @pytest.mark.asyncio
+    async def test_grows_under_contention(self, pool, tuner):
+        """Test timeouts grow the pool and let waiting callers through."""
+        held = [await pool.get_connection("GET") for _ in range(2)]
+        with pytest.raises(ConnectionError):
+            await pool.get_connection("GET")
+
+        assert await tuner.adjust() == 3
+        connection = await pool.get_connection("GET")
+        assert pool.stats()["checkouts"] == 1
+        for c in (*held, connection):
+            await pool.release(c)
+
+    @pytest.mark.asyncio
+    async def test_shrinks_when_idle(self, pool, tuner):
+        """Test an uncontended pool shrinks towards peak use and drops idle connections."""
+        await pool.resize(8)
+        held = [await pool.get_connection("GET") for _ in range(4)]
+        for c in held:
+            await pool.release(c)
+        pool.take_window()
+
+        connection = await pool.get_connection("GET")
+        await pool.release(connection)
+        assert await tuner.adjust() == 5
+        assert await tuner.adjust() == 3
+        assert pool.idle <= 3
+        assert await tuner.adjust() == 2
+
+    def test_stays_within_limits(self, tuner):
+        """Test the target size is clamped to the configured limits."""
+        window = {
+            "max_connections": 8,
+            "timeouts": 3,
+            "waited": 10,
+            "checkouts": 10,
+            "peak_in_use": 8,
+        }
+        assert tuner.target_size(window) == 8
+        window = {
+            "max_connections": 2,
+            "timeouts": 0,
+            "waited": 0,
+            "checkouts": 0,
+            "peak_in_use": 0,
+        }
+        assert tuner.target_size(window) == 2
@@ -0,0 +1,200 @@
+"""Unit tests for the delayed retry queue and poller."""
+
+import time
+from unittest.mock import AsyncMock
+
+import pytest
+
+import src.services.retry_queue as retry_queue_module
+from src.core.exceptions import (
+    BadRequestError,
+    DeadLetteredError,
+    RateLimitError,
+    RetryInPlaceError,
+    RetryScheduledError,
+    ServerError,
+)
+from src.core.retry import send_with_retry_policy
+from src.services.message_processor import MessageProcessor
+from src.services.retry_poller import RetryPoller
+from src.services.retry_queue import RetryQueue
+
+MESSAGE_DATA = {
+    "room_id": "12345678",
+    "message_id": "999",
+    "sender_name": "Test User",
+    "message_body": "Hello",
+}
+
+
+@pytest.fixture
+def retries(redis_client):
+    """Create a retry queue backed by fake Redis."""
+    return RetryQueue(redis=redis_client)
+
+
+@pytest.fixture
+async def processor(redis_client, retries, mock_chatwork_client, mock_lark_client):
+    """Create a message processor with a mapped room and mocked clients."""
+    processor = MessageProcessor()
+    processor.storage = redis_client
+    processor.retries = retries
+    processor.chatwork = mock_chatwork_client
+    processor.lark = mock_lark_client
+    await redis_client.set_room_mapping("chatwork", "12345678", "oc_test")
+    return processor
+
+
+@pytest.mark.unit
+class TestRetryQueue:
+    """Test scheduling and claiming retries."""
+
+    @pytest.mark.asyncio
+    async def test_only_due_retries_are_claimed(self, retries):
+        """Test retries wait in Redis until their next-attempt time."""
+        await retries.schedule("chatwork", MESSAGE_DATA, 1, 0, "boom")
+        await retries.schedule(
+            "chatwork", {**MESSAGE_DATA, "message_id": "1000"}, 1, 60, "boom"
+        )
+
+        claimed = await retries.claim_due()
+
+        assert [item["message_data"]["message_id"] for _, item in claimed] == ["999"]
+        assert claimed[0][1]["attempt"] == 1
+        assert await retries.depth() == 2
+
+    @pytest.mark.asyncio
+    async def test_claimed_retry_hidden_until_completed_or_timed_out(self, retries):
+        """Test a claimed retry is not handed out twice, but survives a crash."""
+        await retries.schedule("chatwork", MESSAGE_DATA, 1, 0, "boom")
+
+        ((raw_item, _),) = await retries.claim_due()
+        assert await retries.claim_due() == []
+
+        # Claim timed out: the poller died before finishing
+        await retries.redis.client.zadd(retries.key, {raw_item: 0})
+        assert len(await retries.claim_due()) == 1
+
+        await retries.complete(raw_item)
+        assert await retries.depth() == 0
+
+    def test_backoff(self, monkeypatch):
+        """Test rate limits use retry_after and other errors back off exponentially."""
+        monkeypatch.setattr(retry_queue_module.settings, "retry_min_wait_seconds", 2)
+        monkeypatch.setattr(retry_queue_module.settings, "retry_max_wait_seconds", 60)
+
+        assert RetryQueue.backoff(RateLimitError("lark", retry_after=7), 3) == 7
+        assert RetryQueue.backoff(ServerError("down"), 0) == 2
+        assert RetryQueue.backoff(ServerError("down"), 2) == 8
+        assert RetryQueue.backoff(ServerError("down"), 10) == 60
+
+    @pytest.mark.asyncio
+    async def test_deferred_policy_calls_once(self, monkeypatch):
+        """Test deferred retry mode leaves retrying to the delay queue."""
+        monkeypatch.setattr(retry_queue_module.settings, "retry_mode", "deferred")
+        func = AsyncMock(side_effect=ServerError("down"))
+
+        with pytest.raises(ServerError):
+            await send_with_retry_policy(func)
+
+        assert func.call_count == 1
+
+
+@pytest.mark.unit
+class TestDeferredRetries:
+    """Test the message processor and poller with the delay queue."""
+
+    @pytest.mark.asyncio
+    async def test_retryable_failure_is_scheduled(
+        self, processor, retries, redis_client
+    ):
+        """Test a retryable send failure is scheduled instead of dead-lettered."""
+        processor.lark.send_text_message = AsyncMock(side_effect=ServerError("down"))
+        started = time.time()
+
+        with pytest.raises(RetryScheduledError):
+            await processor.process_chatwork_message(**MESSAGE_DATA)
+
+        [(item, score)] = await redis_client.client.zrange(
+            retries.key, 0, -1, withscores=True
+        )
+        assert score / 1000 >= started + 1
+        assert await redis_client.get_failed_messages() == []
+
+    @pytest.mark.asyncio
+    async def test_in_order_failure_is_handed_back(
+        self, processor, retries, redis_client
+    ):
+        """Test queue-delivered sends are left to the caller to retry in place."""
+        processor.lark.send_text_message = AsyncMock(
+            side_effect=RateLimitError("lark", 7)
+        )
+
+        with pytest.raises(RetryInPlaceError) as exc_info:
+            await processor.process_chatwork_message(
+                **MESSAGE_DATA, attempt=1, in_order=True
+            )
+
+        assert (exc_info.value.retry_in, exc_info.value.attempt) == (7, 2)
+        assert await retries.depth() == 0
+        assert await redis_client.get_failed_messages() == []
+        # The claim was released, so the retry can send it
+        assert await redis_client.claim_message("chatwork", "999") is not None
+
+    @pytest.mark.asyncio
+    async def test_non_retryable_failure_is_dead_lettered(
+        self, processor, retries, redis_client
+    ):
+        """Test a non-retryable send failure goes straight to the DLQ."""
+        processor.lark.send_text_message = AsyncMock(side_effect=BadRequestError("bad"))
+
+        with pytest.raises(DeadLetteredError):
+            await processor.process_chatwork_message(**MESSAGE_DATA)
+
+        assert await retries.depth() == 0
+        assert len(await redis_client.get_failed_messages()) == 1
+
+    @pytest.mark.asyncio
+    async def test_last_attempt_is_dead_lettered(
+        self, processor, retries, redis_client, monkeypatch
+    ):
+        """Test the final attempt is dead-lettered rather than rescheduled."""
+        monkeypatch.setattr(retry_queue_module.settings, "max_retry_attempts", 3)
+        processor.lark.send_text_message = AsyncMock(side_effect=ServerError("down"))
+
+        with pytest.raises(DeadLetteredError):
+            await processor.process_chatwork_message(**MESSAGE_DATA, attempt=2)
+
+        assert await retries.depth() == 0
+        assert len(await redis_client.get_failed_messages()) == 1
+
+    @pytest.mark.asyncio
+    async def test_poller_runs_due_retry(self, processor, retries, redis_client):
+        """Test a due retry is sent and removed from the queue."""
+        poller = RetryPoller()
+        poller.queue = retries
+        poller.processor = processor
+        await retries.schedule("chatwork", MESSAGE_DATA, 1, 0, "boom")
+
+        for raw_item, item in await retries.claim_due():
+            await poller.run_retry(raw_item, item)
+
+        processor.lark.send_text_message.assert_called_once()
+        assert await retries.depth() == 0
+        assert await redis_client.is_message_processed("chatwork", "999")
+
+    @pytest.mark.asyncio
+    async def test_poller_reschedules_failed_retry(self, processor, retries):
+        """Test a retry that fails again is scheduled with the next attempt number."""
+        poller = RetryPoller()
+        poller.queue = retries
+        poller.processor = processor
+        processor.lark.send_text_message = AsyncMock(side_effect=ServerError("down"))
+        await retries.schedule("chatwork", MESSAGE_DATA, 1, 0, "boom")
+
+        for raw_item, item in await retries.claim_due():
+            await poller.run_retry(raw_item, item)
+
+        items = await retries.redis.client.zrange(retries.key, 0, -1)
+        assert len(items) == 1
+        assert '"attempt": 2' in items[0]
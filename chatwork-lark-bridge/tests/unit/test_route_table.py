@@ -0,0 +1,97 @@
+"""Unit tests for the in-process route table."""
+
+import asyncio
+
+import pytest
+
+import src.services.route_table as route_table_module
+from src.services.message_processor import MessageProcessor
+from src.services.route_table import RouteTable
+
+
+@pytest.mark.unit
+class TestRouteTable:
+    """Test loading and refreshing the route snapshot."""
+
+    @pytest.mark.asyncio
+    async def test_refresh_loads_all_mappings(self, redis_client):
+        """Test every room mapping and its sync direction is loaded."""
+        await redis_client.client.hset("rooms:chatwork", "12345678", "oc_test")
+        await redis_client.client.hset("rooms:lark", "oc_test", "12345678")
+        await redis_client.client.hset(
+            "room_directions:lark", "oc_test", "lark_to_chatwork"
+        )
+        table = RouteTable(redis=redis_client)
+
+        assert not table.ready
+        await table.refresh()
+
+        assert table.ready
+        assert len(table) == 2
+        assert table.lookup("chatwork", "12345678").target_room_id == "oc_test"
+        assert table.lookup("lark", "oc_test").sync_direction == "lark_to_chatwork"
+        assert table.lookup("chatwork", "nonexistent") is None
+
+    @pytest.mark.asyncio
+    async def test_snapshot_is_immutable(self, redis_client):
+        """Test readers never see a partially updated table."""
+        table = RouteTable(redis=redis_client)
+        await table.refresh()
+
+        with pytest.raises(TypeError):
+            table._routes["chatwork:1"] = None
+
+    @pytest.mark.asyncio
+    async def test_change_notification_reloads_other_tables(
+        self, redis_client, monkeypatch
+    ):
+        """Test a change announced by one process reaches a running table."""
+        monkeypatch.setattr(
+            route_table_module.settings, "route_table_check_interval_seconds", 5
+        )
+        follower = RouteTable(redis=redis_client)
+        await follower.start()
+
+        try:
+            await redis_client.client.hset("rooms:chatwork", "12345678", "oc_test")
+            version = await RouteTable(redis=redis_client).notify_changed()
+
+            for _ in range(50):
+                if follower.version == version:
+                    break
+                await asyncio.sleep(0.02)
+
+            assert follower.version == version
+            assert follower.lookup("chatwork", "12345678").target_room_id == "oc_test"
+        finally:
+            await follower.stop()
+
+    @pytest.mark.asyncio
+    async def test_processor_routes_locally(
+        self, redis_client, mock_chatwork_client, mock_lark_client
+    ):
+        """Test a routed message only needs Redis for its claim."""
+        table = RouteTable(redis=redis_client)
+        await redis_client.client.hset("rooms:chatwork", "12345678", "oc_test")
+        await table.refresh()
+        # Gone from Redis, still in the snapshot
+        await redis_client.client.delete("rooms:chatwork")
+
+        processor = MessageProcessor()
+        processor.storage = redis_client
+        processor.routes = table
+        processor.chatwork = mock_chatwork_client
+        processor.lark = mock_lark_client
+
+        result = await processor.process_chatwork_message(
+            room_id="12345678",
+            message_id="999",
+            sender_name="Test User",
+            message_body="Hello",
+        )
+
+        assert result == "om_test123"
+        assert mock_lark_client.send_text_message.call_args[0][0] == "oc_test"
+        assert await processor.partition_key("chatwork", "12345678") == (
+            "cw_12345678_lark_oc_test"
+        )
@@ -0,0 +1,111 @@
+"""Unit tests for the seen filter in front of dedup lookups."""
+
+import uuid
+
+import pytest
+
+from src.core.config import settings
+from src.services.redis_client import RedisClient
+from src.services.seen_filter import BloomFilter, SeenFilter
+
+
+@pytest.mark.unit
+class TestSeenFilter:
+    """Test the rotating Bloom filter."""
+
+    def test_no_false_negatives_and_bounded_false_positives(self):
+        """Test added items are always found and others rarely are."""
+        bloom = BloomFilter(capacity=10_000, error_rate=0.01)
+        added = [uuid.uuid4().hex for _ in range(10_000)]
+        for item in added:
+            bloom.add(item)
+
+        assert all(item in bloom for item in added)
+        false_positives = sum(uuid.uuid4().hex in bloom for _ in range(10_000))
+        assert false_positives < 200
+
+    def test_rotates_with_windows(self, monkeypatch):
+        """Test items survive one window change and are dropped after two."""
+        now = [1000.0]
+        monkeypatch.setattr("src.services.seen_filter.time.time", lambda: now[0])
+        seen = SeenFilter(capacity=100, error_rate=0.01, window_seconds=100)
+        seen.add("chatwork:1")
+
+        now[0] += 100
+        assert seen.might_contain("chatwork:1")
+        seen.add("chatwork:2")
+
+        now[0] += 100
+        seen.add("chatwork:3")
+        assert not seen.might_contain("chatwork:1")
+        assert seen.might_contain("chatwork:2")
+        assert len(seen) == 2
+
+
+@pytest.mark.unit
+@pytest.mark.redis
+class TestRedisSeenFilter:
+    """Test lookups answered by the filter and its rebuild."""
+
+    @pytest.mark.asyncio
+    async def test_rebuilt_from_existing_mappings(self, redis_client, fake_redis):
+        """Test mappings, claims and legacy keys already in Redis are found."""
+        await redis_client.save_message_mapping("chatwork", "1", "lark", "om_1")
+        await redis_client.claim_message("lark", "om_2")
+        await fake_redis.set("msg:chatwork:3", '{"target_message_id": "om_3"}')
+
+        assert await redis_client.rebuild_seen_filter() == 3
+        assert await redis_client.is_message_processed("chatwork", "1")
+        assert await redis_client.is_message_processed("lark", "om_2")
+        assert await redis_client.is_message_processed("chatwork", "3")
+        assert await redis_client.get_counterpart("lark", "om_1") == {
+            "platform": "chatwork",
+            "message_id": "1",
+            "role": "source",
+        }
+
+    @pytest.mark.asyncio
+    async def test_unseen_message_skips_redis(self, redis_client, fake_redis):
+        """Test a definite negative is answered without a Redis read."""
+        await redis_client.rebuild_seen_filter()
+        calls = []
+        pipeline = fake_redis.pipeline
+        fake_redis.pipeline = lambda *a, **kw: calls.append(1) or pipeline(*a, **kw)
+
+        assert not await redis_client.is_message_processed("chatwork", "404")
+        assert calls == []
+
+        claim = await redis_client.claim_message("chatwork", "404")
+        assert claim is not None
+        assert await redis_client.is_message_processed("chatwork", "404")
+
+    @pytest.mark.asyncio
+    async def test_mapping_reads_ignore_filter(self, redis_client, fake_redis):
+        """Test mappings saved by another process are still found."""
+        await redis_client.rebuild_seen_filter()
+        other = RedisClient()
+        other.client = fake_redis
+        await other.save_message_mapping("chatwork", "7", "lark", "om_7")
+
+        assert await redis_client.get_message_mapping("chatwork", "7") is not None
+        assert await redis_client.get_counterpart("lark", "om_7") == {
+            "platform": "chatwork",
+            "message_id": "7",
+            "role": "source",
+        }
+
+    @pytest.mark.asyncio
+    async def test_connect_rebuilds_when_enabled(self, monkeypatch, fake_redis):
+        """Test the filter is only used with dedup_filter_enabled."""
+        monkeypatch.setattr(settings, "dedup_filter_enabled", True)
+        monkeypatch.setattr(
+            "src.services.redis_client.ConnectionPool.from_url", lambda *a, **kw: None
+        )
+        monkeypatch.setattr(
+            "src.services.redis_client.aioredis.Redis", lambda **kw: fake_redis
+        )
+        client = RedisClient()
+        await client.connect()
+
+        assert client.seen is not None
+        client._client = None
@@ -0,0 +1,283 @@
+"""Unit tests for the local storage backends."""
+
+import asyncio
+import time
+
+import pytest
+
+from src.core.config import settings
+from src.services.memory_storage import MemoryStorage
+from src.services.message_processor import MessageProcessor
+from src.services.redis_client import (
+    SEND_CLAIMED,
+    SEND_DIRECTION_DISABLED,
+    SEND_DUPLICATE,
+    SEND_NO_MAPPING,
+)
+from src.services.sqlite_storage import SQLiteStorage
+from src.services.storage import create_storage
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+async def storage(request, tmp_path):
+    """Connected storage of each local backend."""
+    if request.param == "memory":
+        backend = MemoryStorage()
+    else:
+        backend = SQLiteStorage(str(tmp_path / "db" / "bridge.db"))
+    await backend.connect()
+    yield backend
+    await backend.disconnect()
+
+
+@pytest.mark.unit
+class TestLocalStorage:
+    """Test the memory and SQLite backends behave like Redis."""
+
+    @pytest.mark.asyncio
+    async def test_claim_and_save_mapping(self, storage):
+        """Test a claimed message is a duplicate until released."""
+        claim = await storage.claim_message("chatwork", "999")
+        assert claim is not None
+        assert await storage.claim_message("chatwork", "999") is None
+        assert await storage.is_message_processed("chatwork", "999")
+
+        await storage.release_message_claim("chatwork", "999", "someone-else")
+        assert await storage.claim_message("chatwork", "999") is None
+        await storage.release_message_claim("chatwork", "999", claim)
+        assert not await storage.is_message_processed("chatwork", "999")
+
+        claim = await storage.claim_message("chatwork", "999")
+        await storage.save_message_mapping("chatwork", "999", "lark", "om_1")
+        await storage.release_message_claim("chatwork", "999", claim)
+
+        mapping = await storage.get_message_mapping("chatwork", "999")
+        assert mapping["target_platform"] == "lark"
+        assert mapping["target_message_id"] == "om_1"
+        assert "timestamp" in mapping
+        assert await storage.claim_message("chatwork", "999") is None
+
+    @pytest.mark.asyncio
+    async def test_get_counterpart_both_directions(self, storage):
+        """Test the synced message is found from either side."""
+        await storage.save_message_mapping("lark", "om_1", "chatwork", "555")
+
+        assert await storage.get_counterpart("lark", "om_1") == {
+            "platform": "chatwork",
+            "message_id": "555",
+            "role": "target",
+        }
+        assert await storage.get_counterpart("chatwork", "555") == {
+            "platform": "lark",
+            "message_id": "om_1",
+            "role": "source",
+        }
+        assert await storage.get_counterpart("chatwork", "556") is None
+
+    @pytest.mark.asyncio
+    async def test_mapping_expires(self, storage, monkeypatch):
+        """Test mappings expire after message_ttl_seconds."""
+        await storage.save_message_mapping("chatwork", "999", "lark", "om_1")
+
+        later = time.time() + settings.message_ttl_seconds + 1
+        monkeypatch.setattr(time, "time", lambda: later)
+        assert await storage.get_message_mapping("chatwork", "999") is None
+        assert not await storage.is_message_processed("chatwork", "999")
+
+    @pytest.mark.asyncio
+    async def test_prepare_send(self, storage):
+        """Test prepare_send statuses match the Redis script."""
+        result = await storage.prepare_send("chatwork", "123", "1")
+        assert result.status == SEND_NO_MAPPING
+
+        await storage.replace_tables(
+            {
+                "rooms:chatwork": {"123": "oc_1"},
+                "room_directions:chatwork": {"123": "lark_to_chatwork"},
+            }
+        )
+        result = await storage.prepare_send("chatwork", "123", "1")
+        assert result.status == SEND_DIRECTION_DISABLED
+        assert result.target_room_id == "oc_1"
+
+        await storage.set_room_mapping("chatwork", "456", "oc_2", sync_direction="both")
+        result = await storage.prepare_send("chatwork", "456", "2")
+        assert result.status == SEND_CLAIMED
+        assert result.target_room_id == "oc_2"
+        assert result.claim
+
+        result = await storage.prepare_send("chatwork", "456", "2")
+        assert result.status == SEND_DUPLICATE
+
+    @pytest.mark.asyncio
+    async def test_replace_and_sync_tables(self, storage):
+        """Test full table loads and diffs."""
+        await storage.replace_tables({"rooms:lark": {"oc_1": "1", "oc_2": "2"}})
+        await storage.replace_tables({"rooms:lark": {"oc_1": "1"}})
+        assert await storage.get_room_mapping("lark", "oc_2") is None
+
+        updated, removed = await storage.sync_tables(
+            {"rooms:lark": {"oc_1": "9", "oc_3": "3"}}
+        )
+        assert (updated, removed) == (2, 0)
+        assert await storage.sync_tables({"rooms:lark": {"oc_3": "3"}}) == (0, 1)
+        assert await storage.get_room_mapping("lark", "oc_1") is None
+        assert await storage.get_room_mapping("lark", "oc_3") == "3"
+
+        await storage.replace_tables(
+            {"users:lark": {"ou_1": '{"chatwork_user_id": "7"}'}}
+        )
+        assert await storage.get_user_mapping("lark", "ou_1") == {
+            "chatwork_user_id": "7"
+        }
+
+    @pytest.mark.asyncio
+    async def test_failed_queue(self, storage):
+        """Test DLQ paging, counts and removal."""
+        for i in range(3):
+            await storage.add_to_failed_queue(
+                "lark",
+                "chatwork",
+                {"message_id": str(i)},
+                "boom",
+                error_type="ServerError",
+            )
+        await storage.add_to_failed_queue(
+            "chatwork", "lark", {"message_id": "x"}, "boom"
+        )
+
+        first = await storage.get_failed_messages(limit=2)
+        rest = await storage.get_failed_messages(limit=10, after=first[-1][0])
+        assert len(first) == 2
+        assert len(rest) == 2
+        assert await storage.count_failed_messages() == {
+            "total": 4,
+            "by_platform": {"lark": 3, "chatwork": 1},
+            "by_error": {"ServerError": 3, "unknown": 1},
+        }
+
+        assert await storage.remove_failed_messages(first) == 2
+        assert await storage.remove_failed_messages(first) == 0
+        counts = await storage.count_failed_messages()
+        assert counts["total"] == 2
+
+    @pytest.mark.asyncio
+    async def test_records(self, storage, monkeypatch):
+        """Test records round-trip and expire."""
+        assert await storage.get_record("dlq:replay:run") == {}
+        await storage.put_record("dlq:replay:run", {"progress": "{}"}, 60)
+        assert await storage.get_record("dlq:replay:run") == {"progress": "{}"}
+
+        later = time.time() + 61
+        monkeypatch.setattr(time, "time", lambda: later)
+        assert await storage.get_record("dlq:replay:run") == {}
+
+    @pytest.mark.asyncio
+    async def test_processor_on_local_storage(
+        self, storage, mock_chatwork_client, mock_lark_client
+    ):
+        """Test the message pipeline runs without Redis."""
+        processor = MessageProcessor()
+        processor.storage = storage
+        processor.lark = mock_lark_client
+        processor.chatwork = mock_chatwork_client
+        await storage.replace_tables({"rooms:chatwork": {"123": "oc_1"}})
+
+        result = await processor.process_chatwork_message("123", "999", "User", "Hello")
+
+        assert result == "om_test123"
+        assert (
+            await processor.process_chatwork_message("123", "999", "User", "Hello")
+            is None
+        )
+        mock_lark_client.send_text_message.assert_called_once()
+
+
+@pytest.mark.unit
+class TestSQLiteStorage:
+    """Test SQLite specifics."""
+
+    @pytest.mark.asyncio
+    async def test_wal_mode_and_persistence(self, tmp_path):
+        """Test the database uses WAL and keeps data across reconnects."""
+        path = str(tmp_path / "bridge.db")
+        first = SQLiteStorage(path)
+        await first.connect()
+        assert first.db.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        await first.save_message_mapping("chatwork", "999", "lark", "om_1")
+        await first.disconnect()
+
+        second = SQLiteStorage(path)
+        await second.connect()
+        assert await second.is_message_processed("chatwork", "999")
+        assert await second.health_check()
+        await second.disconnect()
+        assert not await second.health_check()
+
+    @pytest.mark.asyncio
+    async def test_claims_shared_between_connections(self, tmp_path):
+        """Test two processes on one database share dedup."""
+        path = str(tmp_path / "bridge.db")
+        first, second = SQLiteStorage(path), SQLiteStorage(path)
+        await first.connect()
+        await second.connect()
+
+        assert await first.claim_message("lark", "om_1")
+        assert await second.claim_message("lark", "om_1") is None
+
+        await first.disconnect()
+        await second.disconnect()
+
+    @pytest.mark.asyncio
+    async def test_locked_database_does_not_block_event_loop(self, tmp_path):
+        """Test a write waiting for another process's lock lets other coroutines run."""
+        path = str(tmp_path / "bridge.db")
+        first, second = SQLiteStorage(path), SQLiteStorage(path)
+        await first.connect()
+        await second.connect()
+        first.db.execute("BEGIN IMMEDIATE")
+
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        async def unlock():
+            await asyncio.sleep(0.2)
+            first.db.execute("COMMIT")
+
+        ticker = asyncio.create_task(tick())
+        asyncio.create_task(unlock())
+        claim = await second.claim_message("lark", "om_1")
+        ticker.cancel()
+
+        assert claim is not None
+        assert ticks >= 10
+        await first.disconnect()
+        await second.disconnect()
+
+
+@pytest.mark.unit
+class TestCreateStorage:
+    """Test backend selection."""
+
+    def test_backends(self, monkeypatch, tmp_path):
+        """Test each backend and the Redis-only feature check."""
+        from src.services.redis_client import redis_client
+
+        monkeypatch.setattr(settings, "ingest_mode", "inline")
+        monkeypatch.setattr(settings, "retry_mode", "inline")
+        monkeypatch.setattr(settings, "sqlite_path", str(tmp_path / "bridge.db"))
+
+        assert create_storage("redis") is redis_client
+        assert isinstance(create_storage("memory"), MemoryStorage)
+        assert isinstance(create_storage("sqlite"), SQLiteStorage)
+        with pytest.raises(ValueError):
+            create_storage("postgres")
+
+        monkeypatch.setattr(settings, "retry_mode", "deferred")
+        with pytest.raises(ValueError):
+            create_storage("sqlite")
@@ -0,0 +1,50 @@
+"""Unit tests for the standalone delivery worker entry point."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+import src.worker as worker_module
+from src.core.config import settings
+
+
+@pytest.mark.unit
+class TestRunWorker:
+    """Test the worker starts and stops the shared services."""
+
+    @pytest.mark.asyncio
+    async def test_uses_configured_storage_and_prober(self, monkeypatch):
+        """Test the worker connects the storage and runs the health prober."""
+        services = {
+            name: MagicMock(start=AsyncMock(), stop=AsyncMock())
+            for name in ("route_table", "health_prober", "retry_poller")
+        }
+        services["retry_poller"].start = MagicMock()
+        storage = MagicMock(connect=AsyncMock(), disconnect=AsyncMock())
+        worker = MagicMock(
+            start=AsyncMock(side_effect=RuntimeError("stop")), stop=AsyncMock()
+        )
+        for name, service in services.items():
+            monkeypatch.setattr(worker_module, name, service)
+        monkeypatch.setattr(worker_module, "storage", storage)
+        monkeypatch.setattr(worker_module, "DeliveryWorker", lambda: worker)
+        monkeypatch.setattr(worker_module, "lark_client", MagicMock(close=AsyncMock()))
+        monkeypatch.setattr(
+            worker_module, "chatwork_client", MagicMock(close=AsyncMock())
+        )
+
+        with pytest.raises(RuntimeError):
+            await worker_module.run_worker()
+
+        storage.connect.assert_awaited_once()
+        storage.disconnect.assert_awaited_once()
+        services["health_prober"].start.assert_awaited_once()
+        services["health_prober"].stop.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_refuses_local_storage(self, monkeypatch):
+        """Test a local storage backend is rejected (the queue lives in Redis)."""
+        monkeypatch.setattr(settings, "storage_backend", "sqlite")
+
+        with pytest.raises(ValueError, match="no event queue"):
+            await worker_module.run_worker()